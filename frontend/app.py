@@ -1,10 +1,13 @@
 import streamlit as st
 import requests
+import json
 import uuid
 
 # ---------------- CONFIG ----------------
 API_URL = "http://api_gateway:8000/api/chat"  # docker
 # API_URL = "http://localhost:8000/api/chat" # local run
+# tokens aate hi dikhane ke liye (Server-Sent Events)
+STREAM_URL = API_URL + "/stream"
 
 st.set_page_config(
     page_title="AI Agriculture Assistant",
@@ -52,29 +55,55 @@ user_input = st.text_input(
 
 send = st.button("Send")
 
+# ---------------- CHAT DISPLAY ----------------
+def render(role, msg, slot=st):
+    if role == "user":
+        slot.markdown(f"<div class='chat-user'>🧑‍🌾 <b>You:</b><br>{msg}</div>", unsafe_allow_html=True)
+    else:
+        slot.markdown(f"<div class='chat-bot'>🌾 <b>AI:</b><br>{msg}</div>", unsafe_allow_html=True)
+
+
+st.divider()
+for role, msg in st.session_state.chat:
+    render(role, msg)
+
 # ---------------- ACTION ----------------
+def stream_reply(payload, slot):
+    """Gateway ke SSE events padh kar bot bubble har token par update karein."""
+    reply = ""
+    with requests.post(STREAM_URL, json=payload, stream=True, timeout=(5, 60)) as res:
+        if res.status_code == 429:
+            # gateway overload / rate limit — error nahi, thoda rukna hai
+            return f"⏳ Server abhi busy hai, {res.headers.get('Retry-After', 'kuch')} second baad dobara poochhein"
+        res.raise_for_status()
+        for line in res.iter_lines():
+            # text/event-stream bina charset → requests latin-1 maanta hai
+            if not line.startswith(b"data:"):
+                continue
+            event = json.loads(line[5:].decode("utf-8"))
+            if event.get("type") == "delta":
+                reply += event["text"]
+                render("bot", reply + " ▌", slot)
+            elif event.get("type") == "error" and not reply:
+                reply = f"❌ {event.get('error', 'Kuch galat ho gaya')}"
+    return reply or "Kuch galat ho gaya"
+
+
 if send and user_input.strip():
     payload = {
         "session_id": st.session_state.session_id,
         "message": user_input
     }
 
-    try:
-        res = requests.post(API_URL, json=payload, timeout=20)
-        res.raise_for_status()
-        data = res.json()
-        reply = data.get("reply", "Kuch galat ho gaya")
+    render("user", user_input)
+    slot = st.empty()
 
+    try:
+        reply = stream_reply(payload, slot)
     except Exception as e:
         reply = f"❌ Backend error: {e}"
 
+    render("bot", reply, slot)
+
     st.session_state.chat.append(("user", user_input))
     st.session_state.chat.append(("bot", reply))
-
-# ---------------- CHAT DISPLAY ----------------
-st.divider()
-for role, msg in st.session_state.chat:
-    if role == "user":
-        st.markdown(f"<div class='chat-user'>🧑‍🌾 <b>You:</b><br>{msg}</div>", unsafe_allow_html=True)
-    else:
-        st.markdown(f"<div class='chat-bot'>🌾 <b>AI:</b><br>{msg}</div>", unsafe_allow_html=True)
\ No newline at end of file
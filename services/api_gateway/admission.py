@@ -0,0 +1,239 @@
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Callable
+
+from prometheus_client import Counter, Gauge, Histogram
+
+# ---------------- Admission Control ----------------
+#
+# Orchestrator tak request jaane se pehle:
+#   1. TokenBuckets — per session / per IP rate limit (ek client ka burst
+#      baaki sab ki queue na bhare). Keys LRU me bounded.
+#   2. PriorityGate — orchestrator par max `capacity()` requests; baaki ek
+#      bounded priority queue me. Sasti history reads (HIGH) chat se pehle
+#      nikalti hain. Queue full, andaze se wait deadline se zyada (drain
+#      rate se — aate hi), ya wait sach me deadline paar → 429 + Retry-After
+#      (60s timeout tak latakne se behtar).
+
+HIGH, NORMAL = 0, 1
+
+ADMISSION = Counter(
+    "gateway_admission_total",
+    "Gateway admission decisions",
+    ["route", "result"],  # admitted | rate_limited | queue_full | shed_early | deadline
+)
+QUEUE_DEPTH = Gauge("gateway_queue_depth", "Requests waiting for an orchestrator slot", ["priority"])
+IN_FLIGHT = Gauge("gateway_in_flight", "Requests currently forwarded to the orchestrator")
+QUEUE_WAIT = Histogram(
+    "gateway_queue_wait_seconds",
+    "Time spent waiting in the admission queue",
+    ["route"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 5),
+)
+
+
+class Rejected(Exception):
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(f"{reason}, retry after {retry_after:.1f}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+# ---------------- Token Buckets ----------------
+
+class TokenBuckets:
+    """Har key ka bucket: `burst` tokens tak, `rate` tokens/sec se bharta hai."""
+
+    def __init__(self, rate: float, burst: float, max_keys: int = 100000, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets: OrderedDict[str, list[float]] = OrderedDict()  # key → [tokens, updated_at]
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def take(self, key: str, cost: float = 1.0) -> float:
+        """Token mila → 0; warna kitne seconds baad milega."""
+        now = self.clock()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [self.burst, now]
+            if len(self._buckets) > self.max_keys:
+                # sabse purana (LRU) key hatao — memory bounded
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+
+        if bucket[0] >= cost:
+            bucket[0] -= cost
+            return 0.0
+        return (cost - bucket[0]) / self.rate
+
+# ---------------- Priority Gate ----------------
+
+class PriorityGate:
+    def __init__(
+        self,
+        capacity: Callable[[], int],
+        max_queue: int = 200,
+        deadlines: dict[int, float] | None = None,
+    ):
+        self.capacity = capacity
+        self.max_queue = max_queue
+        self.deadlines = deadlines or {HIGH: 1.0, NORMAL: 2.0}
+        self.in_flight = 0
+        self._heap: list[tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._waiting = {HIGH: 0, NORMAL: 0}
+        self._drain: float | None = None  # saturated hone par releases ke beech EWMA seconds
+        self._last_release = 0.0
+
+    def __len__(self) -> int:
+        return sum(self._waiting.values())
+
+    def _retry_after(self) -> float:
+        # andaza: queue ke aage wale nikalne me lagbhag ek deadline
+        return max(1.0, min(self.deadlines.values()))
+
+    def expected_wait(self, priority: int) -> float | None:
+        if self._drain is None:
+            return None
+        ahead = sum(n for p, n in self._waiting.items() if p <= priority)
+        return (ahead + 1) * self._drain
+
+    async def acquire(self, priority: int, route: str):
+        started = time.perf_counter()
+        if self.in_flight < max(1, self.capacity()) and not self._heap:
+            self._admit(route, started)
+            return
+
+        if len(self) >= self.max_queue:
+            ADMISSION.labels(route, "queue_full").inc()
+            raise Rejected("queue_full", self._retry_after())
+
+        deadline = self.deadlines.get(priority, 2.0)
+        expected = self.expected_wait(priority)
+        if expected is not None and expected > deadline:
+            # deadline tak intezaar karke 429 dene se abhi dena behtar
+            ADMISSION.labels(route, "shed_early").inc()
+            raise Rejected("shed_early", max(self._retry_after(), expected - deadline))
+
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._heap, (priority, next(self._seq), fut))
+        self._set_waiting(priority, +1)
+        try:
+            await asyncio.wait_for(fut, deadline)
+        except BaseException as e:
+            if fut.done() and not fut.cancelled():
+                # slot mil gaya tha par hum ja rahe hain → agle ko do
+                self.release()
+            else:
+                self._discard(fut, priority)
+            if isinstance(e, asyncio.TimeoutError):
+                ADMISSION.labels(route, "deadline").inc()
+                raise Rejected("deadline", self._retry_after()) from None
+            raise
+        self._admit(route, started, counted=True)
+
+    def _admit(self, route: str, started: float, counted: bool = False):
+        if not counted:
+            self.in_flight += 1
+        IN_FLIGHT.set(self.in_flight)
+        ADMISSION.labels(route, "admitted").inc()
+        QUEUE_WAIT.labels(route).observe(time.perf_counter() - started)
+
+    def _set_waiting(self, priority: int, delta: int):
+        self._waiting[priority] = self._waiting.get(priority, 0) + delta
+        QUEUE_DEPTH.labels("high" if priority == HIGH else "normal").set(self._waiting[priority])
+
+    def _discard(self, fut: asyncio.Future, priority: int):
+        for i, (_, _, f) in enumerate(self._heap):
+            if f is fut:
+                self._heap[i] = self._heap[-1]
+                self._heap.pop()
+                heapq.heapify(self._heap)
+                self._set_waiting(priority, -1)
+                return
+
+    def release(self):
+        self.in_flight -= 1
+        now = time.perf_counter()
+        if self._heap:
+            gap = now - self._last_release
+            self._drain = gap if self._drain is None else self._drain + (gap - self._drain) * 0.1
+        self._last_release = now
+        # capacity adaptive limit ke saath badal sakti hai — jitni jagah utne nikalo
+        while self._heap and self.in_flight < max(1, self.capacity()):
+            priority, _, fut = heapq.heappop(self._heap)
+            self._set_waiting(priority, -1)
+            if not fut.done():
+                self.in_flight += 1
+                fut.set_result(None)
+        IN_FLIGHT.set(self.in_flight)
+
+    @asynccontextmanager
+    async def slot(self, priority: int, route: str):
+        await self.acquire(priority, route)
+        try:
+            yield
+        finally:
+            self.release()
+
+# ---------------- Admission ----------------
+
+class Admission:
+    """Rate limit (session + IP) phir priority gate. `enabled=False` → sab seedha."""
+
+    def __init__(
+        self,
+        gate: PriorityGate,
+        session_buckets: TokenBuckets,
+        ip_buckets: TokenBuckets,
+        enabled: bool = True,
+    ):
+        self.gate = gate
+        self.session_buckets = session_buckets
+        self.ip_buckets = ip_buckets
+        self.enabled = enabled
+
+    def check_rate(self, route: str, ip: str | None, session_id: str | None, cost: float = 1.0):
+        if not self.enabled:
+            return
+        waits = []
+        if session_id:
+            waits.append(self.session_buckets.take(session_id, cost))
+        if ip:
+            waits.append(self.ip_buckets.take(ip, cost))
+        wait = max(waits, default=0.0)
+        if wait > 0:
+            ADMISSION.labels(route, "rate_limited").inc()
+            raise Rejected("rate_limited", wait)
+
+    async def acquire(self, route: str, priority: int, ip: str | None, session_id: str | None, cost: float = 1.0):
+        self.check_rate(route, ip, session_id, cost)
+        if self.enabled:
+            await self.gate.acquire(priority, route)
+
+    def release(self):
+        if self.enabled:
+            self.gate.release()
+
+    @asynccontextmanager
+    async def admit(self, route: str, priority: int, ip: str | None, session_id: str | None, cost: float = 1.0):
+        await self.acquire(route, priority, ip, session_id, cost)
+        try:
+            yield
+        finally:
+            self.release()
+
+
+def retry_after_header(seconds: float) -> str:
+    return str(max(1, math.ceil(seconds)))
@@ -1,8 +1,19 @@
-from fastapi import FastAPI, Depends
+from fastapi import FastAPI, Depends, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
+import importlib.util
+import json
+import os
 import httpx
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi import HTTPException as HTTTPException
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+import deadlines
+import tracing
+from admission import HIGH, NORMAL, Admission, PriorityGate, Rejected, TokenBuckets, retry_after_header
+from deadlines import DeadlineExceeded, DeadlineMiddleware, deadline_exceeded_handler
+from resilience import AdaptiveLimiter, CircuitBreaker, SharedState, Upstream, UpstreamUnavailable
 
 app = FastAPI(title="AI Agri Assistant - API Gateway", docs_url="/docs", openapi_url="/openapi.json")
 
@@ -17,7 +28,176 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-CHAT_ORCHESTRATOR_URL = "http://chat_orchestrator:8000"
+CHAT_ORCHESTRATOR_URL = os.getenv("CHAT_ORCHESTRATOR_URL", "http://chat_orchestrator:8000")
+
+# ---------------- HTTP Client Pool ----------------
+
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", 200))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", 50))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", 30))
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "false").lower() == "true"
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", 2))
+CHAT_TIMEOUT = float(os.getenv("CHAT_TIMEOUT", 60))
+HISTORY_TIMEOUT = float(os.getenv("HISTORY_TIMEOUT", 5))
+# streaming me har chunk ke beech ka max gap (poore jawab ka nahi)
+CHAT_STREAM_READ_TIMEOUT = float(os.getenv("CHAT_STREAM_READ_TIMEOUT", 30))
+
+# ---------------- Request Deadline ----------------
+
+# har request ka kul budget yahin banta hai; X-Deadline-Ms header me bacha hua
+# time orchestrator → NLU / RAG / LLM tak jaata hai (client kam maang sakta hai)
+REQUEST_DEADLINE_S = float(os.getenv("REQUEST_DEADLINE_S", CHAT_TIMEOUT))
+
+app.add_middleware(DeadlineMiddleware, default=REQUEST_DEADLINE_S, maximum=REQUEST_DEADLINE_S)
+app.add_exception_handler(DeadlineExceeded, deadline_exceeded_handler)
+
+# ---------------- Tracing ----------------
+
+# trace yahin shuru hota hai; response me X-Request-ID (trace_id) milta hai
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH", "")
+
+tracing.configure("api_gateway", TRACE_EXPORT_PATH)
+app.add_middleware(tracing.TracingMiddleware)
+
+# ---------------- Resilience ----------------
+
+BREAKER_WINDOW_S = float(os.getenv("BREAKER_WINDOW_S", 30))
+BREAKER_MIN_REQUESTS = int(os.getenv("BREAKER_MIN_REQUESTS", 20))
+BREAKER_ERROR_RATE = float(os.getenv("BREAKER_ERROR_RATE", 0.5))
+BREAKER_COOLDOWN_S = float(os.getenv("BREAKER_COOLDOWN_S", 10))
+BREAKER_HALF_OPEN_PROBES = int(os.getenv("BREAKER_HALF_OPEN_PROBES", 3))
+LIMIT_INITIAL = int(os.getenv("LIMIT_INITIAL", 100))
+LIMIT_MIN = int(os.getenv("LIMIT_MIN", 8))
+LIMIT_MAX = int(os.getenv("LIMIT_MAX", HTTP_MAX_CONNECTIONS))
+LIMIT_MAX_WAIT_S = float(os.getenv("LIMIT_MAX_WAIT_S", 2))
+RESILIENCE_STATE_DB = os.getenv("RESILIENCE_STATE_DB", "")
+
+
+def _is_orchestrator_failure(exc: BaseException) -> bool:
+    # budget khatam (orchestrator ki kharabi nahi)
+    if isinstance(exc, DeadlineExceeded):
+        return False
+    if isinstance(exc, httpx.TimeoutException) and deadlines.expired():
+        return False
+    # 404 (session nahi mila) jaise jawab orchestrator ki kharabi nahi
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code >= 500
+    return True
+
+
+resilience_state = SharedState(RESILIENCE_STATE_DB) if RESILIENCE_STATE_DB else None
+
+orchestrator = Upstream(
+    "orchestrator",
+    breaker=CircuitBreaker(
+        "orchestrator",
+        window=BREAKER_WINDOW_S,
+        min_requests=BREAKER_MIN_REQUESTS,
+        error_rate=BREAKER_ERROR_RATE,
+        cooldown=BREAKER_COOLDOWN_S,
+        half_open_probes=BREAKER_HALF_OPEN_PROBES,
+        shared=resilience_state,
+    ),
+    limiter=AdaptiveLimiter(
+        "orchestrator",
+        initial=min(LIMIT_INITIAL, LIMIT_MAX),
+        min_limit=LIMIT_MIN,
+        max_limit=LIMIT_MAX,
+        max_wait=LIMIT_MAX_WAIT_S,
+    ),
+    is_failure=_is_orchestrator_failure,
+)
+
+# ---------------- Admission Control ----------------
+
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+# per session (farmer) aur per IP (ek NAT ke peeche kai farmers → zyada)
+RATE_SESSION_RPS = float(os.getenv("RATE_SESSION_RPS", 1))
+RATE_SESSION_BURST = float(os.getenv("RATE_SESSION_BURST", 5))
+RATE_IP_RPS = float(os.getenv("RATE_IP_RPS", 20))
+RATE_IP_BURST = float(os.getenv("RATE_IP_BURST", 50))
+RATE_MAX_KEYS = int(os.getenv("RATE_MAX_KEYS", 100000))
+# history read sasta hai — chat ke ek token ka hissa
+HISTORY_RATE_COST = float(os.getenv("HISTORY_RATE_COST", 0.25))
+# 0 → sirf orchestrator ka adaptive limit; capacity pata ho to upar se cap
+ADMISSION_MAX_CONCURRENT = int(os.getenv("ADMISSION_MAX_CONCURRENT", 0))
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", 200))
+ADMISSION_DEADLINE_CHAT_S = float(os.getenv("ADMISSION_DEADLINE_CHAT_S", 2))
+ADMISSION_DEADLINE_HISTORY_S = float(os.getenv("ADMISSION_DEADLINE_HISTORY_S", 1))
+# sirf tab jab gateway ke aage apna proxy / load balancer ho
+TRUST_FORWARDED_FOR = os.getenv("TRUST_FORWARDED_FOR", "false").lower() == "true"
+
+def admission_capacity() -> int:
+    # orchestrator ka adaptive limit hi gate ki capacity — baaki queue me
+    limit = int(orchestrator.limiter.limit)
+    return min(limit, ADMISSION_MAX_CONCURRENT) if ADMISSION_MAX_CONCURRENT > 0 else limit
+
+
+admission = Admission(
+    gate=PriorityGate(
+        capacity=admission_capacity,
+        max_queue=ADMISSION_MAX_QUEUE,
+        deadlines={HIGH: ADMISSION_DEADLINE_HISTORY_S, NORMAL: ADMISSION_DEADLINE_CHAT_S},
+    ),
+    session_buckets=TokenBuckets(RATE_SESSION_RPS, RATE_SESSION_BURST, max_keys=RATE_MAX_KEYS),
+    ip_buckets=TokenBuckets(RATE_IP_RPS, RATE_IP_BURST, max_keys=RATE_MAX_KEYS),
+    enabled=ADMISSION_ENABLED,
+)
+
+
+def client_ip(request: Request) -> str | None:
+    if TRUST_FORWARDED_FOR:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else None
+
+
+@app.exception_handler(Rejected)
+async def rejected_handler(request: Request, exc: Rejected):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "Bahut zyada requests — thodi der baad try karein", "reason": exc.reason},
+        headers={"Retry-After": retry_after_header(exc.retry_after)},
+    )
+
+
+_orchestrator_client: httpx.AsyncClient | None = None
+
+
+def get_orchestrator_client() -> httpx.AsyncClient:
+    global _orchestrator_client
+    if _orchestrator_client is None:
+        http2 = HTTP2_ENABLED and importlib.util.find_spec("h2") is not None
+        _orchestrator_client = httpx.AsyncClient(
+            base_url=CHAT_ORCHESTRATOR_URL,
+            timeout=httpx.Timeout(CHAT_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+            ),
+            http2=http2,
+            # timeout = min(cap, bacha hua budget) + X-Deadline-Ms aage
+            event_hooks={"request": [deadlines.httpx_hook(), tracing.httpx_hook()]},
+        )
+    return _orchestrator_client
+
+
+@app.on_event("startup")
+async def startup_event():
+    get_orchestrator_client()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    global _orchestrator_client
+    if _orchestrator_client is not None:
+        await _orchestrator_client.aclose()
+        _orchestrator_client = None
+    if resilience_state is not None:
+        resilience_state.close()
+    tracing.shutdown()
 
 class ChatRequest(BaseModel):
     session_id: str | None = None
@@ -32,26 +212,118 @@ async def health_check():
     return {"status": "ok", "service": "api_gateway"}
 
 
-@app.get("/api/chat/history/{session_id}")
-async def proxy_chat_history(session_id: str):
+@app.get("/metrics", tags=["system"])
+def metrics():
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+def _page_params(limit: int | None, cursor: str | None) -> dict:
+    return {k: v for k, v in (("limit", limit), ("cursor", cursor)) if v is not None}
+
+
+async def _proxy_read(route: str, path: str, request: Request, session_id: str | None, params: dict):
+    deadlines.shrink(HISTORY_TIMEOUT)
     try:
-        async with httpx.AsyncClient() as client:
-         
-         res = await client.get(
-           f"http://chat_orchestrator:8000/api/chat/history/{session_id}"
-       )
-
-         res.raise_for_status()
-         return res.json()
+        async with admission.admit(route, HIGH, client_ip(request), session_id, cost=HISTORY_RATE_COST):
+            async with orchestrator.call(), tracing.span("orchestrator"):
+                res = await get_orchestrator_client().get(path, params=params, timeout=HISTORY_TIMEOUT)
+
+                res.raise_for_status()
+                return res.json()
     except httpx.HTTPStatusError as e:
         raise HTTTPException(status_code=res.status_code, detail=str(e))
+    except UpstreamUnavailable as e:
+        raise HTTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(max(1, round(e.retry_after)))},
+        )
+    except httpx.TimeoutException as e:
+        raise HTTTPException(status_code=504, detail=f"orchestrator timed out: {e!r}")
+    except httpx.ConnectError as e:
+        raise HTTTPException(status_code=503, detail=f"orchestrator unreachable: {e!r}", headers={"Retry-After": "1"})
 
-@app.post("/api/chat", response_model=ChatResponse)
-async def chat_endpoint(payload: ChatRequest):
-    async with httpx.AsyncClient(timeout=60.0) as client:
+
+@app.get("/api/chat/history/{session_id}")
+async def proxy_chat_history(session_id: str, request: Request, limit: int | None = None, cursor: str | None = None):
+    # ek page; agla page response ke next_cursor se
+    return await _proxy_read(
+        "history", f"/api/chat/history/{session_id}", request, session_id, _page_params(limit, cursor)
+    )
+
+
+@app.get("/api/chat/session")
+async def proxy_chat_sessions(request: Request, limit: int | None = None, cursor: str | None = None):
+    return await _proxy_read("sessions", "/api/chat/session", request, None, _page_params(limit, cursor))
+
+
+@app.get("/api/chat/history/{session_id}/stream")
+async def proxy_chat_history_stream(session_id: str, request: Request):
+    # poora session NDJSON me; gate slot stream khatam hone tak
+    with tracing.span("admission"):
+        await admission.acquire("history_stream", HIGH, client_ip(request), session_id, cost=HISTORY_RATE_COST)
+    released = False
+
+    def release():
+        nonlocal released
+        if not released:
+            released = True
+            admission.release()
+
+    client = get_orchestrator_client()
+    upstream_req = client.build_request(
+        "GET",
+        f"/api/chat/history/{session_id}/stream",
+        timeout=httpx.Timeout(CHAT_STREAM_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+    )
+
+    try:
+        async with orchestrator.call() as slot, tracing.span("orchestrator", stream=True):
+            resp = await client.send(upstream_req, stream=True)
+            if resp.status_code >= 500:
+                slot.drop()
+    except UpstreamUnavailable as e:
+        release()
+        raise HTTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(max(1, round(e.retry_after)))},
+        )
+    except httpx.TimeoutException as e:
+        release()
+        raise HTTTPException(status_code=504, detail=f"orchestrator timed out: {e!r}")
+    except httpx.ConnectError as e:
+        release()
+        raise HTTTPException(status_code=503, detail=f"orchestrator unreachable: {e!r}", headers={"Retry-After": "1"})
+    except Exception:
+        release()
+        raise
+
+    if resp.status_code != 200:
+        release()
+        body = await resp.aread()
+        await resp.aclose()
+        return Response(body, status_code=resp.status_code, media_type=resp.headers.get("content-type"))
+
+    async def relay():
         try:
-            resp = await client.post(
-                f"{CHAT_ORCHESTRATOR_URL}/chat",
+            async for chunk in resp.aiter_raw():
+                yield chunk
+        finally:
+            release()
+            await resp.aclose()
+
+    return StreamingResponse(relay(), media_type="application/x-ndjson")
+
+@app.post("/api/chat", response_model=ChatResponse)
+async def chat_endpoint(payload: ChatRequest, request: Request):
+    # Rejected → 429 (neeche wala except use error reply me na badle)
+    with tracing.span("admission"):
+        await admission.acquire("chat", NORMAL, client_ip(request), payload.session_id)
+    try:
+        async with orchestrator.call(), tracing.span("orchestrator"):
+            resp = await get_orchestrator_client().post(
+                "/chat",
                 json=payload.dict(),
             )
 
@@ -63,12 +335,90 @@ async def chat_endpoint(payload: ChatRequest):
                     response=resp
                 )
 
-            data = resp.json()
-            return ChatResponse(**data)
+        data = resp.json()
+        return ChatResponse(**data)
+
+    except Exception as e:
+        print("❌ Gateway exception:", repr(e))
+        return ChatResponse(
+            session_id=payload.session_id or "unknown",
+            reply=f"Backend error (chat orchestrator unavailable): {repr(e)}",
+        )
+    finally:
+        admission.release()
+
+
+# ---------------- Streaming Chat ----------------
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def _sse_error(session_id: str | None, error: str) -> str:
+    event = {
+        "type": "error",
+        "session_id": session_id or "unknown",
+        "error": f"Backend error (chat orchestrator unavailable): {error}",
+    }
+    return f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
+
 
+@app.post("/api/chat/stream")
+async def chat_stream_endpoint(payload: ChatRequest, request: Request):
+    # gate slot poore stream tak — orchestrator utni der kaam kar raha hai
+    with tracing.span("admission"):
+        await admission.acquire("chat_stream", NORMAL, client_ip(request), payload.session_id)
+    released = False
+
+    def release():
+        nonlocal released
+        if not released:
+            released = True
+            admission.release()
+
+    client = get_orchestrator_client()
+    upstream_req = client.build_request(
+        "POST",
+        "/chat/stream",
+        json=payload.dict(),
+        timeout=httpx.Timeout(CHAT_STREAM_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+    )
+
+    try:
+        # breaker / limiter sirf headers aane tak; stream body relay me
+        async with orchestrator.call() as slot, tracing.span("orchestrator", stream=True):
+            resp = await client.send(upstream_req, stream=True)
+            if resp.status_code >= 500:
+                slot.drop()
+    except Exception as e:
+        print("❌ Gateway stream exception:", repr(e))
+        release()
+        return StreamingResponse(
+            iter([_sse_error(payload.session_id, repr(e))]),
+            media_type="text/event-stream",
+            headers=SSE_HEADERS,
+        )
+
+    if resp.status_code != 200:
+        release()
+        body = await resp.aread()
+        await resp.aclose()
+        print("❌ Orchestrator non-200:", resp.status_code, body[:500])
+        return StreamingResponse(
+            iter([_sse_error(payload.session_id, f"status {resp.status_code}")]),
+            media_type="text/event-stream",
+            headers=SSE_HEADERS,
+        )
+
+    async def relay():
+        # bytes jaise aaye waise aage — parse / buffer nahi
+        try:
+            async for chunk in resp.aiter_raw():
+                yield chunk
         except Exception as e:
-            print("❌ Gateway exception:", repr(e))
-            return ChatResponse(
-                session_id=payload.session_id or "unknown",
-                reply=f"Backend error (chat orchestrator unavailable): {repr(e)}",
-            )
+            print("❌ Gateway stream broke:", repr(e))
+            yield _sse_error(payload.session_id, repr(e)).encode("utf-8")
+        finally:
+            release()
+            await resp.aclose()
+
+    return StreamingResponse(relay(), media_type="text/event-stream", headers=SSE_HEADERS)
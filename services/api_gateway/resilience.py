@@ -0,0 +1,530 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Callable
+
+from prometheus_client import Counter, Gauge
+
+# ----------------- Resilience -----------------
+#
+# Har outbound upstream (Groq, NLU, RAG, LLM service, orchestrator) ke liye:
+#
+# CircuitBreaker — pichhle `window` seconds ka error rate (time buckets).
+#   closed → (error rate >= threshold, kam se kam min_requests) → open
+#   open → (cooldown ke baad) → half_open: sirf `half_open_probes` calls jaati
+#   hain; sab theek → closed, ek bhi fail → dobara open.
+#   SharedState (SQLite file) do to saare uvicorn workers ek hi breaker
+#   dekhte hain: counts aur state har `sync_interval` par file se milte hain.
+#   File I/O threadpool me hota hai, breaker khud memory se jawab deta hai;
+#   file locked / kharab ho to sync chhod do (fail-open), local counts agli
+#   baar jaate hain.
+#
+# AdaptiveLimiter — AIMD concurrency limit. Congestion signal: haal ki
+#   latency (short EWMA) lambi baseline (long EWMA) ke `tolerance` guna se
+#   upar, ya drop rate (429 / 5xx / timeout) `drop_tolerance` se upar →
+#   limit * backoff (ek RTT me ek hi baar). Warna limit badhti hai: shuru me
+#   slow start (+1 per call), pehli congestion ke baad +1 per "limit" calls.
+#   Akela 429 ya ek slow jawab limit nahi girata. Limit per process hai.
+#
+# Copy: chat_orchestrator (yahan badlo), api_gateway, llm-services/services;
+# chat_orchestrator/tests/test_vendored_modules.py copies ko byte-for-byte match karta hai.
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+_STATE_VALUE = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+BREAKER_STATE = Gauge(
+    "resilience_breaker_state",
+    "Circuit breaker state (0 closed, 1 half-open, 2 open)",
+    ["name"],
+)
+CONCURRENCY_LIMIT = Gauge("resilience_concurrency_limit", "Adaptive concurrency limit", ["name"])
+IN_FLIGHT = Gauge("resilience_in_flight", "Calls currently holding a limiter slot", ["name"])
+CALLS = Counter("resilience_calls_total", "Guarded upstream calls by outcome", ["name", "outcome"])
+REJECTED = Counter(
+    "resilience_rejected_total",
+    "Calls rejected before reaching the upstream",
+    ["name", "reason"],
+)
+SHARED_ERRORS = Counter(
+    "resilience_shared_state_errors_total",
+    "Shared breaker state syncs skipped (file busy / broken)",
+    ["name", "op"],
+)
+
+
+class UpstreamUnavailable(RuntimeError):
+    def __init__(self, message: str, retry_after: float = 1.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(UpstreamUnavailable):
+    pass
+
+
+class LimitExceededError(UpstreamUnavailable):
+    pass
+
+# ----------------- Shared State (SQLite) -----------------
+
+class SharedState:
+    """Workers ke beech breaker counts + state. Blocking hai — breaker ise threadpool me chalata hai."""
+
+    def __init__(self, path: str, busy_timeout_ms: int = 5):
+        self.path = path
+        self.worker = f"{os.getpid()}"
+        # ek connection, kai breakers / threads — ek waqt me ek hi
+        self._lock = threading.Lock()
+        # chhota busy timeout: doosra worker likh raha ho to intezaar nahi, agli sync me
+        self._conn = sqlite3.connect(path, timeout=busy_timeout_ms / 1000, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS resilience_window (
+                name TEXT NOT NULL,
+                bucket INTEGER NOT NULL,
+                worker TEXT NOT NULL,
+                ok INTEGER NOT NULL DEFAULT 0,
+                fail INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (name, bucket, worker)
+            );
+            CREATE TABLE IF NOT EXISTS resilience_breaker (
+                name TEXT PRIMARY KEY,
+                state TEXT NOT NULL,
+                until REAL NOT NULL,
+                changed_at REAL NOT NULL
+            );
+        """)
+
+    def sync(self, name: str, deltas: dict[int, list[int]], min_bucket: int):
+        """push + get_state ek saath; file busy / error → None (caller fail-open)."""
+        try:
+            with self._lock:
+                return self.push(name, deltas, min_bucket), self.get_state(name)
+        except sqlite3.Error:
+            SHARED_ERRORS.labels(name, "sync").inc()
+            return None
+
+    def publish(self, name: str, state: str, until: float, changed_at: float, reset_window: bool = False):
+        try:
+            with self._lock:
+                self.set_state(name, state, until, changed_at, reset_window)
+        except sqlite3.Error:
+            # baaki workers apni window se khud trip / recover kar lenge
+            SHARED_ERRORS.labels(name, "publish").inc()
+
+    def push(self, name: str, deltas: dict[int, list[int]], min_bucket: int) -> tuple[int, int]:
+        """Apne naye counts jodo, purane buckets hatao, window ka total (sab workers) lo."""
+        with self._conn:
+            self._conn.executemany(
+                """
+                INSERT INTO resilience_window (name, bucket, worker, ok, fail) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(name, bucket, worker) DO UPDATE SET ok = ok + excluded.ok, fail = fail + excluded.fail
+                """,
+                [(name, bucket, self.worker, ok, fail) for bucket, (ok, fail) in deltas.items()],
+            )
+            self._conn.execute("DELETE FROM resilience_window WHERE name = ? AND bucket < ?", (name, min_bucket))
+            ok, fail = self._conn.execute(
+                "SELECT COALESCE(SUM(ok), 0), COALESCE(SUM(fail), 0) FROM resilience_window WHERE name = ?",
+                (name,),
+            ).fetchone()
+        return ok, fail
+
+    def get_state(self, name: str) -> tuple[str, float, float] | None:
+        return self._conn.execute(
+            "SELECT state, until, changed_at FROM resilience_breaker WHERE name = ?", (name,)
+        ).fetchone()
+
+    def set_state(self, name: str, state: str, until: float, changed_at: float, reset_window: bool = False):
+        with self._conn:
+            self._conn.execute(
+                """
+                INSERT INTO resilience_breaker (name, state, until, changed_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT(name) DO UPDATE SET state = excluded.state, until = excluded.until,
+                    changed_at = excluded.changed_at
+                WHERE excluded.changed_at >= resilience_breaker.changed_at
+                """,
+                (name, state, until, changed_at),
+            )
+            if reset_window:
+                self._conn.execute("DELETE FROM resilience_window WHERE name = ?", (name,))
+
+    def close(self):
+        self._conn.close()
+
+# ----------------- Circuit Breaker -----------------
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        window: float = 30,
+        buckets: int = 10,
+        min_requests: int = 10,
+        error_rate: float = 0.5,
+        cooldown: float = 30,
+        half_open_probes: int = 3,
+        shared: SharedState | None = None,
+        sync_interval: float = 1.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.name = name
+        self.width = window / buckets
+        self.buckets = buckets
+        self.min_requests = min_requests
+        self.error_rate = error_rate
+        self.cooldown = cooldown
+        self.half_open_probes = half_open_probes
+        self.shared = shared
+        self.sync_interval = sync_interval
+        self.clock = clock
+
+        self.state = CLOSED
+        self.until = 0.0
+        self._changed_at = 0.0
+        self._counts: dict[int, list[int]] = {}   # bucket → [ok, fail] (local)
+        self._pending: dict[int, list[int]] = {}  # shared me abhi push nahi hue
+        self._shared_totals = (0, 0)
+        self._last_sync = 0.0
+        self._syncing = False
+        self._in_sync: dict[int, list[int]] = {}  # push ho rahe hain, jawab abhi nahi aaya
+        self._probes = 0
+        self._probe_ok = 0
+        BREAKER_STATE.labels(name).set(0)
+
+    # ---- window ----
+
+    def _bucket(self, now: float) -> int:
+        return int(now // self.width)
+
+    def totals(self) -> tuple[int, int]:
+        """(ok, fail) pichhli window me."""
+        if self.shared is not None:
+            ok, fail = self._shared_totals
+            for p_ok, p_fail in [*self._pending.values(), *self._in_sync.values()]:
+                ok, fail = ok + p_ok, fail + p_fail
+            return ok, fail
+        oldest = self._bucket(self.clock()) - self.buckets + 1
+        ok = sum(c[0] for b, c in self._counts.items() if b >= oldest)
+        fail = sum(c[1] for b, c in self._counts.items() if b >= oldest)
+        return ok, fail
+
+    def _add(self, ok: bool, now: float):
+        bucket = self._bucket(now)
+        target = self._pending if self.shared is not None else self._counts
+        target.setdefault(bucket, [0, 0])[0 if ok else 1] += 1
+        if self.shared is None and len(self._counts) > self.buckets:
+            oldest = bucket - self.buckets + 1
+            for b in [b for b in self._counts if b < oldest]:
+                del self._counts[b]
+
+    # ---- state ----
+
+    def _set(self, state: str, now: float, until: float = 0.0, publish: bool = True):
+        self.state, self.until, self._changed_at = state, until, now
+        self._probes = self._probe_ok = 0
+        if state == CLOSED:
+            self._counts.clear()
+            self._pending.clear()
+            self._in_sync = {}
+            self._shared_totals = (0, 0)
+        BREAKER_STATE.labels(self.name).set(_STATE_VALUE[state])
+        if publish and self.shared is not None:
+            self._offload(self.shared.publish, self.name, state, until, now, state == CLOSED)
+        print(f"🔌 Breaker {self.name}: {state}")
+
+    def _offload(self, fn, *args, done=None):
+        # file I/O event loop ke bahar; loop na ho (CLI / sync code) to seedha
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            result = fn(*args)
+            if done is not None:
+                done(result)
+            return
+        future = loop.run_in_executor(None, fn, *args)
+        if done is not None:
+            future.add_done_callback(lambda f: done(None if f.cancelled() or f.exception() else f.result()))
+
+    def _sync(self, now: float):
+        if self._syncing:
+            return
+        self._last_sync = now
+        self._syncing = True
+        pending, self._pending = self._pending, {}
+        self._in_sync = pending
+        changed_at = self._changed_at
+        self._offload(
+            self.shared.sync, self.name, pending, self._bucket(now) - self.buckets + 1,
+            done=lambda result: self._synced(result, pending, changed_at),
+        )
+
+    def _synced(self, result, pending: dict[int, list[int]], changed_at: float):
+        self._syncing = False
+        if self._in_sync is pending:
+            self._in_sync = {}
+        if result is None:
+            # fail-open: local counts wapas, agli sync me phir koshish
+            if self._changed_at == changed_at:
+                for bucket, (ok, fail) in pending.items():
+                    counts = self._pending.setdefault(bucket, [0, 0])
+                    counts[0] += ok
+                    counts[1] += fail
+            return
+        totals, row = result
+        # beech me state badli (window reset) → ye totals purane
+        if self._changed_at == changed_at:
+            self._shared_totals = totals
+        # kisi aur worker ne baad me state badli → wahi maano
+        if row and row[2] > self._changed_at and row[0] != self.state:
+            self._set(row[0], row[2], until=row[1], publish=False)
+        elif self.state == CLOSED:
+            # baaki workers ke counts milkar threshold paar?
+            self._maybe_trip(self.clock())
+
+    def _refresh(self, now: float):
+        if self.shared is not None and now - self._last_sync >= self.sync_interval:
+            self._sync(now)
+        if self.state == OPEN and now >= self.until:
+            self._set(HALF_OPEN, now)
+
+    def check(self):
+        """Sirf dekhna: open ho to CircuitOpenError (half-open me call jaane do)."""
+        now = self.clock()
+        self._refresh(now)
+        if self.state == OPEN:
+            REJECTED.labels(self.name, "circuit_open").inc()
+            raise CircuitOpenError(f"{self.name} circuit open", retry_after=max(0.0, self.until - now))
+
+    def before_call(self) -> bool:
+        """Call shuru: half-open me probe slot leta hai. Returns probe?"""
+        self.check()
+        if self.state == HALF_OPEN:
+            if self._probes >= self.half_open_probes:
+                REJECTED.labels(self.name, "circuit_open").inc()
+                raise CircuitOpenError(f"{self.name} circuit half-open, probes busy", retry_after=1.0)
+            self._probes += 1
+            return True
+        return False
+
+    def record(self, ok: bool, probe: bool = False):
+        now = self.clock()
+        CALLS.labels(self.name, "success" if ok else "failure").inc()
+
+        if probe:
+            if self.state != HALF_OPEN:
+                return
+            self._probes = max(0, self._probes - 1)
+            if not ok:
+                self._set(OPEN, now, until=now + self.cooldown)
+            else:
+                self._probe_ok += 1
+                if self._probe_ok >= self.half_open_probes:
+                    self._set(CLOSED, now)
+            return
+
+        if self.state != CLOSED:
+            # trip se pehle shuru hui calls ka late result
+            return
+        self._add(ok, now)
+        if self.shared is not None and now - self._last_sync >= self.sync_interval:
+            self._sync(now)
+            if self.state != CLOSED:
+                return
+        self._maybe_trip(now)
+
+    def _maybe_trip(self, now: float):
+        ok_n, fail_n = self.totals()
+        total = ok_n + fail_n
+        if total >= self.min_requests and fail_n / total >= self.error_rate:
+            self._set(OPEN, now, until=now + self.cooldown)
+
+    def cancel(self, probe: bool = False):
+        # cancel / disconnect: na success na failure, bas probe slot wapas
+        if probe and self.state == HALF_OPEN:
+            self._probes = max(0, self._probes - 1)
+
+# ----------------- Adaptive Concurrency Limit -----------------
+
+class Slot:
+    __slots__ = ("dropped",)
+
+    def __init__(self):
+        self.dropped = False
+
+    def drop(self):
+        """Upstream ne mana kiya (429 / 5xx / timeout) — limit ghatao."""
+        self.dropped = True
+
+
+class AdaptiveLimiter:
+    def __init__(
+        self,
+        name: str,
+        initial: int = 20,
+        min_limit: int = 1,
+        max_limit: int = 200,
+        backoff: float = 0.9,
+        tolerance: float = 2.0,
+        drop_tolerance: float = 0.05,
+        max_wait: float | None = None,
+    ):
+        self.name = name
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.tolerance = tolerance
+        self.drop_tolerance = drop_tolerance
+        self.max_wait = max_wait
+        self.in_flight = 0
+        self.baseline: float | None = None  # long EWMA
+        self.recent: float | None = None    # short EWMA
+        self.drop_rate = 0.0
+        self._slow_start = True
+        self._last_decrease = 0.0
+        self._waiters: deque[asyncio.Future] = deque()
+        CONCURRENCY_LIMIT.labels(name).set(self.limit)
+
+    async def acquire(self):
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            IN_FLIGHT.labels(self.name).set(self.in_flight)
+            return
+
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        try:
+            if self.max_wait is None:
+                await fut
+            else:
+                await asyncio.wait_for(fut, self.max_wait)
+        except BaseException as e:
+            if fut.done() and not fut.cancelled():
+                # slot mil chuka tha par caller ja raha hai
+                self._release()
+            elif fut in self._waiters:
+                self._waiters.remove(fut)
+            if isinstance(e, asyncio.TimeoutError):
+                REJECTED.labels(self.name, "limit").inc()
+                raise LimitExceededError(f"{self.name} concurrency limit {int(self.limit)} reached") from None
+            raise
+
+    def _release(self):
+        self.in_flight -= 1
+        IN_FLIGHT.labels(self.name).set(self.in_flight)
+        while self._waiters and self.in_flight < int(self.limit):
+            fut = self._waiters.popleft()
+            if not fut.done():
+                self.in_flight += 1
+                fut.set_result(None)
+        IN_FLIGHT.labels(self.name).set(self.in_flight)
+
+    def release(self, latency: float, dropped: bool = False, ignore: bool = False):
+        in_use = self.in_flight
+        if not ignore:
+            self._update(latency, dropped, in_use)
+        self._release()
+
+    def _update(self, latency: float, dropped: bool, in_use: int):
+        if not dropped:
+            if self.baseline is None:
+                self.baseline = self.recent = latency
+            else:
+                self.recent += (latency - self.recent) * 0.1
+                self.baseline += (latency - self.baseline) * 0.01
+        # ~100 calls ka drop rate: 2% random 429 limit nahi girata, lagataar 429 gira deta hai
+        self.drop_rate += (float(dropped) - self.drop_rate) * 0.01
+
+        congested = self.drop_rate > self.drop_tolerance or (
+            self.baseline is not None and self.recent > self.tolerance * self.baseline
+        )
+        now = time.monotonic()
+        if congested:
+            self._slow_start = False
+            # ek RTT me ek hi multiplicative decrease (burst of slow samples ≠ collapse)
+            if now - self._last_decrease >= (self.recent or latency):
+                self._last_decrease = now
+                self.limit = max(float(self.min_limit), self.limit * self.backoff)
+                # nayi limit ka apna drop rate — purane drops dobara na ginein
+                self.drop_rate = 0.0
+        elif in_use * 2 >= self.limit:
+            # sirf tab badhao jab limit sach me use ho rahi ho
+            step = 1.0 if self._slow_start else 1 / self.limit
+            self.limit = min(float(self.max_limit), self.limit + step)
+        CONCURRENCY_LIMIT.labels(self.name).set(self.limit)
+
+    @asynccontextmanager
+    async def slot(self):
+        await self.acquire()
+        slot = Slot()
+        started = time.perf_counter()
+        try:
+            yield slot
+        except (asyncio.CancelledError, GeneratorExit):
+            self.release(time.perf_counter() - started, ignore=True)
+            raise
+        except BaseException:
+            self.release(time.perf_counter() - started, dropped=True)
+            raise
+        else:
+            self.release(time.perf_counter() - started, dropped=slot.dropped)
+
+# ----------------- Upstream Guard -----------------
+
+class Upstream:
+    """Breaker + limiter ek saath: `async with upstream.call() as slot: ...`"""
+
+    def __init__(
+        self,
+        name: str,
+        breaker: CircuitBreaker | None = None,
+        limiter: AdaptiveLimiter | None = None,
+        is_failure: Callable[[BaseException], bool] = lambda e: True,
+    ):
+        self.name = name
+        self.breaker = breaker
+        self.limiter = limiter
+        self.is_failure = is_failure
+
+    def check(self):
+        if self.breaker is not None:
+            self.breaker.check()
+
+    @asynccontextmanager
+    async def call(self):
+        probe = self.breaker.before_call() if self.breaker is not None else False
+        if self.limiter is not None:
+            try:
+                await self.limiter.acquire()
+            except BaseException:
+                if self.breaker is not None:
+                    self.breaker.cancel(probe)
+                raise
+
+        slot = Slot()
+        started = time.perf_counter()
+        outcome = None  # None = cancel (na success na failure)
+        try:
+            yield slot
+            outcome = not slot.dropped
+        except (asyncio.CancelledError, GeneratorExit):
+            raise
+        except BaseException as e:
+            # 4xx jaise client errors upstream ki galti nahi
+            outcome = not self.is_failure(e)
+            if not outcome:
+                slot.drop()
+            raise
+        finally:
+            if self.limiter is not None:
+                self.limiter.release(time.perf_counter() - started, dropped=slot.dropped, ignore=outcome is None)
+            if self.breaker is not None:
+                if outcome is None:
+                    self.breaker.cancel(probe)
+                else:
+                    self.breaker.record(outcome, probe)
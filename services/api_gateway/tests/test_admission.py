@@ -0,0 +1,122 @@
+import asyncio
+
+import httpx
+import pytest
+
+import main
+from admission import HIGH, NORMAL, Admission, PriorityGate, Rejected, TokenBuckets
+
+
+class Clock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_token_bucket_allows_burst_then_refills():
+    clock = Clock()
+    buckets = TokenBuckets(rate=2, burst=3, clock=clock)
+
+    assert [buckets.take("s1") for _ in range(3)] == [0, 0, 0]
+    assert buckets.take("s1") == pytest.approx(0.5)
+    assert buckets.take("s2") == 0  # doosri session par asar nahi
+
+    clock.now += 0.5
+    assert buckets.take("s1") == 0
+
+
+def test_token_bucket_keys_are_bounded():
+    buckets = TokenBuckets(rate=1, burst=1, max_keys=2, clock=Clock())
+    buckets.take("a")
+    buckets.take("b")
+    buckets.take("a")  # a ab recent
+    buckets.take("c")
+    assert len(buckets) == 2
+    assert buckets.take("b") == 0  # b nikal gaya tha → naya bucket
+
+
+@pytest.mark.anyio
+async def test_gate_serves_high_priority_first():
+    gate = PriorityGate(capacity=lambda: 1, max_queue=10, deadlines={HIGH: 5, NORMAL: 5})
+    await gate.acquire(NORMAL, "chat")
+    order = []
+
+    async def waiter(priority, name):
+        await gate.acquire(priority, name)
+        order.append(name)
+        gate.release()
+
+    tasks = [asyncio.create_task(waiter(NORMAL, "chat"))]
+    await asyncio.sleep(0)
+    tasks.append(asyncio.create_task(waiter(HIGH, "history")))
+    await asyncio.sleep(0)
+    assert len(gate) == 2
+
+    gate.release()
+    await asyncio.gather(*tasks)
+    assert order == ["history", "chat"]
+    assert gate.in_flight == 0 and len(gate) == 0
+
+
+@pytest.mark.anyio
+async def test_gate_sheds_on_full_queue_and_deadline():
+    gate = PriorityGate(capacity=lambda: 1, max_queue=1, deadlines={HIGH: 0.05, NORMAL: 0.05})
+    await gate.acquire(NORMAL, "chat")
+
+    waiting = asyncio.create_task(gate.acquire(NORMAL, "chat"))
+    await asyncio.sleep(0)
+    with pytest.raises(Rejected) as full:
+        await gate.acquire(NORMAL, "chat")
+    assert full.value.reason == "queue_full"
+
+    with pytest.raises(Rejected) as late:
+        await waiting
+    assert late.value.reason == "deadline"
+    assert len(gate) == 0 and gate.in_flight == 1
+
+
+@pytest.fixture
+def gateway(monkeypatch):
+    admission = Admission(
+        gate=PriorityGate(capacity=lambda: 1, max_queue=0),
+        session_buckets=TokenBuckets(rate=0.1, burst=1),
+        ip_buckets=TokenBuckets(rate=100, burst=100),
+    )
+    monkeypatch.setattr(main, "admission", admission)
+
+    async def orchestrator(request: httpx.Request):
+        return httpx.Response(200, json={"session_id": "s1", "reply": "jawab"})
+
+    client = httpx.AsyncClient(base_url="http://orchestrator", transport=httpx.MockTransport(orchestrator))
+    monkeypatch.setattr(main, "_orchestrator_client", client)
+    return admission
+
+
+@pytest.mark.anyio
+async def test_chat_is_rate_limited_per_session_with_retry_after(gateway):
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        ok = await client.post("/api/chat", json={"session_id": "s1", "message": "gehu"})
+        limited = await client.post("/api/chat", json={"session_id": "s1", "message": "gehu"})
+        other = await client.post("/api/chat", json={"session_id": "s2", "message": "gehu"})
+
+    assert ok.json()["reply"] == "jawab"
+    assert limited.status_code == 429
+    assert limited.json()["reason"] == "rate_limited"
+    assert limited.headers["Retry-After"] == "10"
+    assert other.status_code == 200
+    assert gateway.gate.in_flight == 0
+
+
+@pytest.mark.anyio
+async def test_overloaded_gateway_sheds_with_429(gateway):
+    await gateway.gate.acquire(NORMAL, "chat")  # capacity bhari, queue 0
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        res = await client.post("/api/chat/stream", json={"session_id": "s1", "message": "gehu"})
+
+    assert res.status_code == 429
+    assert res.json()["reason"] == "queue_full"
+    assert int(res.headers["Retry-After"]) >= 1
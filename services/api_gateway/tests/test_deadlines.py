@@ -0,0 +1,48 @@
+import httpx
+import pytest
+
+import main
+
+
+@pytest.fixture
+def orchestrator_calls(monkeypatch):
+    calls = []
+
+    async def orchestrator(request: httpx.Request):
+        calls.append((request.headers.get("x-deadline-ms"), request.extensions["timeout"]))
+        if request.method == "GET":
+            return httpx.Response(200, json={"session_id": "s1", "history": []})
+        return httpx.Response(200, json={"session_id": "s1", "reply": "jawab"})
+
+    client = httpx.AsyncClient(
+        base_url="http://orchestrator",
+        transport=httpx.MockTransport(orchestrator),
+        event_hooks={"request": [main.deadlines.httpx_hook()]},
+    )
+    monkeypatch.setattr(main, "_orchestrator_client", client)
+    monkeypatch.setattr(main.admission, "enabled", False)
+    return calls
+
+
+@pytest.mark.anyio
+async def test_gateway_creates_deadline_and_client_can_shorten_it(orchestrator_calls):
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        await client.post("/api/chat", json={"session_id": "s1", "message": "gehu"})
+        await client.post("/api/chat", json={"session_id": "s1", "message": "gehu"}, headers={"X-Deadline-Ms": "3000"})
+        await client.get("/api/chat/history/s1")
+
+    (default, _), (shortened, timeout), (history, _) = orchestrator_calls
+    assert main.REQUEST_DEADLINE_S * 1000 - 500 < int(default) <= main.REQUEST_DEADLINE_S * 1000
+    assert 2500 < int(shortened) <= 3000 and timeout["read"] <= 3
+    assert int(history) <= main.HISTORY_TIMEOUT * 1000
+
+
+@pytest.mark.anyio
+async def test_expired_deadline_is_not_forwarded(orchestrator_calls):
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        res = await client.get("/api/chat/history/s1", headers={"X-Deadline-Ms": "0"})
+
+    assert res.status_code == 504
+    assert orchestrator_calls == []
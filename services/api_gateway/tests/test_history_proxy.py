@@ -0,0 +1,73 @@
+import httpx
+import pytest
+
+import main
+
+
+@pytest.mark.anyio
+async def test_history_pages_sessions_and_stream_are_proxied(monkeypatch):
+    seen = []
+
+    async def lines():
+        yield b'{"message": "a"}\n'
+        yield b'{"message": "b"}\n'
+
+    async def orchestrator(request: httpx.Request):
+        seen.append((request.url.path, dict(request.url.params)))
+        if request.url.path.startswith("/api/chat/history/missing"):
+            return httpx.Response(404, json={"detail": "Session ID not found"})
+        if request.url.path.endswith("/stream"):
+            return httpx.Response(200, content=lines())
+        if request.url.path == "/api/chat/session" and not request.url.params:
+            return httpx.Response(200, json=[{"session_id": "s1", "start_time": "t"}])
+        if request.url.path == "/api/chat/session":
+            return httpx.Response(200, json={"sessions": [], "next_cursor": None})
+        return httpx.Response(200, json={"session_id": "s1", "history": [], "next_cursor": "abc"})
+
+    client = httpx.AsyncClient(base_url="http://orchestrator", transport=httpx.MockTransport(orchestrator))
+    monkeypatch.setattr(main, "_orchestrator_client", client)
+    monkeypatch.setattr(main.admission, "enabled", False)
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+        page = await ac.get("/api/chat/history/s1", params={"limit": 20, "cursor": "xyz"})
+        sessions = await ac.get("/api/chat/session", params={"limit": 5})
+        legacy = await ac.get("/api/chat/session")
+        streamed = await ac.get("/api/chat/history/s1/stream")
+        missing = await ac.get("/api/chat/history/missing/stream")
+
+    assert page.json()["next_cursor"] == "abc" and sessions.json()["sessions"] == []
+    assert seen[:3] == [
+        ("/api/chat/history/s1", {"limit": "20", "cursor": "xyz"}),
+        ("/api/chat/session", {"limit": "5"}),
+        ("/api/chat/session", {}),
+    ]
+    # bina params purana bare-list shape jaisa ka taisa
+    assert legacy.json() == [{"session_id": "s1", "start_time": "t"}]
+    assert streamed.headers["content-type"] == "application/x-ndjson"
+    assert streamed.text.splitlines() == ['{"message": "a"}', '{"message": "b"}']
+    assert missing.status_code == 404
+
+
+@pytest.mark.anyio
+async def test_history_proxy_maps_timeouts_and_connect_errors(monkeypatch):
+    async def orchestrator(request: httpx.Request):
+        if "slow" in request.url.path:
+            raise httpx.ReadTimeout("slow", request=request)
+        raise httpx.ConnectError("down", request=request)
+
+    client = httpx.AsyncClient(base_url="http://orchestrator", transport=httpx.MockTransport(orchestrator))
+    monkeypatch.setattr(main, "_orchestrator_client", client)
+    monkeypatch.setattr(main.admission, "enabled", False)
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+        slow = await ac.get("/api/chat/history/slow")
+        down = await ac.get("/api/chat/session")
+        slow_stream = await ac.get("/api/chat/history/slow/stream")
+        down_stream = await ac.get("/api/chat/history/s1/stream")
+
+    # 500 nahi: timeout → 504, orchestrator tak pahunch hi nahi → 503
+    assert slow.status_code == 504 and slow_stream.status_code == 504
+    assert down.status_code == 503 and down_stream.status_code == 503
+    assert down.headers["retry-after"] == "1"
@@ -0,0 +1,31 @@
+import httpx
+import pytest
+
+import main
+
+
+@pytest.mark.anyio
+async def test_gateway_starts_trace_and_returns_request_id(monkeypatch):
+    seen = []
+
+    async def orchestrator(request: httpx.Request):
+        seen.append(request.headers)
+        return httpx.Response(200, json={"session_id": "s1", "reply": "jawab"})
+
+    client = httpx.AsyncClient(
+        base_url="http://orchestrator",
+        transport=httpx.MockTransport(orchestrator),
+        event_hooks={"request": [main.tracing.httpx_hook()]},
+    )
+    monkeypatch.setattr(main, "_orchestrator_client", client)
+    monkeypatch.setattr(main.admission, "enabled", False)
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+        res = await ac.post("/api/chat", json={"session_id": "s1", "message": "gehu"})
+        again = await ac.post("/api/chat", json={"session_id": "s1", "message": "gehu"})
+
+    request_id = res.headers["x-request-id"]
+    assert len(request_id) == 32 and again.headers["x-request-id"] != request_id
+    version, trace_id, parent, _ = seen[0]["traceparent"].split("-")
+    assert trace_id == request_id == seen[0]["x-request-id"] and len(parent) == 16
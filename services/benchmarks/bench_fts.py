@@ -0,0 +1,96 @@
+"""
+FTS5 / BM25 benchmark: 100k+ advisory passages par search latency.
+
+Temp DB me synthetic advisory_passages bhare jaate hain, index rebuild hota
+hai, phir random farmer sawal par fts.search ka p50/p99 aur trigger ke
+through incremental insert ka cost nikala jata hai.
+
+    python benchmarks/bench_fts.py --passages 120000
+"""
+import argparse
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "rag_services"))
+
+import fts  # noqa: E402
+
+CROPS = ["gehu", "dhaan", "sarson", "makka", "bajra", "chana", "arhar", "ganna", "kapas", "aloo"]
+COMMON = (
+    "fasal khet mitti paani khaad beej spray keet rog patta jad tana phal "
+    "buvai katai sinchai urvarak dawai upchar mausam barish garmi thand"
+).split()
+
+
+def passage(rng: random.Random, vocab: list[str]) -> tuple:
+    crop = rng.choice(CROPS)
+    words = rng.choices(COMMON, k=25) + rng.sample(vocab, 5)
+    rng.shuffle(words)
+    return crop, f"{crop} advisory {rng.randrange(10**6)}", " ".join(words)
+
+
+def percentile(values, p):
+    return statistics.quantiles(values, n=100)[p - 1]
+
+
+def main(total: int, queries: int):
+    rng = random.Random(11)
+    vocab = [f"shabd{i}" for i in range(20000)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = sqlite3.connect(Path(tmp) / "bench.db")
+        conn.executescript(fts.ADVISORY_DDL)
+        conn.executemany(
+            "INSERT INTO advisory_passages (doc_id, chunk_no, crop_name, title, body, content_hash) "
+            "VALUES (?, 0, ?, ?, ?, ?)",
+            ((f"doc{i}", c, t, b, f"h{i}") for i, (c, t, b) in enumerate(passage(rng, vocab) for _ in range(total))),
+        )
+        conn.commit()
+
+        t0 = time.perf_counter()
+        fts.ensure_fts(conn, rebuild=True)
+        build_s = time.perf_counter() - t0
+
+        messages = [
+            (rng.choice(CROPS), " ".join(rng.sample(COMMON, 2) + rng.sample(vocab, 2)))
+            for _ in range(queries)
+        ]
+        index = fts.FullTextIndex()
+        latencies, hits = [], 0
+        for crop, message in messages:
+            t0 = time.perf_counter()
+            hits += bool(index.search(conn, message, crop=crop, k=3))
+            latencies.append(time.perf_counter() - t0)
+
+        # triggers ke through incremental maintenance
+        t0 = time.perf_counter()
+        n_inc = 1000
+        for i in range(n_inc):
+            crop, title, body = passage(rng, vocab)
+            conn.execute(
+                "INSERT INTO advisory_passages (doc_id, chunk_no, crop_name, title, body, content_hash) "
+                "VALUES (?, 0, ?, ?, ?, ?)",
+                (f"inc{i}", crop, title, body, f"inc{i}"),
+            )
+        conn.commit()
+        insert_us = (time.perf_counter() - t0) / n_inc * 1e6
+        conn.close()
+
+    print(f"passages={total} rebuild={build_s:.2f}s incremental_insert={insert_us:.0f}µs/row")
+    print(
+        f"search: p50={percentile(latencies, 50) * 1e3:.2f}ms "
+        f"p99={percentile(latencies, 99) * 1e3:.2f}ms hit_rate={hits / queries:.0%}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--passages", type=int, default=120000)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+    main(args.passages, args.queries)
@@ -0,0 +1,141 @@
+"""
+Gateway overload: admission control (token buckets + priority queue) on vs off.
+
+Gateway app in-process (ASGITransport) ek stub orchestrator ke saath chalta
+hai jo sirf `--capacity` requests ek saath `--service-ms` me serve karta hai,
+baaki uske andar queue hote hain (jaise uvicorn workers bhare hon). Open-loop
+Poisson arrivals `--overload` x capacity par — 90% chat, 10% history, bahut
+saari sessions / IPs. Served requests ki p50/p99 aur 429 count dekhte hain.
+
+    python benchmarks/bench_gateway_overload.py --seconds 10 --overload 3
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "api_gateway"))
+
+import main  # noqa: E402
+from admission import HIGH, NORMAL, Admission, PriorityGate, TokenBuckets  # noqa: E402
+from resilience import AdaptiveLimiter, CircuitBreaker, Upstream  # noqa: E402
+
+
+def pct(values: list[float], p: float) -> float:
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[int(p * (len(values) - 1))] * 1e3
+
+
+def setup(enabled: bool, capacity: int, service_ms: float, max_concurrent: int):
+    workers = asyncio.Semaphore(capacity)
+
+    async def orchestrator(request: httpx.Request):
+        async with workers:
+            await asyncio.sleep(service_ms / 1000 / (4 if request.method == "GET" else 1))
+        if request.method == "GET":
+            return httpx.Response(200, json={"session_id": "s", "history": []})
+        return httpx.Response(200, json={"session_id": "s", "reply": "jawab"})
+
+    main._orchestrator_client = httpx.AsyncClient(
+        base_url="http://orchestrator",
+        transport=httpx.MockTransport(orchestrator),
+        timeout=main.CHAT_TIMEOUT,
+    )
+    # har run naye breaker / limiter se (pichle run ki seekh na rahe)
+    main.orchestrator = Upstream(
+        "orchestrator",
+        breaker=CircuitBreaker("orchestrator", min_requests=10**9),
+        limiter=AdaptiveLimiter(
+            "orchestrator",
+            initial=main.LIMIT_INITIAL,
+            min_limit=main.LIMIT_MIN,
+            max_limit=main.LIMIT_MAX,
+            max_wait=main.LIMIT_MAX_WAIT_S,
+        ),
+        is_failure=main._is_orchestrator_failure,
+    )
+    main.TRUST_FORWARDED_FOR = True
+    main.ADMISSION_MAX_CONCURRENT = max_concurrent
+    main.admission = Admission(
+        gate=PriorityGate(
+            capacity=main.admission_capacity,
+            max_queue=main.ADMISSION_MAX_QUEUE,
+            deadlines={HIGH: main.ADMISSION_DEADLINE_HISTORY_S, NORMAL: main.ADMISSION_DEADLINE_CHAT_S},
+        ),
+        session_buckets=TokenBuckets(main.RATE_SESSION_RPS, main.RATE_SESSION_BURST),
+        ip_buckets=TokenBuckets(main.RATE_IP_RPS, main.RATE_IP_BURST),
+        enabled=enabled,
+    )
+
+
+async def run(enabled: bool, seconds: float, capacity: int, service_ms: float, overload: float, max_concurrent: int) -> None:
+    setup(enabled, capacity, service_ms, max_concurrent)
+    rate = overload * capacity / (service_ms / 1000)
+    rng = random.Random(7)
+    results = {"chat": [], "history": [], "429": []}
+    status = {"ok": 0, "429": 0, "error": 0}
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=120) as client:
+
+        async def one(i: int, kind: str):
+            session = f"farmer-{rng.randrange(5000)}"
+            headers = {"X-Forwarded-For": f"10.0.{i % 200}.{i % 250}"}
+            t0 = time.perf_counter()
+            if kind == "history":
+                res = await client.get(f"/api/chat/history/{session}", headers=headers)
+            else:
+                res = await client.post("/api/chat", json={"session_id": session, "message": "gehu"}, headers=headers)
+            elapsed = time.perf_counter() - t0
+            if res.status_code == 429:
+                status["429"] += 1
+                results["429"].append(elapsed)
+            elif res.status_code != 200 or "Backend error" in res.text:
+                # admission band ho to limiter ka max_wait wala error yahan aata hai
+                status["error"] += 1
+            else:
+                status["ok"] += 1
+                results[kind].append(elapsed)
+
+        tasks = []
+        start = time.perf_counter()
+        i = 0
+        while time.perf_counter() - start < seconds:
+            kind = "history" if rng.random() < 0.1 else "chat"
+            tasks.append(asyncio.create_task(one(i, kind)))
+            i += 1
+            await asyncio.sleep(rng.expovariate(rate))
+        await asyncio.gather(*tasks)
+
+    await main._orchestrator_client.aclose()
+    label = "off" if not enabled else f"on, cap={max_concurrent or 'adaptive'}"
+    print(
+        f"{label:>17}: sent={i:5d} ok={status['ok']:5d} 429={status['429']:5d} error={status['error']:5d}  "
+        f"chat p50={pct(results['chat'], 0.5):7.0f}ms p99={pct(results['chat'], 0.99):7.0f}ms  "
+        f"history p50={pct(results['history'], 0.5):5.0f}ms p99={pct(results['history'], 0.99):5.0f}ms  "
+        f"429 p50={pct(results['429'], 0.5):5.0f}ms p99={pct(results['429'], 0.99):5.0f}ms"
+    )
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--capacity", type=int, default=20, help="orchestrator concurrent capacity")
+    parser.add_argument("--service-ms", type=float, default=250, help="chat service time (history = 1/4)")
+    parser.add_argument("--overload", type=float, default=3, help="offered load / capacity")
+    args = parser.parse_args()
+
+    print(f"capacity={args.capacity} service={args.service_ms:.0f}ms offered={args.overload}x for {args.seconds:.0f}s")
+    # ADMISSION_MAX_CONCURRENT=0 (sirf adaptive limit) vs orchestrator capacity par cap
+    for enabled, cap in ((True, 0), (True, args.capacity), (False, 0)):
+        asyncio.run(run(enabled, args.seconds, args.capacity, args.service_ms, args.overload, cap))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,144 @@
+"""
+Orchestrator fan-out benchmark: naya AsyncClient per call vs shared pooled clients.
+
+Local stub upstreams (NLU / RAG / LLM) ek uvicorn thread me chalte hain, phir
+dono tarike se NLU → RAG → LLM ka ek /chat jaisa round trip N baar chalaya jata hai.
+
+    python benchmarks/bench_http_pool.py --requests 2000 --concurrency 50
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+import httpx
+import uvicorn
+from fastapi import FastAPI
+
+SERVICES_DIR = Path(__file__).resolve().parent.parent
+
+# ---------------- Stub Upstreams ----------------
+
+stub = FastAPI()
+
+
+@stub.post("/analyze")
+async def analyze():
+    return {"intent": "fertilizer", "crop": "gehu", "language": "hi-en"}
+
+
+@stub.post("/query")
+async def query():
+    return {"context": "stub context", "source": "generic"}
+
+
+@stub.post("/generate")
+async def generate():
+    return {"final_answer": "stub answer", "metadata": {}}
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_stub(port: int) -> uvicorn.Server:
+    server = uvicorn.Server(
+        uvicorn.Config(stub, host="127.0.0.1", port=port, log_level="warning")
+    )
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+# ---------------- Call Patterns ----------------
+
+async def chat_round_trip_unpooled(base: str):
+    # purana tarika: har call par naya client (naya TCP connection)
+    async with httpx.AsyncClient(timeout=10) as client:
+        (await client.post(f"{base}/analyze", json={"message": "gehu khaad"})).json()
+    async with httpx.AsyncClient(timeout=10) as client:
+        (await client.post(f"{base}/query", json={"intent": "fertilizer", "message": "x"})).json()
+    async with httpx.AsyncClient(timeout=20) as client:
+        (await client.post(f"{base}/generate", json={"user_message": "x"})).json()
+
+
+async def chat_round_trip_pooled(orchestrator):
+    intent, entities = await orchestrator.call_nlu_service("gehu khaad")
+    await orchestrator.call_rag_service(intent, entities, "gehu khaad")
+    await orchestrator.call_llm_service("gehu khaad", intent, entities, "")
+
+
+async def run(label: str, fn, total: int, concurrency: int) -> dict:
+    sem = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    errors = 0
+
+    async def one():
+        nonlocal errors
+        async with sem:
+            t0 = time.perf_counter()
+            try:
+                await fn()
+            except Exception:
+                errors += 1
+                return
+            latencies.append(time.perf_counter() - t0)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    q = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return {
+        "label": label,
+        "requests": total,
+        "errors": errors,
+        "rps": round(total / elapsed, 1),
+        "p50_ms": round(q[49] * 1000, 2),
+        "p99_ms": round(q[98] * 1000, 2),
+    }
+
+# ---------------- Main ----------------
+
+async def main(total: int, concurrency: int):
+    port = _free_port()
+    server = start_stub(port)
+    base = f"http://127.0.0.1:{port}"
+
+    os.environ["NLU_SERVICE_URL"] = f"{base}/analyze"
+    os.environ["RAG_SERVICE_URL"] = f"{base}/query"
+    os.environ["LLM_SERVICE_URL"] = f"{base}/generate"
+    sys.path.insert(0, str(SERVICES_DIR / "chat_orchestrator"))
+    import main as orchestrator
+    import clients
+
+    results = [await run("before (client per call)", lambda: chat_round_trip_unpooled(base), total, concurrency)]
+
+    clients.init_clients()
+    try:
+        results.append(await run("after (pooled clients)", lambda: chat_round_trip_pooled(orchestrator), total, concurrency))
+    finally:
+        await clients.close_clients()
+        server.should_exit = True
+
+    for r in results:
+        print(
+            f"{r['label']:<28} rps={r['rps']:<8} p50={r['p50_ms']}ms "
+            f"p99={r['p99_ms']}ms errors={r['errors']}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
@@ -0,0 +1,69 @@
+"""
+Ingestion benchmark: N synthetic advisory documents ka pehla ingest, phir
+unchanged re-ingest aur kuch documents badal kar re-ingest (chunks/sec).
+
+    python benchmarks/bench_ingest.py --docs 10000 --workers 4
+"""
+import argparse
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "rag_services"))
+
+import ingest  # noqa: E402
+
+CROPS = ["gehu", "dhaan", "sarson"]
+WORDS = (
+    "fasal khet mitti paani khaad beej spray keet rog patta jad tana phal "
+    "buvai katai sinchai urvarak dawai upchar mausam barish garmi thand"
+).split()
+
+
+def document(rng: random.Random) -> str:
+    crop = rng.choice(CROPS)
+    paras = []
+    for _ in range(rng.randint(3, 8)):
+        sentences = [
+            f"{crop.capitalize()} " + " ".join(rng.choices(WORDS, k=12)) + f" {rng.randrange(10**6)}."
+            for _ in range(rng.randint(2, 6))
+        ]
+        paras.append(" ".join(sentences))
+    return "\n\n".join(paras)
+
+
+def run(label: str, db: Path, docs: Path, workers: int):
+    t0 = time.perf_counter()
+    stats = ingest.ingest(db, [docs], workers=workers)
+    print(f"{label:<10} {stats.report()} ({time.perf_counter() - t0:.1f}s)")
+
+
+def main(n_docs: int, workers: int, changed: int):
+    rng = random.Random(5)
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        docs = tmp / "docs"
+        docs.mkdir()
+        for i in range(n_docs):
+            (docs / f"advisory_{i:05d}.txt").write_text(document(rng), encoding="utf-8")
+        db = tmp / "bench.db"
+        sqlite3.connect(db).close()
+
+        run("initial", db, docs, workers)
+        run("unchanged", db, docs, workers)
+        for i in rng.sample(range(n_docs), changed):
+            path = docs / f"advisory_{i:05d}.txt"
+            path.write_text(path.read_text(encoding="utf-8") + "\n\nNayi salah: " + document(rng), encoding="utf-8")
+        run(f"{changed} changed", db, docs, workers)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--docs", type=int, default=10000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--changed", type=int, default=100)
+    args = parser.parse_args()
+    main(args.docs, args.workers, args.changed)
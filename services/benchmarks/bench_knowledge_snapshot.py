@@ -0,0 +1,153 @@
+"""
+RAG read latency jab saath me chat turns likhe ja rahe hon: shared DB vs snapshot.
+
+"shared" = purana layout: RAG live agri_knowledge.db (WAL, read-only pool)
+padhta hai aur orchestrator usi file me chat_history likhta hai.
+"snapshot" = naya layout: RAG publish_knowledge.py ka immutable snapshot
+(immutable=1 + mmap + query_only) padhta hai, history alag chat_history.db me.
+
+Har layout do baar: bina writes ke (idle) aur ek alag process se lagataar
+history batches (orchestrator ke write-behind jaisa) ke saath. Readers FTS
+search chalaate hain (RAG ka SQL wala path); p50 / p99 dekhiye.
+
+    python benchmarks/bench_knowledge_snapshot.py --passages 20000 --write-rps 2000 --seconds 5
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+SERVICES_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SERVICES_DIR / "rag_services"))
+sys.path.insert(1, str(SERVICES_DIR / "chat_orchestrator"))
+
+import fts  # noqa: E402
+import history_store  # noqa: E402
+from bench_fts import COMMON, CROPS, passage  # noqa: E402
+from db import SQLitePool  # noqa: E402
+from knowledge_index import current_snapshot, open_snapshot_pool  # noqa: E402
+from publish_knowledge import publish  # noqa: E402
+
+
+def build_knowledge(path: Path, passages: int, vocab: list[str]):
+    subprocess.run(
+        [sys.executable, "create_db.py"], cwd=SERVICES_DIR / "chat_orchestrator",
+        env={**os.environ, "AGRI_DB_PATH": str(path)}, check=True, stdout=subprocess.DEVNULL,
+    )
+    rng = random.Random(7)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.executescript(fts.ADVISORY_DDL)
+    conn.executemany(
+        "INSERT INTO advisory_passages (doc_id, chunk_no, crop_name, title, body, content_hash) "
+        "VALUES (?, 0, ?, ?, ?, ?)",
+        ((f"doc{i}", c, t, b, f"h{i}") for i, (c, t, b) in enumerate(passage(rng, vocab) for _ in range(passages))),
+    )
+    conn.commit()
+    fts.ensure_fts(conn, rebuild=True)
+    conn.close()
+
+
+def writer(path: str, rps: int, batch: int, stop):
+    # orchestrator process jaisa: WAL + synchronous NORMAL, batch ek transaction me
+    pool = SQLitePool(path, size=1)
+    with pool.transaction() as conn:
+        history_store.init_schema(conn)
+    interval = batch / rps
+    n = 0
+    next_at = time.perf_counter()
+    while not stop.is_set():
+        now = datetime.now().isoformat()
+        rows = [(f"s{(n + i) % 5000}", "user", f"sawal {n + i} " + "shabd " * 20, now) for i in range(batch)]
+        with pool.transaction() as conn:
+            history_store.insert_rows(conn, rows)
+        n += batch
+        next_at += interval
+        delay = next_at - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    pool.close()
+
+
+def read_load(pool: SQLitePool, seconds: float, threads: int, vocab: list[str]) -> list[float]:
+    index = fts.FullTextIndex()
+    latencies: list[float] = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def run(seed):
+        rng = random.Random(seed)
+        mine = []
+        while time.perf_counter() < deadline:
+            message = " ".join(rng.sample(COMMON, 2) + rng.sample(vocab, 2))
+            t0 = time.perf_counter()
+            with pool.connection() as conn:
+                index.search(conn, message, crop=rng.choice(CROPS), k=3)
+            mine.append(time.perf_counter() - t0)
+        with lock:
+            latencies.extend(mine)
+
+    workers = [threading.Thread(target=run, args=(i,)) for i in range(threads)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return latencies
+
+
+def measure(label: str, pool: SQLitePool, history_path: Path, args, vocab) -> None:
+    for writes in (False, True):
+        stop = multiprocessing.Event()
+        proc = None
+        if writes:
+            proc = multiprocessing.Process(target=writer, args=(str(history_path), args.write_rps, args.batch, stop))
+            proc.start()
+            time.sleep(0.5)
+        lat = read_load(pool, args.seconds, args.threads, vocab)
+        if proc is not None:
+            stop.set()
+            proc.join()
+        lat.sort()
+        print(
+            f"{label:<9} writes={'on ' if writes else 'off'} queries={len(lat):>6} "
+            f"p50={statistics.median(lat) * 1e3:6.2f}ms p99={lat[int(0.99 * (len(lat) - 1))] * 1e3:6.2f}ms "
+            f"max={lat[-1] * 1e3:6.1f}ms"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--passages", type=int, default=20000)
+    parser.add_argument("--threads", type=int, default=4, help="RAG reader threads (DB_POOL_SIZE)")
+    parser.add_argument("--write-rps", type=int, default=2000, help="chat turns / sec")
+    parser.add_argument("--batch", type=int, default=200, help="HISTORY_BATCH_SIZE")
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    vocab = [f"shabd{i}" for i in range(20000)]
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        knowledge_db = tmp / "agri_knowledge.db"
+        build_knowledge(knowledge_db, args.passages, vocab)
+        publish(knowledge_db, tmp / "knowledge")
+
+        shared = SQLitePool(knowledge_db, size=args.threads, readonly=True)
+        measure("shared", shared, knowledge_db, args, vocab)
+        shared.close()
+
+        snapshot = open_snapshot_pool(current_snapshot(tmp / "knowledge"), size=args.threads)
+        measure("snapshot", snapshot, tmp / "chat_history.db", args, vocab)
+        snapshot.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Groq client throughput: 500+ concurrent calls fake Groq server par.
+
+"before" = purana requests.post threadpool me (har call nayi connection,
+threadpool ~40 par cap); "after" = pooled httpx.AsyncClient + semaphore +
+jittered retry (services/llm_client.py).
+
+    python benchmarks/bench_llm_client.py --requests 500 --latency-ms 200 --rate-429 0.02
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import requests
+from fastapi.concurrency import run_in_threadpool
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent / "llm-services"))
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_fake_groq(port: int, *args: str) -> subprocess.Popen:
+    # alag process: client aur server ek GIL par na ladein
+    proc = subprocess.Popen([sys.executable, str(BENCH_DIR / "fake_groq.py"), "--port", str(port), *args])
+    for _ in range(100):
+        try:
+            requests.get(f"http://127.0.0.1:{port}/stats", timeout=0.5)
+            return proc
+        except requests.ConnectionError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("fake groq did not start")
+
+
+def fake_stats(port: int) -> dict:
+    return requests.get(f"http://127.0.0.1:{port}/stats", timeout=5).json()
+
+
+def legacy_call(url: str, system: str, user: str) -> str:
+    resp = requests.post(
+        url,
+        headers={"Authorization": "Bearer fake"},
+        json={"model": "fake", "messages": [{"role": "system", "content": system}, {"role": "user", "content": user}]},
+        timeout=20,
+    )
+    if resp.status_code != 200:
+        raise RuntimeError(f"{resp.status_code} {resp.text}")
+    return resp.json()["choices"][0]["message"]["content"]
+
+
+async def run(label: str, n: int, call) -> None:
+    async def one(i):
+        t0 = time.perf_counter()
+        try:
+            await call(f"sawal {i}")
+            ok = True
+        except Exception:
+            ok = False
+        return ok, time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    results = await asyncio.gather(*[one(i) for i in range(n)])
+    wall = time.perf_counter() - t0
+    lat = sorted(t for _, t in results)
+    ok = sum(1 for good, _ in results if good)
+    print(
+        f"{label:<7} ok={ok}/{n} wall={wall:.2f}s throughput={n / wall:.0f} req/s "
+        f"p50={statistics.median(lat) * 1e3:.0f}ms p99={lat[int(0.99 * (n - 1))] * 1e3:.0f}ms"
+    )
+
+
+def main(n: int, latency_ms: float, rate_429: float):
+    port = free_port()
+    server = start_fake_groq(port, "--latency-ms", str(latency_ms), "--rate-429", str(rate_429), "--retry-after", "0.2")
+    url = f"http://127.0.0.1:{port}/openai/v1/chat/completions"
+
+    os.environ.update(GROQ_URL=url, GROQ_API_KEY="fake", LLM_RETRY_BASE="0.1")
+    from services import llm_client
+
+    asyncio.run(run("before", n, lambda u: run_in_threadpool(legacy_call, url, "system", u)))
+    before = fake_stats(port)
+
+    async def after():
+        llm_client.init_client()
+        try:
+            await run("after", n, lambda u: llm_client.call_llm("system", u))
+        finally:
+            await llm_client.close_client()
+
+    asyncio.run(after())
+    stats = fake_stats(port)
+    print(f"fake groq: before requests={before['requests']} | after requests={stats['requests'] - before['requests']} "
+          f"(429s incl. retries={stats['429'] - before['429']})")
+    server.terminate()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=200)
+    parser.add_argument("--rate-429", type=float, default=0.02)
+    args = parser.parse_args()
+    main(args.requests, args.latency_ms, args.rate_429)
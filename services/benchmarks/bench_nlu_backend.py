@@ -0,0 +1,103 @@
+"""
+NLU backend: "remote" (HTTP POST nlu_llm /analyze) vs "embedded" (same engine
+in-process) — per-request latency aur CPU (orchestrator + nlu_llm process).
+
+nlu_llm asli uvicorn subprocess me chalta hai (loopback HTTP, keep-alive pool).
+
+    python benchmarks/bench_nlu_backend.py --requests 3000 --concurrency 32
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+SERVICES = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SERVICES / "chat_orchestrator"))
+
+from bench_llm_client import free_port  # noqa: E402
+from nlu_backend import EmbeddedNLU, RemoteNLU  # noqa: E402
+
+MESSAGES = [
+    "gehu ke liye khaad", "dhaan ke patte par brown spot", "sarson me paani kab dena hai",
+    "mandi bhav kya hai", "gehu me peela patta rog", "dhaan ki ropai ke baad urea",
+    "namaste", "sarson ka bhav", "kapas me sundi", "tamatar me keeda laga hai",
+]
+
+
+def proc_cpu_seconds(pid: int) -> float:
+    # /proc/<pid>/stat: utime + stime (clock ticks)
+    fields = Path(f"/proc/{pid}/stat").read_text().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def start_nlu_service(port: int) -> subprocess.Popen:
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=SERVICES / "nlu_llm",
+    )
+    for _ in range(100):
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/health", timeout=0.5)
+            return proc
+        except httpx.TransportError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("nlu_llm did not start")
+
+
+async def run(label: str, backend, n: int, concurrency: int, server_pid: int | None) -> None:
+    rng = random.Random(3)
+    messages = [f"{rng.choice(MESSAGES)} {i}" for i in range(n)]
+    sem = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(message):
+        async with sem:
+            t0 = time.perf_counter()
+            await backend.analyze(message)
+            latencies.append(time.perf_counter() - t0)
+
+    # warm-up (connections, lexicon)
+    await asyncio.gather(*[backend.analyze(m) for m in MESSAGES])
+    server_cpu = proc_cpu_seconds(server_pid) if server_pid else 0.0
+    cpu, t0 = time.process_time(), time.perf_counter()
+    await asyncio.gather(*[one(m) for m in messages])
+    wall = time.perf_counter() - t0
+    cpu = time.process_time() - cpu
+    if server_pid:
+        server_cpu = proc_cpu_seconds(server_pid) - server_cpu
+
+    latencies.sort()
+    print(
+        f"{label:<9} p50={statistics.median(latencies) * 1e6:.0f}µs "
+        f"p99={latencies[int(0.99 * (n - 1))] * 1e6:.0f}µs "
+        f"throughput={n / wall:.0f}/s cpu/request={(cpu + server_cpu) / n * 1e6:.0f}µs "
+        f"(orchestrator {cpu / n * 1e6:.0f}µs + nlu_llm {server_cpu / n * 1e6:.0f}µs)"
+    )
+
+
+async def main(n: int, concurrency: int):
+    port = free_port()
+    server = start_nlu_service(port)
+    client = httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=10)
+    try:
+        await run("remote", RemoteNLU("/analyze", lambda: client), n, concurrency, server.pid)
+        await run("embedded", EmbeddedNLU(), n, concurrency, None)
+    finally:
+        await client.aclose()
+        server.terminate()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
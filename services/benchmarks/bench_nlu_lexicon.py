@@ -0,0 +1,79 @@
+"""
+NLU lexicon microbenchmark: lexicon size badhne par per-message cost.
+
+Synthetic lexicon (10k–100k phrases) par compiled Lexicon.analyze vs purana
+"any(w in text for w in words)" substring scan, same messages par.
+
+    python benchmarks/bench_nlu_lexicon.py --sizes 1000 10000 100000
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "nlu_llm"))
+
+from lexicon import Lexicon  # noqa: E402
+
+BASE = "gehu dhaan sarson khaad bimari paani mandi patta daag spray kab kitna kaise".split()
+
+
+def synthetic_entries(size: int, rng: random.Random):
+    for i in range(size):
+        kind = "crop" if i % 4 == 0 else "intent"
+        phrase = f"term{i}" if i % 5 else f"term{i} variant{i % 97}"
+        yield phrase, kind, f"{kind}{i % 50}", rng.uniform(0.3, 1.0)
+
+
+def messages(n: int, size: int, rng: random.Random) -> list[str]:
+    out = []
+    for _ in range(n):
+        words = rng.choices(BASE, k=rng.randint(6, 20)) + [f"term{rng.randrange(size)}" for _ in range(2)]
+        rng.shuffle(words)
+        out.append(" ".join(words))
+    return out
+
+
+def per_message_us(fn, msgs: list[str]) -> float:
+    runs = []
+    for _ in range(3):
+        t0 = time.perf_counter()
+        for m in msgs:
+            fn(m)
+        runs.append((time.perf_counter() - t0) / len(msgs) * 1e6)
+    return statistics.median(runs)
+
+
+def main(sizes: list[int], n_messages: int, naive_max: int):
+    rng = random.Random(3)
+    print(f"{'entries':>8} {'compile':>9} {'lexicon':>10} {'substring':>10}")
+    for size in sizes:
+        entries = list(synthetic_entries(size, rng))
+        t0 = time.perf_counter()
+        lex = Lexicon(entries)
+        compile_ms = (time.perf_counter() - t0) * 1e3
+
+        msgs = messages(n_messages, size, rng)
+        fast = per_message_us(lex.analyze, msgs)
+
+        naive = "-"
+        if size <= naive_max:
+            words = [phrase for phrase, *_ in entries]
+
+            def substring(text, words=words):
+                t = text.lower()
+                return [w for w in words if w in t]
+
+            naive = f"{per_message_us(substring, msgs[:200]):.0f}µs"
+        print(f"{size:>8} {compile_ms:>7.0f}ms {fast:>8.1f}µs {naive:>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--naive-max", type=int, default=100000)
+    args = parser.parse_args()
+    main(args.sizes, args.messages, args.naive_max)
@@ -0,0 +1,70 @@
+"""
+Burst benchmark: outbreak jaisa load, sainkdon farmers kuch hi sawal ek saath.
+
+llm-services app (ASGI, in-process) par fake Groq (fixed latency) ke saath
+N concurrent /generate, single-flight on vs off: upstream calls aur latency.
+
+    python benchmarks/bench_single_flight.py --requests 1000 --questions 5
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "llm-services"))
+os.environ.setdefault("SERVICE_API_KEY", "bench-key")
+os.environ["SEMANTIC_CACHE_ENABLED"] = "false"
+
+from httpx import ASGITransport, AsyncClient  # noqa: E402
+
+import main  # noqa: E402
+
+
+async def burst(n: int, questions: int, upstream_s: float, enabled: bool) -> tuple[int, list[float]]:
+    calls = []
+
+    async def fake_groq(system, user):
+        calls.append(user)
+        await asyncio.sleep(upstream_s)
+        return "jawab"
+
+    main.call_llm = fake_groq
+    main.llm_flights.enabled = enabled
+    rng = random.Random(1)
+    asked = [f"sawal {rng.randrange(questions)}: patton par kaala keeda" for _ in range(n)]
+    headers = {"x-api-key": os.environ["SERVICE_API_KEY"]}
+
+    async def one(client, message):
+        t0 = time.perf_counter()
+        await client.post(
+            "/generate",
+            json={"user_message": message, "intent": "disease", "entities": {}, "context_data": ""},
+            headers=headers,
+        )
+        return time.perf_counter() - t0
+
+    async with AsyncClient(transport=ASGITransport(app=main.app), base_url="http://bench", timeout=None) as client:
+        latencies = await asyncio.gather(*[one(client, m) for m in asked])
+    return len(calls), latencies
+
+
+def run(n: int, questions: int, upstream_ms: float):
+    for enabled in (False, True):
+        calls, lat = asyncio.run(burst(n, questions, upstream_ms / 1000, enabled))
+        print(
+            f"single_flight={'on ' if enabled else 'off'} requests={n} upstream_calls={calls} "
+            f"p50={statistics.median(lat) * 1e3:.0f}ms max={max(lat) * 1e3:.0f}ms"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--questions", type=int, default=5)
+    parser.add_argument("--upstream-ms", type=float, default=300)
+    args = parser.parse_args()
+    run(args.requests, args.questions, args.upstream_ms)
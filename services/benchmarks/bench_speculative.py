@@ -0,0 +1,91 @@
+"""
+Speculative RAG + LLM: p50/p99 latency vs extra LLM calls (cost).
+
+Orchestrator ke speculative_answer() ko simulated upstreams ke saath chalate
+hain — RAG latency lognormal (kabhi kabhi slow), hit rate configurable, LLM
+fixed latency. Sequential (RAG → LLM) vs speculative har hedge delay par.
+
+    python benchmarks/bench_speculative.py --requests 500 --rag-hit-rate 0.6 --hedges 0,50,150
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "chat_orchestrator"))
+
+import main  # noqa: E402
+
+
+def pct(values: list[float], p: float) -> float:
+    values = sorted(values)
+    return values[int(p * (len(values) - 1))] * 1e3
+
+
+async def run(n: int, hit_rate: float, rag_ms: float, llm_ms: float, hedge_ms: float | None) -> None:
+    rng = random.Random(7)
+    plan = [(rng.random() < hit_rate, rng.lognormvariate(0, 0.8) * rag_ms / 1000) for _ in range(n)]
+    calls = {"llm": 0, "cancelled": 0}
+
+    async def fake_rag(intent, entities, message):
+        hit, delay = plan[int(message.split()[-1])]
+        await asyncio.sleep(delay)
+        return ("context", "table") if hit else ("", "generic")
+
+    async def fake_llm(*args, **kwargs):
+        calls["llm"] += 1
+        await asyncio.sleep(llm_ms / 1000)
+        return "jawab"
+
+    async def fake_stream(*args, **kwargs):
+        calls["llm"] += 1
+        try:
+            await asyncio.sleep(llm_ms / 1000)
+        except asyncio.CancelledError:
+            calls["cancelled"] += 1
+            raise
+        yield {"type": "delta", "text": "jawab"}
+
+    main.call_rag_service = fake_rag
+    main.call_llm_service = fake_llm
+    main.stream_llm_service = fake_stream
+    main.answer_cache = None
+
+    async def one(i):
+        t0 = time.perf_counter()
+        if hedge_ms is None:
+            answer, _ = await main.lookup_answer(f"sawal {i}", "disease", {"crop": "gehu"})
+            if answer is None:
+                await main.llm_answer(f"sawal {i}", "disease", {"crop": "gehu"}, main.call_llm_service())
+        else:
+            main.SPECULATIVE_HEDGE_MS = hedge_ms
+            await main.speculative_answer(f"sawal {i}", "disease", {"crop": "gehu"})
+        return time.perf_counter() - t0
+
+    lat = await asyncio.gather(*[one(i) for i in range(n)])
+    misses = sum(1 for hit, _ in plan if not hit)
+    label = "sequential" if hedge_ms is None else f"hedge={hedge_ms:g}ms"
+    print(
+        f"{label:<12} p50={pct(lat, 0.5):.0f}ms p99={pct(lat, 0.99):.0f}ms "
+        f"llm_calls={calls['llm']} (needed {misses}, cancelled {calls['cancelled']}, "
+        f"extra {calls['llm'] - misses})"
+    )
+
+
+def main_cli(n: int, hit_rate: float, rag_ms: float, llm_ms: float, hedges: list[float]):
+    asyncio.run(run(n, hit_rate, rag_ms, llm_ms, None))
+    for hedge in hedges:
+        asyncio.run(run(n, hit_rate, rag_ms, llm_ms, hedge))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--rag-hit-rate", type=float, default=0.6)
+    parser.add_argument("--rag-ms", type=float, default=60)
+    parser.add_argument("--llm-ms", type=float, default=800)
+    parser.add_argument("--hedges", default="0,50,150")
+    args = parser.parse_args()
+    main_cli(args.requests, args.rag_hit_rate, args.rag_ms, args.llm_ms, [float(h) for h in args.hedges.split(",")])
@@ -0,0 +1,72 @@
+"""
+Time-to-first-token vs poora jawab: fake Groq (--token-ms per token) par
+call_llm (non-streaming, poori completion ka wait) aur stream_llm (pehla
+delta aate hi) ki latency.
+
+    python benchmarks/bench_stream_ttft.py --requests 200 --latency-ms 200 --token-ms 20
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+from bench_llm_client import fake_stats, free_port, start_fake_groq
+
+
+def pct(values: list[float], p: float) -> float:
+    values = sorted(values)
+    return values[int(p * (len(values) - 1))] * 1e3
+
+
+async def measure(n: int) -> tuple[list[float], list[float], list[float]]:
+    from services import llm_client
+
+    llm_client.init_client()
+    try:
+        async def full(i):
+            t0 = time.perf_counter()
+            await llm_client.call_llm("system", f"gehu me khad kitni daalein sawal {i}")
+            return time.perf_counter() - t0
+
+        async def streamed(i):
+            t0 = time.perf_counter()
+            ttft = None
+            async for _ in llm_client.stream_llm("system", f"gehu me khad kitni daalein sawal {i}"):
+                if ttft is None:
+                    ttft = time.perf_counter() - t0
+            return ttft, time.perf_counter() - t0
+
+        full_lat = await asyncio.gather(*[full(i) for i in range(n)])
+        stream_lat = await asyncio.gather(*[streamed(i) for i in range(n)])
+    finally:
+        await llm_client.close_client()
+    return full_lat, [t for t, _ in stream_lat], [t for _, t in stream_lat]
+
+
+def main(n: int, latency_ms: float, token_ms: float):
+    port = free_port()
+    server = start_fake_groq(port, "--latency-ms", str(latency_ms), "--token-ms", str(token_ms))
+    os.environ.update(
+        GROQ_URL=f"http://127.0.0.1:{port}/openai/v1/chat/completions",
+        GROQ_API_KEY="fake",
+    )
+    try:
+        full_lat, ttft, stream_total = asyncio.run(measure(n))
+    finally:
+        stats = fake_stats(port)
+        server.terminate()
+
+    print(f"non-stream  p50={statistics.median(full_lat) * 1e3:.0f}ms p99={pct(full_lat, 0.99):.0f}ms (user waits for all of it)")
+    print(f"stream TTFT p50={statistics.median(ttft) * 1e3:.0f}ms p99={pct(ttft, 0.99):.0f}ms")
+    print(f"stream full p50={statistics.median(stream_total) * 1e3:.0f}ms p99={pct(stream_total, 0.99):.0f}ms")
+    print(f"fake groq requests={stats['requests']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=200)
+    parser.add_argument("--token-ms", type=float, default=20)
+    args = parser.parse_args()
+    main(args.requests, args.latency_ms, args.token_ms)
@@ -0,0 +1,82 @@
+"""
+Symptom inverted index benchmark: tens of thousands disease rows par search latency.
+
+Synthetic rows banaye jaate hain (crops × diseases, har row 3-6 symptom
+keywords, ek common "daag" token sab me), phir random farmer messages par
+SymptomIndex.search ka p50/p99 nikala jata hai.
+
+    python benchmarks/bench_symptom_index.py --rows 50000 --crops 20
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "rag_services"))
+
+from symptom_index import SymptomIndex  # noqa: E402
+
+FILLER = "mere khet me fasal ke upar kuch ho gaya hai kya karun".split()
+
+
+def build_rows(total: int, crops: int, vocab: int, rng: random.Random):
+    words = [f"lakshan{i}" for i in range(vocab)]
+    per_crop = total // crops
+    rows = {}
+    for c in range(crops):
+        rows[f"crop{c}"] = tuple(
+            (
+                f"disease{c}_{d}",
+                "recommendation text",
+                ",".join(["daag"] + rng.sample(words, rng.randint(3, 6))),
+            )
+            for d in range(per_crop)
+        )
+    return rows, words
+
+
+def percentile(values, p):
+    return statistics.quantiles(values, n=100)[p - 1]
+
+
+def main(total: int, crops: int, vocab: int, queries: int, k: int):
+    rng = random.Random(7)
+    rows, words = build_rows(total, crops, vocab, rng)
+
+    t0 = time.perf_counter()
+    index = SymptomIndex(rows)
+    build_s = time.perf_counter() - t0
+
+    messages = [
+        (
+            f"crop{rng.randrange(crops)}",
+            " ".join(rng.sample(FILLER, 5) + ["daag"] + rng.sample(words, rng.randint(1, 3))),
+        )
+        for _ in range(queries)
+    ]
+
+    latencies = []
+    for crop, message in messages:
+        t0 = time.perf_counter()
+        index.search(crop, message, k)
+        latencies.append(time.perf_counter() - t0)
+
+    print(f"rows={total} crops={crops} vocab={vocab} postings={len(index)} build={build_s:.2f}s")
+    print(
+        f"search: p50={percentile(latencies, 50) * 1e6:.1f}µs "
+        f"p99={percentile(latencies, 99) * 1e6:.1f}µs "
+        f"max={max(latencies) * 1e6:.1f}µs"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--crops", type=int, default=20)
+    parser.add_argument("--vocab", type=int, default=3000)
+    parser.add_argument("--queries", type=int, default=5000)
+    parser.add_argument("--top-k", type=int, default=3)
+    args = parser.parse_args()
+    main(args.rows, args.crops, args.vocab, args.queries, args.top_k)
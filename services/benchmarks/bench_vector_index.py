@@ -0,0 +1,93 @@
+"""
+Dense retrieval benchmark: brute-force float16 / int8 vs IVF, single query vs
+batched queries.
+
+Scale test ke liye passage vectors synthetic hote hain: kuch hazaar "topic"
+centers ke aas-paas clustered unit vectors (real text embeddings bhi aise hi
+cluster hote hain; pure random vectors par IVF ka recall meaningless hai).
+
+    python benchmarks/bench_vector_index.py --passages 200000 --nlist 256 --nprobe 8
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "rag_services"))
+
+from embeddings import HashingEmbedder  # noqa: E402
+from vector_index import VectorIndex, write_index  # noqa: E402
+
+
+def unit(rng, n, dim):
+    v = rng.standard_normal((n, dim)).astype(np.float32)
+    return v / np.linalg.norm(v, axis=1, keepdims=True)
+
+
+def measure(index, queries, k, nprobe, batch):
+    latencies = []
+    started = time.perf_counter()
+    for i in range(0, len(queries), batch):
+        t0 = time.perf_counter()
+        index.search_batch(queries[i:i + batch], k, nprobe)
+        latencies.append(time.perf_counter() - t0)
+    qps = len(queries) / (time.perf_counter() - started)
+    q = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return q[49] * 1e3, q[98] * 1e3, qps
+
+
+def clustered(rng, n, dim, topics):
+    centers = unit(rng, topics, dim)
+    v = centers[rng.integers(topics, size=n)] + 0.5 * unit(rng, n, dim)
+    return (v / np.linalg.norm(v, axis=1, keepdims=True)).astype(np.float32)
+
+
+def main(n, dim, nlist, nprobe, queries, k):
+    rng = np.random.default_rng(3)
+    vecs = clustered(rng, n, dim, topics=max(n // 100, 10))
+    # queries = kuch passages ke paas ke points (realistic neighbours)
+    picks = rng.integers(n, size=queries)
+    qs = vecs[picks] + 0.3 * unit(rng, queries, dim)
+    qs /= np.linalg.norm(qs, axis=1, keepdims=True)
+    meta = [{"id": i} for i in range(n)]
+    embedder = HashingEmbedder(dim=dim)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, dtype, lists in [
+            ("brute float16", "float16", 0),
+            ("brute int8", "int8", 0),
+            (f"ivf int8 nlist={nlist} nprobe={nprobe}", "int8", nlist),
+        ]:
+            path = Path(tmp) / label.split()[0] / dtype
+            t0 = time.perf_counter()
+            write_index(path, vecs, meta, embedder, dtype, lists)
+            build_s = time.perf_counter() - t0
+            index = VectorIndex(path)
+
+            # recall@k vs exact float32
+            exact = np.argsort(-(vecs @ qs[:50].T), axis=0)[:k].T
+            got = index.search_batch(qs[:50], k, nprobe)
+            recall = np.mean([len({h["id"] for h in g} & set(e)) / k for g, e in zip(got, exact)])
+
+            for batch in (1, 32):
+                p50, p99, qps = measure(index, qs, k, nprobe, batch)
+                print(
+                    f"{label:<32} batch={batch:<3} p50={p50:7.2f}ms p99={p99:7.2f}ms "
+                    f"qps={qps:8.0f} recall@{k}={recall:.2f} build={build_s:.1f}s"
+                )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--passages", type=int, default=200000)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--nlist", type=int, default=256)
+    parser.add_argument("--nprobe", type=int, default=8)
+    parser.add_argument("--queries", type=int, default=256)
+    parser.add_argument("--top-k", type=int, default=5)
+    args = parser.parse_args()
+    main(args.passages, args.dim, args.nlist, args.nprobe, args.queries, args.top_k)
@@ -0,0 +1,121 @@
+"""
+Local fake Groq server (OpenAI-compatible /chat/completions) for load tests.
+
+Configurable latency, 429 (Retry-After ke saath) / 5xx error rate aur ek
+server-side concurrency limit (us se upar 429), taaki client ke pooling,
+semaphore aur retry ko bina paid API ke test kar sakein. `"stream": true`
+par SSE chunks (har token ke beech --token-ms) bhejta hai; non-stream jawab
+bhi utna hi generation time leta hai (--answer-words × --token-ms).
+
+    python benchmarks/fake_groq.py --port 9100 --latency-ms 200 --rate-429 0.02
+    GROQ_URL=http://127.0.0.1:9100/openai/v1/chat/completions GROQ_API_KEY=fake ...
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+def create_app(
+    latency_ms: float = 200,
+    jitter_ms: float = 50,
+    rate_429: float = 0.0,
+    rate_5xx: float = 0.0,
+    max_concurrency: int = 0,
+    retry_after: float = 1.0,
+    seed: int = 0,
+    token_ms: float = 0,
+    answer_words: int = 40,
+) -> FastAPI:
+    app = FastAPI(title="Fake Groq")
+    rng = random.Random(seed)
+    stats = {"requests": 0, "ok": 0, "429": 0, "5xx": 0, "in_flight": 0, "peak_in_flight": 0}
+    app.state.stats = stats
+
+    def rate_limited() -> JSONResponse:
+        stats["429"] += 1
+        return JSONResponse(
+            {"error": {"message": "Rate limit reached", "type": "rate_limit_exceeded"}},
+            status_code=429,
+            headers={"retry-after": f"{retry_after:g}"},
+        )
+
+    async def token_stream(content: str):
+        words = content.split(" ")
+        for i, word in enumerate(words):
+            chunk = {"choices": [{"index": 0, "delta": {"content": word if i == 0 else " " + word}}]}
+            yield f"data: {json.dumps(chunk)}\n\n"
+            await asyncio.sleep(token_ms / 1000)
+        yield 'data: {"choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}\n\n'
+        yield "data: [DONE]\n\n"
+
+    @app.post("/openai/v1/chat/completions")
+    async def completions(request: Request):
+        body = await request.json()
+        stats["requests"] += 1
+
+        if max_concurrency and stats["in_flight"] >= max_concurrency:
+            return rate_limited()
+        if rng.random() < rate_429:
+            return rate_limited()
+        if rng.random() < rate_5xx:
+            stats["5xx"] += 1
+            return JSONResponse({"error": {"message": "upstream overloaded"}}, status_code=503)
+
+        stats["in_flight"] += 1
+        stats["peak_in_flight"] = max(stats["peak_in_flight"], stats["in_flight"])
+        try:
+            await asyncio.sleep(max(0.0, rng.gauss(latency_ms, jitter_ms)) / 1000)
+        finally:
+            stats["in_flight"] -= 1
+
+        stats["ok"] += 1
+        question = body["messages"][-1]["content"][:60]
+        content = f"Fake jawab: {question} " + " ".join(["khad"] * answer_words)
+        if body.get("stream"):
+            return StreamingResponse(token_stream(content), media_type="text/event-stream")
+        # poori completion generate hone tak ruko
+        await asyncio.sleep(len(content.split(" ")) * token_ms / 1000)
+        return {
+            "id": f"fake-{stats['requests']}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+        }
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats
+
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-ms", type=float, default=200)
+    parser.add_argument("--jitter-ms", type=float, default=50)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--rate-5xx", type=float, default=0.0)
+    parser.add_argument("--max-concurrency", type=int, default=0)
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--token-ms", type=float, default=0)
+    parser.add_argument("--answer-words", type=int, default=40)
+    args = parser.parse_args()
+
+    app = create_app(
+        args.latency_ms, args.jitter_ms, args.rate_429, args.rate_5xx,
+        args.max_concurrency, args.retry_after, token_ms=args.token_ms, answer_words=args.answer_words,
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
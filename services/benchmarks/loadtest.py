@@ -0,0 +1,417 @@
+"""
+Load test: poora stack (gateway → orchestrator → NLU / RAG / LLM) local par,
+Groq ki jagah fake_groq.py. Har service apne uvicorn process me, temp dir me
+nayi knowledge DB (create_db.py → publish_knowledge.py snapshot) aur alag
+chat history DB ke saath.
+
+Traffic open-loop hai: fixed arrival rate (ya --poisson), mix ke hisaab se:
+  - rag_hit:  "gehu ke liye khaad ..." → fertilizer / calendar table, LLM tak
+  - rag_miss: routing miss → FTS / vector khaali → LLM (fake Groq)
+  - history:  GET /api/chat/history/{session} (warm-up me bane sessions)
+  - cached:   ek hi sawal baar baar → orchestrator answer cache
+Latency scheduled arrival time se naapi jaati hai (coordinated omission nahi:
+stack atke to queue ka wait bhi latency me aata hai).
+
+Result JSON (--out) me har endpoint ka RPS, p50/p95/p99, errors (status ke
+hisaab se). --baseline purani JSON se compare karta hai; p99 / RPS
+--tolerance se zyada bigde ya error rate badhe to exit code 1 (CI / deploy
+se pehle).
+
+    python benchmarks/loadtest.py --rate 40 --duration 30 --out results.json
+    python benchmarks/loadtest.py --rate 40 --duration 30 --baseline results.json
+    python benchmarks/loadtest.py --mix rag_miss=1 --groq-latency-ms 800 --env SPECULATIVE_LLM_ENABLED=true
+    python benchmarks/loadtest.py --target http://127.0.0.1:8000 --rate 10   # chalta hua gateway
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+
+import httpx
+import requests
+
+from bench_llm_client import fake_stats, free_port, start_fake_groq
+
+BENCH_DIR = Path(__file__).resolve().parent
+SERVICES_DIR = BENCH_DIR.parent
+
+CROPS = ["gehu", "dhaan", "sarson"]
+HIT_TEMPLATES = [
+    "{crop} ke liye kaun si khaad daalein ({n})",
+    "{crop} me urea kab dein {n}",
+    "{crop} ki buvai kab kare {n}",
+]
+MISS_TEMPLATES = [
+    "tamatar me paani kitna dena chahiye {n}",
+    "kheti ke liye loan kaise milega {n}",
+    "aaj mausam kaisa rahega {n}",
+]
+CACHED_MESSAGE = "gehu ke liye kaun si khaad daalein"
+CLASSES = ("rag_hit", "rag_miss", "history", "cached")
+
+
+def parse_mix(text: str) -> dict[str, float]:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in CLASSES:
+            raise argparse.ArgumentTypeError(f"unknown traffic class {name!r} (choose from {', '.join(CLASSES)})")
+        mix[name] = float(weight or 1)
+    if sum(mix.values()) <= 0:
+        raise argparse.ArgumentTypeError("mix weights sum to zero")
+    return mix
+
+
+def pct(values: list[float], p: float) -> float:
+    values = sorted(values)
+    return values[int(p * (len(values) - 1))] if values else 0.0
+
+# ---------------- Stack ----------------
+
+def wait_ready(url: str, proc: subprocess.Popen, name: str, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"{name} exited with {proc.returncode} (log dekhein)")
+        try:
+            if requests.get(url, timeout=0.5).status_code == 200:
+                return
+        except requests.ConnectionError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{name} did not become ready at {url}")
+
+
+class Stack:
+    """fake Groq + nlu / rag / llm / orchestrator / gateway, sab 127.0.0.1 ke free ports par."""
+
+    def __init__(self, workdir: Path, args):
+        self.workdir = workdir
+        self.args = args
+        self.procs: list[subprocess.Popen] = []
+        self.ports: dict[str, int] = {}
+
+    def _env(self, extra: dict[str, str]) -> dict[str, str]:
+        env = dict(os.environ)
+        env.update({
+            "SERVICE_API_KEY": "loadtest-key",
+            "PYTHONUNBUFFERED": "1",
+            "TRACE_EXPORT_PATH": str(self.workdir / "spans.jsonl") if self.args.trace else "",
+        })
+        env.update(extra)
+        env.update(self.args.env)
+        return env
+
+    def _uvicorn(self, name: str, app_dir: Path, ready_path: str, env: dict[str, str]) -> str:
+        port = self.ports[name] = free_port()
+        log = open(self.workdir / f"{name}.log", "w")
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+             "--log-level", "warning", "--no-access-log"],
+            cwd=app_dir, env=self._env(env), stdout=log, stderr=subprocess.STDOUT,
+        )
+        self.procs.append(proc)
+        base = f"http://127.0.0.1:{port}"
+        wait_ready(base + ready_path, proc, name)
+        return base
+
+    def start(self) -> str:
+        args = self.args
+        db_path = self.workdir / "agri_knowledge.db"
+        snapshots = self.workdir / "knowledge"
+        subprocess.run(
+            [sys.executable, "create_db.py"], cwd=SERVICES_DIR / "chat_orchestrator",
+            env=self._env({"AGRI_DB_PATH": str(db_path)}), check=True, stdout=subprocess.DEVNULL,
+        )
+        subprocess.run(
+            [sys.executable, "publish_knowledge.py", "--db", str(db_path), "--out", str(snapshots)],
+            cwd=SERVICES_DIR / "rag_services", env=self._env({}), check=True, stdout=subprocess.DEVNULL,
+        )
+
+        groq_port = self.ports["fake_groq"] = free_port()
+        self.procs.append(start_fake_groq(
+            groq_port, "--latency-ms", str(args.groq_latency_ms), "--jitter-ms", str(args.groq_jitter_ms),
+            "--rate-429", str(args.groq_rate_429), "--rate-5xx", str(args.groq_rate_5xx),
+        ))
+
+        nlu = self._uvicorn("nlu_llm", SERVICES_DIR / "nlu_llm", "/health", {})
+        rag = self._uvicorn("rag_services", SERVICES_DIR / "rag_services", "/health", {
+            "RAG_DB_PATH": str(db_path),
+            "KNOWLEDGE_SNAPSHOT_DIR": str(snapshots),
+            "VECTOR_INDEX_DIR": str(self.workdir / "vector_index"),
+        })
+        llm = self._uvicorn("llm_services", SERVICES_DIR / "llm-services", "/metrics", {
+            "GROQ_API_KEY": "fake",
+            "GROQ_URL": f"http://127.0.0.1:{groq_port}/openai/v1/chat/completions",
+            "SEMANTIC_CACHE_ENABLED": str(args.semantic_cache).lower(),
+            "SEMANTIC_CACHE_PATH": str(self.workdir / "semantic_cache.npz"),
+        })
+        orchestrator = self._uvicorn("chat_orchestrator", SERVICES_DIR / "chat_orchestrator", "/health", {
+            "AGRI_DB_PATH": str(db_path),
+            "KNOWLEDGE_SNAPSHOT_DIR": str(snapshots),
+            "HISTORY_DB_PATH": str(self.workdir / "chat_history.db"),
+            "NLU_SERVICE_URL": nlu + "/analyze",
+            "RAG_SERVICE_URL": rag + "/query",
+            "LLM_SERVICE_URL": llm + "/generate",
+            "NLU_BACKEND": args.nlu_backend,
+        })
+        limits = {} if args.keep_rate_limits else {
+            # saara load ek hi IP se aata hai
+            "RATE_IP_RPS": "1000000",
+            "RATE_IP_BURST": "1000000",
+        }
+        return self._uvicorn("api_gateway", SERVICES_DIR / "api_gateway", "/health", {
+            "CHAT_ORCHESTRATOR_URL": orchestrator,
+            **limits,
+        })
+
+    def stats(self) -> dict:
+        out = {"fake_groq": fake_stats(self.ports["fake_groq"])}
+        scrape = requests.get(f"http://127.0.0.1:{self.ports['chat_orchestrator']}/metrics", timeout=5).text
+        out["rag_sources"] = {
+            source: int(float(count))
+            for source, count in re.findall(r'^orchestrator_rag_latency_seconds_count\{source="([^"]+)"\} (\S+)', scrape, re.M)
+        }
+        return out
+
+    def stop(self) -> None:
+        for proc in reversed(self.procs):
+            proc.terminate()
+        for proc in self.procs:
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+# ---------------- Load ----------------
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(Counter)
+        self.sent = Counter()
+
+    def add(self, kind: str, latency: float, error: str | None) -> None:
+        if error is None:
+            self.latencies[kind].append(latency)
+        else:
+            self.errors[kind][error] += 1
+
+    def summary(self, duration: float) -> dict:
+        endpoints = {}
+        kinds = sorted(self.sent)
+        for kind in kinds + ["all"]:
+            lat = self.latencies[kind] if kind != "all" else [t for k in kinds for t in self.latencies[k]]
+            errors = self.errors[kind] if kind != "all" else sum((self.errors[k] for k in kinds), Counter())
+            sent = self.sent[kind] if kind != "all" else sum(self.sent.values())
+            endpoints[kind] = {
+                "sent": sent,
+                "ok": len(lat),
+                "errors": dict(errors),
+                "error_rate": round(sum(errors.values()) / sent, 4) if sent else 0.0,
+                "rps": round(len(lat) / duration, 2),
+                "p50_ms": round(pct(lat, 0.5) * 1000, 1),
+                "p95_ms": round(pct(lat, 0.95) * 1000, 1),
+                "p99_ms": round(pct(lat, 0.99) * 1000, 1),
+                "max_ms": round(max(lat, default=0) * 1000, 1),
+            }
+        return endpoints
+
+
+async def send(client: httpx.AsyncClient, kind: str, n: int, rng: random.Random, sessions: list[str]) -> str | None:
+    """Error ka naam (status code / exception) ya None."""
+    try:
+        if kind == "history":
+            resp = await client.get(f"/api/chat/history/{rng.choice(sessions)}")
+        else:
+            if kind == "rag_hit":
+                message = rng.choice(HIT_TEMPLATES).format(crop=rng.choice(CROPS), n=n)
+            elif kind == "rag_miss":
+                message = rng.choice(MISS_TEMPLATES).format(n=n)
+            else:
+                message = CACHED_MESSAGE
+            resp = await client.post("/api/chat", json={"message": message})
+    except httpx.TimeoutException:
+        return "timeout"
+    except httpx.HTTPError as e:
+        return type(e).__name__
+    return None if resp.status_code == 200 else str(resp.status_code)
+
+
+async def warm_sessions(client: httpx.AsyncClient, count: int) -> list[str]:
+    async def one(i):
+        resp = await client.post("/api/chat", json={"message": f"{CROPS[i % len(CROPS)]} ke liye khaad"})
+        resp.raise_for_status()
+        return resp.json()["session_id"]
+
+    return list(await asyncio.gather(*[one(i) for i in range(count)]))
+
+
+async def drive(args, base_url: str) -> tuple[dict, float]:
+    rng = random.Random(args.seed)
+    kinds, weights = zip(*args.mix.items())
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=args.max_in_flight, max_keepalive_connections=args.max_in_flight)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        sessions = await warm_sessions(client, args.sessions) if "history" in args.mix else []
+
+        loop = asyncio.get_running_loop()
+        in_flight: set[asyncio.Task] = set()
+        total = args.warmup + args.duration
+        start = loop.time()
+        at = 0.0
+        n = 0
+
+        async def one(kind, n, scheduled, measured):
+            error = await send(client, kind, n, rng, sessions)
+            if measured:
+                recorder.add(kind, loop.time() - scheduled, error)
+
+        while at < total:
+            delay = start + at - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            kind = rng.choices(kinds, weights)[0]
+            measured = at >= args.warmup
+            if measured:
+                recorder.sent[kind] += 1
+            if len(in_flight) >= args.max_in_flight:
+                # load generator khud saturate — stack ki galti nahi, par chhupana bhi nahi
+                if measured:
+                    recorder.add(kind, 0.0, "client_overflow")
+            else:
+                task = asyncio.create_task(one(kind, n, start + at, measured))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+            n += 1
+            at += rng.expovariate(args.rate) if args.poisson else 1 / args.rate
+
+        if in_flight:
+            await asyncio.wait(in_flight)
+        elapsed = loop.time() - start - args.warmup
+
+    # RPS naapi gayi window par (jo late khatam hue woh bhi usi window ke hain)
+    return recorder.summary(max(elapsed, args.duration)), elapsed
+
+# ---------------- Report ----------------
+
+def print_table(endpoints: dict) -> None:
+    print(f"{'endpoint':<10}{'sent':>7}{'ok':>7}{'rps':>8}{'p50':>10}{'p95':>10}{'p99':>10}  errors")
+    for kind, r in endpoints.items():
+        errors = ", ".join(f"{k}={v}" for k, v in sorted(r["errors"].items())) or "-"
+        print(
+            f"{kind:<10}{r['sent']:>7}{r['ok']:>7}{r['rps']:>8.1f}{r['p50_ms']:>8.1f}ms"
+            f"{r['p95_ms']:>8.1f}ms{r['p99_ms']:>8.1f}ms  {errors}"
+        )
+
+
+def compare(current: dict, baseline: dict, tolerance: float, floor_ms: float) -> list[str]:
+    """Baseline se bigde metrics ki list (khaali = pass)."""
+    regressions = []
+    for kind, base in baseline["endpoints"].items():
+        cur = current["endpoints"].get(kind)
+        if cur is None:
+            continue
+        limit = base["p99_ms"] * (1 + tolerance) + floor_ms
+        if cur["p99_ms"] > limit:
+            regressions.append(f"{kind}: p99 {cur['p99_ms']:.1f}ms > {limit:.1f}ms (baseline {base['p99_ms']:.1f}ms)")
+        if cur["error_rate"] > base["error_rate"] + 0.01:
+            regressions.append(f"{kind}: error rate {cur['error_rate']:.2%} (baseline {base['error_rate']:.2%})")
+        if cur["rps"] < base["rps"] * (1 - tolerance):
+            regressions.append(f"{kind}: rps {cur['rps']:.1f} < baseline {base['rps']:.1f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", default=None, help="chalta hua gateway URL; na ho to poora stack local boot")
+    parser.add_argument("--rate", type=float, default=20, help="arrivals per second")
+    parser.add_argument("--duration", type=float, default=30, help="naapi jaane wali window (sec)")
+    parser.add_argument("--warmup", type=float, default=5, help="shuru ke sec jo report me nahi")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("rag_hit=0.5,rag_miss=0.3,history=0.2"))
+    parser.add_argument("--poisson", action="store_true", help="fixed interval ki jagah Poisson arrivals")
+    parser.add_argument("--sessions", type=int, default=20, help="history traffic ke liye warm-up sessions")
+    parser.add_argument("--max-in-flight", type=int, default=1000)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=None, help="result JSON file")
+    parser.add_argument("--baseline", default=None, help="purani result JSON; regression par exit 1")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="p99 / rps me itna (fraction) bigadna chalega")
+    parser.add_argument("--floor-ms", type=float, default=5, help="chhote p99 par noise ke liye absolute slack")
+    # local stack
+    parser.add_argument("--groq-latency-ms", type=float, default=200)
+    parser.add_argument("--groq-jitter-ms", type=float, default=50)
+    parser.add_argument("--groq-rate-429", type=float, default=0.0)
+    parser.add_argument("--groq-rate-5xx", type=float, default=0.0)
+    parser.add_argument("--nlu-backend", choices=["remote", "embedded"], default="remote")
+    parser.add_argument("--semantic-cache", action="store_true", help="llm-services semantic cache on (miss traffic ko cache kar lega)")
+    parser.add_argument("--keep-rate-limits", action="store_true", help="gateway ke default per-IP limits rehne do")
+    parser.add_argument("--trace", action="store_true", help="spans workdir/spans.jsonl me (trace_report.py ke liye)")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="har service ke env me (A/B ke liye)")
+    parser.add_argument("--workdir", default=None, help="DB / logs / spans yahan (default: temp dir)")
+    args = parser.parse_args()
+    args.env = dict(item.split("=", 1) for item in args.env)
+
+    stack = None
+    if args.target:
+        base_url = args.target.rstrip("/")
+    else:
+        workdir = Path(args.workdir or tempfile.mkdtemp(prefix="agri-loadtest-"))
+        workdir.mkdir(parents=True, exist_ok=True)
+        print(f"stack workdir: {workdir}")
+        stack = Stack(workdir, args)
+    try:
+        if stack is not None:
+            base_url = stack.start()
+        endpoints, elapsed = asyncio.run(drive(args, base_url))
+        upstream = stack.stats() if stack is not None else {}
+    finally:
+        if stack is not None:
+            stack.stop()
+
+    result = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "target": args.target or "local",
+            "rate": args.rate,
+            "arrivals": "poisson" if args.poisson else "fixed",
+            "duration": args.duration,
+            "elapsed": round(elapsed, 2),
+            "mix": args.mix,
+            "env": args.env,
+            "groq_latency_ms": None if args.target else args.groq_latency_ms,
+        },
+        "endpoints": endpoints,
+        "upstream": upstream,
+    }
+    print_table(endpoints)
+    if upstream:
+        groq = upstream["fake_groq"]
+        print(f"\nrag sources: {upstream['rag_sources']}  groq requests={groq['requests']} peak_in_flight={groq['peak_in_flight']}")
+    if args.out:
+        Path(args.out).write_text(json.dumps(result, indent=2))
+        print(f"\nresult: {args.out}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        regressions = compare(result, baseline, args.tolerance, args.floor_ms)
+        if regressions:
+            print("\n❌ regressions vs baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("\n✅ baseline ke andar")
+
+
+if __name__ == "__main__":
+    main()
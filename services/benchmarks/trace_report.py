@@ -0,0 +1,96 @@
+"""
+Trace report: TRACE_EXPORT_PATH wali span files se /chat ka per-stage breakdown.
+
+Har service (gateway, orchestrator, nlu, rag, llm) spans JSON lines me likhti
+hai; yeh script unhe trace_id par jodti hai aur batati hai:
+  - har (service, stage) ka p50 / p95 / p99 aur kitne traces me aaya
+  - sabse slow N traces ka waterfall (kaunsa stage kab shuru, kitna chala)
+
+    python benchmarks/trace_report.py /data/traces/spans.jsonl --slowest 3
+    python benchmarks/trace_report.py gw.jsonl orch.jsonl llm.jsonl --root "POST /api/chat"
+"""
+import argparse
+import json
+from collections import defaultdict
+
+
+def pct(values: list[float], p: float) -> float:
+    values = sorted(values)
+    return values[int(p * (len(values) - 1))]
+
+
+def load(paths: list[str]) -> dict[str, list[dict]]:
+    traces = defaultdict(list)
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    span = json.loads(line)
+                    traces[span["trace_id"]].append(span)
+    return traces
+
+
+def waterfall(spans: list[dict]) -> None:
+    children = defaultdict(list)
+    ids = {s["span_id"] for s in spans}
+    for s in spans:
+        children[s["parent_id"] if s["parent_id"] in ids else None].append(s)
+    t0 = min(s["start"] for s in spans)
+
+    def walk(parent, depth):
+        for s in sorted(children[parent], key=lambda s: s["start"]):
+            offset = (s["start"] - t0) * 1000
+            flag = "" if s["status"] == "ok" else f"  [{s['status']}]"
+            print(f"    {'  ' * depth}{s['service']}:{s['name']:<28} +{offset:8.1f}ms {s['duration_ms']:9.1f}ms{flag}")
+            walk(s["span_id"], depth + 1)
+
+    walk(None, 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+", help="span JSONL files")
+    parser.add_argument("--root", default=None, help="sirf woh traces jinka root span yeh ho (jaise 'POST /api/chat')")
+    parser.add_argument("--slowest", type=int, default=3)
+    args = parser.parse_args()
+
+    traces = load(args.paths)
+    roots = {}
+    for trace_id, spans in traces.items():
+        ids = {s["span_id"] for s in spans}
+        top = [s for s in spans if s["parent_id"] not in ids]
+        root = max(top, key=lambda s: s["duration_ms"])
+        if args.root is None or root["name"] == args.root:
+            roots[trace_id] = root
+    if not roots:
+        print("koi trace nahi mila")
+        return
+
+    stages = defaultdict(list)
+    for trace_id in roots:
+        per_trace = defaultdict(float)
+        for s in traces[trace_id]:
+            # ek trace me same stage kai baar (retry) → jod do
+            per_trace[(s["service"], s["name"])] += s["duration_ms"]
+        for key, ms in per_trace.items():
+            stages[key].append(ms)
+
+    root_p50 = pct([r["duration_ms"] for r in roots.values()], 0.5)
+    print(f"{len(roots)} traces, root p50 {root_p50:.1f}ms\n")
+    print(f"{'service:stage':<44}{'traces':>7}{'p50':>10}{'p95':>10}{'p99':>10}{'p50 share':>11}")
+    for (service, name), values in sorted(stages.items(), key=lambda kv: -pct(kv[1], 0.5)):
+        p50 = pct(values, 0.5)
+        print(
+            f"{service + ':' + name:<44}{len(values):>7}{p50:>8.1f}ms{pct(values, 0.95):>8.1f}ms"
+            f"{pct(values, 0.99):>8.1f}ms{p50 / root_p50:>11.0%}"
+        )
+
+    print(f"\nslowest {args.slowest}:")
+    for trace_id, root in sorted(roots.items(), key=lambda kv: -kv[1]["duration_ms"])[:args.slowest]:
+        print(f"  trace {trace_id}  {root['duration_ms']:.1f}ms")
+        waterfall(traces[trace_id])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+import hashlib
+import re
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Callable, NamedTuple
+
+from fastapi.concurrency import run_in_threadpool
+from prometheus_client import Counter, Gauge
+
+from db import SQLitePool
+
+# ----------------- Metrics -----------------
+
+CACHE_LOOKUPS = Counter(
+    "orchestrator_answer_cache_lookups_total",
+    "Answer cache lookups per tier",
+    ["tier", "result"],
+)
+CACHE_ENTRIES = Gauge("orchestrator_answer_cache_entries", "In-process answer cache entries")
+CACHE_INVALIDATIONS = Counter(
+    "orchestrator_answer_cache_invalidations_total",
+    "Knowledge version change par cache flush",
+)
+
+# ----------------- Keys -----------------
+
+RAG = "rag"
+LLM = "llm"
+
+WORD_RE = re.compile(r"\w+")
+
+
+def normalize_message(message: str) -> str:
+    # "Gehu ke liye khaad?" aur "gehu  ke liye KHAAD" ek hi key
+    return " ".join(WORD_RE.findall(message.lower()))
+
+
+def cache_key(message: str, intent: str, crop: str | None) -> str:
+    raw = f"{intent}|{crop or ''}|{normalize_message(message)}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class CachedAnswer(NamedTuple):
+    answer: str
+    kind: str          # RAG ya LLM
+    version: int
+    expires_at: float
+
+# ----------------- SQLite Tier -----------------
+
+CACHE_DDL = """
+CREATE TABLE IF NOT EXISTS answer_cache (
+    key TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    answer TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    expires_at REAL NOT NULL
+)
+"""
+
+SELECT_CACHE_SQL = """
+    SELECT answer, kind, version, expires_at FROM answer_cache
+    WHERE key = ? AND version = ? AND expires_at > ?
+"""
+
+UPSERT_CACHE_SQL = """
+    INSERT INTO answer_cache (key, kind, answer, version, expires_at)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT (key) DO UPDATE SET
+        kind = excluded.kind, answer = excluded.answer,
+        version = excluded.version, expires_at = excluded.expires_at
+"""
+
+PURGE_CACHE_SQL = "DELETE FROM answer_cache WHERE version != ? OR expires_at <= ?"
+
+# ----------------- Tiered Cache -----------------
+
+
+class AnswerCache:
+    """
+    L1: process ke andar LRU (max_entries) + per-entry TTL.
+    L2 (optional): SQLite table, saare orchestrator workers/replicas me shared.
+
+    Key = normalized message + intent + crop. RAG aur LLM answers ke TTL alag.
+    Har entry ke saath knowledge version store hota hai; version_fn naya
+    version de to purani entries miss hain (L1 turant clear, L2 purge).
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        ttl_rag: float = 3600.0,
+        ttl_llm: float = 600.0,
+        store: SQLitePool | None = None,
+        version_fn: Callable[[], int] | None = None,
+        version_check_interval: float = 5.0,
+    ):
+        self.max_entries = max_entries
+        self.ttls = {RAG: ttl_rag, LLM: ttl_llm}
+        self.store = store
+        self.version_fn = version_fn
+        self.version_check_interval = version_check_interval
+
+        self._entries: OrderedDict[str, CachedAnswer] = OrderedDict()
+        self._version = 0
+        self._version_checked: float | None = None
+        self.stats = {"hits": 0, "misses": 0, "l2_hits": 0, "invalidations": 0}
+
+        if self.store is not None:
+            with self.store.transaction() as conn:
+                conn.execute(CACHE_DDL)
+
+    # ---------- version ----------
+
+    async def current_version(self) -> int:
+        now = time.monotonic()
+        if self.version_fn is None:
+            return self._version
+        if self._version_checked is not None and now - self._version_checked < self.version_check_interval:
+            return self._version
+        self._version_checked = now
+
+        try:
+            version = await run_in_threadpool(self.version_fn)
+        except Exception as e:
+            print("⚠️ Knowledge version check failed:", e)
+            return self._version
+
+        if version != self._version:
+            if self._version:
+                print(f"♻️ Knowledge version {self._version} → {version}, answer cache flushed")
+                self.stats["invalidations"] += 1
+                CACHE_INVALIDATIONS.inc()
+            self._version = version
+            self._entries.clear()
+            CACHE_ENTRIES.set(0)
+            if self.store is not None:
+                await run_in_threadpool(self._purge_sync, version)
+        return self._version
+
+    # ---------- L1 ----------
+
+    def _remember(self, key: str, entry: CachedAnswer):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        CACHE_ENTRIES.set(len(self._entries))
+
+    # ---------- L2 ----------
+
+    def _load_sync(self, key: str, version: int) -> CachedAnswer | None:
+        with self.store.connection() as conn:
+            row = conn.execute(SELECT_CACHE_SQL, (key, version, time.time())).fetchone()
+        return CachedAnswer(*row) if row else None
+
+    def _save_sync(self, key: str, entry: CachedAnswer):
+        with self.store.transaction() as conn:
+            conn.execute(UPSERT_CACHE_SQL, (key, entry.kind, entry.answer, entry.version, entry.expires_at))
+
+    def _purge_sync(self, version: int):
+        with self.store.transaction() as conn:
+            conn.execute(PURGE_CACHE_SQL, (version, time.time()))
+
+    # ---------- API ----------
+
+    async def get(self, message: str, intent: str, crop: str | None) -> CachedAnswer | None:
+        version = await self.current_version()
+        key = cache_key(message, intent, crop)
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry.version == version and entry.expires_at > time.time():
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                CACHE_LOOKUPS.labels("memory", "hit").inc()
+                return entry
+            del self._entries[key]
+        CACHE_LOOKUPS.labels("memory", "miss").inc()
+
+        if self.store is not None:
+            try:
+                entry = await run_in_threadpool(self._load_sync, key, version)
+            except sqlite3.Error as e:
+                print("⚠️ Answer cache read failed:", e)
+                entry = None
+            CACHE_LOOKUPS.labels("sqlite", "hit" if entry else "miss").inc()
+            if entry is not None:
+                self._remember(key, entry)
+                self.stats["hits"] += 1
+                self.stats["l2_hits"] += 1
+                return entry
+
+        self.stats["misses"] += 1
+        return None
+
+    async def put(self, message: str, intent: str, crop: str | None, answer: str, kind: str):
+        version = await self.current_version()
+        key = cache_key(message, intent, crop)
+        entry = CachedAnswer(answer, kind, version, time.time() + self.ttls[kind])
+        self._remember(key, entry)
+
+        if self.store is not None:
+            try:
+                await run_in_threadpool(self._save_sync, key, entry)
+            except sqlite3.Error as e:
+                print("⚠️ Answer cache write failed:", e)
+
+    def hit_rate(self) -> float:
+        total = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / total if total else 0.0
+
+    def clear(self):
+        self._entries.clear()
+        CACHE_ENTRIES.set(0)
@@ -0,0 +1,84 @@
+import importlib.util
+import httpx
+
+import deadlines
+import tracing
+from config import (
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE,
+    HTTP_KEEPALIVE_EXPIRY,
+    HTTP2_ENABLED,
+    HTTP_CONNECT_TIMEOUT,
+    NLU_TIMEOUT,
+    RAG_TIMEOUT,
+    LLM_TIMEOUT,
+)
+
+# ----------------- Per-Upstream Timeouts -----------------
+
+UPSTREAM_TIMEOUTS = {
+    "nlu": NLU_TIMEOUT,
+    "rag": RAG_TIMEOUT,
+    "llm": LLM_TIMEOUT,
+}
+
+_clients: dict[str, httpx.AsyncClient] = {}
+
+# ----------------- Client Factory -----------------
+
+def _http2_available() -> bool:
+    # httpx[http2] ke bina h2 package nahi hota
+    return importlib.util.find_spec("h2") is not None
+
+
+def build_client(timeout: float, transport: httpx.AsyncBaseTransport | None = None) -> httpx.AsyncClient:
+    http2 = HTTP2_ENABLED and _http2_available()
+    if HTTP2_ENABLED and not http2:
+        print("⚠️ HTTP2_ENABLED set but 'h2' not installed, using HTTP/1.1")
+
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(timeout, connect=HTTP_CONNECT_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+        http2=http2,
+        transport=transport,
+        # request deadline: timeout = min(upar wala cap, bacha hua budget) + header aage
+        # + traceparent / X-Request-ID taaki NLU / RAG / LLM spans isi trace me judein
+        event_hooks={"request": [deadlines.httpx_hook(), tracing.httpx_hook()]},
+    )
+
+# ----------------- Lifecycle -----------------
+
+def init_clients():
+    for name, timeout in UPSTREAM_TIMEOUTS.items():
+        if name not in _clients:
+            _clients[name] = build_client(timeout)
+
+
+async def close_clients():
+    for client in _clients.values():
+        await client.aclose()
+    _clients.clear()
+
+
+def get_client(name: str) -> httpx.AsyncClient:
+    client = _clients.get(name)
+    if client is None:
+        # startup event ke bina (scripts / tests) bhi kaam kare
+        client = _clients[name] = build_client(UPSTREAM_TIMEOUTS[name])
+    return client
+
+
+def is_upstream_failure(exc: BaseException) -> bool:
+    # hamara budget khatam hua (upstream slow nahi tha) → breaker me failure nahi
+    if isinstance(exc, deadlines.DeadlineExceeded):
+        return False
+    if isinstance(exc, httpx.TimeoutException) and deadlines.expired():
+        return False
+    # 4xx = hamari request ki galti, upstream theek hai → breaker me failure nahi
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code >= 500
+    return True
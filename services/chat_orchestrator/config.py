@@ -0,0 +1,115 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# ----------------- Upstream Services -----------------
+
+NLU_SERVICE_URL = os.getenv("NLU_SERVICE_URL", "http://nlu_llm:8000/analyze")
+# "remote" (nlu_llm service) ya "embedded" (same engine in-process)
+NLU_BACKEND = os.getenv("NLU_BACKEND", "remote")
+RAG_SERVICE_URL = os.getenv("RAG_SERVICE_URL", "http://rag_service:8000/query")
+LLM_SERVICE_URL = os.getenv("LLM_SERVICE_URL", "http://llm_service:8000/generate")
+# token streaming (SSE) endpoint
+LLM_STREAM_URL = os.getenv("LLM_STREAM_URL", LLM_SERVICE_URL.rstrip("/") + "/stream")
+
+SERVICE_API_KEY = os.getenv("SERVICE_API_KEY", "supersecret-service-key")
+
+# ----------------- HTTP Client Pool -----------------
+
+# Ek hi AsyncClient per upstream, startup par bante hain aur shutdown par band.
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", 100))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", 20))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", 30))
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "false").lower() == "true"
+
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", 2))
+NLU_TIMEOUT = float(os.getenv("NLU_TIMEOUT", 10))
+RAG_TIMEOUT = float(os.getenv("RAG_TIMEOUT", 10))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", 20))
+
+# ----------------- Request Deadline -----------------
+
+# upar ke timeouts sirf cap hain — asli timeout gateway ke X-Deadline-Ms budget
+# me se jitna bacha ho. Itna budget na bacha ho to woh stage skip:
+# RAG skip → LLM bhi; LLM skip → rag_fallback_answer turant
+RAG_MIN_BUDGET_S = float(os.getenv("RAG_MIN_BUDGET_S", 0.2))
+LLM_MIN_BUDGET_S = float(os.getenv("LLM_MIN_BUDGET_S", 2))
+
+# ----------------- Tracing -----------------
+
+# set ho to spans JSON lines me (kai services ek hi file / volume share kar sakti hain)
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH", "")
+
+# ----------------- SQLite -----------------
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 4))
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
+
+# ----------------- Chat History Write-Behind -----------------
+
+# "ack_then_flush" (fast) ya "flush_before_ack" (durable before response)
+HISTORY_WRITE_MODE = os.getenv("HISTORY_WRITE_MODE", "ack_then_flush")
+HISTORY_QUEUE_SIZE = int(os.getenv("HISTORY_QUEUE_SIZE", 10000))
+HISTORY_BATCH_SIZE = int(os.getenv("HISTORY_BATCH_SIZE", 200))
+HISTORY_FLUSH_INTERVAL_MS = float(os.getenv("HISTORY_FLUSH_INTERVAL_MS", 50))
+# ack_then_flush me flush fail: itni retries (backoff), phir rows dead-letter file me
+HISTORY_FLUSH_RETRIES = int(os.getenv("HISTORY_FLUSH_RETRIES", 3))
+HISTORY_DEAD_LETTER_PATH = os.getenv("HISTORY_DEAD_LETTER_PATH", "")  # default: DB ke paas history_dead_letter.jsonl
+
+# ----------------- Chat History Reads -----------------
+
+# keyset pages: ?limit=&cursor= ; /stream poora session NDJSON me, itni rows per read
+HISTORY_PAGE_DEFAULT = int(os.getenv("HISTORY_PAGE_DEFAULT", 100))
+SESSIONS_PAGE_DEFAULT = int(os.getenv("SESSIONS_PAGE_DEFAULT", 50))
+PAGE_MAX = int(os.getenv("PAGE_MAX", 1000))
+HISTORY_STREAM_CHUNK = int(os.getenv("HISTORY_STREAM_CHUNK", 500))
+
+# ----------------- Chat History Retention -----------------
+
+# itne din se purane turns live DB se compressed archive segments me (0 = band);
+# history reads archive bhi padhte hain, isliye API par fark nahi
+HISTORY_RETENTION_DAYS = float(os.getenv("HISTORY_RETENTION_DAYS", 0))
+HISTORY_ARCHIVE_DIR = os.getenv("HISTORY_ARCHIVE_DIR", "")  # default: DB ke paas history_archive/
+HISTORY_COMPACTION_INTERVAL_S = float(os.getenv("HISTORY_COMPACTION_INTERVAL_S", 3600))
+HISTORY_ARCHIVE_BATCH = int(os.getenv("HISTORY_ARCHIVE_BATCH", 50000))
+# compaction ke baad free pages / total itne se zyada → VACUUM
+HISTORY_VACUUM_FREE_RATIO = float(os.getenv("HISTORY_VACUUM_FREE_RATIO", 0.25))
+
+# ----------------- Answer Cache -----------------
+
+# L1: in-process LRU; L2 (optional): shared SQLite file (ANSWER_CACHE_DB set ho to)
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", 10000))
+ANSWER_CACHE_TTL_RAG = float(os.getenv("ANSWER_CACHE_TTL_RAG", 3600))
+ANSWER_CACHE_TTL_LLM = float(os.getenv("ANSWER_CACHE_TTL_LLM", 600))
+ANSWER_CACHE_DB = os.getenv("ANSWER_CACHE_DB", "")
+KNOWLEDGE_VERSION_CHECK_INTERVAL = float(os.getenv("KNOWLEDGE_VERSION_CHECK_INTERVAL", 5))
+
+# ----------------- Single-Flight -----------------
+
+# same NLU / RAG request in-flight ho to ek hi upstream call share hoti hai
+SINGLE_FLIGHT_ENABLED = os.getenv("SINGLE_FLIGHT_ENABLED", "true").lower() == "true"
+
+# ----------------- Speculative LLM -----------------
+
+# RAG slow ho (hedge delay se zyada) to LLM saath me shuru; RAG hit par LLM cancel.
+# Zyada Groq calls (cost) ke badle RAG miss par kam p99 latency.
+SPECULATIVE_LLM_ENABLED = os.getenv("SPECULATIVE_LLM_ENABLED", "false").lower() == "true"
+SPECULATIVE_HEDGE_MS = float(os.getenv("SPECULATIVE_HEDGE_MS", 50))
+
+# ----------------- Resilience -----------------
+
+# har upstream (nlu / rag / llm) ka apna breaker + adaptive concurrency limit
+BREAKER_WINDOW_S = float(os.getenv("BREAKER_WINDOW_S", 30))
+BREAKER_MIN_REQUESTS = int(os.getenv("BREAKER_MIN_REQUESTS", 10))
+BREAKER_ERROR_RATE = float(os.getenv("BREAKER_ERROR_RATE", 0.5))
+BREAKER_COOLDOWN_S = float(os.getenv("BREAKER_COOLDOWN_S", 15))
+BREAKER_HALF_OPEN_PROBES = int(os.getenv("BREAKER_HALF_OPEN_PROBES", 3))
+LIMIT_INITIAL = int(os.getenv("LIMIT_INITIAL", 50))
+LIMIT_MIN = int(os.getenv("LIMIT_MIN", 4))
+LIMIT_MAX = int(os.getenv("LIMIT_MAX", 500))
+LIMIT_MAX_WAIT_S = float(os.getenv("LIMIT_MAX_WAIT_S", 2))
+# set ho to saare uvicorn workers breaker state is SQLite file se share karte hain
+RESILIENCE_STATE_DB = os.getenv("RESILIENCE_STATE_DB", "")
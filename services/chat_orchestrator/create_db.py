@@ -1,11 +1,11 @@
+import os
 import sqlite3
+import sys
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent
-DATA_DIR = BASE_DIR / "data"
-DATA_DIR.mkdir(exist_ok=True)
-
-DB_PATH = DATA_DIR / "agri_knowledge.db"
+DB_PATH = Path(os.getenv("AGRI_DB_PATH", BASE_DIR / "data" / "agri_knowledge.db"))
+DB_PATH.parent.mkdir(parents=True, exist_ok=True)
 
 print("\n📌 Creating / refreshing SQLite DB at:", DB_PATH, "\n")
 
@@ -21,8 +21,6 @@ CREATE TABLE IF NOT EXISTS fertilizer (
 """)
 
 
-cur.execute("DELETE FROM fertilizer")
-
 fert_rows = [
     (
         "gehu",
@@ -41,10 +39,19 @@ fert_rows = [
     )
 ]
 
-cur.executemany(
-    "INSERT INTO fertilizer (crop_name, recommendation) VALUES (?, ?)",
-    fert_rows
-)
+# Seed rows upsert hote hain (DELETE nahi) — ingest.py se aaya data bacha rehta hai
+changes_before = conn.total_changes
+
+for crop_name, recommendation in fert_rows:
+    cur.execute(
+        "UPDATE fertilizer SET recommendation = ? WHERE crop_name = ? AND recommendation != ?",
+        (recommendation, crop_name, recommendation)
+    )
+    cur.execute(
+        "INSERT INTO fertilizer (crop_name, recommendation) "
+        "SELECT ?, ? WHERE NOT EXISTS (SELECT 1 FROM fertilizer WHERE crop_name = ?)",
+        (crop_name, recommendation, crop_name)
+    )
 
 cur.execute("""
 CREATE TABLE IF NOT EXISTS disease (
@@ -56,8 +63,6 @@ CREATE TABLE IF NOT EXISTS disease (
 )
 """)
 
-cur.execute("DELETE FROM disease")
-
 disease_rows = [
     (
         "gehu",
@@ -98,21 +103,21 @@ disease_rows = [
     )
 ]
 
-cur.executemany(
-    "INSERT INTO disease (crop_name, symptom_keywords, disease_name, recommendation) "
-    "VALUES (?, ?, ?, ?)",
-    disease_rows
-)
+for crop_name, keywords, disease_name, recommendation in disease_rows:
+    cur.execute(
+        "UPDATE disease SET symptom_keywords = ?, recommendation = ? "
+        "WHERE crop_name = ? AND disease_name = ? "
+        "AND (symptom_keywords != ? OR recommendation != ?)",
+        (keywords, recommendation, crop_name, disease_name, keywords, recommendation)
+    )
+    cur.execute(
+        "INSERT INTO disease (crop_name, symptom_keywords, disease_name, recommendation) "
+        "SELECT ?, ?, ?, ? WHERE NOT EXISTS "
+        "(SELECT 1 FROM disease WHERE crop_name = ? AND disease_name = ?)",
+        (crop_name, keywords, disease_name, recommendation, crop_name, disease_name)
+    )
 
-cur.execute("""
-CREATE TABLE IF NOT EXISTS chat_history (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    session_id TEXT,
-    role TEXT,
-    message TEXT,
-    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-);
-""")
+# chat_history yahan nahi: orchestrator apni alag history DB (HISTORY_DB_PATH) me likhta hai
 
 cur.execute("""
 CREATE TABLE IF NOT EXISTS crop_calendar (
@@ -122,7 +127,6 @@ CREATE TABLE IF NOT EXISTS crop_calendar (
 )
 """)
 
-cur.execute("DELETE FROM crop_calendar")
 crop_calendar_rows = [
     ("gehu", "October–November", "March–April"),
     ("dhaan", "June–July", "October–November"),
@@ -130,14 +134,45 @@ crop_calendar_rows = [
 ]
 
 cur.executemany(
-    "INSERT INTO crop_calendar (crop_name, sowing_month, harvesting_month) VALUES (?, ?, ?)",
+    "INSERT INTO crop_calendar (crop_name, sowing_month, harvesting_month) VALUES (?, ?, ?) "
+    "ON CONFLICT(crop_name) DO UPDATE SET "
+    "sowing_month = excluded.sowing_month, harvesting_month = excluded.harvesting_month "
+    "WHERE sowing_month != excluded.sowing_month OR harvesting_month != excluded.harvesting_month",
     crop_calendar_rows
 )
 
+knowledge_changed = conn.total_changes > changes_before
+
+# RAG service isi version se snapshot reload detect karta hai
+cur.execute("""
+CREATE TABLE IF NOT EXISTS knowledge_version (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    version INTEGER NOT NULL
+)
+""")
 
+# version sirf tab badhe jab seed data sach me badla (warna bekaar snapshot reload)
+if knowledge_changed:
+    cur.execute("""
+    INSERT INTO knowledge_version (id, version) VALUES (1, 1)
+    ON CONFLICT(id) DO UPDATE SET version = version + 1
+    """)
+else:
+    cur.execute("INSERT OR IGNORE INTO knowledge_version (id, version) VALUES (1, 1)")
 
 conn.commit()
+
+# FTS index yahin (RAG service DB read-only kholta hai, khud nahi banata)
+sys.path.insert(0, str(BASE_DIR.parent / "rag_services"))
+try:
+    import fts
+except ImportError:
+    print("⚠️ rag_services/fts.py nahi mila — FTS ke liye: python rag_services/fts.py --db", DB_PATH)
+else:
+    fts.ensure_fts(conn)
+
 conn.close()
 
-print("✅ DB Ready: Fertilizer + Disease + Crop Calendar data inserted successfully!\n")
+print("✅ DB Ready: Fertilizer + Disease + Crop Calendar data seeded (upsert) successfully!")
+print("   RAG ke liye publish: python rag_services/publish_knowledge.py --db", DB_PATH, "--out <KNOWLEDGE_SNAPSHOT_DIR>\n")
 
@@ -0,0 +1,269 @@
+import asyncio
+import gzip
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from itertools import groupby
+from pathlib import Path
+from typing import Callable
+
+from fastapi.concurrency import run_in_threadpool
+
+from db import SQLitePool
+
+# ----------------- Chat History Archive -----------------
+#
+# Purane turns live DB se nikal kar append-only, compressed segments me:
+#   - segment = <first_id>-<last_id>-<rand>.jsonl.gz; rows (session_id, id) order me,
+#     har session ek alag gzip member (gzip members jod kar bhi valid gzip hai,
+#     `zcat` poora segment padh leta hai)
+#   - <segment>.idx.json: session → [offset, length, count]; ek session ke
+#     liye sirf uska member padha aur decompress hota hai
+#   - archived_sessions (live DB me): session kis segment me hai — history
+#     read isi se segments chunta hai, directory scan nahi
+#
+# Hamesha sabse purani ids ka prefix archive hota hai (id <= last archived),
+# isliye ek session ke archived turns uske live turns se pehle aate hain aur
+# keyset cursor (id) dono par ek jaisa chalta hai.
+
+ARCHIVE_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS archived_sessions (
+        session_id TEXT NOT NULL,
+        segment TEXT NOT NULL,
+        last_id INTEGER NOT NULL,
+        PRIMARY KEY (session_id, segment)
+    )
+    """,
+]
+
+SELECT_OLDEST_SQL = """
+    SELECT id, session_id, role, message, timestamp
+    FROM chat_history
+    ORDER BY id ASC
+    LIMIT ?
+"""
+
+SELECT_SEGMENTS_SQL = """
+    SELECT segment
+    FROM archived_sessions
+    WHERE session_id = ? AND last_id > ?
+    ORDER BY segment ASC
+"""
+
+INSERT_ROUTE_SQL = "INSERT OR REPLACE INTO archived_sessions (session_id, segment, last_id) VALUES (?, ?, ?)"
+
+
+def init_schema(conn: sqlite3.Connection):
+    for statement in ARCHIVE_SCHEMA:
+        conn.execute(statement)
+
+
+class HistoryArchive:
+    """Segment files ka directory; reads thread-safe (files immutable hain)."""
+
+    def __init__(self, directory: Path | str, cache_size: int = 256):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.cache_size = cache_size
+        self._indexes: OrderedDict[str, dict] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _index(self, segment: str) -> dict:
+        with self._lock:
+            index = self._indexes.get(segment)
+            if index is not None:
+                self._indexes.move_to_end(segment)
+                return index
+        index = json.loads((self.directory / f"{segment}.idx.json").read_text())
+        with self._lock:
+            self._indexes[segment] = index
+            if len(self._indexes) > self.cache_size:
+                self._indexes.popitem(last=False)
+        return index
+
+    def write_segment(self, rows: list[tuple]) -> tuple[str, list[tuple]]:
+        """
+        rows = (id, session_id, role, message, timestamp), id order me.
+        File + index fsync ke baad rename (adha segment kabhi dikhta nahi).
+        Returns (segment, routes) — routes archived_sessions me jaate hain.
+        """
+        # random suffix: do workers ek hi range likhein to ek doosre ki file na mitayein
+        segment = f"{rows[0][0]:012d}-{rows[-1][0]:012d}-{os.urandom(3).hex()}"
+        path = self.directory / f"{segment}.jsonl.gz"
+        sessions = {}
+        routes = []
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            for session_id, turns in groupby(sorted(rows, key=lambda r: (r[1], r[0])), key=lambda r: r[1]):
+                turns = list(turns)
+                data = "".join(
+                    json.dumps([i, role, message, ts], ensure_ascii=False) + "\n"
+                    for i, _, role, message, ts in turns
+                ).encode("utf-8")
+                member = gzip.compress(data, mtime=0)
+                sessions[session_id] = [f.tell(), len(member), len(turns)]
+                routes.append((session_id, segment, turns[-1][0]))
+                f.write(member)
+            f.flush()
+            os.fsync(f.fileno())
+
+        index = {"first_id": rows[0][0], "last_id": rows[-1][0], "rows": len(rows), "sessions": sessions}
+        idx_tmp = self.directory / f"{segment}.idx.tmp"
+        with open(idx_tmp, "w", encoding="utf-8") as f:
+            json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(idx_tmp, self.directory / f"{segment}.idx.json")
+        os.replace(tmp, path)
+        return segment, routes
+
+    def remove_segment(self, segment: str):
+        for name in (f"{segment}.jsonl.gz", f"{segment}.idx.json"):
+            try:
+                (self.directory / name).unlink()
+            except FileNotFoundError:
+                pass
+        with self._lock:
+            self._indexes.pop(segment, None)
+
+    def read_session(self, segment: str, session_id: str) -> list[tuple]:
+        entry = self._index(segment)["sessions"].get(session_id)
+        if entry is None:
+            return []
+        offset, length, _ = entry
+        with open(self.directory / f"{segment}.jsonl.gz", "rb") as f:
+            f.seek(offset)
+            data = gzip.decompress(f.read(length))
+        return [tuple(json.loads(line)) for line in data.decode("utf-8").splitlines()]
+
+    def session_rows(self, conn: sqlite3.Connection, session_id: str, after: int = 0) -> list[tuple]:
+        """Session ke archived turns (id, role, message, timestamp), id > after."""
+        rows = []
+        for (segment,) in conn.execute(SELECT_SEGMENTS_SQL, (session_id, after)).fetchall():
+            rows.extend(r for r in self.read_session(segment, session_id) if r[0] > after)
+        return rows
+
+# ----------------- Compaction -----------------
+
+
+def archive_batch(pool: SQLitePool, archive: HistoryArchive, cutoff: str, batch_size: int) -> int:
+    """
+    Sabse purane `batch_size` rows me se jo cutoff se purane hain (prefix) →
+    ek segment; phir ek transaction me routes insert + live rows delete.
+    Returns kitne rows archive hue.
+    """
+    with pool.connection() as conn:
+        oldest = conn.execute(SELECT_OLDEST_SQL, (batch_size,)).fetchall()
+
+    rows = []
+    for row in oldest:
+        if row[4] >= cutoff:
+            break
+        rows.append(row)
+    if not rows:
+        return 0
+
+    segment, routes = archive.write_segment(rows)
+    try:
+        with pool.transaction() as conn:
+            # doosra worker pehle archive kar chuka ho to yeh segment bekaar
+            conn.execute("BEGIN IMMEDIATE")
+            first = conn.execute("SELECT MIN(id) FROM chat_history").fetchone()[0]
+            if first != rows[0][0]:
+                conn.rollback()
+                archive.remove_segment(segment)
+                return 0
+            conn.executemany(INSERT_ROUTE_SQL, routes)
+            conn.execute("DELETE FROM chat_history WHERE id <= ?", (rows[-1][0],))
+    except Exception:
+        archive.remove_segment(segment)
+        raise
+    return len(rows)
+
+
+def checkpoint(pool: SQLitePool, vacuum_free_ratio: float) -> bool:
+    """WAL truncate; free pages zyada hon to VACUUM (file chhoti, backups tez). Returns vacuumed?"""
+    with pool.connection() as conn:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        pages = conn.execute("PRAGMA page_count").fetchone()[0]
+        free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        if not pages or free / pages < vacuum_free_ratio:
+            return False
+        conn.execute("VACUUM")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    return True
+
+
+class HistoryCompactor:
+    """
+    Background task: har `interval` sec par retention se purane turns archive
+    me, phir checkpoint / VACUUM. Kaam threadpool me (event loop block nahi).
+    """
+
+    def __init__(
+        self,
+        pool: SQLitePool,
+        archive: HistoryArchive,
+        retention_s: float,
+        interval: float = 3600,
+        batch_size: int = 50000,
+        vacuum_free_ratio: float = 0.25,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.pool = pool
+        self.archive = archive
+        self.retention_s = retention_s
+        self.interval = interval
+        self.batch_size = batch_size
+        self.vacuum_free_ratio = vacuum_free_ratio
+        self.clock = clock
+        self._task: asyncio.Task | None = None
+        self.stats = {"runs": 0, "archived": 0, "segments": 0, "vacuums": 0, "failed": 0}
+
+    def cutoff(self) -> str:
+        # chat_history.timestamp = datetime.now().isoformat() (local time)
+        return time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.clock() - self.retention_s))
+
+    def compact_once(self) -> int:
+        cutoff = self.cutoff()
+        total = 0
+        while True:
+            n = archive_batch(self.pool, self.archive, cutoff, self.batch_size)
+            if n:
+                total += n
+                self.stats["segments"] += 1
+            if n < self.batch_size:
+                break
+        if checkpoint(self.pool, self.vacuum_free_ratio):
+            self.stats["vacuums"] += 1
+        self.stats["runs"] += 1
+        self.stats["archived"] += total
+        return total
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                archived = await run_in_threadpool(self.compact_once)
+                if archived:
+                    print(f"🗄️ Chat history: {archived} purane turns archive hue")
+            except Exception as e:
+                self.stats["failed"] += 1
+                print("⚠️ Chat history compaction failed:", e)
+            await asyncio.sleep(self.interval)
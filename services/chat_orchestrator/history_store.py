@@ -0,0 +1,189 @@
+import base64
+import json
+import sqlite3
+from pathlib import Path
+
+# ----------------- Chat History Store -----------------
+#
+# chat_history lakhon rows tak badhta hai, isliye koi read poori table nahi
+# padhta:
+#   - sessions: har session ki ek summary row (start / last time, count),
+#     chat_history ke insert ke saath usi transaction me upsert hoti hai —
+#     session list ab GROUP BY nahi, sessions par index scan hai
+#   - idx_chat_history_session_id (session_id, id): ek session ke turns
+#     index order me, id > cursor se seedha agla page
+#   - keyset pagination: cursor = pichhle page ki aakhri key (opaque base64);
+#     OFFSET nahi, isliye page 1000 bhi page 1 jitna sasta
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS chat_history (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        session_id TEXT NOT NULL,
+        role TEXT NOT NULL,
+        message TEXT NOT NULL,
+        timestamp TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_chat_history_session_id ON chat_history (session_id, id)",
+    """
+    CREATE TABLE IF NOT EXISTS sessions (
+        session_id TEXT PRIMARY KEY,
+        start_time TEXT NOT NULL,
+        last_time TEXT NOT NULL,
+        message_count INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_sessions_start_time ON sessions (start_time, session_id)",
+]
+
+# purani DB (sessions table se pehle ki) → ek baar chat_history se bharo
+BACKFILL_SESSIONS_SQL = """
+    INSERT OR IGNORE INTO sessions (session_id, start_time, last_time, message_count)
+    SELECT session_id, MIN(timestamp), MAX(timestamp), COUNT(*)
+    FROM chat_history
+    GROUP BY session_id
+"""
+
+INSERT_CHAT_SQL = """
+    INSERT INTO chat_history (session_id, role, message, timestamp)
+    VALUES (?, ?, ?, ?)
+"""
+
+UPSERT_SESSION_SQL = """
+    INSERT INTO sessions (session_id, start_time, last_time, message_count)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT(session_id) DO UPDATE SET
+        last_time = MAX(last_time, excluded.last_time),
+        message_count = message_count + excluded.message_count
+"""
+
+SELECT_SESSIONS_SQL = """
+    SELECT session_id, start_time, last_time, message_count
+    FROM sessions
+    ORDER BY start_time DESC, session_id DESC
+    LIMIT ?
+"""
+
+SELECT_SESSIONS_AFTER_SQL = """
+    SELECT session_id, start_time, last_time, message_count
+    FROM sessions
+    WHERE (start_time, session_id) < (?, ?)
+    ORDER BY start_time DESC, session_id DESC
+    LIMIT ?
+"""
+
+SELECT_HISTORY_SQL = """
+    SELECT id, role, message, timestamp
+    FROM chat_history
+    WHERE session_id = ? AND id > ?
+    ORDER BY id ASC
+    LIMIT ?
+"""
+
+SELECT_SESSION_SQL = "SELECT 1 FROM sessions WHERE session_id = ?"
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(*key) -> str:
+    return base64.urlsafe_b64encode(json.dumps(key, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor("invalid cursor") from e
+    if not isinstance(key, list) or len(key) != size:
+        raise InvalidCursor("invalid cursor")
+    return key
+
+
+def init_schema(conn: sqlite3.Connection):
+    for statement in SCHEMA:
+        conn.execute(statement)
+    if conn.execute("SELECT 1 FROM sessions LIMIT 1").fetchone() is None:
+        conn.execute(BACKFILL_SESSIONS_SQL)
+
+
+def import_legacy(conn: sqlite3.Connection, legacy_path: Path | str) -> int:
+    """
+    Pehle chat_history knowledge DB me hi thi. Naya history store khaali ho to
+    wahan ke turns (same ids) ek baar copy; returns kitne rows aaye.
+    """
+    if not Path(legacy_path).exists() or conn.execute("SELECT 1 FROM chat_history LIMIT 1").fetchone():
+        return 0
+    conn.execute("ATTACH DATABASE ? AS legacy", (str(legacy_path),))
+    try:
+        found = conn.execute(
+            "SELECT 1 FROM legacy.sqlite_master WHERE type = 'table' AND name = 'chat_history'"
+        ).fetchone()
+        if not found:
+            return 0
+        moved = conn.execute(
+            "INSERT INTO chat_history (id, session_id, role, message, timestamp) "
+            "SELECT id, session_id, role, message, COALESCE(timestamp, '') FROM legacy.chat_history "
+            "WHERE session_id IS NOT NULL AND role IS NOT NULL AND message IS NOT NULL"
+        ).rowcount
+        conn.execute(BACKFILL_SESSIONS_SQL)
+        conn.commit()
+        return moved
+    finally:
+        if conn.in_transaction:
+            conn.rollback()
+        conn.execute("DETACH DATABASE legacy")
+
+
+def insert_rows(conn: sqlite3.Connection, rows: list[tuple]):
+    """(session_id, role, message, timestamp) rows + sessions summary, caller ke transaction me."""
+    conn.executemany(INSERT_CHAT_SQL, rows)
+    summary: dict[str, list] = {}
+    for session_id, _, _, timestamp in rows:
+        s = summary.get(session_id)
+        if s is None:
+            summary[session_id] = [session_id, timestamp, timestamp, 1]
+        else:
+            s[1] = min(s[1], timestamp)
+            s[2] = max(s[2], timestamp)
+            s[3] += 1
+    conn.executemany(UPSERT_SESSION_SQL, summary.values())
+
+
+def session_exists(conn: sqlite3.Connection, session_id: str) -> bool:
+    return conn.execute(SELECT_SESSION_SQL, (session_id,)).fetchone() is not None
+
+
+def sessions_page(conn: sqlite3.Connection, limit: int, cursor: str | None = None) -> tuple[list[tuple], str | None]:
+    """Naye session pehle; (rows, next_cursor) — aakhri page par next_cursor None."""
+    if cursor:
+        start_time, session_id = decode_cursor(cursor, 2)
+        rows = conn.execute(SELECT_SESSIONS_AFTER_SQL, (start_time, session_id, limit + 1)).fetchall()
+    else:
+        rows = conn.execute(SELECT_SESSIONS_SQL, (limit + 1,)).fetchall()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1][1], rows[-1][0])
+
+
+def history_page(
+    conn: sqlite3.Connection, session_id: str, limit: int, cursor: str | None = None, archive=None
+) -> tuple[list[tuple], str | None]:
+    """
+    Session ke turns purane se naye; rows = (id, role, message, timestamp).
+    archive (HistoryArchive) ho to pehle archived turns, phir live — caller
+    ko fark nahi dikhta.
+    """
+    after = decode_cursor(cursor, 1)[0] if cursor else 0
+    if not isinstance(after, int):
+        raise InvalidCursor("invalid cursor")
+    rows = archive.session_rows(conn, session_id, after)[:limit + 1] if archive is not None else []
+    if len(rows) <= limit:
+        rows += conn.execute(SELECT_HISTORY_SQL, (session_id, after, limit + 1 - len(rows))).fetchall()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1][0])
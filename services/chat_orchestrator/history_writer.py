@@ -0,0 +1,232 @@
+import asyncio
+import json
+import os
+import time
+from pathlib import Path
+from typing import Callable
+
+from fastapi.concurrency import run_in_threadpool
+
+# ----------------- Write Modes -----------------
+
+# ack_then_flush   → response turant, rows background me batch flush hoti hain
+#                    (crash par last flush_interval ke turns kho sakte hain).
+#                    Flush fail → backoff ke saath retry; phir bhi fail to
+#                    rows dead-letter file (JSON lines) me, agle start par replay
+# flush_before_ack → response tab tak ruka rahta hai jab tak rows wala batch
+#                    commit na ho jaye (batching phir bhi milti hai)
+ACK_THEN_FLUSH = "ack_then_flush"
+FLUSH_BEFORE_ACK = "flush_before_ack"
+WRITE_MODES = (ACK_THEN_FLUSH, FLUSH_BEFORE_ACK)
+
+# ----------------- Write-Behind Queue -----------------
+
+# _get(): timeout tak kuch nahi mila (None = stop marker se alag)
+_EMPTY = object()
+
+
+class HistoryWriter:
+    """
+    Chat turns ko memory queue me daalta hai aur ek background task unhe
+    batch_size ya flush_interval (jo pehle ho) par ek transaction me likhta hai.
+    Queue full ho to enqueue() wait karta hai (backpressure).
+    Acknowledged rows (ack_then_flush) flush fail hone par gira nahi dete:
+    max_retries tak retry, phir dead_letter file.
+    """
+
+    def __init__(
+        self,
+        flush_rows: Callable[[list[tuple]], None],
+        max_queue: int = 10000,
+        batch_size: int = 200,
+        flush_interval: float = 0.05,
+        mode: str = ACK_THEN_FLUSH,
+        max_retries: int = 3,
+        retry_base: float = 0.1,
+        dead_letter: Path | str | None = None,
+    ):
+        if mode not in WRITE_MODES:
+            raise ValueError(f"Unknown history write mode: {mode}")
+
+        self.flush_rows = flush_rows
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.mode = mode
+        self.max_retries = max_retries
+        self.retry_base = retry_base
+        self.dead_letter = Path(dead_letter) if dead_letter else None
+
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+
+        self.stats = {"enqueued": 0, "flushed": 0, "batches": 0, "failed": 0, "retried": 0, "dead_lettered": 0}
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def qsize(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    async def start(self):
+        if self.running:
+            return
+        await self._replay_dead_letter()
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Bache hue saare rows flush karke worker band karo."""
+        if not self.running:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+    async def enqueue(self, rows: list[tuple]):
+        if not rows:
+            return
+
+        if not self.running:
+            # writer start nahi hua (scripts / tests) → seedha likho
+            await run_in_threadpool(self.flush_rows, rows)
+            self.stats["enqueued"] += len(rows)
+            self.stats["flushed"] += len(rows)
+            return
+
+        done = None
+        if self.mode == FLUSH_BEFORE_ACK:
+            done = asyncio.get_running_loop().create_future()
+
+        await self._queue.put((rows, done))
+        self.stats["enqueued"] += len(rows)
+
+        if done is not None:
+            await done
+
+    # ----------------- Worker -----------------
+
+    async def _get(self, timeout: float):
+        # wait_for(queue.get()) timeout ke waqt mila hua item gira sakta hai
+        # (Python 3.10); alag task + cancel ke baad bhi result check
+        getter = asyncio.ensure_future(self._queue.get())
+        await asyncio.wait({getter}, timeout=timeout)
+        if not getter.done():
+            getter.cancel()
+            await asyncio.wait({getter})
+        return _EMPTY if getter.cancelled() else getter.result()
+
+    async def _next_batch(self) -> tuple[list, bool]:
+        """
+        Pehla item aane tak ruko, phir flush_interval ke andar jitne items
+        batch_size tak aa sakein le lo. Returns (items, stop_requested).
+        """
+        first = await self._queue.get()
+        if first is None:
+            return [], True
+
+        items = [first]
+        count = len(first[0])
+        deadline = time.monotonic() + self.flush_interval
+
+        while count < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            item = await self._get(timeout)
+            if item is _EMPTY:
+                break
+            if item is None:
+                return items, True
+            items.append(item)
+            count += len(item[0])
+
+        return items, False
+
+    async def _flush(self, items: list):
+        rows = [row for batch, _ in items for row in batch]
+        # flush_before_ack: caller wait kar raha hai, error seedha use; ack ho chuke rows retry
+        retries = self.max_retries if self.mode == ACK_THEN_FLUSH else 0
+        for attempt in range(retries + 1):
+            try:
+                await run_in_threadpool(self.flush_rows, rows)
+                break
+            except Exception as e:
+                if attempt < retries:
+                    self.stats["retried"] += 1
+                    await asyncio.sleep(self.retry_base * 2 ** attempt)
+                    continue
+                self.stats["failed"] += len(rows)
+                print("⚠️ Chat history batch flush failed:", e)
+                for _, done in items:
+                    if done is not None and not done.done():
+                        done.set_exception(e)
+                if self.mode == ACK_THEN_FLUSH:
+                    await self._write_dead_letter(rows)
+                return
+
+        self.stats["flushed"] += len(rows)
+        self.stats["batches"] += 1
+        for _, done in items:
+            if done is not None and not done.done():
+                done.set_result(None)
+
+    # ----------------- Dead Letter -----------------
+
+    def _append_dead_letter(self, rows: list[tuple]):
+        self.dead_letter.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.dead_letter, "a", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    async def _write_dead_letter(self, rows: list[tuple]):
+        if self.dead_letter is None:
+            print(f"❌ Chat history: {len(rows)} acknowledged rows lost (dead-letter path set nahi)")
+            return
+        try:
+            await run_in_threadpool(self._append_dead_letter, rows)
+        except Exception as e:
+            print(f"❌ Chat history: {len(rows)} rows lost, dead-letter write failed:", e)
+            return
+        self.stats["dead_lettered"] += len(rows)
+        print(f"📥 Chat history: {len(rows)} rows dead-lettered to {self.dead_letter}")
+
+    def _replay_dead_letter_sync(self) -> int:
+        if self.dead_letter is None or not self.dead_letter.exists():
+            return 0
+        with open(self.dead_letter, encoding="utf-8") as f:
+            rows = [tuple(json.loads(line)) for line in f if line.strip()]
+        if rows:
+            # ek transaction: ya sab likhe gaye ya file jaisi thi waisi
+            self.flush_rows(rows)
+        self.dead_letter.unlink()
+        return len(rows)
+
+    async def _replay_dead_letter(self):
+        try:
+            replayed = await run_in_threadpool(self._replay_dead_letter_sync)
+        except Exception as e:
+            print("⚠️ Chat history dead-letter replay failed (agli start par phir):", e)
+            return
+        if replayed:
+            self.stats["flushed"] += replayed
+            print(f"📤 Chat history: {replayed} dead-lettered rows replayed")
+
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            items, stopping = await self._next_batch()
+            if items:
+                await self._flush(items)
+
+        # shutdown: jo bacha hai sab drain karo
+        leftovers = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not None:
+                leftovers.append(item)
+        if leftovers:
+            await self._flush(leftovers)
@@ -1,20 +1,82 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 from datetime import datetime
 from pathlib import Path
+import asyncio
+import json
+import os
 import sqlite3
+import time
 import uuid
+from urllib.parse import quote
 import httpx
 from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-
-# ----------------- Service Configuration -----------------
-
-NLU_SERVICE_URL = "http://nlu_llm:8000/analyze"
-RAG_SERVICE_URL = "http://rag_service:8000/query"
-LLM_SERVICE_URL = "http://llm_service:8000/generate"
-
-SERVICE_API_KEY = "supersecret-service-key"
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
+
+from config import (
+    NLU_SERVICE_URL,
+    NLU_BACKEND,
+    RAG_SERVICE_URL,
+    LLM_SERVICE_URL,
+    LLM_STREAM_URL,
+    SERVICE_API_KEY,
+    DB_POOL_SIZE,
+    SQLITE_SYNCHRONOUS,
+    SQLITE_BUSY_TIMEOUT_MS,
+    HISTORY_WRITE_MODE,
+    HISTORY_QUEUE_SIZE,
+    HISTORY_BATCH_SIZE,
+    HISTORY_FLUSH_INTERVAL_MS,
+    HISTORY_FLUSH_RETRIES,
+    HISTORY_DEAD_LETTER_PATH,
+    HISTORY_PAGE_DEFAULT,
+    SESSIONS_PAGE_DEFAULT,
+    PAGE_MAX,
+    HISTORY_STREAM_CHUNK,
+    HISTORY_RETENTION_DAYS,
+    HISTORY_ARCHIVE_DIR,
+    HISTORY_COMPACTION_INTERVAL_S,
+    HISTORY_ARCHIVE_BATCH,
+    HISTORY_VACUUM_FREE_RATIO,
+    ANSWER_CACHE_ENABLED,
+    ANSWER_CACHE_MAX_ENTRIES,
+    ANSWER_CACHE_TTL_RAG,
+    ANSWER_CACHE_TTL_LLM,
+    ANSWER_CACHE_DB,
+    KNOWLEDGE_VERSION_CHECK_INTERVAL,
+    SINGLE_FLIGHT_ENABLED,
+    SPECULATIVE_LLM_ENABLED,
+    SPECULATIVE_HEDGE_MS,
+    RAG_MIN_BUDGET_S,
+    LLM_MIN_BUDGET_S,
+    BREAKER_WINDOW_S,
+    BREAKER_MIN_REQUESTS,
+    BREAKER_ERROR_RATE,
+    BREAKER_COOLDOWN_S,
+    BREAKER_HALF_OPEN_PROBES,
+    LIMIT_INITIAL,
+    LIMIT_MIN,
+    LIMIT_MAX,
+    LIMIT_MAX_WAIT_S,
+    RESILIENCE_STATE_DB,
+    TRACE_EXPORT_PATH,
+)
+import deadlines
+import history_archive
+import history_store
+import tracing
+from answer_cache import LLM, RAG, AnswerCache
+from clients import init_clients, close_clients, get_client, is_upstream_failure
+from db import SQLitePool
+from deadlines import DeadlineExceeded, DeadlineMiddleware, deadline_exceeded_handler
+from history_store import InvalidCursor
+from history_writer import HistoryWriter
+from nlu_backend import make_nlu_backend
+from resilience import AdaptiveLimiter, CircuitBreaker, SharedState, Upstream, UpstreamUnavailable
+from single_flight import SingleFlight
+from streaming import SSE_HEADERS, iter_sse, sse
 
 # ----------------- App Init -----------------
 
@@ -26,61 +88,191 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# gateway ka X-Deadline-Ms budget; header na ho (direct call) to koi deadline nahi
+app.add_middleware(DeadlineMiddleware)
+app.add_exception_handler(DeadlineExceeded, deadline_exceeded_handler)
+# sabse bahar: 504 / 503 wale requests bhi trace me
+tracing.configure("chat_orchestrator", TRACE_EXPORT_PATH)
+app.add_middleware(tracing.TracingMiddleware)
 
 # ----------------- Database Config -----------------
 
 BASE_DIR = Path(__file__).resolve().parent
-DB_PATH = BASE_DIR / "data" / "agri_knowledge.db"
+# chat history apni DB me — knowledge file (RAG wali) par ab koi write lock nahi
+DB_PATH = Path(os.getenv("HISTORY_DB_PATH", BASE_DIR / "data" / "chat_history.db"))
+# knowledge sirf version ke liye padhi jaati hai (answer cache invalidation):
+# published snapshot (CURRENT) ho to uska, warna working DB (create_db.py) ka
+KNOWLEDGE_DB_PATH = Path(os.getenv("AGRI_DB_PATH", BASE_DIR / "data" / "agri_knowledge.db"))
+KNOWLEDGE_SNAPSHOT_DIR = Path(os.getenv("KNOWLEDGE_SNAPSHOT_DIR", KNOWLEDGE_DB_PATH.parent / "knowledge"))
 
 # 🔥 IMPORTANT: auto-create folder
 DB_PATH.parent.mkdir(parents=True, exist_ok=True)
 
+db_pool = SQLitePool(
+    DB_PATH,
+    size=DB_POOL_SIZE,
+    busy_timeout_ms=SQLITE_BUSY_TIMEOUT_MS,
+    pragmas={"synchronous": SQLITE_SYNCHRONOUS},
+)
+
 # ----------------- DB Init -----------------
 
-def init_db():
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
-    cur = conn.cursor()
-
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS chat_history (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        session_id TEXT NOT NULL,
-        role TEXT NOT NULL,
-        message TEXT NOT NULL,
-        timestamp TEXT NOT NULL
+# archive hamesha padha jaata hai (retention baad me band ho to bhi purane segments)
+archive = history_archive.HistoryArchive(HISTORY_ARCHIVE_DIR or DB_PATH.parent / "history_archive")
+compactor = None
+if HISTORY_RETENTION_DAYS > 0:
+    compactor = history_archive.HistoryCompactor(
+        db_pool,
+        archive,
+        retention_s=HISTORY_RETENTION_DAYS * 86400,
+        interval=HISTORY_COMPACTION_INTERVAL_S,
+        batch_size=HISTORY_ARCHIVE_BATCH,
+        vacuum_free_ratio=HISTORY_VACUUM_FREE_RATIO,
     )
-    """)
 
-    conn.commit()
-    conn.close()
+
+def init_db():
+    with db_pool.transaction() as conn:
+        history_store.init_schema(conn)
+        history_archive.init_schema(conn)
+    # purani deployments: history knowledge DB me thi → naye store me ek baar copy
+    with db_pool.connection() as conn:
+        moved = history_store.import_legacy(conn, KNOWLEDGE_DB_PATH)
+    if moved:
+        print(f"📦 {moved} chat turns {KNOWLEDGE_DB_PATH} se history DB me copy hue")
 
 
 @app.on_event("startup")
 async def startup_event():
     init_db()
+    init_clients()
+    await history_writer.start()
+    if compactor is not None:
+        await compactor.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await close_clients()
+    if compactor is not None:
+        await compactor.stop()
+    # pending turns pehle disk par, phir pool band
+    await history_writer.stop()
+    db_pool.close()
+    if answer_cache and answer_cache.store is not None:
+        answer_cache.store.close()
+    if resilience_state is not None:
+        resilience_state.close()
+    tracing.shutdown()
 
 # ----------------- DB Helper -----------------
 
-def _save_to_chat_history_sync(session_id: str, role: str, message: str):
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
-    cur = conn.cursor()
-    cur.execute(
-        """
-        INSERT INTO chat_history (session_id, role, message, timestamp)
-        VALUES (?, ?, ?, ?)
-        """,
-        (session_id, role, message, datetime.now().isoformat())
-    )
-    conn.commit()
-    conn.close()
+def _insert_chat_rows_sync(rows: list[tuple]):
+    # saare rows ek hi transaction me (ek commit)
+    with db_pool.transaction() as conn:
+        history_store.insert_rows(conn, rows)
+
+
+def _chat_rows(session_id: str, turns: list[tuple[str, str]]) -> list[tuple]:
+    now = datetime.now().isoformat()
+    return [(session_id, role, message, now) for role, message in turns]
+
+
+history_writer = HistoryWriter(
+    _insert_chat_rows_sync,
+    max_queue=HISTORY_QUEUE_SIZE,
+    batch_size=HISTORY_BATCH_SIZE,
+    flush_interval=HISTORY_FLUSH_INTERVAL_MS / 1000,
+    mode=HISTORY_WRITE_MODE,
+    max_retries=HISTORY_FLUSH_RETRIES,
+    dead_letter=HISTORY_DEAD_LETTER_PATH or DB_PATH.parent / "history_dead_letter.jsonl",
+)
+
+
+async def save_chat_turns(session_id: str, turns: list[tuple[str, str]]):
+    with tracing.span("history_write", mode=HISTORY_WRITE_MODE):
+        await history_writer.enqueue(_chat_rows(session_id, turns))
+
 
+def _sessions_page_sync(limit: int, cursor: str | None):
+    with db_pool.connection() as conn:
+        return history_store.sessions_page(conn, limit, cursor)
 
-async def save_to_chat_history(session_id: str, role: str, message: str):
-    await run_in_threadpool(
-        _save_to_chat_history_sync,
-        session_id,
-        role,
-        message
+
+def _all_sessions_sync() -> list[tuple]:
+    # purana (bina pagination) shape: sessions summary par PAGE_MAX ke pages
+    rows, cursor = [], None
+    with db_pool.connection() as conn:
+        while True:
+            page, cursor = history_store.sessions_page(conn, PAGE_MAX, cursor)
+            rows += page
+            if cursor is None:
+                return rows
+
+
+def _history_page_sync(session_id: str, limit: int, cursor: str | None):
+    with db_pool.connection() as conn:
+        rows, next_cursor = history_store.history_page(conn, session_id, limit, cursor, archive=archive)
+        # khaali pehla page → session hai bhi? (404 vs khaali page)
+        exists = bool(rows) or cursor is not None or history_store.session_exists(conn, session_id)
+    return rows, next_cursor, exists
+
+
+def _all_history_sync(session_id: str) -> list[tuple]:
+    # purana (bina pagination) shape: poori history, PAGE_MAX ke pages me padh kar
+    rows, cursor = [], None
+    with db_pool.connection() as conn:
+        while True:
+            page, cursor = history_store.history_page(conn, session_id, PAGE_MAX, cursor, archive=archive)
+            rows += page
+            if cursor is None:
+                return rows
+
+
+_snapshot_version: tuple[str, int] | None = None
+
+
+def _read_knowledge_version(uri: str) -> int:
+    try:
+        conn = sqlite3.connect(uri, uri=True)
+    except sqlite3.OperationalError:
+        return 0
+    try:
+        row = conn.execute("SELECT version FROM knowledge_version WHERE id = 1").fetchone()
+    except sqlite3.OperationalError:
+        return 0
+    finally:
+        conn.close()
+    return row[0] if row else 0
+
+
+def _knowledge_version_sync() -> int:
+    # RAG jis snapshot se jawab deta hai usi ka version (publish_knowledge.py ka CURRENT)
+    global _snapshot_version
+    try:
+        name = (KNOWLEDGE_SNAPSHOT_DIR / "CURRENT").read_text().strip()
+    except FileNotFoundError:
+        name = ""
+    if name:
+        if _snapshot_version is None or _snapshot_version[0] != name:
+            path = KNOWLEDGE_SNAPSHOT_DIR / name
+            _snapshot_version = (name, _read_knowledge_version(f"file:{quote(str(path))}?mode=ro&immutable=1"))
+        return _snapshot_version[1]
+    if not KNOWLEDGE_DB_PATH.exists():
+        return 0
+    return _read_knowledge_version(f"file:{quote(str(KNOWLEDGE_DB_PATH))}?mode=ro")
+
+# ----------------- Answer Cache -----------------
+
+answer_cache = None
+if ANSWER_CACHE_ENABLED:
+    answer_cache = AnswerCache(
+        max_entries=ANSWER_CACHE_MAX_ENTRIES,
+        ttl_rag=ANSWER_CACHE_TTL_RAG,
+        ttl_llm=ANSWER_CACHE_TTL_LLM,
+        store=SQLitePool(ANSWER_CACHE_DB, size=2) if ANSWER_CACHE_DB else None,
+        version_fn=_knowledge_version_sync,
+        version_check_interval=KNOWLEDGE_VERSION_CHECK_INTERVAL,
     )
 
 # ----------------- Pydantic Models -----------------
@@ -102,23 +294,101 @@ class ChatResponse(BaseModel):
 async def health():
     return {"status": "ok", "service": "chat_orchestrator"}
 
+
+@app.get("/metrics")
+def metrics():
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+@app.exception_handler(UpstreamUnavailable)
+async def upstream_unavailable_handler(request, exc: UpstreamUnavailable):
+    # breaker open / limit full → turant 503, timeout tak latakna nahi
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(max(1, round(exc.retry_after)))},
+    )
+
+
+@app.exception_handler(httpx.TimeoutException)
+async def upstream_timeout_handler(request, exc: httpx.TimeoutException):
+    # budget khatam ya upstream cap tak jawab nahi → 504 (500 nahi)
+    reason = "deadline exceeded" if deadlines.expired() else "upstream timeout"
+    return JSONResponse(status_code=504, content={"detail": f"{reason}: {exc!r}"})
+
+# ----------------- Resilience -----------------
+
+resilience_state = SharedState(RESILIENCE_STATE_DB) if RESILIENCE_STATE_DB else None
+
+
+def _upstream(name: str) -> Upstream:
+    return Upstream(
+        name,
+        breaker=CircuitBreaker(
+            name,
+            window=BREAKER_WINDOW_S,
+            min_requests=BREAKER_MIN_REQUESTS,
+            error_rate=BREAKER_ERROR_RATE,
+            cooldown=BREAKER_COOLDOWN_S,
+            half_open_probes=BREAKER_HALF_OPEN_PROBES,
+            shared=resilience_state,
+        ),
+        limiter=AdaptiveLimiter(
+            name,
+            initial=LIMIT_INITIAL,
+            min_limit=LIMIT_MIN,
+            max_limit=LIMIT_MAX,
+            max_wait=LIMIT_MAX_WAIT_S,
+        ),
+        is_failure=is_upstream_failure,
+    )
+
+
+upstreams = {name: _upstream(name) for name in ("nlu", "rag", "llm")}
+
 # ----------------- External Service Calls -----------------
 
+# burst me same sawal → ek hi NLU / RAG call, sab callers ko wahi result
+nlu_flights = SingleFlight("nlu", enabled=SINGLE_FLIGHT_ENABLED, budget=deadlines.Shared)
+rag_flights = SingleFlight("rag", enabled=SINGLE_FLIGHT_ENABLED, budget=deadlines.Shared)
+
+nlu_backend = make_nlu_backend(NLU_BACKEND, NLU_SERVICE_URL, lambda: get_client("nlu"))
+
+
+async def _shared(flights: SingleFlight, key, fn):
+    # shared call ki deadline sabse lambe waiter ki; har caller apne budget tak hi ruke
+    try:
+        return await flights.do(key, fn, timeout=deadlines.remaining())
+    except asyncio.TimeoutError:
+        raise DeadlineExceeded(f"deadline exceeded waiting for {flights.name}") from None
+
+
 async def call_nlu_service(message: str):
-    async with httpx.AsyncClient(timeout=10) as client:
-        res = await client.post(
-            NLU_SERVICE_URL,
-            json={"message": message},
-        )
-        res.raise_for_status()
-        data = res.json()
+    with tracing.span("nlu", backend=nlu_backend.name) as span:
+        if nlu_backend.name == "embedded":
+            # in-process: share karne layak koi network call nahi
+            intent, entities = await nlu_backend.analyze(message)
+        else:
+            intent, entities = await _shared(nlu_flights, message, lambda: _call_nlu_service(message))
+            # result followers me shared hai, entities ki apni copy
+            entities = dict(entities)
+        span.set(intent=intent, crop=entities.get("crop"))
+    return intent, entities
+
 
-    return data["intent"], {"crop": data.get("crop")}
+async def _call_nlu_service(message: str):
+    async with upstreams["nlu"].call():
+        return await nlu_backend.analyze(message)
 
 
 async def call_rag_service(intent: str, entities: dict, message: str):
-    async with httpx.AsyncClient(timeout=10) as client:
-        res = await client.post(
+    key = (intent, entities.get("crop"), message)
+    return await _shared(rag_flights, key, lambda: _call_rag_service(intent, entities, message))
+
+
+async def _call_rag_service(intent: str, entities: dict, message: str):
+    async with upstreams["rag"].call():
+        res = await get_client("rag").post(
             RAG_SERVICE_URL,
             json={
                 "intent": intent,
@@ -133,20 +403,79 @@ async def call_rag_service(intent: str, entities: dict, message: str):
 
 
 
+class LLMFallback(RuntimeError):
+    """llm_service ne asli jawab ki jagah fallback diya (Groq error / stream adhoora)."""
+
+
 async def call_llm_service(message, intent, entities, context_data):
-    async with httpx.AsyncClient(timeout=20) as client:
-        res = await client.post(
-            LLM_SERVICE_URL,
+    with tracing.span("llm", stream=False):
+        async with upstreams["llm"].call():
+            res = await get_client("llm").post(
+                LLM_SERVICE_URL,
+                headers={"x-api-key": SERVICE_API_KEY},
+                json={
+                    "user_message": message,
+                    "intent": intent,
+                    "entities": entities,
+                    "context_data": context_data,
+                    "request_id": tracing.request_id(),
+                }
+            )
+            res.raise_for_status()
+            data = res.json()
+    # Groq fail → llm_service 200 + FALLBACK_ANSWER + metadata.error deta hai;
+    # llm_service khud theek hai (breaker failure nahi), par jawab fallback hai
+    error = (data.get("metadata") or {}).get("error")
+    if error:
+        raise LLMFallback(error)
+    return data["final_answer"]
+
+
+async def stream_llm_service(message, intent, entities, context_data):
+    # LLM service ke SSE events (delta / done / error) jaise aate hain waise
+    with tracing.span("llm", stream=True):
+        async with upstreams["llm"].call(), get_client("llm").stream(
+            "POST",
+            LLM_STREAM_URL,
             headers={"x-api-key": SERVICE_API_KEY},
             json={
                 "user_message": message,
                 "intent": intent,
                 "entities": entities,
-                "context_data": context_data
+                "context_data": context_data,
+                "request_id": tracing.request_id(),
             }
-        )
-        res.raise_for_status()
-        return res.json()["final_answer"]
+        ) as res:
+            res.raise_for_status()
+            async for event in iter_sse(res):
+                yield event
+
+
+async def collect_llm_stream(message, intent, entities, context_data) -> str:
+    # stream wala call: task cancel → connection band → llm_service Groq stream rok deta hai
+    parts = []
+    async for event in stream_llm_service(message, intent, entities, context_data):
+        if event.get("type") == "delta":
+            parts.append(event["text"])
+        elif event.get("type") == "error":
+            raise LLMFallback(event.get("error") or "LLM stream failed")
+        elif event.get("type") == "done":
+            return "".join(parts).strip()
+    # done ke bina stream khatam = adhoora jawab
+    raise LLMFallback("LLM stream ended without done")
+
+# ----------------- Deadline Budget -----------------
+
+DEADLINE_SKIPS = Counter(
+    "orchestrator_deadline_skipped_total",
+    "Stages skipped because the request deadline could not cover them",
+    ["stage"],
+)
+
+
+def has_budget(seconds: float) -> bool:
+    remaining = deadlines.remaining()
+    return remaining is None or remaining >= seconds
 
 # ----------------- RAG Fallback -----------------
 
@@ -172,6 +501,156 @@ def rag_fallback_answer(intent: str, entities: dict, context_data: str) -> str:
         "Kripya apna sawal thoda aur detail me likhein."
     )
 
+FALLBACK_ANSWER = (
+    "Is sawal ke liye abhi exact jankari uplabdh nahi hai. "
+    "Kripya thoda aur detail batayein."
+)
+
+
+def deadline_fallback(intent: str, entities: dict) -> str | None:
+    """LLM call ke liye budget nahi bacha → seedha rag_fallback_answer, warna None."""
+    if has_budget(LLM_MIN_BUDGET_S):
+        return None
+    DEADLINE_SKIPS.labels("llm").inc()
+    return rag_fallback_answer(intent, entities, context_data="")
+
+
+async def cached_answer(user_message: str, intent: str, entities: dict) -> str | None:
+    if not answer_cache:
+        return None
+    with tracing.span("cache") as span:
+        cached = await answer_cache.get(user_message, intent, entities.get("crop"))
+        span.set(hit=cached is not None)
+    return cached.answer if cached is not None else None
+
+
+RAG_LATENCY = Histogram(
+    "orchestrator_rag_latency_seconds",
+    "RAG call latency as seen by the orchestrator, by knowledge source",
+    ["source"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2, 5),
+)
+
+
+async def rag_answer(user_message: str, intent: str, entities: dict) -> str | None:
+    """REAL RAG HIT → formatted jawab (cache me bhi); generic → None."""
+    if not has_budget(RAG_MIN_BUDGET_S):
+        DEADLINE_SKIPS.labels("rag").inc()
+        return None
+    try:
+        with tracing.span("rag") as span:
+            context_data, rag_source = await call_rag_service(intent, entities, user_message)
+            span.set(source=rag_source)
+    except UpstreamUnavailable as e:
+        # RAG breaker open → RAG miss maan kar LLM se jawab
+        print("⚠️ RAG skipped:", e)
+        return None
+    RAG_LATENCY.labels(rag_source).observe(span.duration)
+    if rag_source == "generic":
+        return None
+
+    answer = rag_fallback_answer(
+        intent=intent,
+        entities=entities,
+        context_data=context_data
+    )
+    if answer_cache:
+        await answer_cache.put(user_message, intent, entities.get("crop"), answer, RAG)
+    return answer
+
+
+async def lookup_answer(user_message: str, intent: str, entities: dict):
+    """Cache ya RAG hit → (answer, "cache" | "rag"); LLM chahiye → (None, "llm")."""
+    answer = await cached_answer(user_message, intent, entities)
+    if answer is not None:
+        # repeat sawal → RAG / LLM hop skip
+        return answer, "cache"
+
+    # CASE 1: REAL RAG HIT
+    answer = await rag_answer(user_message, intent, entities)
+    if answer is not None:
+        return answer, "rag"
+
+    # CASE 2: RAG MISS → LLM fallback
+    return None, "llm"
+
+
+async def llm_answer(user_message: str, intent: str, entities: dict, call) -> str:
+    try:
+        answer = await call
+    except Exception as e:
+        print("⚠️ LLM API failed:", e)
+        return FALLBACK_ANSWER
+
+    # failure wala jawab cache nahi hota
+    if answer_cache:
+        await answer_cache.put(user_message, intent, entities.get("crop"), answer, LLM)
+    return answer
+
+# ----------------- Speculative RAG + LLM -----------------
+
+SPECULATION = Counter(
+    "orchestrator_speculative_llm_total",
+    "Speculative LLM calls by outcome "
+    "(saved = RAG miss, LLM already running; cancelled / wasted = RAG hit, "
+    "LLM stopped mid-way / already finished; not_needed = RAG within hedge delay)",
+    ["outcome"],
+)
+SPECULATION_HEADSTART = Counter(
+    "orchestrator_speculative_llm_headstart_seconds_total",
+    "Latency saved on RAG misses: how long the LLM ran before RAG answered",
+)
+
+
+async def speculative_answer(user_message: str, intent: str, entities: dict) -> str:
+    answer = await cached_answer(user_message, intent, entities)
+    if answer is not None:
+        return answer
+
+    rag_task = asyncio.ensure_future(rag_answer(user_message, intent, entities))
+    llm_task = None
+    try:
+        # hedge: RAG jaldi aa gaya to LLM par kharcha hi nahi
+        done, _ = await asyncio.wait({rag_task}, timeout=SPECULATIVE_HEDGE_MS / 1000)
+        # LLM poora ho hi nahi sakta to speculation ka kharcha bhi nahi
+        if not done and has_budget(LLM_MIN_BUDGET_S):
+            llm_started = time.perf_counter()
+            llm_task = asyncio.ensure_future(
+                collect_llm_stream(user_message, intent, entities, context_data="")
+            )
+
+        answer = await rag_task
+
+        if llm_task is None:
+            if done:
+                SPECULATION.labels("not_needed").inc()
+            if answer is not None:
+                return answer
+            fallback = deadline_fallback(intent, entities)
+            if fallback is not None:
+                return fallback
+            return await llm_answer(
+                user_message, intent, entities,
+                call_llm_service(user_message, intent, entities, context_data=""),
+            )
+
+        if answer is not None:
+            SPECULATION.labels("wasted" if llm_task.done() else "cancelled").inc()
+            return answer
+
+        SPECULATION.labels("saved").inc()
+        SPECULATION_HEADSTART.inc(time.perf_counter() - llm_started)
+        return await llm_answer(user_message, intent, entities, llm_task)
+    finally:
+        # RAG hit / RAG error / client disconnect → chalta LLM stream band
+        if llm_task is not None:
+            if not llm_task.done():
+                llm_task.cancel()
+            elif not llm_task.cancelled():
+                llm_task.exception()
+        if not rag_task.done():
+            rag_task.cancel()
+
 # ----------------- Chat Endpoint -----------------
 
 @app.post("/chat", response_model=ChatResponse)
@@ -183,40 +662,28 @@ async def chat(req: ChatRequest):
     # 1️⃣ NLU
     intent, entities = await call_nlu_service(user_message)
 
-    # 2️⃣ RAG
-    context_data, rag_source = await call_rag_service(intent, entities, user_message)
-
-
-    # 3️⃣ LLM
-    
-    # CASE 1: REAL RAG HIT
-    if rag_source != "generic":
-        final_answer = rag_fallback_answer(
-            intent=intent,
-            entities=entities,
-            context_data=context_data
-        )
-    # CASE 2: RAG MISS → LLM fallback
+    if SPECULATIVE_LLM_ENABLED:
+        # 2️⃣ + 3️⃣ RAG aur LLM saath (RAG slow ho to)
+        final_answer = await speculative_answer(user_message, intent, entities)
     else:
-        try:
-            final_answer = await call_llm_service(
-                user_message,
-                intent,
-                entities,
-                context_data=""
-            )
-        except Exception as e:
-            print("⚠️ LLM API failed:", e)
-            final_answer = (
-                "Is sawal ke liye abhi exact jankari uplabdh nahi hai. "
-                "Kripya thoda aur detail batayein."
+        # 2️⃣ Cache / RAG
+        final_answer, _ = await lookup_answer(user_message, intent, entities)
+
+        # 3️⃣ LLM (budget ho to)
+        if final_answer is None:
+            final_answer = deadline_fallback(intent, entities)
+        if final_answer is None:
+            final_answer = await llm_answer(
+                user_message, intent, entities,
+                call_llm_service(user_message, intent, entities, context_data=""),
             )
 
-
     # 4️⃣ Save chat history (FAIL-SAFE)
     try:
-        await save_to_chat_history(session_id, "user", user_message)
-        await save_to_chat_history(session_id, "bot", final_answer)
+        await save_chat_turns(
+            session_id,
+            [("user", user_message), ("bot", final_answer)],
+        )
     except Exception as e:
         print("⚠️ Chat history save failed:", e)
 
@@ -227,50 +694,178 @@ async def chat(req: ChatRequest):
         entities=entities
     )
 
+# ----------------- Streaming Chat Endpoint -----------------
+
+CHAT_TTFT = Histogram(
+    "orchestrator_chat_ttft_seconds",
+    "Time to first answer token on /chat/stream",
+    ["path"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10),
+)
+
+
+async def _chat_events(session_id: str, user_message: str, intent: str, entities: dict, started: float):
+    yield sse({"type": "meta", "session_id": session_id, "intent": intent, "entities": entities})
+
+    parts = []
+    path = None
+    failed = False
+    completed = False
+    try:
+        answer, path = await lookup_answer(user_message, intent, entities)
+        if answer is None:
+            answer = deadline_fallback(intent, entities)
+            if answer is not None:
+                path = "deadline"
+        if answer is not None:
+            CHAT_TTFT.labels(path).observe(time.perf_counter() - started)
+            parts.append(answer)
+            yield sse({"type": "delta", "text": answer})
+        else:
+            # LLM tokens jaise aaye waise aage
+            async for event in stream_llm_service(user_message, intent, entities, context_data=""):
+                if event.get("type") == "delta":
+                    if not parts:
+                        CHAT_TTFT.labels(path).observe(time.perf_counter() - started)
+                    parts.append(event["text"])
+                    yield sse(event)
+                elif event.get("type") == "error":
+                    print("⚠️ LLM stream failed:", event.get("error"))
+                    failed = True
+                elif event.get("type") == "done":
+                    completed = True
+    except Exception as e:
+        print("⚠️ Chat stream failed:", e)
+        failed = True
+
+    if not parts:
+        path = "fallback"
+        CHAT_TTFT.labels(path).observe(time.perf_counter() - started)
+        parts.append(FALLBACK_ANSWER)
+        yield sse({"type": "delta", "text": FALLBACK_ANSWER})
+
+    final_answer = "".join(parts).strip()
+    # failure / fallback / bina done wala jawab cache nahi hota
+    if path == "llm" and completed and not failed and answer_cache:
+        await answer_cache.put(user_message, intent, entities.get("crop"), final_answer, LLM)
+
+    # 4️⃣ Save chat history (FAIL-SAFE)
+    try:
+        await save_chat_turns(
+            session_id,
+            [("user", user_message), ("bot", final_answer)],
+        )
+    except Exception as e:
+        print("⚠️ Chat history save failed:", e)
+
+    yield sse({"type": "done", "session_id": session_id, "source": path})
+
+
+@app.post("/chat/stream")
+async def chat_stream(req: ChatRequest):
+    started = time.perf_counter()
+    session_id = req.session_id or str(uuid.uuid4())
+    user_message = req.message.strip()
+
+    # NLU stream shuru hone se pehle: fail ho to normal error status mile
+    intent, entities = await call_nlu_service(user_message)
+
+    return StreamingResponse(
+        _chat_events(session_id, user_message, intent, entities, started),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
+
 # ----------------- Chat History APIs -----------------
 
+@app.exception_handler(InvalidCursor)
+async def invalid_cursor_handler(request, exc: InvalidCursor):
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
+
+
+def _session_json(row: tuple) -> dict:
+    session_id, start, last, count = row
+    return {"session_id": session_id, "start_time": start, "last_time": last, "message_count": count}
+
+
 @app.get("/api/chat/session")
-async def get_all_sessions():
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cur.execute("""
-        SELECT session_id, MIN(timestamp)
-        FROM chat_history
-        GROUP BY session_id
-        ORDER BY MIN(timestamp) DESC
-    """)
-    rows = cur.fetchall()
-    conn.close()
-
-    return [
-        {"session_id": row[0], "start_time": row[1]}
-        for row in rows
-    ]
+async def get_all_sessions(
+    limit: int | None = Query(None, ge=1, le=PAGE_MAX),
+    cursor: str | None = None,
+):
+    # limit / cursor ke bina: purane clients wala bare list (saare sessions)
+    if limit is None and cursor is None:
+        rows = await run_in_threadpool(_all_sessions_sync)
+        return [_session_json(row) for row in rows]
+
+    rows, next_cursor = await run_in_threadpool(_sessions_page_sync, limit or SESSIONS_PAGE_DEFAULT, cursor)
+
+    return {
+        "sessions": [_session_json(row) for row in rows],
+        "next_cursor": next_cursor,
+    }
 
 
 @app.get("/api/chat/history/{session_id}")
-async def get_chat_history(session_id: str):
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cur.execute(
-        """
-        SELECT role, message, timestamp
-        FROM chat_history
-        WHERE session_id = ?
-        ORDER BY timestamp ASC
-        """,
-        (session_id,),
+async def get_chat_history(
+    session_id: str,
+    limit: int | None = Query(None, ge=1, le=PAGE_MAX),
+    cursor: str | None = None,
+):
+    # limit / cursor ke bina: purane clients wala shape (poori history, next_cursor nahi)
+    if limit is None and cursor is None:
+        rows = await run_in_threadpool(_all_history_sync, session_id)
+        if not rows:
+            raise HTTPException(status_code=404, detail="Session ID not found")
+        return {
+            "session_id": session_id,
+            "history": [
+                {"role": r, "message": m, "timestamp": t}
+                for _, r, m, t in rows
+            ],
+        }
+
+    rows, next_cursor, exists = await run_in_threadpool(
+        _history_page_sync, session_id, limit or HISTORY_PAGE_DEFAULT, cursor
     )
-    rows = cur.fetchall()
-    conn.close()
 
-    if not rows:
+    if not exists:
         raise HTTPException(status_code=404, detail="Session ID not found")
 
     return {
         "session_id": session_id,
         "history": [
             {"role": r, "message": m, "timestamp": t}
-            for r, m, t in rows
-        ]
-    }
\ No newline at end of file
+            for _, r, m, t in rows
+        ],
+        "next_cursor": next_cursor,
+    }
+
+
+async def _history_lines(session_id: str, rows: list[tuple], next_cursor: str | None):
+    # ek chunk memory me; baaki keyset pages jaise-jaise client padhta hai
+    while True:
+        yield "".join(
+            json.dumps({"role": r, "message": m, "timestamp": t}, ensure_ascii=False) + "\n"
+            for _, r, m, t in rows
+        )
+        if next_cursor is None:
+            return
+        rows, next_cursor, _ = await run_in_threadpool(
+            _history_page_sync, session_id, HISTORY_STREAM_CHUNK, next_cursor
+        )
+
+
+@app.get("/api/chat/history/{session_id}/stream")
+async def stream_chat_history(session_id: str):
+    """Bade session ke saare turns NDJSON me (ek line = ek turn), bina poora list banaye."""
+    rows, next_cursor, exists = await run_in_threadpool(
+        _history_page_sync, session_id, HISTORY_STREAM_CHUNK, None
+    )
+    if not exists:
+        raise HTTPException(status_code=404, detail="Session ID not found")
+
+    return StreamingResponse(
+        _history_lines(session_id, rows, next_cursor),
+        media_type="application/x-ndjson",
+    )
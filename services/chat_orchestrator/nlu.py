@@ -0,0 +1,69 @@
+import os
+from typing import Iterable, Iterator
+
+from pydantic import BaseModel
+
+from lexicon import DEFAULT_LEXICON_PATH, Lexicon
+
+# ----------------- NLU Engine -----------------
+#
+# Pure CPU kaam (~25µs / message). nlu_llm / chat_orchestrator dono me same
+# file hai — orchestrator ise "embedded" NLU backend ke roop me import karta
+# hai (alag Docker context).
+
+
+class LabelScore(BaseModel):
+    label: str
+    confidence: float
+
+
+class NLUResult(BaseModel):
+    intent: str
+    crop: str | None = None
+    language: str = "hi-en"  # abhi simple assumption
+    intent_confidence: float = 0.0
+    crop_confidence: float = 0.0
+    intents: list[LabelScore] = []
+    crops: list[LabelScore] = []
+
+
+# lexicon process start par ek baar compile hota hai
+LEXICON = Lexicon.load(os.getenv("NLU_LEXICON_PATH", str(DEFAULT_LEXICON_PATH)))
+
+
+def detect_intent_and_crop(text: str, lexicon: Lexicon | None = None) -> NLUResult:
+    found = (lexicon or LEXICON).analyze(text)
+
+    crops = [LabelScore(label=l, confidence=c) for l, c in found.get("crop", [])]
+    intents = [LabelScore(label=l, confidence=c) for l, c in found.get("intent", [])]
+
+    return NLUResult(
+        intent=intents[0].label if intents else "general",
+        crop=crops[0].label if crops else None,
+        intent_confidence=intents[0].confidence if intents else 0.0,
+        crop_confidence=crops[0].confidence if crops else 0.0,
+        intents=intents,
+        crops=crops,
+    )
+
+
+def analyze_batch(
+    texts: Iterable[str],
+    lexicon: Lexicon | None = None,
+    memo_size: int = 50000,
+) -> Iterator[NLUResult]:
+    """
+    Batch NLU: lexicon ek hi baar resolve, aur repeat messages (batch me
+    "gehu me khaad" jaise sawal bahut baar aate hain) ka result reuse.
+    """
+    lexicon = lexicon or LEXICON
+    seen: dict[str, NLUResult] = {}
+    for text in texts:
+        key = " ".join(text.lower().split())
+        result = seen.get(key)
+        if result is None:
+            if len(seen) >= memo_size:
+                # lambe stream (CLI) par memory bounded rahe
+                seen.clear()
+            result = seen[key] = detect_intent_and_crop(text, lexicon)
+        yield result
@@ -0,0 +1,50 @@
+from typing import Callable
+
+import httpx
+
+# ----------------- NLU Backends -----------------
+#
+# "remote"   → nlu_llm service par HTTP POST /analyze (purana tareeka)
+# "embedded" → wahi engine (nlu.py + lexicon.json, vendored) in-process;
+#              HTTP hop + JSON encode/decode dono taraf bachta hai.
+#
+# Dono ka result ek jaisa hona chahiye — tests/test_nlu_contract.py dono
+# backends par same cases chalata hai.
+
+
+class RemoteNLU:
+    name = "remote"
+
+    def __init__(self, url: str, client: Callable[[], httpx.AsyncClient]):
+        self.url = url
+        self.client = client
+
+    async def analyze(self, message: str) -> tuple[str, dict]:
+        res = await self.client().post(self.url, json={"message": message})
+        res.raise_for_status()
+        data = res.json()
+
+        return data["intent"], {"crop": data.get("crop")}
+
+
+class EmbeddedNLU:
+    name = "embedded"
+
+    def __init__(self):
+        # import yahin: remote mode me lexicon load hi na ho
+        from nlu import detect_intent_and_crop
+        self._detect = detect_intent_and_crop
+
+    async def analyze(self, message: str) -> tuple[str, dict]:
+        # microseconds ka kaam — threadpool hop isse mehenga padega
+        nlu = self._detect(message)
+
+        return nlu.intent, {"crop": nlu.crop}
+
+
+def make_nlu_backend(kind: str, url: str, client: Callable[[], httpx.AsyncClient]):
+    if kind == "embedded":
+        return EmbeddedNLU()
+    if kind == "remote":
+        return RemoteNLU(url, client)
+    raise ValueError(f"Unknown NLU_BACKEND {kind!r} (remote | embedded)")
@@ -0,0 +1,29 @@
+import json
+from typing import Any, AsyncIterator
+
+import httpx
+
+# ----------------- Server-Sent Events -----------------
+#
+# Chat streaming ka wire format (llm_service → orchestrator → gateway → frontend):
+# har event ek line `data: {json}` + blank line. type:
+#   meta  → session_id / intent / entities (pehla event)
+#   delta → jawab ka agla tukda ("text")
+#   done  → stream poora
+#   error → upstream fail (jo text ja chuka wahi jawab hai)
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    # nginx jaise proxies buffer na karein
+    "X-Accel-Buffering": "no",
+}
+
+
+def sse(event: dict[str, Any]) -> str:
+    return f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+
+async def iter_sse(response: httpx.Response) -> AsyncIterator[dict[str, Any]]:
+    async for line in response.aiter_lines():
+        if line.startswith("data:"):
+            yield json.loads(line[5:])
@@ -0,0 +1,134 @@
+import httpx
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from answer_cache import LLM, RAG, AnswerCache, normalize_message
+from db import SQLitePool
+
+
+def test_normalize_message():
+    assert normalize_message("  Gehu ke liye KHAAD?? ") == "gehu ke liye khaad"
+
+
+@pytest.mark.anyio
+async def test_lru_ttl_and_kinds(monkeypatch):
+    import answer_cache
+
+    now = [1000.0]
+    monkeypatch.setattr(answer_cache.time, "time", lambda: now[0])
+
+    cache = AnswerCache(max_entries=2, ttl_rag=100, ttl_llm=10)
+    await cache.put("gehu ke liye khaad", "fertilizer", "gehu", "120 kg urea", RAG)
+    await cache.put("mausam kaisa", "general", None, "llm jawab", LLM)
+
+    hit = await cache.get("Gehu ke liye khaad?", "fertilizer", "gehu")
+    assert hit.answer == "120 kg urea" and hit.kind == RAG
+    # intent / crop alag → alag key
+    assert await cache.get("gehu ke liye khaad", "fertilizer", "dhaan") is None
+
+    now[0] += 11
+    assert await cache.get("mausam kaisa", "general", None) is None     # LLM TTL khatam
+    assert await cache.get("gehu ke liye khaad", "fertilizer", "gehu") is not None
+
+    await cache.put("a", "general", None, "1", RAG)
+    await cache.put("b", "general", None, "2", RAG)
+    # LRU: sabse purana (gehu) nikal gaya
+    assert await cache.get("gehu ke liye khaad", "fertilizer", "gehu") is None
+    assert cache.stats["hits"] == 2 and cache.hit_rate() == pytest.approx(2 / 5)
+
+
+@pytest.mark.anyio
+async def test_knowledge_version_change_invalidates_both_tiers(tmp_path):
+    version = [1]
+    pool = SQLitePool(tmp_path / "cache.db", size=1)
+    cache = AnswerCache(store=pool, version_fn=lambda: version[0], version_check_interval=0)
+
+    await cache.put("gehu khaad", "fertilizer", "gehu", "purana jawab", RAG)
+
+    # doosra worker: L1 khali, L2 (SQLite) se milta hai
+    other = AnswerCache(store=pool, version_fn=lambda: version[0], version_check_interval=0)
+    assert (await other.get("gehu khaad", "fertilizer", "gehu")).answer == "purana jawab"
+    assert other.stats["l2_hits"] == 1
+
+    version[0] = 2
+    assert await cache.get("gehu khaad", "fertilizer", "gehu") is None
+    assert await other.get("gehu khaad", "fertilizer", "gehu") is None
+    assert cache.stats["invalidations"] == 1
+    with pool.connection() as conn:
+        assert conn.execute("SELECT count(*) FROM answer_cache").fetchone()[0] == 0
+    pool.close()
+
+
+@pytest.mark.anyio
+async def test_chat_serves_repeat_question_from_cache(monkeypatch):
+    import main
+
+    calls = {"rag": 0, "llm": 0}
+
+    async def fake_nlu(message):
+        return "fertilizer", {"crop": "gehu"}
+
+    async def fake_rag(intent, entities, message):
+        calls["rag"] += 1
+        return "120 kg urea", "fertilizer_table"
+
+    async def fake_llm(*args, **kwargs):
+        calls["llm"] += 1
+        return "llm"
+
+    async def fake_save(session_id, turns):
+        pass
+
+    monkeypatch.setattr(main, "call_nlu_service", fake_nlu)
+    monkeypatch.setattr(main, "call_rag_service", fake_rag)
+    monkeypatch.setattr(main, "call_llm_service", fake_llm)
+    monkeypatch.setattr(main, "save_chat_turns", fake_save)
+    monkeypatch.setattr(main, "answer_cache", AnswerCache())
+
+    async with AsyncClient(transport=ASGITransport(app=main.app), base_url="http://test") as ac:
+        first = await ac.post("/chat", json={"message": "Gehu ke liye khaad"})
+        second = await ac.post("/chat", json={"message": "gehu ke liye khaad?"})
+        metrics = await ac.get("/metrics")
+
+    assert first.json()["reply"] == second.json()["reply"]
+    assert calls == {"rag": 1, "llm": 0}
+    assert "orchestrator_answer_cache_lookups_total" in metrics.text
+
+
+@pytest.mark.anyio
+async def test_llm_fallback_answer_is_not_cached(monkeypatch):
+    import clients
+    import main
+
+    generate_calls = []
+
+    async def handler(request: httpx.Request):
+        if request.url.path == "/analyze":
+            return httpx.Response(200, json={"intent": "disease", "crop": "kapas"})
+        if request.url.path == "/query":
+            return httpx.Response(200, json={"context": "", "source": "generic"})
+        generate_calls.append(request.url.path)
+        # Groq down: llm_service phir bhi 200 + fallback deta hai
+        return httpx.Response(200, json={
+            "final_answer": "Is sawal ke liye abhi exact jankari uplabdh nahi hai.",
+            "metadata": {"error": "groq 503", "circuit_open": False},
+        })
+
+    async def fake_save(session_id, turns):
+        pass
+
+    transport = httpx.MockTransport(handler)
+    for name, timeout in clients.UPSTREAM_TIMEOUTS.items():
+        monkeypatch.setitem(clients._clients, name, clients.build_client(timeout, transport=transport))
+    monkeypatch.setattr(main, "save_chat_turns", fake_save)
+    monkeypatch.setattr(main, "SPECULATIVE_LLM_ENABLED", False)
+    cache = AnswerCache()
+    monkeypatch.setattr(main, "answer_cache", cache)
+
+    async with AsyncClient(transport=ASGITransport(app=main.app), base_url="http://test") as ac:
+        first = await ac.post("/chat", json={"message": "kapas me sundi"})
+        second = await ac.post("/chat", json={"message": "kapas me sundi"})
+
+    assert first.json()["reply"] == second.json()["reply"] == main.FALLBACK_ANSWER
+    assert generate_calls == ["/generate", "/generate"]
+    assert await cache.get("kapas me sundi", "disease", "kapas") is None
@@ -0,0 +1,92 @@
+import sqlite3
+import threading
+
+import pytest
+
+from db import SQLitePool
+
+
+def test_pool_uses_wal_and_reuses_connections(tmp_path):
+    pool = SQLitePool(tmp_path / "t.db", size=2)
+
+    with pool.connection() as conn:
+        mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        first = conn
+
+    with pool.connection() as conn:
+        assert conn is first
+
+    assert mode == "wal"
+    pool.close()
+
+
+def test_transaction_commits_and_rolls_back(tmp_path):
+    pool = SQLitePool(tmp_path / "t.db", size=1)
+
+    with pool.transaction() as conn:
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        conn.execute("INSERT INTO t VALUES (1)")
+
+    with pytest.raises(RuntimeError):
+        with pool.transaction() as conn:
+            conn.execute("INSERT INTO t VALUES (2)")
+            raise RuntimeError("boom")
+
+    with pool.connection() as conn:
+        rows = conn.execute("SELECT x FROM t").fetchall()
+
+    assert rows == [(1,)]
+    pool.close()
+
+
+def test_pool_never_exceeds_size(tmp_path):
+    pool = SQLitePool(tmp_path / "t.db", size=2)
+    seen = set()
+
+    def worker():
+        for _ in range(20):
+            with pool.connection() as conn:
+                seen.add(id(conn))
+
+    threads = [threading.Thread(target=worker) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(seen) <= 2
+    pool.close()
+
+
+def test_readonly_pool_rejects_writes(tmp_path):
+    path = tmp_path / "t.db"
+    with SQLitePool(path).transaction() as conn:
+        conn.execute("CREATE TABLE t (x INTEGER)")
+
+    ro = SQLitePool(path, readonly=True)
+    with ro.connection() as conn:
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("INSERT INTO t VALUES (1)")
+    ro.close()
+
+
+def test_readonly_pool_does_not_touch_journal_mode(tmp_path):
+    path = tmp_path / "ro.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE t (x INTEGER)")
+    conn.execute("INSERT INTO t VALUES (1)")
+    conn.commit()
+    conn.close()
+
+    pool = SQLitePool(path, size=1, readonly=True)
+    with pool.connection() as conn:
+        assert conn.execute("SELECT x FROM t").fetchall() == [(1,)]
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("INSERT INTO t VALUES (2)")
+    pool.close()
+
+    conn = sqlite3.connect(path)
+    # reader ne delete → wal nahi kiya, -wal / -shm file bhi nahi bani
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+    conn.close()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["ro.db"]
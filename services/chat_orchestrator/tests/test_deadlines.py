@@ -0,0 +1,70 @@
+import httpx
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+
+@pytest.fixture
+def upstream_calls(monkeypatch):
+    import clients
+    import main
+
+    calls = []
+
+    async def handler(request: httpx.Request):
+        calls.append((request.url.path, request.headers.get("x-deadline-ms"), request.extensions["timeout"]))
+        if request.url.path == "/analyze":
+            return httpx.Response(200, json={"intent": "fertilizer", "crop": "gehu"})
+        if request.url.path == "/query":
+            return httpx.Response(200, json={"context": "", "source": "generic"})
+        return httpx.Response(200, json={"final_answer": "Urea do baar dein"})
+
+    async def fake_save(session_id, turns):
+        pass
+
+    transport = httpx.MockTransport(handler)
+    for name, timeout in clients.UPSTREAM_TIMEOUTS.items():
+        monkeypatch.setitem(clients._clients, name, clients.build_client(timeout, transport=transport))
+    monkeypatch.setattr(main, "save_chat_turns", fake_save)
+    monkeypatch.setattr(main, "answer_cache", None)
+    return calls
+
+
+async def _chat(budget_ms: str) -> httpx.Response:
+    import main
+
+    async with AsyncClient(transport=ASGITransport(app=main.app), base_url="http://test") as ac:
+        return await ac.post("/chat", json={"message": "gehu me khaad"}, headers={"X-Deadline-Ms": budget_ms})
+
+
+@pytest.mark.anyio
+async def test_each_hop_gets_the_remaining_budget(upstream_calls):
+    resp = await _chat("5000")
+
+    assert resp.json()["reply"] == "Urea do baar dein"
+    paths = [path for path, _, _ in upstream_calls]
+    assert paths[-2:] == ["/query", "/generate"]
+
+    budgets = [int(budget) for _, budget, _ in upstream_calls]
+    assert all(3000 < b <= 5000 for b in budgets)
+    assert budgets == sorted(budgets, reverse=True)
+    # RAG / LLM ke 10s / 20s cap ki jagah bacha hua budget
+    assert all(t["read"] <= 5 and t["connect"] <= 2 for _, _, t in upstream_calls)
+
+
+@pytest.mark.anyio
+async def test_short_budget_skips_llm_with_rag_fallback(upstream_calls):
+    import main
+
+    resp = await _chat("1500")
+
+    assert resp.status_code == 200
+    assert resp.json()["reply"] == main.rag_fallback_answer("fertilizer", {"crop": "gehu"}, "")
+    assert "/generate" not in [path for path, _, _ in upstream_calls]
+
+
+@pytest.mark.anyio
+async def test_expired_budget_is_rejected_before_any_work(upstream_calls):
+    resp = await _chat("0")
+
+    assert resp.status_code == 504
+    assert upstream_calls == []
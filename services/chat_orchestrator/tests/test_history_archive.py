@@ -0,0 +1,73 @@
+import gzip
+import json
+
+import history_archive
+import history_store
+from db import SQLitePool
+
+
+def _pool(tmp_path):
+    pool = SQLitePool(tmp_path / "h.db", size=2)
+    with pool.transaction() as conn:
+        history_store.init_schema(conn)
+        history_archive.init_schema(conn)
+    return pool
+
+
+def _rows(session_id, day, n):
+    return [(session_id, "user", f"{session_id} {day} {i}", f"2024-01-{day:02d}T10:00:{i:02d}") for i in range(n)]
+
+
+def test_compaction_moves_old_prefix_and_reads_stay_transparent(tmp_path):
+    pool = _pool(tmp_path)
+    archive = history_archive.HistoryArchive(tmp_path / "archive")
+    with pool.transaction() as conn:
+        history_store.insert_rows(conn, _rows("a", 1, 3) + _rows("b", 1, 2))
+        history_store.insert_rows(conn, _rows("a", 2, 2) + _rows("a", 9, 2))
+
+    # batch 4 → do segments (4 + 3), 9 tareekh wale live rehte hain
+    compactor = history_archive.HistoryCompactor(pool, archive, retention_s=0, batch_size=4)
+    compactor.cutoff = lambda: "2024-01-05"
+    assert compactor.compact_once() == 7
+    assert compactor.stats["segments"] == 2
+
+    segments = sorted(p.name for p in (tmp_path / "archive").glob("*.jsonl.gz"))
+    assert len(segments) == 2 and len(list((tmp_path / "archive").glob("*.idx.json"))) == 2
+    # poora segment ek normal gzip file jaisa bhi padhta hai
+    lines = gzip.decompress((tmp_path / "archive" / segments[0]).read_bytes()).decode().splitlines()
+    assert [json.loads(line)[2] for line in lines] == ["a 1 0", "a 1 1", "a 1 2", "b 1 0"]
+
+    with pool.connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM chat_history").fetchone()[0] == 2
+        messages, cursor = [], None
+        while True:
+            rows, cursor = history_store.history_page(conn, "a", 2, cursor, archive=archive)
+            messages += [m for _, _, m, _ in rows]
+            if cursor is None:
+                break
+        b_rows, _ = history_store.history_page(conn, "b", 10, archive=archive)
+        sessions, _ = history_store.sessions_page(conn, 10)
+
+    assert messages == ["a 1 0", "a 1 1", "a 1 2", "a 2 0", "a 2 1", "a 9 0", "a 9 1"]
+    assert [m for _, _, m, _ in b_rows] == ["b 1 0", "b 1 1"]
+    assert dict((s, count) for s, _, _, count in sessions) == {"a": 7, "b": 2}
+
+    # dobara chalane par kuch naya nahi
+    assert compactor.compact_once() == 0
+    pool.close()
+
+
+def test_checkpoint_vacuums_when_mostly_free(tmp_path):
+    pool = _pool(tmp_path)
+    with pool.transaction() as conn:
+        history_store.insert_rows(conn, [("s", "user", "x" * 2000, "2024-01-01T00:00:00")] * 500)
+        conn.execute("DELETE FROM chat_history")
+        pages_before = conn.execute("PRAGMA page_count").fetchone()[0]
+
+    assert history_archive.checkpoint(pool, vacuum_free_ratio=0.25)
+    with pool.connection() as conn:
+        assert conn.execute("PRAGMA page_count").fetchone()[0] < pages_before / 4
+        assert conn.execute("PRAGMA freelist_count").fetchone()[0] == 0
+    assert (tmp_path / "h.db-wal").stat().st_size == 0
+    assert not history_archive.checkpoint(pool, vacuum_free_ratio=0.25)
+    pool.close()
@@ -0,0 +1,136 @@
+import json
+import sqlite3
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+import history_archive
+import history_store
+from db import SQLitePool
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = SQLitePool(tmp_path / "h.db", size=2)
+    with pool.transaction() as conn:
+        history_store.init_schema(conn)
+        history_archive.init_schema(conn)
+    yield pool
+    pool.close()
+
+
+def _rows(session_id, n, day="2024-01-01"):
+    return [(session_id, "user", f"sawal {i}", f"{day}T10:00:{i:02d}") for i in range(n)]
+
+
+def test_sessions_summary_is_maintained_on_write(pool):
+    with pool.transaction() as conn:
+        history_store.insert_rows(conn, _rows("a", 3) + _rows("b", 1, "2024-01-02"))
+    with pool.transaction() as conn:
+        history_store.insert_rows(conn, [("a", "bot", "jawab", "2024-01-03T09:00:00")])
+
+    with pool.connection() as conn:
+        rows, cursor = history_store.sessions_page(conn, 10)
+
+    assert rows == [
+        ("b", "2024-01-02T10:00:00", "2024-01-02T10:00:00", 1),
+        ("a", "2024-01-01T10:00:00", "2024-01-03T09:00:00", 4),
+    ]
+    assert cursor is None
+
+
+def test_keyset_pages_cover_everything_once(pool):
+    with pool.transaction() as conn:
+        history_store.insert_rows(conn, _rows("a", 7))
+        for day in range(1, 6):
+            history_store.insert_rows(conn, _rows(f"s{day}", 1, f"2024-02-0{day}"))
+
+    with pool.connection() as conn:
+        messages, cursor = [], None
+        while True:
+            rows, cursor = history_store.history_page(conn, "a", 3, cursor)
+            messages += [m for _, _, m, _ in rows]
+            if cursor is None:
+                break
+        sessions, cursor = [], None
+        while True:
+            rows, cursor = history_store.sessions_page(conn, 2, cursor)
+            sessions += [s for s, *_ in rows]
+            if cursor is None:
+                break
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN " + history_store.SELECT_HISTORY_SQL, ("a", 0, 3)
+        ).fetchall()
+
+    assert messages == [f"sawal {i}" for i in range(7)]
+    assert sessions == ["s5", "s4", "s3", "s2", "s1", "a"]
+    assert "idx_chat_history_session_id" in str(plan)
+
+
+def test_old_db_is_backfilled_and_bad_cursor_rejected(tmp_path):
+    pool = SQLitePool(tmp_path / "old.db", size=1)
+    with pool.transaction() as conn:
+        conn.execute(history_store.SCHEMA[0])
+        conn.executemany(history_store.INSERT_CHAT_SQL, _rows("old", 2))
+    with pool.transaction() as conn:
+        history_store.init_schema(conn)
+
+    with pool.connection() as conn:
+        assert history_store.sessions_page(conn, 5)[0] == [
+            ("old", "2024-01-01T10:00:00", "2024-01-01T10:00:01", 2)
+        ]
+        with pytest.raises(history_store.InvalidCursor):
+            history_store.history_page(conn, "old", 5, "not-a-cursor")
+    pool.close()
+
+
+@pytest.mark.anyio
+async def test_history_endpoints_paginate_and_stream(monkeypatch, pool):
+    import main
+
+    monkeypatch.setattr(main, "db_pool", pool)
+    monkeypatch.setattr(main, "HISTORY_STREAM_CHUNK", 2)
+    with pool.transaction() as conn:
+        history_store.insert_rows(conn, _rows("s1", 5))
+
+    async with AsyncClient(transport=ASGITransport(app=main.app), base_url="http://test") as ac:
+        full = (await ac.get("/api/chat/history/s1")).json()
+        first = (await ac.get("/api/chat/history/s1", params={"limit": 3})).json()
+        second = (await ac.get("/api/chat/history/s1", params={"limit": 3, "cursor": first["next_cursor"]})).json()
+        streamed = await ac.get("/api/chat/history/s1/stream")
+        missing = await ac.get("/api/chat/history/nahi-hai")
+        bad = await ac.get("/api/chat/history/s1", params={"cursor": "xyz"})
+        sessions = (await ac.get("/api/chat/session", params={"limit": 10})).json()
+        legacy = (await ac.get("/api/chat/session")).json()
+
+    # params ke bina poori history, purana shape
+    assert [h["message"] for h in full["history"]] == [f"sawal {i}" for i in range(5)] and "next_cursor" not in full
+    assert [h["message"] for h in first["history"] + second["history"]] == [f"sawal {i}" for i in range(5)]
+    assert second["next_cursor"] is None
+    assert streamed.headers["content-type"] == "application/x-ndjson"
+    assert [json.loads(line)["message"] for line in streamed.text.splitlines()] == [f"sawal {i}" for i in range(5)]
+    assert missing.status_code == 404 and bad.status_code == 400
+    assert sessions["sessions"][0]["message_count"] == 5 and sessions["next_cursor"] is None
+    # params ke bina purana shape: bare list
+    assert [s["session_id"] for s in legacy] == ["s1"] and legacy[0]["start_time"] == "2024-01-01T10:00:00"
+
+
+def test_legacy_history_is_imported_once_from_knowledge_db(tmp_path, pool):
+    legacy = tmp_path / "agri_knowledge.db"
+    conn = sqlite3.connect(legacy)
+    conn.execute(
+        "CREATE TABLE chat_history (id INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT, "
+        "role TEXT, message TEXT, timestamp DATETIME DEFAULT CURRENT_TIMESTAMP)"
+    )
+    conn.executemany(history_store.INSERT_CHAT_SQL, _rows("old", 3))
+    conn.commit()
+    conn.close()
+
+    with pool.connection() as conn:
+        assert history_store.import_legacy(conn, legacy) == 3
+        assert history_store.import_legacy(conn, legacy) == 0
+        rows, _ = history_store.history_page(conn, "old", 10)
+        sessions, _ = history_store.sessions_page(conn, 10)
+
+    assert [m for _, _, m, _ in rows] == ["sawal 0", "sawal 1", "sawal 2"]
+    assert sessions[0][0] == "old" and sessions[0][3] == 3
@@ -0,0 +1,129 @@
+import asyncio
+
+import pytest
+
+from history_writer import HistoryWriter, FLUSH_BEFORE_ACK
+
+
+class Recorder:
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, rows):
+        self.batches.append(list(rows))
+
+
+@pytest.mark.anyio
+async def test_rows_are_batched_into_one_flush():
+    sink = Recorder()
+    writer = HistoryWriter(sink, batch_size=100, flush_interval=0.05)
+    await writer.start()
+
+    for i in range(10):
+        await writer.enqueue([("s", "user", f"m{i}", "t")])
+
+    await asyncio.sleep(0.1)
+    await writer.stop()
+
+    assert len(sink.batches) == 1
+    assert len(sink.batches[0]) == 10
+
+
+@pytest.mark.anyio
+async def test_stop_drains_pending_rows():
+    sink = Recorder()
+    writer = HistoryWriter(sink, batch_size=1000, flush_interval=10)
+    await writer.start()
+
+    for i in range(5):
+        await writer.enqueue([("s", "bot", f"m{i}", "t")])
+    await writer.stop()
+
+    assert sum(len(b) for b in sink.batches) == 5
+
+
+@pytest.mark.anyio
+async def test_flush_before_ack_waits_for_commit():
+    sink = Recorder()
+    writer = HistoryWriter(sink, flush_interval=0.01, mode=FLUSH_BEFORE_ACK)
+    await writer.start()
+
+    await writer.enqueue([("s", "user", "hi", "t")])
+    assert sink.batches == [[("s", "user", "hi", "t")]]
+
+    await writer.stop()
+
+
+@pytest.mark.anyio
+async def test_flush_before_ack_surfaces_errors():
+    def broken(rows):
+        raise RuntimeError("disk full")
+
+    writer = HistoryWriter(broken, flush_interval=0.01, mode=FLUSH_BEFORE_ACK)
+    await writer.start()
+
+    with pytest.raises(RuntimeError):
+        await writer.enqueue([("s", "user", "hi", "t")])
+
+    await writer.stop()
+    assert writer.stats["failed"] == 1
+
+
+@pytest.mark.anyio
+async def test_full_queue_applies_backpressure():
+    sink = Recorder()
+    writer = HistoryWriter(sink, max_queue=1, batch_size=1, flush_interval=0.01)
+    await writer.start()
+
+    await asyncio.gather(*(writer.enqueue([("s", "u", str(i), "t")]) for i in range(20)))
+    await writer.stop()
+
+    assert sum(len(b) for b in sink.batches) == 20
+
+
+@pytest.mark.anyio
+async def test_ack_then_flush_retries_transient_failures():
+    sink = Recorder()
+    failures = [RuntimeError("database is locked")]
+
+    def flaky(rows):
+        if failures:
+            raise failures.pop()
+        sink(rows)
+
+    writer = HistoryWriter(flaky, flush_interval=0.01, retry_base=0.001)
+    await writer.start()
+    await writer.enqueue([("s", "user", "hi", "t")])
+    await writer.stop()
+
+    assert sink.batches == [[("s", "user", "hi", "t")]]
+    assert writer.stats["retried"] == 1 and writer.stats["failed"] == 0
+
+
+@pytest.mark.anyio
+async def test_acknowledged_rows_are_dead_lettered_then_replayed(tmp_path):
+    def broken(rows):
+        raise RuntimeError("disk full")
+
+    dead_letter = tmp_path / "dead.jsonl"
+    writer = HistoryWriter(broken, flush_interval=0.01, max_retries=2, retry_base=0.001, dead_letter=dead_letter)
+    await writer.start()
+    await writer.enqueue([("s", "user", "gehu me khaad", "t1"), ("s", "bot", "urea", "t2")])
+    await writer.stop()
+
+    assert writer.stats["retried"] == 2 and writer.stats["dead_lettered"] == 2
+    assert dead_letter.exists()
+
+    # disk theek → agla start pehle dead-letter rows likhta hai
+    sink = Recorder()
+    writer = HistoryWriter(sink, flush_interval=0.01, dead_letter=dead_letter)
+    await writer.start()
+    await writer.stop()
+
+    assert sink.batches == [[("s", "user", "gehu me khaad", "t1"), ("s", "bot", "urea", "t2")]]
+    assert not dead_letter.exists()
+
+
+def test_unknown_mode_rejected():
+    with pytest.raises(ValueError):
+        HistoryWriter(Recorder(), mode="yolo")
@@ -0,0 +1,205 @@
+import asyncio
+
+import httpx
+import pytest
+
+from resilience import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    SHARED_ERRORS,
+    AdaptiveLimiter,
+    CircuitBreaker,
+    CircuitOpenError,
+    LimitExceededError,
+    SharedState,
+    Upstream,
+)
+
+
+class Clock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_breaker_trips_on_error_rate_and_recovers_through_half_open():
+    clock = Clock()
+    breaker = CircuitBreaker("t", window=10, min_requests=4, error_rate=0.5, cooldown=5, half_open_probes=2, clock=clock)
+
+    for ok in (True, False, True):
+        breaker.record(ok)
+    assert breaker.state == CLOSED  # min_requests abhi nahi
+    breaker.record(False)
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError) as exc:
+        breaker.before_call()
+    assert exc.value.retry_after == 5
+
+    clock.now += 5
+    assert breaker.before_call() is True and breaker.state == HALF_OPEN
+    assert breaker.before_call() is True
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()  # probes busy
+
+    breaker.record(True, probe=True)
+    breaker.record(False, probe=True)
+    assert breaker.state == OPEN
+
+    clock.now += 5
+    for _ in range(2):
+        breaker.record(True, probe=breaker.before_call())
+    assert breaker.state == CLOSED and breaker.totals() == (0, 0)
+
+
+def test_old_failures_slide_out_of_window():
+    clock = Clock()
+    breaker = CircuitBreaker("t", window=10, min_requests=4, error_rate=0.5, clock=clock)
+    for _ in range(3):
+        breaker.record(False)
+    clock.now += 11
+    for _ in range(3):
+        breaker.record(True)
+    breaker.record(False)
+    assert breaker.totals() == (3, 1) and breaker.state == CLOSED
+
+
+def test_shared_state_lets_workers_agree(tmp_path):
+    clock = Clock()
+    path = str(tmp_path / "resilience.db")
+    kw = dict(window=10, min_requests=4, error_rate=0.5, cooldown=30, sync_interval=0, clock=clock)
+    a = CircuitBreaker("rag", shared=SharedState(path), **kw)
+    b = CircuitBreaker("rag", shared=SharedState(path), **kw)
+
+    # akele kisi worker ke paas min_requests nahi; milkar trip
+    for _ in range(2):
+        a.record(False)
+        b.record(False)
+    assert b.state == OPEN and a.state == CLOSED
+
+    clock.now += 1
+    for breaker in (a, b):
+        with pytest.raises(CircuitOpenError):
+            breaker.check()
+
+
+@pytest.mark.anyio
+async def test_shared_state_sync_is_off_loop_and_fails_open_when_file_is_locked(tmp_path):
+    import sqlite3
+
+    clock = Clock()
+    path = str(tmp_path / "resilience.db")
+    kw = dict(window=10, min_requests=4, error_rate=0.5, cooldown=30, sync_interval=0, clock=clock)
+    a = CircuitBreaker("rag", shared=SharedState(path), **kw)
+    b = CircuitBreaker("rag", shared=SharedState(path), **kw)
+
+    # doosra process file pakde baitha hai: sync chhoot jaata hai, local counts bache rehte hain
+    locker = sqlite3.connect(path, isolation_level=None)
+    locker.execute("BEGIN EXCLUSIVE")
+    skipped = SHARED_ERRORS.labels("rag", "sync")._value.get()
+    for _ in range(2):
+        a.record(False)
+    await asyncio.sleep(0.05)
+    assert SHARED_ERRORS.labels("rag", "sync")._value.get() > skipped
+    assert a.state == CLOSED and a.totals() == (0, 2)
+    locker.execute("ROLLBACK")
+    locker.close()
+
+    # file khuli → pending counts push, b ke saath milkar trip
+    clock.now += 1
+    a.check()
+    await asyncio.sleep(0.05)
+    for _ in range(2):
+        b.record(False)
+        await asyncio.sleep(0.05)
+    assert b.state == OPEN
+
+
+@pytest.mark.anyio
+async def test_limiter_grows_under_healthy_load_and_backs_off_on_drops():
+    limiter = AdaptiveLimiter("t", initial=4, min_limit=1, max_limit=8)
+
+    async def call(drop=False):
+        async with limiter.slot() as slot:
+            await asyncio.sleep(0.001)
+            if drop:
+                slot.drop()
+
+    for _ in range(20):
+        await asyncio.gather(*[call() for _ in range(8)])
+    assert limiter.limit > 4 and limiter.in_flight == 0
+
+    # akela drop tolerate; lagataar drops (upstream 429 de raha) → backoff
+    grown = limiter.limit
+    await call(drop=True)
+    assert limiter.limit >= grown
+    for _ in range(10):
+        await call(drop=True)
+    assert limiter.limit < grown
+
+
+@pytest.mark.anyio
+async def test_limiter_queues_then_rejects_after_max_wait():
+    limiter = AdaptiveLimiter("t", initial=1, max_wait=0.02)
+    await limiter.acquire()
+    with pytest.raises(LimitExceededError):
+        await limiter.acquire()
+
+    waiter = asyncio.ensure_future(limiter.acquire())
+    await asyncio.sleep(0)
+    limiter.release(0.001)
+    await waiter
+    assert limiter.in_flight == 1
+
+
+@pytest.mark.anyio
+async def test_upstream_ignores_client_errors_and_cancellation():
+    clock = Clock()
+    breaker = CircuitBreaker("t", min_requests=1, error_rate=0.5, clock=clock)
+    upstream = Upstream(
+        "t",
+        breaker=breaker,
+        limiter=AdaptiveLimiter("t"),
+        is_failure=lambda e: not (isinstance(e, httpx.HTTPStatusError) and e.response.status_code < 500),
+    )
+    request = httpx.Request("GET", "http://x")
+
+    with pytest.raises(httpx.HTTPStatusError):
+        async with upstream.call():
+            raise httpx.HTTPStatusError("404", request=request, response=httpx.Response(404, request=request))
+    assert breaker.totals() == (1, 0)
+
+    async def slow():
+        async with upstream.call():
+            await asyncio.sleep(1)
+
+    task = asyncio.ensure_future(slow())
+    await asyncio.sleep(0)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert breaker.totals() == (1, 0) and upstream.limiter.in_flight == 0
+
+    with pytest.raises(httpx.ConnectError):
+        async with upstream.call():
+            raise httpx.ConnectError("down")
+    assert breaker.state == OPEN
+
+
+@pytest.mark.anyio
+async def test_chat_returns_503_with_retry_after_when_nlu_breaker_open(monkeypatch):
+    from httpx import ASGITransport, AsyncClient
+
+    import main
+
+    breaker = main.upstreams["nlu"].breaker
+    monkeypatch.setattr(breaker, "state", OPEN)
+    monkeypatch.setattr(breaker, "until", breaker.clock() + 10)
+
+    async with AsyncClient(transport=ASGITransport(app=main.app), base_url="http://test") as ac:
+        resp = await ac.post("/chat", json={"message": "gehu me khaad"})
+
+    assert resp.status_code == 503
+    assert 9 <= int(resp.headers["retry-after"]) <= 10
@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+
+import deadlines
+from single_flight import SingleFlight
+
+
+@pytest.mark.anyio
+async def test_concurrent_identical_calls_share_one_upstream():
+    flights = SingleFlight("test")
+    calls = []
+
+    async def upstream(key):
+        calls.append(key)
+        await asyncio.sleep(0.01)
+        return f"answer:{key}"
+
+    results = await asyncio.gather(
+        *[flights.do("gehu", lambda: upstream("gehu")) for _ in range(50)],
+        flights.do("dhaan", lambda: upstream("dhaan")),
+    )
+
+    assert calls == ["gehu", "dhaan"]
+    assert results[:50] == ["answer:gehu"] * 50
+    assert len(flights) == 0
+
+    # call khatam → agli baar naya upstream call
+    await flights.do("gehu", lambda: upstream("gehu"))
+    assert len(calls) == 3
+
+
+@pytest.mark.anyio
+async def test_errors_are_shared_and_not_cached():
+    flights = SingleFlight("test")
+    attempts = []
+
+    async def failing():
+        attempts.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("429")
+
+    results = await asyncio.gather(*[flights.do("k", failing) for _ in range(5)], return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert len(attempts) == 1
+
+    with pytest.raises(RuntimeError):
+        await flights.do("k", failing)
+    assert len(attempts) == 2
+
+
+@pytest.mark.anyio
+async def test_leader_cancel_does_not_break_followers():
+    flights = SingleFlight("test")
+
+    async def slow():
+        await asyncio.sleep(0.02)
+        return "ok"
+
+    leader = asyncio.ensure_future(flights.do("k", slow))
+    await asyncio.sleep(0)
+    follower = asyncio.ensure_future(flights.do("k", slow))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await follower == "ok"
+
+
+@pytest.mark.anyio
+async def test_shared_call_gets_the_largest_waiter_budget():
+    flights = SingleFlight("test", budget=deadlines.Shared)
+    seen = []
+
+    async def upstream():
+        await asyncio.sleep(0.05)
+        seen.append(deadlines.remaining())
+        return "ok"
+
+    async def caller(budget):
+        token = deadlines.set_budget(budget)
+        try:
+            return await flights.do("k", upstream, timeout=deadlines.remaining())
+        finally:
+            deadlines._deadline.reset(token)
+
+    leader = asyncio.ensure_future(caller(0.01))
+    await asyncio.sleep(0)
+    follower = asyncio.ensure_future(caller(5))
+
+    # leader apne chhote budget par chhoot gaya, shared call follower ke budget par chala
+    with pytest.raises(asyncio.TimeoutError):
+        await leader
+    assert await follower == "ok"
+    assert 4 < seen[0] < 5
+    assert deadlines.remaining() is None
+
+
+@pytest.mark.anyio
+async def test_disabled_calls_every_time():
+    flights = SingleFlight("test", enabled=False)
+    calls = []
+
+    async def upstream():
+        calls.append(1)
+        await asyncio.sleep(0.001)
+        return 1
+
+    await asyncio.gather(*[flights.do("k", upstream) for _ in range(3)])
+    assert len(calls) == 3
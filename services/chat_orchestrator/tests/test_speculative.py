@@ -0,0 +1,89 @@
+import asyncio
+import time
+
+import pytest
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    import main
+    from answer_cache import AnswerCache
+
+    state = {"rag_delay": 0.0, "rag_hit": False, "llm_delay": 0.1, "llm_started": 0, "llm_cancelled": 0, "llm_plain": 0}
+
+    async def fake_rag(intent, entities, message):
+        await asyncio.sleep(state["rag_delay"])
+        if state["rag_hit"]:
+            return "120 kg urea", "fertilizer_table"
+        return "", "generic"
+
+    async def fake_stream(message, intent, entities, context_data):
+        state["llm_started"] += 1
+        try:
+            await asyncio.sleep(state["llm_delay"])
+        except asyncio.CancelledError:
+            state["llm_cancelled"] += 1
+            raise
+        yield {"type": "delta", "text": "LLM jawab"}
+        yield {"type": "done"}
+
+    async def fake_llm(*args, **kwargs):
+        state["llm_plain"] += 1
+        await asyncio.sleep(state["llm_delay"])
+        return "LLM jawab"
+
+    monkeypatch.setattr(main, "call_rag_service", fake_rag)
+    monkeypatch.setattr(main, "stream_llm_service", fake_stream)
+    monkeypatch.setattr(main, "call_llm_service", fake_llm)
+    monkeypatch.setattr(main, "answer_cache", AnswerCache())
+    monkeypatch.setattr(main, "SPECULATIVE_HEDGE_MS", 20)
+    return state
+
+
+def _outcome(name: str) -> float:
+    import main
+    return main.SPECULATION.labels(name)._value.get()
+
+
+@pytest.mark.anyio
+async def test_rag_miss_overlaps_llm_with_slow_rag(pipeline):
+    import main
+
+    pipeline.update(rag_delay=0.1, llm_delay=0.1)
+    saved = _outcome("saved")
+    t0 = time.perf_counter()
+    answer = await main.speculative_answer("gehu me peela patta", "disease", {"crop": "gehu"})
+    elapsed = time.perf_counter() - t0
+
+    assert answer == "LLM jawab"
+    # sequential hota to ~0.2s
+    assert elapsed < 0.18
+    assert _outcome("saved") == saved + 1
+    # LLM jawab cache me
+    assert await main.cached_answer("gehu me peela patta", "disease", {"crop": "gehu"}) == "LLM jawab"
+
+
+@pytest.mark.anyio
+async def test_rag_hit_cancels_running_llm(pipeline):
+    import main
+
+    pipeline.update(rag_delay=0.05, rag_hit=True, llm_delay=1.0)
+    cancelled = _outcome("cancelled")
+    answer = await main.speculative_answer("gehu khad", "fertilizer", {"crop": "gehu"})
+    await asyncio.sleep(0)
+
+    assert "120 kg urea" in answer
+    assert pipeline["llm_started"] == 1 and pipeline["llm_cancelled"] == 1
+    assert _outcome("cancelled") == cancelled + 1
+
+
+@pytest.mark.anyio
+async def test_fast_rag_within_hedge_never_speculates(pipeline):
+    import main
+
+    pipeline.update(rag_delay=0.0, rag_hit=False)
+    answer = await main.speculative_answer("dhaan me paani", "water", {"crop": "dhaan"})
+
+    assert answer == "LLM jawab"
+    # hedge ke andar RAG miss → normal (non-speculative) LLM call
+    assert pipeline["llm_started"] == 0 and pipeline["llm_plain"] == 1
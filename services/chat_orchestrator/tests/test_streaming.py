@@ -0,0 +1,98 @@
+import json
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+
+def _events(body: str) -> list[dict]:
+    return [json.loads(line[5:]) for line in body.splitlines() if line.startswith("data:")]
+
+
+@pytest.fixture
+def stubs(monkeypatch):
+    import main
+    from answer_cache import AnswerCache
+
+    state = {"saved": [], "tokens": ["Neem", " ka", " tel"], "fail": False, "done": True}
+
+    async def fake_nlu(message):
+        return "disease", {"crop": "kapas"}
+
+    async def fake_rag(intent, entities, message):
+        return "", "generic"
+
+    async def fake_stream(message, intent, entities, context_data):
+        for token in state["tokens"]:
+            yield {"type": "delta", "text": token}
+        if state["fail"]:
+            raise RuntimeError("llm_service reset")
+        if state["done"]:
+            yield {"type": "done"}
+
+    async def fake_save(session_id, turns):
+        state["saved"].append(turns)
+
+    monkeypatch.setattr(main, "call_nlu_service", fake_nlu)
+    monkeypatch.setattr(main, "call_rag_service", fake_rag)
+    monkeypatch.setattr(main, "stream_llm_service", fake_stream)
+    monkeypatch.setattr(main, "save_chat_turns", fake_save)
+    monkeypatch.setattr(main, "answer_cache", AnswerCache())
+    return state
+
+
+@pytest.mark.anyio
+async def test_chat_stream_relays_llm_tokens_then_serves_cache(stubs):
+    import main
+
+    async with AsyncClient(transport=ASGITransport(app=main.app), base_url="http://test") as ac:
+        first = await ac.post("/chat/stream", json={"session_id": "s1", "message": "kapas me sundi"})
+        second = await ac.post("/chat/stream", json={"session_id": "s1", "message": "kapas me sundi"})
+        metrics = await ac.get("/metrics")
+
+    assert first.headers["content-type"].startswith("text/event-stream")
+    events = _events(first.text)
+    assert events[0] == {"type": "meta", "session_id": "s1", "intent": "disease", "entities": {"crop": "kapas"}}
+    assert [e["text"] for e in events if e["type"] == "delta"] == ["Neem", " ka", " tel"]
+    assert events[-1] == {"type": "done", "session_id": "s1", "source": "llm"}
+
+    # poora jawab history me + cache me
+    assert stubs["saved"][0] == [("user", "kapas me sundi"), ("bot", "Neem ka tel")]
+    cached = _events(second.text)
+    assert [e["text"] for e in cached if e["type"] == "delta"] == ["Neem ka tel"]
+    assert cached[-1]["source"] == "cache"
+    assert 'orchestrator_chat_ttft_seconds_count{path="llm"}' in metrics.text
+
+
+@pytest.mark.anyio
+async def test_chat_stream_failure_keeps_partial_and_skips_cache(stubs):
+    import main
+
+    stubs["fail"] = True
+    async with AsyncClient(transport=ASGITransport(app=main.app), base_url="http://test") as ac:
+        partial = await ac.post("/chat/stream", json={"message": "kapas me sundi"})
+        stubs["tokens"] = []
+        empty = await ac.post("/chat/stream", json={"message": "kapas me sundi"})
+
+    deltas = [e["text"] for e in _events(partial.text) if e["type"] == "delta"]
+    assert deltas == ["Neem", " ka", " tel"]
+
+    # koi token nahi aaya → fallback text, cache me kuch nahi gaya
+    events = _events(empty.text)
+    assert [e["text"] for e in events if e["type"] == "delta"] == [main.FALLBACK_ANSWER]
+    assert events[-1]["source"] == "fallback"
+
+
+@pytest.mark.anyio
+async def test_chat_stream_without_done_is_not_cached(stubs):
+    import main
+
+    stubs["done"] = False
+    async with AsyncClient(transport=ASGITransport(app=main.app), base_url="http://test") as ac:
+        await ac.post("/chat/stream", json={"message": "kapas me sundi"})
+        stubs["done"] = True
+        stubs["tokens"] = ["Poora", " jawab"]
+        second = await ac.post("/chat/stream", json={"message": "kapas me sundi"})
+
+    # adhoora jawab cache me nahi gaya → doosri baar phir LLM
+    assert [e["text"] for e in _events(second.text) if e["type"] == "delta"] == ["Poora", " jawab"]
+    assert _events(second.text)[-1]["source"] == "llm"
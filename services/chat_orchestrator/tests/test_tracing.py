@@ -0,0 +1,82 @@
+import json
+
+import httpx
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+GATEWAY_SPAN = "00f067aa0ba902b7"
+
+
+@pytest.fixture
+def traced(monkeypatch, tmp_path):
+    import clients
+    import main
+    import tracing
+
+    calls = {}
+
+    async def handler(request: httpx.Request):
+        calls[request.url.path] = request
+        if request.url.path == "/analyze":
+            return httpx.Response(200, json={"intent": "fertilizer", "crop": "gehu"})
+        if request.url.path == "/query":
+            return httpx.Response(200, json={"context": "", "source": "generic"})
+        return httpx.Response(200, json={"final_answer": "Urea do baar dein"})
+
+    async def fake_enqueue(rows):
+        pass
+
+    transport = httpx.MockTransport(handler)
+    for name, timeout in clients.UPSTREAM_TIMEOUTS.items():
+        monkeypatch.setitem(clients._clients, name, clients.build_client(timeout, transport=transport))
+    monkeypatch.setattr(main.history_writer, "enqueue", fake_enqueue)
+    monkeypatch.setattr(main, "answer_cache", None)
+
+    path = tmp_path / "spans.jsonl"
+    monkeypatch.setattr(tracing, "_exporter", tracing.FileExporter(str(path)))
+    return calls, path
+
+
+@pytest.mark.anyio
+async def test_chat_trace_spans_every_stage_and_reaches_upstreams(traced):
+    import main
+    import tracing
+
+    calls, path = traced
+    async with AsyncClient(transport=ASGITransport(app=main.app), base_url="http://test") as ac:
+        resp = await ac.post(
+            "/chat",
+            json={"message": "gehu me khaad"},
+            headers={"traceparent": f"00-{TRACE_ID}-{GATEWAY_SPAN}-01"},
+        )
+    tracing.shutdown()
+
+    assert resp.headers["x-request-id"] == TRACE_ID
+    spans = {s["name"]: s for s in map(json.loads, path.read_text().splitlines())}
+    assert {"POST /chat", "nlu", "rag", "llm", "history_write"} <= set(spans)
+    assert all(s["trace_id"] == TRACE_ID for s in spans.values())
+
+    server = spans["POST /chat"]
+    assert server["parent_id"] == GATEWAY_SPAN and server["attrs"]["status"] == 200
+    for stage in ("nlu", "rag", "llm", "history_write"):
+        assert spans[stage]["parent_id"] == server["span_id"]
+    assert spans["rag"]["attrs"]["source"] == "generic"
+
+    # har upstream ko usi stage ka span parent milta hai
+    for path_, stage in (("/analyze", "nlu"), ("/query", "rag"), ("/generate", "llm")):
+        assert calls[path_].headers["traceparent"] == f"00-{TRACE_ID}-{spans[stage]['span_id']}-01"
+    assert json.loads(calls["/generate"].content)["request_id"] == TRACE_ID
+
+
+@pytest.mark.anyio
+async def test_metrics_expose_stage_and_rag_source_histograms(traced):
+    import main
+
+    async with AsyncClient(transport=ASGITransport(app=main.app), base_url="http://test") as ac:
+        await ac.post("/chat", json={"message": "gehu me khaad"})
+        scrape = await ac.get("/metrics")
+
+    assert 'stage_latency_seconds_count{service="chat_orchestrator",stage="rag"}' in scrape.text
+    assert 'stage_latency_seconds_count{service="chat_orchestrator",stage="POST /chat"}' in scrape.text
+    assert 'orchestrator_rag_latency_seconds_count{source="generic"}' in scrape.text
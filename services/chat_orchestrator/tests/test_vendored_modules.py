@@ -0,0 +1,32 @@
+from pathlib import Path
+
+import pytest
+
+# ----------------- Vendored Modules -----------------
+#
+# Har service ka apna Docker context hai, isliye ye modules har service me
+# copy hote hain. chat_orchestrator wali copy asli hai: badlav wahan karo,
+# phir baaki copies par cp. Koi copy ek byte bhi alag ho to yahan fail.
+# (nlu.py / lexicon ka contract test_nlu_contract.py me.)
+
+SERVICES_DIR = Path(__file__).resolve().parents[2]
+HERE = Path(__file__).resolve().parents[1]
+
+VENDORED = {
+    "db.py": ["rag_services"],
+    "resilience.py": ["api_gateway", "llm-services/services"],
+    "single_flight.py": ["llm-services/services"],
+    "deadlines.py": ["api_gateway", "nlu_llm", "rag_services", "llm-services/services"],
+    "tracing.py": ["api_gateway", "nlu_llm", "rag_services", "llm-services/services"],
+}
+
+
+@pytest.mark.parametrize(
+    ("name", "copy_dir"),
+    [(name, copy_dir) for name, dirs in VENDORED.items() for copy_dir in dirs],
+)
+def test_vendored_copy_matches_orchestrator(name, copy_dir):
+    copy = SERVICES_DIR / copy_dir / name
+    if not copy.parent.is_dir():
+        pytest.skip(f"{copy_dir} source not next to chat_orchestrator")
+    assert copy.read_bytes() == (HERE / name).read_bytes(), f"{copy_dir}/{name} drifted from chat_orchestrator"
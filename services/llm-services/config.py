@@ -9,3 +9,36 @@ PORT = int(os.getenv("PORT", 8000))
 if not SERVICE_API_KEY:
     print("Missing SERVICE_API_KEY", file=sys.stderr)
     sys.exit(1)
+
+# ---------------- Semantic Cache ----------------
+
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() == "true"
+SEMANTIC_CACHE_CAPACITY = int(os.getenv("SEMANTIC_CACHE_CAPACITY", 5000))
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", 0.9))
+SEMANTIC_CACHE_TTL = float(os.getenv("SEMANTIC_CACHE_TTL", 86400))
+SEMANTIC_CACHE_PATH = os.getenv(
+    "SEMANTIC_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "semantic_cache.npz"),
+)
+SEMANTIC_CACHE_SAVE_INTERVAL = float(os.getenv("SEMANTIC_CACHE_SAVE_INTERVAL", 60))
+
+# ---------------- Single-Flight ----------------
+
+# same prompt ke concurrent requests ek hi Groq call share karte hain
+SINGLE_FLIGHT_ENABLED = os.getenv("SINGLE_FLIGHT_ENABLED", "true").lower() == "true"
+
+# ---------------- Tracing ----------------
+
+# set ho to spans JSON lines me (orchestrator ke trace ke child spans)
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH", "")
+
+# ---------------- Resilience ----------------
+
+# Groq breaker: sliding window error rate + half-open probes
+BREAKER_WINDOW_S = float(os.getenv("BREAKER_WINDOW_S", 30))
+BREAKER_MIN_REQUESTS = int(os.getenv("BREAKER_MIN_REQUESTS", 5))
+BREAKER_ERROR_RATE = float(os.getenv("BREAKER_ERROR_RATE", 0.5))
+BREAKER_COOLDOWN_S = float(os.getenv("BREAKER_COOLDOWN_S", 30))
+BREAKER_HALF_OPEN_PROBES = int(os.getenv("BREAKER_HALF_OPEN_PROBES", 2))
+# set ho to saare uvicorn workers breaker state is SQLite file se share karte hain
+RESILIENCE_STATE_DB = os.getenv("RESILIENCE_STATE_DB", "")
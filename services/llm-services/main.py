@@ -1,10 +1,35 @@
-from fastapi import FastAPI, Header, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+import asyncio
+import hashlib
+import json
 import time
 from fastapi.concurrency import run_in_threadpool
 
-from config import SERVICE_API_KEY
-from services.llm_client import call_llm
+from config import (
+    SERVICE_API_KEY,
+    SEMANTIC_CACHE_ENABLED,
+    SEMANTIC_CACHE_CAPACITY,
+    SEMANTIC_CACHE_THRESHOLD,
+    SEMANTIC_CACHE_TTL,
+    SEMANTIC_CACHE_PATH,
+    SEMANTIC_CACHE_SAVE_INTERVAL,
+    SINGLE_FLIGHT_ENABLED,
+    BREAKER_WINDOW_S,
+    BREAKER_MIN_REQUESTS,
+    BREAKER_ERROR_RATE,
+    BREAKER_COOLDOWN_S,
+    BREAKER_HALF_OPEN_PROBES,
+    RESILIENCE_STATE_DB,
+    TRACE_EXPORT_PATH,
+)
+from services import deadlines, tracing
+from services.deadlines import DeadlineExceeded, DeadlineMiddleware, deadline_exceeded_handler
+from services.llm_client import LLMError, call_llm, close_client, init_client, stream_llm
+from services.resilience import CircuitBreaker, CircuitOpenError, OPEN, SharedState, Upstream
+from services.semantic_cache import SemanticCache, namespace_of
+from services.single_flight import SingleFlight
 from utils.formatter import build_prompt
 
 from prometheus_client import Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
@@ -12,18 +37,105 @@ from prometheus_client import Counter, Histogram, generate_latest, CONTENT_TYPE_
 # ---------------- App Init ----------------
 
 app = FastAPI(title="AI Agri Assistant - LLM Service")
+# orchestrator ka X-Deadline-Ms: Groq timeout / retries isi budget me
+app.add_middleware(DeadlineMiddleware)
+app.add_exception_handler(DeadlineExceeded, deadline_exceeded_handler)
+# orchestrator ke traceparent se isi trace ke child spans (semantic_cache, groq)
+tracing.configure("llm_service", TRACE_EXPORT_PATH)
+app.add_middleware(tracing.TracingMiddleware)
 
 REQ_COUNT = Counter("llm_requests_total", "Total LLM requests")
 REQ_LATENCY = Histogram("llm_request_latency_seconds", "LLM request latency")
+TTFT = Histogram(
+    "llm_ttft_seconds",
+    "Time to first streamed token",
+    ["source"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10),
+)
 
-# ---------------- Circuit Breaker State ----------------
+# ---------------- Circuit Breaker ----------------
 
-CIRCUIT_OPEN = False
-CIRCUIT_UNTIL = 0
-FAIL_COUNT = 0
+def _is_groq_failure(exc: BaseException) -> bool:
+    # request ka budget khatam hona Groq ki kharabi nahi
+    if isinstance(exc, DeadlineExceeded):
+        return False
+    # bad request (prompt bahut lamba waghera) Groq ki kharabi nahi
+    return not (isinstance(exc, LLMError) and exc.status in (400, 413, 422))
 
-FAIL_THRESHOLD = 3      # consecutive failures
-COOLDOWN = 30           # seconds
+
+resilience_state = SharedState(RESILIENCE_STATE_DB) if RESILIENCE_STATE_DB else None
+
+# concurrency limit llm_client me (har Groq attempt par); breaker yahan (har shared call par)
+groq = Upstream(
+    "groq",
+    breaker=CircuitBreaker(
+        "groq",
+        window=BREAKER_WINDOW_S,
+        min_requests=BREAKER_MIN_REQUESTS,
+        error_rate=BREAKER_ERROR_RATE,
+        cooldown=BREAKER_COOLDOWN_S,
+        half_open_probes=BREAKER_HALF_OPEN_PROBES,
+        shared=resilience_state,
+    ),
+    is_failure=_is_groq_failure,
+)
+
+
+def circuit_open() -> bool:
+    return groq.breaker.state == OPEN
+
+# ---------------- Single-Flight ----------------
+
+llm_flights = SingleFlight("llm", enabled=SINGLE_FLIGHT_ENABLED, budget=deadlines.Shared)
+
+# ---------------- Semantic Cache ----------------
+
+semantic_cache = None
+if SEMANTIC_CACHE_ENABLED:
+    semantic_cache = SemanticCache(
+        capacity=SEMANTIC_CACHE_CAPACITY,
+        threshold=SEMANTIC_CACHE_THRESHOLD,
+        ttl=SEMANTIC_CACHE_TTL,
+        path=SEMANTIC_CACHE_PATH,
+    )
+
+_save_task = None
+
+
+async def _persist_semantic_cache():
+    # restart ke baad cache garam rahe
+    while True:
+        await asyncio.sleep(SEMANTIC_CACHE_SAVE_INTERVAL)
+        if semantic_cache.dirty:
+            try:
+                await run_in_threadpool(semantic_cache.save)
+            except Exception as e:
+                print("⚠️ Semantic cache save failed:", e)
+
+
+@app.on_event("startup")
+async def startup_event():
+    global _save_task
+    init_client()
+    if semantic_cache is not None:
+        try:
+            loaded = await run_in_threadpool(semantic_cache.load)
+            print(f"🧠 Semantic cache: {loaded} entries loaded")
+        except Exception as e:
+            print("⚠️ Semantic cache load failed:", e)
+        _save_task = asyncio.create_task(_persist_semantic_cache())
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await close_client()
+    if _save_task is not None:
+        _save_task.cancel()
+    if semantic_cache is not None and semantic_cache.dirty:
+        await run_in_threadpool(semantic_cache.save)
+    if resilience_state is not None:
+        resilience_state.close()
+    tracing.shutdown()
 
 # ---------------- Request Model ----------------
 
@@ -36,25 +148,86 @@ class LLMRequest(BaseModel):
 
 # ---------------- LLM Generate Endpoint ----------------
 
-@app.post("/generate")
-async def generate(req: LLMRequest, x_api_key: str = Header(None)):
+FALLBACK_ANSWER = (
+    "Is sawal ke liye abhi exact jankari uplabdh nahi hai. "
+    "Kripya thoda aur detail batayein."
+)
+
 
-    global FAIL_COUNT, CIRCUIT_OPEN, CIRCUIT_UNTIL
+def prompt_key(prompt: dict) -> str:
+    return hashlib.sha1(f"{prompt['system']}\x00{prompt['user']}".encode("utf-8")).hexdigest()
 
+
+def _check_auth(x_api_key: str | None):
     # 🔐 Auth check
     if x_api_key != SERVICE_API_KEY:
         raise HTTPException(status_code=401, detail="Unauthorized")
 
-    # 🔌 Circuit breaker check
-    now = time.time()
-    if CIRCUIT_OPEN and now < CIRCUIT_UNTIL:
+
+def _check_breaker():
+    # 🔌 Circuit breaker check — semantic cache hit ke baad hi (Groq down ho to bhi cache se jawab)
+    try:
+        groq.check()
+    except CircuitOpenError as e:
         raise HTTPException(
             status_code=503,
-            detail="LLM temporarily unavailable, please try again shortly"
+            detail="LLM temporarily unavailable, please try again shortly",
+            headers={"Retry-After": str(max(1, round(e.retry_after)))},
         )
 
+
+def _trace_request(req: LLMRequest) -> str | None:
+    # orchestrator body me bhi request_id bhejta hai (header ke bina aaye to bhi log me dikhe)
+    request_id = req.request_id or tracing.request_id()
+    span = tracing.current()
+    if span is not None:
+        span.set(request_id=request_id, intent=req.intent)
+    return request_id
+
+
+def _semantic_lookup(req: LLMRequest, namespace: str):
+    with tracing.span("semantic_cache") as span:
+        cached = semantic_cache.lookup(req.user_message, namespace)
+        span.set(hit=cached is not None)
+    return cached
+
+
+async def _call_upstream(prompt: dict) -> str:
+    # breaker yahan update hota hai: ek shared call fail = ek failure (followers nahi gine jaate)
+    async with groq.call(), tracing.span("groq"):
+        # pooled async client: threadpool slot nahi, connection reuse
+        return await call_llm(prompt["system"], prompt["user"])
+
+
+@app.post("/generate")
+async def generate(req: LLMRequest, x_api_key: str = Header(None)):
+
+    _check_auth(x_api_key)
+
     REQ_COUNT.inc()
     start_time = time.time()
+    request_id = _trace_request(req)
+
+    # 🧠 Paraphrase pehle poocha ja chuka hai → Groq call nahi
+    namespace = namespace_of(req.intent, req.entities, req.context_data)
+    if semantic_cache is not None:
+        cached = _semantic_lookup(req, namespace)
+        if cached is not None:
+            answer, score = cached
+            latency = time.time() - start_time
+            REQ_LATENCY.observe(latency)
+            return {
+                "final_answer": answer,
+                "metadata": {
+                    "model": "groq",
+                    "cache": "semantic",
+                    "similarity": round(score, 4),
+                    "latency_s": latency,
+                    "request_id": request_id,
+                }
+            }
+
+    _check_breaker()
 
     prompt = build_prompt(
         req.user_message,
@@ -64,33 +237,23 @@ async def generate(req: LLMRequest, x_api_key: str = Header(None)):
     )
 
     try:
-        # ✅ Sync LLM safely called inside async endpoint
-        answer = await run_in_threadpool(
-            call_llm,
-            prompt["system"],
-            prompt["user"]
+        # same prompt pehle se in-flight hai → usi Groq call ka result
+        answer = await llm_flights.do(
+            prompt_key(prompt), lambda: _call_upstream(prompt), timeout=deadlines.remaining()
         )
 
-        # success → reset breaker
-        FAIL_COUNT = 0
-        CIRCUIT_OPEN = False
+        if semantic_cache is not None:
+            semantic_cache.add(req.user_message, namespace, answer)
 
     except Exception as e:
-        FAIL_COUNT += 1
-        if FAIL_COUNT >= FAIL_THRESHOLD:
-            CIRCUIT_OPEN = True
-            CIRCUIT_UNTIL = time.time() + COOLDOWN
-
         REQ_LATENCY.observe(time.time() - start_time)
 
         return {
-            "final_answer": (
-                "Is sawal ke liye abhi exact jankari uplabdh nahi hai. "
-                "Kripya thoda aur detail batayein."
-            ),
+            "final_answer": FALLBACK_ANSWER,
             "metadata": {
                 "error": str(e),
-                "circuit_open": CIRCUIT_OPEN
+                "circuit_open": circuit_open(),
+                "request_id": request_id,
             }
         }
 
@@ -101,12 +264,85 @@ async def generate(req: LLMRequest, x_api_key: str = Header(None)):
         "final_answer": answer,
         "metadata": {
             "model": "groq",
-            "latency_s": latency
+            "latency_s": latency,
+            "request_id": request_id,
         }
     }
 
+# ---------------- Streaming Endpoint ----------------
+#
+# Server-Sent Events: har event `data: {json}\n\n`, type = delta | done | error.
+# Farmer ko pehla token aate hi text dikhne lagta hai (poora jawab ka wait nahi).
+
+def sse(event: dict) -> str:
+    return f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+
+async def _cached_answer(cached: tuple[str, float], start_time: float):
+    answer, score = cached
+    TTFT.labels("cache").observe(time.time() - start_time)
+    yield sse({"type": "delta", "text": answer})
+    latency = time.time() - start_time
+    REQ_LATENCY.observe(latency)
+    yield sse({"type": "done", "metadata": {
+        "model": "groq", "cache": "semantic",
+        "similarity": round(score, 4), "latency_s": latency,
+    }})
+
+
+async def _stream_answer(req: LLMRequest, namespace: str, start_time: float):
+    prompt = build_prompt(req.user_message, req.intent, req.entities, req.context_data)
+
+    parts = []
+    try:
+        # client disconnect (GeneratorExit) breaker me failure nahi ginta
+        async with groq.call(), tracing.span("groq", stream=True):
+            async for delta in stream_llm(prompt["system"], prompt["user"]):
+                if not parts:
+                    TTFT.labels("groq").observe(time.time() - start_time)
+                parts.append(delta)
+                yield sse({"type": "delta", "text": delta})
+    except Exception as e:
+        REQ_LATENCY.observe(time.time() - start_time)
+        # kuch tokens ja chuke hain to fallback text nahi jodte
+        if not parts:
+            yield sse({"type": "delta", "text": FALLBACK_ANSWER})
+        yield sse({"type": "error", "error": str(e), "partial": bool(parts), "circuit_open": circuit_open()})
+        return
+
+    answer = "".join(parts).strip()
+    if semantic_cache is not None and answer:
+        semantic_cache.add(req.user_message, namespace, answer)
+
+    latency = time.time() - start_time
+    REQ_LATENCY.observe(latency)
+    yield sse({"type": "done", "metadata": {"model": "groq", "latency_s": latency}})
+
+
+@app.post("/generate/stream")
+async def generate_stream(req: LLMRequest, x_api_key: str = Header(None)):
+
+    # auth / breaker stream shuru hone se pehle — proper status code mile
+    _check_auth(x_api_key)
+
+    REQ_COUNT.inc()
+    start_time = time.time()
+    _trace_request(req)
+    namespace = namespace_of(req.intent, req.entities, req.context_data)
+    cached = _semantic_lookup(req, namespace) if semantic_cache is not None else None
+    if cached is not None:
+        body = _cached_answer(cached, start_time)
+    else:
+        _check_breaker()
+        body = _stream_answer(req, namespace, start_time)
+    return StreamingResponse(
+        body,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 # ---------------- Metrics Endpoint ----------------
 
 @app.get("/metrics")
 def metrics():
-    return generate_latest(), 200, {"Content-Type": CONTENT_TYPE_LATEST}
\ No newline at end of file
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
\ No newline at end of file
@@ -0,0 +1,77 @@
+import re
+import zlib
+
+import numpy as np
+
+# ---------------- Hashed N-gram Embedder ----------------
+#
+# Semantic prompt cache ka offline embedder. rag_services/embeddings.py
+# jaisa tarika (word stems + character n-grams, signed feature hashing
+# crc32 se, phir L2 normalize) par copy nahi — apna alag module, apne tests
+# (tests/test_embeddings.py). Prompt cache ke liye: stopwords hataye jaate
+# hain aur agri synonyms ek canonical word par map hote hain, taaki "chawal
+# ke liye urvarak" aur "dhaan me khaad" paas aayein.
+
+TOKEN_RE = re.compile(r"[a-z0-9ऀ-ॿ]+")
+
+SYNONYMS = {
+    "gehun": "gehu", "gehoon": "gehu", "wheat": "gehu",
+    "dhan": "dhaan", "chawal": "dhaan", "chaawal": "dhaan", "rice": "dhaan", "paddy": "dhaan",
+    "sarso": "sarson", "mustard": "sarson",
+    "khad": "khaad", "urvarak": "khaad", "fertilizer": "khaad", "fertiliser": "khaad",
+    "beemari": "bimari", "bimaari": "bimari", "rog": "bimari", "disease": "bimari",
+    "pani": "paani", "water": "paani", "irrigation": "sinchai",
+    "bhaav": "bhav", "price": "bhav", "daam": "bhav", "rate": "bhav",
+    "kitni": "kitna", "kitne": "kitna", "how": "kitna",
+}
+
+STOPWORDS = {
+    "ke", "ki", "ka", "ko", "me", "mein", "main", "hai", "hain", "ho", "liye",
+    "se", "par", "pe", "to", "bhi", "aur", "ya", "mera", "meri", "mere",
+    "batao", "bataye", "bataiye", "please", "plz", "sir", "ji", "the", "is",
+    "a", "an", "of", "for", "in", "on", "and", "my", "do", "de", "dena", "chahiye",
+}
+
+
+def stem(token: str) -> str:
+    if len(token) < 4:
+        return token
+    if token.endswith(("on", "en")) and len(token) > 5:
+        token = token[:-2]
+    return token.rstrip("aei") if len(token.rstrip("aei")) >= 3 else token
+
+
+def terms(text: str) -> list[str]:
+    out = []
+    for token in TOKEN_RE.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        out.append(stem(SYNONYMS.get(token, token)))
+    return out
+
+
+class HashingEmbedder:
+    def __init__(self, dim: int = 256, ngram_range: tuple[int, int] = (3, 5), word_weight: float = 2.0):
+        self.dim = dim
+        self.ngram_range = ngram_range
+        self.word_weight = word_weight
+
+    def _features(self, text: str):
+        lo, hi = self.ngram_range
+        for word in terms(text):
+            yield f"w:{word}", self.word_weight
+            padded = f"<{word}>"
+            for n in range(lo, hi + 1):
+                for i in range(len(padded) - n + 1):
+                    yield padded[i:i + n], 1.0
+
+    def embed(self, text: str) -> np.ndarray:
+        vec = np.zeros(self.dim, dtype=np.float32)
+        for feature, weight in self._features(text):
+            h = zlib.crc32(feature.encode("utf-8"))
+            sign = 1.0 if h & 0x80000000 else -1.0
+            vec[h % self.dim] += sign * weight
+        norm = np.linalg.norm(vec)
+        if norm > 0:
+            vec /= norm
+        return vec
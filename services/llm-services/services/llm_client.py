@@ -1,12 +1,124 @@
+import asyncio
+import itertools
+import json
 import os
-import requests
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator
+
+import httpx
+
+from services import deadlines
+from services.resilience import AdaptiveLimiter
 
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 MODEL = os.getenv("GROQ_MODEL", "llama3-8b-8192")
 
-GROQ_URL = "https://api.groq.com/openai/v1/chat/completions"
+# load test me fake server (benchmarks/fake_groq.py) par point kar sakte hain
+GROQ_URL = os.getenv("GROQ_URL", "https://api.groq.com/openai/v1/chat/completions")
+
+# ---------------- Pool / Concurrency ----------------
+
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", 20))
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", 5))
+# adaptive (AIMD) limit: 429 / 5xx / latency badhne par ghatti, warna MAX tak badhti
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 64))
+LLM_MIN_CONCURRENCY = int(os.getenv("LLM_MIN_CONCURRENCY", 2))
+LLM_INITIAL_CONCURRENCY = int(os.getenv("LLM_INITIAL_CONCURRENCY", 16))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", 100))
+LLM_MAX_KEEPALIVE = int(os.getenv("LLM_MAX_KEEPALIVE", 20))
+# httpcore pool har request assign karte waqt saari connections scan karta hai
+# (cost ~ queued × connections); ek bade pool ki jagah kuch chhote pools
+# round-robin me — 600 concurrent par ~6x tez (benchmarks/bench_llm_client.py)
+LLM_POOL_SHARDS = int(os.getenv("LLM_POOL_SHARDS", 4))
+
+# ---------------- Retry ----------------
+
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 3))
+LLM_RETRY_BASE = float(os.getenv("LLM_RETRY_BASE", 0.5))
+LLM_RETRY_MAX = float(os.getenv("LLM_RETRY_MAX", 8))
+# isse lamba Retry-After → wait nahi, turant fail (request timeout se pehle)
+LLM_RETRY_AFTER_MAX = float(os.getenv("LLM_RETRY_AFTER_MAX", 30))
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class LLMError(RuntimeError):
+    def __init__(self, message: str, status: int | None = None):
+        super().__init__(message)
+        self.status = status
+
+
+_clients: list[httpx.AsyncClient] = []
+_next_client = None
+_limiter: AdaptiveLimiter | None = None
+
+
+def init_client(transport: httpx.AsyncBaseTransport | None = None):
+    """Startup par pooled clients (TLS connection reuse) + adaptive concurrency limit."""
+    global _clients, _next_client, _limiter
+    shards = max(1, LLM_POOL_SHARDS)
+    _clients = [
+        httpx.AsyncClient(
+            timeout=httpx.Timeout(LLM_TIMEOUT, connect=LLM_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=max(1, LLM_MAX_CONNECTIONS // shards),
+                max_keepalive_connections=max(1, LLM_MAX_KEEPALIVE // shards),
+            ),
+            transport=transport,
+            # timeout = min(LLM_TIMEOUT, orchestrator se mila bacha hua budget);
+            # header Groq ko nahi bhejte
+            event_hooks={"request": [deadlines.httpx_hook(propagate=False)]},
+        )
+        for _ in range(shards)
+    ]
+    _next_client = itertools.cycle(_clients)
+    _limiter = AdaptiveLimiter(
+        "groq",
+        initial=min(LLM_INITIAL_CONCURRENCY, LLM_MAX_CONCURRENCY),
+        min_limit=LLM_MIN_CONCURRENCY,
+        max_limit=LLM_MAX_CONCURRENCY,
+    )
+
+
+async def close_client():
+    global _clients, _next_client
+    for client in _clients:
+        await client.aclose()
+    _clients = []
+    _next_client = None
+
 
-def call_llm(system, user, max_tokens=300):
+def get_client() -> httpx.AsyncClient:
+    if not _clients:
+        init_client()
+    return next(_next_client)
+
+
+def retry_after_seconds(value: str | None) -> float | None:
+    """Retry-After: seconds ya HTTP-date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, retry_after: float | None = None) -> float:
+    # full jitter: sab clients ek saath retry na karein
+    delay = random.uniform(0, min(LLM_RETRY_MAX, LLM_RETRY_BASE * 2 ** attempt))
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
+
+def _request(system, user, max_tokens, stream=False) -> tuple[dict, dict]:
     if not GROQ_API_KEY:
         raise RuntimeError("GROQ_API_KEY not set inside container")
 
@@ -24,16 +136,113 @@ def call_llm(system, user, max_tokens=300):
         "temperature": 0.4,
         "max_tokens": max_tokens
     }
+    if stream:
+        payload["stream"] = True
+    return headers, payload
 
-    resp = requests.post(
-        GROQ_URL,
-        headers=headers,
-        json=payload,
-        timeout=20
-    )
 
+def _retry_after_or_raise(resp: httpx.Response, attempt: int) -> float | None:
+    """Non-200 response: retry karna hai to Retry-After (ya None), warna LLMError."""
     # 🔥 VERY IMPORTANT FOR DEBUG
-    if resp.status_code != 200:
-        raise RuntimeError(f"{resp.status_code} {resp.text}")
+    error = LLMError(f"{resp.status_code} {resp.text[:500]}", status=resp.status_code)
+    if resp.status_code not in RETRY_STATUS or attempt == LLM_MAX_RETRIES:
+        raise error
+    retry_after = retry_after_seconds(resp.headers.get("retry-after"))
+    if retry_after is not None and retry_after > LLM_RETRY_AFTER_MAX:
+        raise error
+    return retry_after
+
+
+async def _backoff(attempt: int, retry_after: float | None):
+    delay = backoff_delay(attempt, retry_after)
+    left = deadlines.remaining()
+    if left is not None and delay >= left:
+        # retry deadline ke baad hi ho paata — caller ja chuka hoga
+        raise deadlines.DeadlineExceeded(f"Groq retry in {delay:.2f}s would miss the request deadline")
+    print(f"⚠️ Groq retry {attempt + 1}/{LLM_MAX_RETRIES} in {delay:.2f}s")
+    await asyncio.sleep(delay)
+
+
+async def call_llm(system, user, max_tokens=300):
+    headers, payload = _request(system, user, max_tokens)
+
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        retry_after = None
+        exhausted = None
+        deadlines.check("Groq call")
+        # slot sirf request ke dauran; backoff sleep me doosre chal sakein
+        async with _limiter.slot() as slot:
+            try:
+                resp = await get_client().post(GROQ_URL, headers=headers, json=payload)
+            except httpx.TransportError as e:
+                if deadlines.expired():
+                    # hamara budget khatam hua, Groq overloaded nahi → limit mat ghatao
+                    exhausted = e
+                else:
+                    slot.drop()
+                    if attempt == LLM_MAX_RETRIES:
+                        raise LLMError(f"Groq unreachable: {e!r}") from e
+                resp = None
+            else:
+                if resp.status_code in RETRY_STATUS:
+                    # Groq overloaded → limit ghatao
+                    slot.drop()
+
+        if exhausted is not None:
+            raise deadlines.DeadlineExceeded("Groq call ran out of request budget") from exhausted
+        if resp is not None:
+            if resp.status_code == 200:
+                return resp.json()["choices"][0]["message"]["content"].strip()
+            retry_after = _retry_after_or_raise(resp, attempt)
+
+        await _backoff(attempt, retry_after)
+
+
+async def stream_llm(system, user, max_tokens=300) -> AsyncIterator[str]:
+    """
+    Groq SSE stream se content deltas. Retry sirf pehla token aane se pehle;
+    beech me toota stream dobara nahi chalta (farmer ko duplicate text dikhega).
+    """
+    headers, payload = _request(system, user, max_tokens, stream=True)
+
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        retry_after = None
+        started = False
+        failed = None
+        exhausted = None
+        deadlines.check("Groq stream")
+        # stream chalne tak slot pakde rehta hai
+        async with _limiter.slot() as slot:
+            try:
+                async with get_client().stream("POST", GROQ_URL, headers=headers, json=payload) as resp:
+                    if resp.status_code == 200:
+                        async for line in resp.aiter_lines():
+                            if not line.startswith("data:"):
+                                continue
+                            data = line[5:].strip()
+                            if data == "[DONE]":
+                                return
+                            choices = json.loads(data).get("choices") or [{}]
+                            delta = (choices[0].get("delta") or {}).get("content")
+                            if delta:
+                                started = True
+                                yield delta
+                        return
+                    await resp.aread()
+                    failed = resp
+                    if resp.status_code in RETRY_STATUS:
+                        slot.drop()
+            except httpx.TransportError as e:
+                if deadlines.expired():
+                    # call_llm jaisa: hamara budget khatam hua, Groq overloaded nahi → limit mat ghatao
+                    exhausted = e
+                else:
+                    slot.drop()
+                    if started or attempt == LLM_MAX_RETRIES:
+                        raise LLMError(f"Groq stream failed: {e!r}") from e
 
-    return resp.json()["choices"][0]["message"]["content"].strip()
+        if exhausted is not None:
+            raise deadlines.DeadlineExceeded("Groq stream ran out of request budget") from exhausted
+        if failed is not None:
+            retry_after = _retry_after_or_raise(failed, attempt)
+        await _backoff(attempt, retry_after)
@@ -0,0 +1,181 @@
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+from prometheus_client import Counter, Gauge
+
+from services.embeddings import HashingEmbedder
+
+# ---------------- Metrics ----------------
+
+SEMANTIC_LOOKUPS = Counter("llm_semantic_cache_lookups_total", "Semantic cache lookups", ["result"])
+UPSTREAM_SAVED = Counter("llm_upstream_calls_saved_total", "Groq calls avoided", ["reason"])
+SEMANTIC_ENTRIES = Gauge("llm_semantic_cache_entries", "Semantic cache entries")
+
+# ---------------- Semantic Cache ----------------
+
+
+def namespace_of(intent: str, entities: dict, context_data: str) -> str:
+    """Sirf same intent + entities + context wale prompts aapas me match ho sakte hain."""
+    raw = json.dumps([intent, entities, context_data], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class SemanticCache:
+    """
+    Near-duplicate prompt → cached answer.
+
+    User message embed hota hai (local hashing embedder); fixed size
+    float32 matrix par ek matmul se nearest neighbour, sirf same namespace
+    (intent / entities / context) ke andar. Score >= threshold ho to hit.
+    Capacity bhar jaye to least-recently-used slot overwrite hota hai, to
+    memory hamesha capacity * dim * 4 bytes tak.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 5000,
+        threshold: float = 0.9,
+        ttl: float = 86400.0,
+        embedder: HashingEmbedder | None = None,
+        path: Path | str | None = None,
+    ):
+        self.capacity = capacity
+        self.threshold = threshold
+        self.ttl = ttl
+        self.embedder = embedder or HashingEmbedder()
+        self.path = Path(path) if path else None
+
+        self.vectors = np.zeros((capacity, self.embedder.dim), dtype=np.float32)
+        self.ns_ids = np.full(capacity, -1, dtype=np.int64)      # -1 = khali slot
+        self.last_used = np.zeros(capacity, dtype=np.int64)
+        self.created = np.zeros(capacity, dtype=np.float64)
+        self.answers: list[str | None] = [None] * capacity
+        self.namespaces: list[str | None] = [None] * capacity
+
+        self._ns_index: dict[str, int] = {}
+        self._tick = 0
+        self.size = 0
+        self.dirty = False
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _ns_id(self, namespace: str) -> int:
+        if namespace not in self._ns_index:
+            if len(self._ns_index) >= 4 * self.capacity:
+                self._compact_namespaces()
+            self._ns_index[namespace] = len(self._ns_index)
+        return self._ns_index[namespace]
+
+    def _compact_namespaces(self):
+        # evicted entries ke namespaces bhi dict me pade rehte; bounded rakho
+        self._ns_index = {}
+        for slot in range(self.size):
+            ns = self.namespaces[slot]
+            self.ns_ids[slot] = self._ns_index.setdefault(ns, len(self._ns_index))
+
+    def _touch(self, slot: int):
+        self._tick += 1
+        self.last_used[slot] = self._tick
+
+    def lookup(self, message: str, namespace: str) -> tuple[str, float] | None:
+        ns_id = self._ns_index.get(namespace)
+        if ns_id is None or self.size == 0:
+            SEMANTIC_LOOKUPS.labels("miss").inc()
+            return None
+
+        query = self.embedder.embed(message)
+        scores = self.vectors[:self.size] @ query
+        alive = (self.ns_ids[:self.size] == ns_id) & (time.time() - self.created[:self.size] < self.ttl)
+        scores = np.where(alive, scores, -1.0)
+
+        slot = int(np.argmax(scores))
+        score = float(scores[slot])
+        if score < self.threshold:
+            SEMANTIC_LOOKUPS.labels("miss").inc()
+            return None
+
+        self._touch(slot)
+        SEMANTIC_LOOKUPS.labels("hit").inc()
+        UPSTREAM_SAVED.labels("semantic_cache").inc()
+        return self.answers[slot], score
+
+    def add(self, message: str, namespace: str, answer: str):
+        query = self.embedder.embed(message)
+        ns_id = self._ns_id(namespace)
+
+        # bilkul same prompt pehle se hai → wahi slot update
+        if self.size:
+            same = (self.ns_ids[:self.size] == ns_id) & (self.vectors[:self.size] @ query > 0.9999)
+            existing = np.flatnonzero(same)
+        else:
+            existing = []
+
+        if len(existing):
+            slot = int(existing[0])
+        elif self.size < self.capacity:
+            slot = self.size
+            self.size += 1
+        else:
+            slot = int(np.argmin(self.last_used))     # LRU eviction
+
+        self.vectors[slot] = query
+        self.ns_ids[slot] = ns_id
+        self.created[slot] = time.time()
+        self.answers[slot] = answer
+        self.namespaces[slot] = namespace
+        self._touch(slot)
+        self.dirty = True
+        SEMANTIC_ENTRIES.set(self.size)
+
+    # ---------------- Persistence ----------------
+
+    def save(self, path: Path | str | None = None):
+        path = Path(path or self.path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        order = np.argsort(self.last_used[:self.size])    # restart ke baad LRU order bana rahe
+        tmp = path.with_name(f"{path.name}.tmp-{os.getpid()}")
+
+        with open(tmp, "wb") as f:
+            np.savez(
+                f,
+                vectors=self.vectors[:self.size][order],
+                created=self.created[:self.size][order],
+                dim=np.array(self.embedder.dim),
+                records=np.array(json.dumps(
+                    [[self.namespaces[i], self.answers[i]] for i in order], ensure_ascii=False
+                )),
+            )
+        os.replace(tmp, path)
+        self.dirty = False
+
+    def load(self, path: Path | str | None = None) -> int:
+        path = Path(path or self.path)
+        if not path.exists():
+            return 0
+
+        with np.load(path) as data:
+            if int(data["dim"]) != self.embedder.dim:
+                print("⚠️ Semantic cache dim mismatch, ignoring", path)
+                return 0
+            vectors, created = data["vectors"], data["created"]
+            records = json.loads(str(data["records"]))
+
+        # capacity chhoti ho gayi ho to sirf recent entries
+        keep = slice(max(0, len(records) - self.capacity), len(records))
+        for vec, born, (namespace, answer) in zip(vectors[keep], created[keep], records[keep]):
+            slot = self.size
+            self.vectors[slot] = vec
+            self.ns_ids[slot] = self._ns_id(namespace)
+            self.created[slot] = born
+            self.answers[slot] = answer
+            self.namespaces[slot] = namespace
+            self._touch(slot)
+            self.size += 1
+
+        SEMANTIC_ENTRIES.set(self.size)
+        return self.size
@@ -0,0 +1,12 @@
+import os
+
+import pytest
+
+# config.py bina SERVICE_API_KEY ke exit karta hai
+os.environ.setdefault("SERVICE_API_KEY", "supersecret-service-key")
+
+
+@pytest.fixture
+def anyio_backend():
+    # services asyncio par hi chalte hain (uvicorn)
+    return "asyncio"
@@ -1,19 +1,25 @@
 import pytest
-from httpx import AsyncClient
+from httpx import ASGITransport, AsyncClient
+
+import main
 from main import app
+from services.resilience import CircuitBreaker, Upstream
+
+
+def _fresh_groq():
+    return Upstream("groq", breaker=CircuitBreaker("groq", min_requests=100), is_failure=main._is_groq_failure)
 
 @pytest.mark.anyio
 async def test_generate_success(monkeypatch):
 
-    def fake_llm(system, user):
+    async def fake_llm(system, user):
         return "Fake answer"
 
-    monkeypatch.setattr(
-        "services.llm_client.call_llm",
-        fake_llm
-    )
+    # main ne call_llm import kiya hua hai, wahi patch hona chahiye
+    monkeypatch.setattr(main, "call_llm", fake_llm)
+    monkeypatch.setattr(main, "semantic_cache", None)
 
-    async with AsyncClient(app=app, base_url="http://test") as ac:
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
         resp = await ac.post(
             "/generate",
             json={
@@ -26,4 +32,180 @@ async def test_generate_success(monkeypatch):
         )
 
     assert resp.status_code == 200
-    assert resp.json()["final_answer"] == "Fake answer"
\ No newline at end of file
+    assert resp.json()["final_answer"] == "Fake answer"
+
+@pytest.mark.anyio
+async def test_concurrent_identical_prompts_share_one_groq_call(monkeypatch):
+    import asyncio
+
+    calls = []
+
+    async def slow_llm(system, user):
+        calls.append(user)
+        await asyncio.sleep(0.05)
+        return "Shared answer"
+
+    monkeypatch.setattr(main, "call_llm", slow_llm)
+    monkeypatch.setattr(main, "semantic_cache", None)
+
+    body = {"user_message": "tiddi dal aa gaya kya karein", "intent": "disease", "entities": {}, "context_data": ""}
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        responses = await asyncio.gather(*[
+            ac.post("/generate", json=body, headers={"x-api-key": "supersecret-service-key"})
+            for _ in range(20)
+        ])
+
+    assert {r.json()["final_answer"] for r in responses} == {"Shared answer"}
+    assert len(calls) == 1
+
+
+@pytest.mark.anyio
+async def test_shared_failure_counts_once_for_breaker(monkeypatch):
+    import asyncio
+
+    async def failing_llm(system, user):
+        await asyncio.sleep(0.05)
+        raise RuntimeError("429 rate limited")
+
+    monkeypatch.setattr(main, "call_llm", failing_llm)
+    monkeypatch.setattr(main, "semantic_cache", None)
+    monkeypatch.setattr(main, "groq", _fresh_groq())
+
+    body = {"user_message": "x", "intent": "i", "entities": {}, "context_data": ""}
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        responses = await asyncio.gather(*[
+            ac.post("/generate", json=body, headers={"x-api-key": "supersecret-service-key"})
+            for _ in range(10)
+        ])
+
+    assert all("error" in r.json()["metadata"] for r in responses)
+    assert main.groq.breaker.totals() == (0, 1) and not main.circuit_open()
+
+
+def _events(body: str) -> list[dict]:
+    import json
+    return [json.loads(line[5:]) for line in body.splitlines() if line.startswith("data:")]
+
+
+@pytest.mark.anyio
+async def test_generate_stream_relays_tokens_then_done(monkeypatch):
+
+    async def fake_stream(system, user):
+        for token in ["Urea", " 2", " baar"]:
+            yield token
+
+    monkeypatch.setattr(main, "stream_llm", fake_stream)
+    monkeypatch.setattr(main, "semantic_cache", None)
+
+    body = {"user_message": "gehu me khad", "intent": "fertilizer", "entities": {}, "context_data": ""}
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        resp = await ac.post("/generate/stream", json=body, headers={"x-api-key": "supersecret-service-key"})
+        unauthorized = await ac.post("/generate/stream", json=body)
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/event-stream")
+    events = _events(resp.text)
+    assert [e["text"] for e in events if e["type"] == "delta"] == ["Urea", " 2", " baar"]
+    assert events[-1]["type"] == "done"
+    assert unauthorized.status_code == 401
+
+
+@pytest.mark.anyio
+async def test_generate_stream_failure_sends_fallback_and_error(monkeypatch):
+
+    async def failing_stream(system, user):
+        raise RuntimeError("503 overloaded")
+        yield
+
+    monkeypatch.setattr(main, "stream_llm", failing_stream)
+    monkeypatch.setattr(main, "semantic_cache", None)
+    monkeypatch.setattr(main, "groq", _fresh_groq())
+
+    body = {"user_message": "x", "intent": "i", "entities": {}, "context_data": ""}
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        resp = await ac.post("/generate/stream", json=body, headers={"x-api-key": "supersecret-service-key"})
+
+    events = _events(resp.text)
+    assert events[0] == {"type": "delta", "text": main.FALLBACK_ANSWER}
+    assert events[-1]["type"] == "error" and events[-1]["partial"] is False
+    assert main.groq.breaker.totals() == (0, 1)
+
+
+@pytest.mark.anyio
+async def test_open_breaker_rejects_with_retry_after_then_probes(monkeypatch):
+    clock = {"now": 1000.0}
+    breaker = CircuitBreaker("groq", min_requests=2, cooldown=30, half_open_probes=1, clock=lambda: clock["now"])
+    monkeypatch.setattr(main, "groq", Upstream("groq", breaker=breaker, is_failure=main._is_groq_failure))
+    monkeypatch.setattr(main, "semantic_cache", None)
+
+    answers = iter([RuntimeError("503"), RuntimeError("503"), "Theek ho gaya"])
+
+    async def flaky_llm(system, user):
+        answer = next(answers)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+    monkeypatch.setattr(main, "call_llm", flaky_llm)
+    headers = {"x-api-key": "supersecret-service-key"}
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        for i in range(2):
+            await ac.post("/generate", json={"user_message": f"q{i}", "intent": "i"}, headers=headers)
+        rejected = await ac.post("/generate", json={"user_message": "q2", "intent": "i"}, headers=headers)
+
+        clock["now"] += 30
+        probe = await ac.post("/generate", json={"user_message": "q3", "intent": "i"}, headers=headers)
+
+    assert rejected.status_code == 503 and rejected.headers["retry-after"] == "30"
+    assert probe.json()["final_answer"] == "Theek ho gaya"
+    assert not main.circuit_open() and breaker.state == "closed"
+
+
+@pytest.mark.anyio
+async def test_semantic_cache_answers_while_breaker_is_open(monkeypatch):
+    from services.semantic_cache import SemanticCache, namespace_of
+
+    breaker = CircuitBreaker("groq", min_requests=1, cooldown=30)
+    breaker.record(False)
+    monkeypatch.setattr(main, "groq", Upstream("groq", breaker=breaker, is_failure=main._is_groq_failure))
+    cache = SemanticCache(capacity=10, threshold=0.9)
+    cache.add("gehu me khaad kitna", namespace_of("fertilizer", {}, ""), "120 kg urea")
+    monkeypatch.setattr(main, "semantic_cache", cache)
+
+    headers = {"x-api-key": "supersecret-service-key"}
+    hit = {"user_message": "gehu me khaad kitna", "intent": "fertilizer"}
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        answered = await ac.post("/generate", json=hit, headers=headers)
+        streamed = await ac.post("/generate/stream", json=hit, headers=headers)
+        missed = await ac.post("/generate/stream", json={**hit, "user_message": "sarson ka bhav"}, headers=headers)
+
+    # Groq band hai, par pehle poocha gaya sawal cache se
+    assert answered.json()["final_answer"] == "120 kg urea"
+    assert streamed.status_code == 200 and "120 kg urea" in streamed.text
+    assert missed.status_code == 503
+
+
+@pytest.mark.anyio
+async def test_metrics_scrape_and_request_id_echo(monkeypatch):
+    async def fake_llm(system, user):
+        return "Fake answer"
+
+    monkeypatch.setattr(main, "call_llm", fake_llm)
+    monkeypatch.setattr(main, "semantic_cache", None)
+    monkeypatch.setattr(main, "groq", _fresh_groq())
+
+    trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        resp = await ac.post(
+            "/generate",
+            json={"user_message": "test", "intent": "i"},
+            headers={"x-api-key": "supersecret-service-key", "traceparent": f"00-{trace_id}-00f067aa0ba902b7-01"},
+        )
+        scrape = await ac.get("/metrics")
+
+    assert resp.headers["x-request-id"] == trace_id
+    assert resp.json()["metadata"]["request_id"] == trace_id
+    # pehle tuple lautata tha → JSON array, Prometheus parse nahi kar pata tha
+    assert scrape.headers["content-type"].startswith("text/plain")
+    assert "llm_requests_total" in scrape.text
+    assert 'stage_latency_seconds_count{service="llm_service",stage="groq"}' in scrape.text
@@ -0,0 +1,27 @@
+import numpy as np
+
+from services.embeddings import HashingEmbedder, terms
+
+
+def test_embedder_is_deterministic_and_normalized():
+    a = HashingEmbedder().embed("gehu ke patte peele")
+    b = HashingEmbedder().embed("gehu ke patte peele")
+
+    assert np.array_equal(a, b)
+    assert np.isclose(np.linalg.norm(a), 1.0)
+    assert not HashingEmbedder().embed("").any()
+
+
+def test_terms_drop_stopwords_and_map_synonyms():
+    assert terms("Chawal ke liye urvarak batao") == terms("dhaan khaad")
+    assert terms("ke liye me hai") == []
+
+
+def test_paraphrases_land_closer_than_other_questions():
+    embedder = HashingEmbedder()
+    query = embedder.embed("dhaan me khaad kitna")
+    paraphrase = embedder.embed("chawal ke liye urvarak kitni")
+    other = embedder.embed("sarson ka bhav")
+
+    assert float(query @ paraphrase) > 0.9
+    assert float(query @ paraphrase) > float(query @ other)
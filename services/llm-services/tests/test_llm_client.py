@@ -0,0 +1,129 @@
+import email.utils
+import time
+
+import httpx
+import pytest
+
+from services import deadlines, llm_client
+
+
+def _ok(text="Jawab"):
+    return httpx.Response(200, json={"choices": [{"message": {"content": f" {text} "}}]})
+
+
+@pytest.fixture
+def groq(monkeypatch):
+    """MockTransport par client; responses list se ek-ek response."""
+    monkeypatch.setattr(llm_client, "GROQ_API_KEY", "test-key")
+    monkeypatch.setattr(llm_client, "LLM_RETRY_BASE", 0.001)
+    state = {"responses": [], "requests": 0, "seen": []}
+
+    def handler(request):
+        state["requests"] += 1
+        state["seen"].append(request)
+        assert request.headers["authorization"] == "Bearer test-key"
+        return state["responses"].pop(0)
+
+    llm_client.init_client(transport=httpx.MockTransport(handler))
+    yield state
+    llm_client._clients = []
+
+
+@pytest.mark.anyio
+async def test_retries_429_and_5xx_then_succeeds(groq):
+    groq["responses"] = [
+        httpx.Response(429, headers={"retry-after": "0"}),
+        httpx.Response(503),
+        _ok(),
+    ]
+    assert await llm_client.call_llm("s", "u") == "Jawab"
+    assert groq["requests"] == 3
+
+
+@pytest.mark.anyio
+async def test_non_retryable_and_exhausted_errors(groq, monkeypatch):
+    groq["responses"] = [httpx.Response(400, text="bad request")]
+    with pytest.raises(llm_client.LLMError) as exc:
+        await llm_client.call_llm("s", "u")
+    assert exc.value.status == 400 and groq["requests"] == 1
+
+    monkeypatch.setattr(llm_client, "LLM_MAX_RETRIES", 1)
+    groq["responses"] = [httpx.Response(500), httpx.Response(500)]
+    with pytest.raises(llm_client.LLMError):
+        await llm_client.call_llm("s", "u")
+    assert groq["requests"] == 3
+
+
+@pytest.mark.anyio
+async def test_long_retry_after_fails_fast(groq):
+    groq["responses"] = [httpx.Response(429, headers={"retry-after": "3600"})]
+    with pytest.raises(llm_client.LLMError) as exc:
+        await llm_client.call_llm("s", "u")
+    assert exc.value.status == 429 and groq["requests"] == 1
+
+
+@pytest.mark.anyio
+async def test_request_deadline_caps_timeout_and_skips_late_retry(groq):
+    groq["responses"] = [httpx.Response(429, headers={"retry-after": "5"})]
+    deadlines.set_budget(1.0)
+    try:
+        started = time.monotonic()
+        with pytest.raises(deadlines.DeadlineExceeded):
+            await llm_client.call_llm("s", "u")
+    finally:
+        deadlines.set_budget(None)
+
+    # 5s Retry-After 1s budget me fit nahi → bina soye fail
+    assert time.monotonic() - started < 0.5 and groq["requests"] == 1
+    # Groq ko header nahi jaata, sirf timeout chhota hota hai
+    request = groq["seen"][0]
+    assert deadlines.HEADER not in request.headers and request.extensions["timeout"]["read"] <= 1.0
+
+
+def test_retry_after_parsing_and_backoff():
+    assert llm_client.retry_after_seconds("2.5") == 2.5
+    assert llm_client.retry_after_seconds(None) is None
+    assert llm_client.retry_after_seconds("garbage") is None
+    future = email.utils.formatdate(time.time() + 10, usegmt=True)
+    assert 8 <= llm_client.retry_after_seconds(future) <= 10
+
+    # Retry-After jitter ke upar floor hai
+    assert llm_client.backoff_delay(0, retry_after=2.0) >= 2.0
+    assert all(0 <= llm_client.backoff_delay(10) <= llm_client.LLM_RETRY_MAX for _ in range(50))
+
+
+def _sse(*deltas, done=True):
+    lines = [f'data: {{"choices": [{{"delta": {{"content": "{d}"}}}}]}}\n\n' for d in deltas]
+    if done:
+        lines.append("data: [DONE]\n\n")
+    return httpx.Response(200, text="".join(lines), headers={"content-type": "text/event-stream"})
+
+
+@pytest.mark.anyio
+async def test_stream_yields_deltas_and_retries_before_first_token(groq):
+    groq["responses"] = [httpx.Response(429, headers={"retry-after": "0"}), _sse("Neem", " ka", " tel")]
+    deltas = [d async for d in llm_client.stream_llm("s", "u")]
+    assert deltas == ["Neem", " ka", " tel"]
+    assert groq["requests"] == 2
+
+
+@pytest.mark.anyio
+async def test_stream_timeout_from_our_deadline_does_not_shrink_limit(monkeypatch):
+    monkeypatch.setattr(llm_client, "GROQ_API_KEY", "test-key")
+
+    def handler(request):
+        time.sleep(0.06)
+        raise httpx.ReadTimeout("budget khatam", request=request)
+
+    llm_client.init_client(transport=httpx.MockTransport(handler))
+    drops = []
+    monkeypatch.setattr(llm_client._limiter, "release", lambda latency, dropped=False, ignore=False: drops.append(dropped))
+    deadlines.set_budget(0.05)
+    try:
+        with pytest.raises(deadlines.DeadlineExceeded):
+            [d async for d in llm_client.stream_llm("s", "u")]
+    finally:
+        deadlines.set_budget(None)
+        llm_client._clients = []
+
+    assert drops == [False]
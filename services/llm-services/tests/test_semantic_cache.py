@@ -0,0 +1,86 @@
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from services.semantic_cache import SemanticCache, namespace_of
+
+NS = namespace_of("fertilizer", {"crop": "dhaan"}, "")
+
+
+def test_paraphrase_hits_within_namespace():
+    cache = SemanticCache(capacity=10, threshold=0.9)
+    cache.add("dhaan me khaad kitna", NS, "100 kg urea")
+
+    answer, score = cache.lookup("chawal ke liye urvarak kitna", NS)
+    assert answer == "100 kg urea" and score >= 0.9
+
+    # alag intent / context → match nahi
+    assert cache.lookup("dhaan me khaad kitna", namespace_of("water", {"crop": "dhaan"}, "")) is None
+    assert cache.lookup("dhaan me keet ka spray", NS) is None
+
+
+def test_lru_eviction_keeps_memory_bounded():
+    cache = SemanticCache(capacity=2, threshold=0.99)
+    cache.add("gehu khaad", NS, "a")
+    cache.add("sarson bhav", NS, "b")
+    cache.lookup("gehu khaad", NS)          # gehu recently used
+    cache.add("mandi aalu", NS, "c")         # sarson evict
+
+    assert len(cache) == 2
+    assert cache.lookup("sarson bhav", NS) is None
+    assert cache.lookup("gehu khaad", NS)[0] == "a"
+
+    # same prompt dobara → naya slot nahi
+    cache.add("gehu khaad", NS, "a2")
+    assert len(cache) == 2 and cache.lookup("gehu khaad", NS)[0] == "a2"
+
+
+def test_ttl_expiry(monkeypatch):
+    import services.semantic_cache as sc
+
+    now = [1000.0]
+    monkeypatch.setattr(sc.time, "time", lambda: now[0])
+    cache = SemanticCache(capacity=4, ttl=60)
+    cache.add("gehu khaad", NS, "a")
+    now[0] += 61
+    assert cache.lookup("gehu khaad", NS) is None
+
+
+def test_persistence_roundtrip(tmp_path):
+    path = tmp_path / "cache.npz"
+    cache = SemanticCache(capacity=4, path=path)
+    cache.add("gehu khaad", NS, "a")
+    cache.add("dhaan bimari", NS, "b")
+    cache.save()
+    assert not cache.dirty
+
+    restored = SemanticCache(capacity=1, path=path)
+    assert restored.load() == 1
+    # capacity chhoti → sirf sabse recent entry
+    assert restored.lookup("dhaan bimari", NS)[0] == "b"
+    assert restored.lookup("gehu khaad", NS) is None
+
+
+@pytest.mark.anyio
+async def test_generate_skips_upstream_on_paraphrase(monkeypatch):
+    import main
+
+    calls = []
+
+    async def fake_llm(system, user):
+        calls.append(user)
+        return "100 kg urea"
+
+    monkeypatch.setattr(main, "call_llm", fake_llm)
+    monkeypatch.setattr(main, "semantic_cache", SemanticCache(capacity=10))
+
+    body = {"intent": "fertilizer", "entities": {"crop": "dhaan"}, "context_data": ""}
+    headers = {"x-api-key": "supersecret-service-key"}
+    async with AsyncClient(transport=ASGITransport(app=main.app), base_url="http://test") as ac:
+        first = await ac.post("/generate", json={**body, "user_message": "dhaan me khaad kitna"}, headers=headers)
+        second = await ac.post(
+            "/generate", json={**body, "user_message": "chawal ke liye urvarak kitna?"}, headers=headers
+        )
+
+    assert first.json()["final_answer"] == second.json()["final_answer"] == "100 kg urea"
+    assert second.json()["metadata"]["cache"] == "semantic"
+    assert len(calls) == 1
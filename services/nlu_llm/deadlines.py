@@ -0,0 +1,155 @@
+import contextvars
+import time
+
+from starlette.responses import JSONResponse
+
+# ----------------- Request Deadlines -----------------
+#
+# Gateway har request ka budget banata hai; har hop `X-Deadline-Ms` header me
+# *bacha hua* time (ms) aage bhejta hai — absolute time nahi, containers ki
+# ghadiyan alag ho sakti hain. Har service me:
+#   - DeadlineMiddleware: header padh kar deadline set; budget khatam → 504
+#   - httpx_hook: har outbound request ka timeout = min(apna cap, bacha hua
+#     budget) aur header me bacha hua budget
+#   - remaining() / expired() / check(): mehenga kaam shuru karne se pehle
+#
+# Deadline contextvar me hai — asyncio tasks (speculative LLM) ko bhi wahi
+# dikhti hai. Single-flight ka shared call kai requests ka hai, uske liye
+# `Shared`: deadline = waiters me sabse bada budget (leader ka chhota budget
+# followers ka call na kaate).
+#
+# Copy: chat_orchestrator (yahan badlo), api_gateway, nlu_llm, rag_services,
+# llm-services/services; chat_orchestrator/tests/test_vendored_modules.py drift pakadta hai.
+
+HEADER = "X-Deadline-Ms"
+
+# timer thoda pehle bhi fire ho sakta hai — itna bacha ho to bhi khatam maano
+SLACK = 0.005
+
+_deadline: contextvars.ContextVar["float | Shared | None"] = contextvars.ContextVar("deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+class Shared:
+    """Shared (single-flight) call ki deadline; har naya waiter ise aage badha sakta hai."""
+
+    def __init__(self):
+        self.at: float | None = float("-inf")
+
+    def join(self, seconds: float | None):
+        # ek bhi waiter bina deadline ka → shared call ki bhi deadline nahi
+        if self.at is None:
+            return
+        if seconds is None:
+            self.at = None
+        else:
+            self.at = max(self.at, time.monotonic() + seconds)
+
+    def enter(self):
+        """Shared task ke andar: ab is context ki deadline yahi object hai."""
+        _deadline.set(self)
+
+
+def parse(value: str | None) -> float | None:
+    """Header (ms) → seconds; galat value → None (deadline nahi)."""
+    if value is None:
+        return None
+    try:
+        return float(value) / 1000
+    except ValueError:
+        return None
+
+
+def set_budget(seconds: float | None) -> contextvars.Token:
+    return _deadline.set(None if seconds is None else time.monotonic() + seconds)
+
+
+def shrink(seconds: float):
+    """Is request ka budget `seconds` se zyada na ho (kam ho to waise hi)."""
+    left = remaining()
+    if left is None or seconds < left:
+        _deadline.set(time.monotonic() + seconds)
+
+
+def remaining() -> float | None:
+    deadline = _deadline.get()
+    if isinstance(deadline, Shared):
+        deadline = deadline.at
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def expired() -> bool:
+    left = remaining()
+    return left is not None and left <= SLACK
+
+
+def check(what: str = "request"):
+    if expired():
+        raise DeadlineExceeded(f"deadline exceeded before {what}")
+
+
+def headers() -> dict[str, str]:
+    left = remaining()
+    return {} if left is None else {HEADER: str(max(0, int(left * 1000)))}
+
+
+def httpx_hook(propagate: bool = True):
+    """httpx `event_hooks={"request": [...]}` ke liye: timeout cap + header."""
+
+    async def apply(request):
+        left = remaining()
+        if left is None:
+            return
+        if left <= SLACK:
+            raise DeadlineExceeded(f"deadline exceeded before {request.method} {request.url.path}")
+        if propagate:
+            request.headers[HEADER] = str(int(left * 1000))
+        timeouts = request.extensions.get("timeout") or {}
+        request.extensions["timeout"] = {
+            key: left if value is None else min(value, left)
+            for key, value in {"connect": None, "read": None, "write": None, "pool": None, **timeouts}.items()
+        }
+
+    return apply
+
+
+async def deadline_exceeded_handler(request, exc: DeadlineExceeded):
+    return JSONResponse(status_code=504, content={"detail": str(exc)})
+
+
+class DeadlineMiddleware:
+    """Header se deadline; na ho to `default` (None → koi deadline nahi)."""
+
+    def __init__(self, app, default: float | None = None, maximum: float | None = None):
+        self.app = app
+        self.default = default
+        self.maximum = maximum
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        budget = None
+        for name, value in scope.get("headers", ()):
+            if name == b"x-deadline-ms":
+                budget = parse(value.decode("latin-1"))
+                break
+        if budget is None:
+            budget = self.default
+        if budget is not None and self.maximum is not None:
+            budget = min(budget, self.maximum)
+
+        token = set_budget(budget)
+        try:
+            if budget is not None and budget <= SLACK:
+                # caller pehle hi haar maan chuka — kaam shuru hi mat karo
+                response = JSONResponse(status_code=504, content={"detail": "deadline exceeded on arrival"})
+                await response(scope, receive, send)
+                return
+            await self.app(scope, receive, send)
+        finally:
+            _deadline.reset(token)
@@ -0,0 +1,95 @@
+import json
+import re
+from pathlib import Path
+
+# ----------------- Lexicon Matcher -----------------
+#
+# Lexicon (crop / intent → synonyms + weight) ek baar compile hota hai ek
+# phrase → labels hash table me. Message ko tokens me todkar har position
+# par longest phrase (max_n tokens tak) dhoondhte hain: cost message length
+# ke hisab se hai, lexicon size ke hisab se nahi. Sirf poore words match
+# hote hain, "progress" me "rog" nahi milta.
+#
+# (nlu_llm / chat_orchestrator dono me same file hai — orchestrator ka
+# embedded NLU backend; alag Docker context.)
+
+TOKEN_RE = re.compile(r"[a-z0-9\u0900-\u097f]+")
+
+DEFAULT_LEXICON_PATH = Path(__file__).resolve().parent / "lexicon.json"
+
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN_RE.findall(text.lower())
+
+
+class Lexicon:
+    def __init__(self, entries):
+        """entries: iterable of (phrase, kind, label, weight). Label order = tie-break priority."""
+        self._table: dict[str, list[tuple[str, str, float]]] = {}
+        self.priority: dict[str, dict[str, int]] = {}
+        self.max_n = 1
+        self.size = 0
+
+        for phrase, kind, label, weight in entries:
+            tokens = tokenize(phrase)
+            if not tokens:
+                continue
+            self._table.setdefault(" ".join(tokens), []).append((kind, label, float(weight)))
+            labels = self.priority.setdefault(kind, {})
+            labels.setdefault(label, len(labels))
+            self.max_n = max(self.max_n, len(tokens))
+            self.size += 1
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Lexicon":
+        """{"crop": {"gehu": {"gehu": 1.0, "wheat": 1.0}}, "intent": {...}}"""
+        return cls(
+            (phrase, kind, label, weight)
+            for kind, labels in data.items()
+            for label, phrases in labels.items()
+            for phrase, weight in phrases.items()
+        )
+
+    @classmethod
+    def load(cls, path: Path | str = DEFAULT_LEXICON_PATH) -> "Lexicon":
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+    def matches(self, text: str) -> list[tuple[str, str, str, float]]:
+        """Ek pass me saare (phrase, kind, label, weight) matches, longest-first, overlap nahi."""
+        tokens = tokenize(text)
+        table = self._table
+        found = []
+        i = 0
+        while i < len(tokens):
+            step = 1
+            for n in range(min(self.max_n, len(tokens) - i), 0, -1):
+                phrase = tokens[i] if n == 1 else " ".join(tokens[i:i + n])
+                hits = table.get(phrase)
+                if hits:
+                    found.extend((phrase, kind, label, weight) for kind, label, weight in hits)
+                    step = n
+                    break
+            i += step
+        return found
+
+    def analyze(self, text: str) -> dict[str, list[tuple[str, float]]]:
+        """
+        kind → [(label, confidence)] (best pehle). Confidence = noisy-OR of
+        matched phrase weights; ek phrase baar baar aaye to ek hi baar gina jata hai.
+        """
+        seen = set()
+        miss: dict[tuple[str, str], float] = {}
+        for phrase, kind, label, weight in self.matches(text):
+            if (phrase, kind, label) in seen:
+                continue
+            seen.add((phrase, kind, label))
+            miss[(kind, label)] = miss.get((kind, label), 1.0) * (1.0 - min(weight, 1.0))
+
+        out: dict[str, list[tuple[str, float]]] = {}
+        for (kind, label), m in miss.items():
+            out.setdefault(kind, []).append((label, round(1.0 - m, 4)))
+        for kind, labels in out.items():
+            order = self.priority.get(kind, {})
+            labels.sort(key=lambda lc: (-lc[1], order.get(lc[0], len(order))))
+        return out
@@ -1,8 +1,31 @@
-from fastapi import FastAPI
+import json
+import os
+
+from fastapi import FastAPI, HTTPException, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from pydantic import BaseModel
-from nlu import detect_intent_and_crop, NLUResult
+import tracing
+from deadlines import DeadlineMiddleware
+from nlu import analyze_batch, detect_intent_and_crop, LabelScore, NLUResult
+
+NLU_BATCH_MAX = int(os.getenv("NLU_BATCH_MAX", "20000"))
+NLU_BATCH_CHUNK = int(os.getenv("NLU_BATCH_CHUNK", "500"))
+# set ho to spans JSON lines me (orchestrator / gateway ke saath ek hi file chal jaati hai)
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH", "")
 
 app = FastAPI(title="AI Agri Assistant - NLU/LLM Service")
+# X-Deadline-Ms budget pehle hi khatam → 504, kaam nahi
+app.add_middleware(DeadlineMiddleware)
+# orchestrator ke traceparent se isi trace ka child span
+tracing.configure("nlu_llm", TRACE_EXPORT_PATH)
+app.add_middleware(tracing.TracingMiddleware)
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    tracing.shutdown()
 
 
 class AnalyzeRequest(BaseModel):
@@ -13,22 +36,65 @@ class AnalyzeResponse(BaseModel):
     intent: str
     crop: str | None = None
     language: str
+    intent_confidence: float = 0.0
+    crop_confidence: float = 0.0
+    intents: list[LabelScore] = []
+    crops: list[LabelScore] = []
+
+
+class BatchItem(BaseModel):
+    id: str | int | None = None
+    message: str
+
+
+class BatchAnalyzeRequest(BaseModel):
+    items: list[BatchItem]
+
 
 @app.get("/health")
 async def health():
     return {"status": "ok", "service": "nlu_llm"}
 
 
+@app.get("/metrics")
+def metrics():
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
 @app.post("/analyze", response_model=AnalyzeResponse)
 async def analyze(req: AnalyzeRequest) -> AnalyzeResponse:
     """
-    Abhi ke liye: sirf rule-based NLU.
+    Abhi ke liye: lexicon-based NLU (lexicon.json, compiled once).
     Future me: yahin se LLM + RAG bhi call kara sakte hain.
     """
-    nlu: NLUResult = detect_intent_and_crop(req.message)
+    with tracing.span("nlu") as span:
+        nlu: NLUResult = detect_intent_and_crop(req.message)
+        span.set(intent=nlu.intent, crop=nlu.crop)
+
+    return AnalyzeResponse(**nlu.model_dump())
+
+
+def _ndjson_chunk(items: list[BatchItem], offset: int) -> str:
+    lines = []
+    for i, (item, nlu) in enumerate(zip(items, analyze_batch(item.message for item in items))):
+        row = {"id": item.id if item.id is not None else offset + i, **nlu.model_dump()}
+        lines.append(json.dumps(row, ensure_ascii=False))
+    return "\n".join(lines) + "\n"
+
+
+@app.post("/analyze/batch")
+async def analyze_batch_endpoint(req: BatchAnalyzeRequest):
+    """
+    Hazaron messages ek request me; results NDJSON (ek line per message,
+    input order me) stream hote hain. Kaam NLU_BATCH_CHUNK ke tukdon me
+    threadpool par, taaki event loop block na ho.
+    """
+    if len(req.items) > NLU_BATCH_MAX:
+        raise HTTPException(status_code=413, detail=f"Max {NLU_BATCH_MAX} items per batch")
+
+    async def stream():
+        for start in range(0, len(req.items), NLU_BATCH_CHUNK):
+            chunk = req.items[start:start + NLU_BATCH_CHUNK]
+            yield await run_in_threadpool(_ndjson_chunk, chunk, start)
 
-    return AnalyzeResponse(
-     intent=nlu.intent,
-     crop=nlu.crop,
-     language=nlu.language
-    )
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
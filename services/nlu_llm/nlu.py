@@ -1,43 +1,69 @@
+import os
+from typing import Iterable, Iterator
+
 from pydantic import BaseModel
 
+from lexicon import DEFAULT_LEXICON_PATH, Lexicon
+
+# ----------------- NLU Engine -----------------
+#
+# Pure CPU kaam (~25µs / message). nlu_llm / chat_orchestrator dono me same
+# file hai — orchestrator ise "embedded" NLU backend ke roop me import karta
+# hai (alag Docker context).
+
+
+class LabelScore(BaseModel):
+    label: str
+    confidence: float
+
 
 class NLUResult(BaseModel):
     intent: str
     crop: str | None = None
     language: str = "hi-en"  # abhi simple assumption
+    intent_confidence: float = 0.0
+    crop_confidence: float = 0.0
+    intents: list[LabelScore] = []
+    crops: list[LabelScore] = []
 
 
-def detect_intent_and_crop(text: str) -> NLUResult:
-    t = text.lower()
+# lexicon process start par ek baar compile hota hai
+LEXICON = Lexicon.load(os.getenv("NLU_LEXICON_PATH", str(DEFAULT_LEXICON_PATH)))
+
+
+def detect_intent_and_crop(text: str, lexicon: Lexicon | None = None) -> NLUResult:
+    found = (lexicon or LEXICON).analyze(text)
+
+    crops = [LabelScore(label=l, confidence=c) for l, c in found.get("crop", [])]
+    intents = [LabelScore(label=l, confidence=c) for l, c in found.get("intent", [])]
+
+    return NLUResult(
+        intent=intents[0].label if intents else "general",
+        crop=crops[0].label if crops else None,
+        intent_confidence=intents[0].confidence if intents else 0.0,
+        crop_confidence=crops[0].confidence if crops else 0.0,
+        intents=intents,
+        crops=crops,
+    )
 
-    intent = "general"
-    crop: str | None = None
 
-    # crop detection
-    if "gehu" in t or "wheat" in t:
-        crop = "gehu"
-    elif "dhaan" in t or "chawal" in t or "rice" in t:
-        crop = "dhaan"
-    elif "sarson" in t or "mustard" in t:
-        crop = "sarson"
-
-    # intent detection
-    if any(w in t for w in ["khaad", "fertilizer", "urvarak"]):
-        intent = "fertilizer"
-    elif any(w in t for w in ["bimari", "rog", "disease", "daag", "spot"]):
-        intent = "disease"
-    elif any(w in t for w in ["paani", "sinchai", "irrigation", "water"]):
-        intent = "water"
-    elif any(w in t for w in ["daam", "bhav", "mandi", "price"]):
-        intent = "price"
-
-    # ✅ yahin return karo, dubara function call nahi
-    return NLUResult(intent=intent, crop=crop)
-
-
-    return {
-      "intent": result.intent,
-      "entities": {
-        "crop": result.crop
-       }
-    }
+def analyze_batch(
+    texts: Iterable[str],
+    lexicon: Lexicon | None = None,
+    memo_size: int = 50000,
+) -> Iterator[NLUResult]:
+    """
+    Batch NLU: lexicon ek hi baar resolve, aur repeat messages (batch me
+    "gehu me khaad" jaise sawal bahut baar aate hain) ka result reuse.
+    """
+    lexicon = lexicon or LEXICON
+    seen: dict[str, NLUResult] = {}
+    for text in texts:
+        key = " ".join(text.lower().split())
+        result = seen.get(key)
+        if result is None:
+            if len(seen) >= memo_size:
+                # lambe stream (CLI) par memory bounded rahe
+                seen.clear()
+            result = seen[key] = detect_intent_and_crop(text, lexicon)
+        yield result
@@ -0,0 +1,107 @@
+"""
+chat_history ke stored messages par seedha NLU engine chalao (HTTP nahi).
+
+Re-labelling ya lexicon change evaluate karne ke liye: har message ka NDJSON
+result likho, aur end me intent/crop distribution + throughput.
+
+    python relabel.py --db /app/data/chat_history.db --out labels.ndjson
+    python relabel.py --db ... --lexicon new_lexicon.json --compare
+"""
+import argparse
+import json
+import sqlite3
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Iterator
+
+from lexicon import DEFAULT_LEXICON_PATH, Lexicon
+from nlu import analyze_batch
+
+SELECT_MESSAGES_SQL = """
+    SELECT id, session_id, message FROM chat_history
+    WHERE role = ? AND id > ?
+    ORDER BY id
+"""
+
+
+def iter_messages(conn: sqlite3.Connection, role: str = "user", since_id: int = 0, fetch: int = 1000) -> Iterator[tuple]:
+    cur = conn.execute(SELECT_MESSAGES_SQL, (role, since_id))
+    while True:
+        rows = cur.fetchmany(fetch)
+        if not rows:
+            return
+        yield from rows
+
+
+def relabel(
+    conn: sqlite3.Connection,
+    out,
+    lexicon: Lexicon,
+    baseline: Lexicon | None = None,
+    role: str = "user",
+    since_id: int = 0,
+) -> dict:
+    intents, crops = Counter(), Counter()
+    changed = 0
+    total = 0
+    t0 = time.perf_counter()
+
+    buffer: list[tuple] = []
+
+    def flush():
+        nonlocal changed, total
+        messages = [m or "" for _, _, m in buffer]
+        results = analyze_batch(messages, lexicon)
+        old = analyze_batch(messages, baseline) if baseline else iter(())
+        for (row_id, session_id, _), nlu in zip(buffer, results):
+            total += 1
+            intents[nlu.intent] += 1
+            crops[nlu.crop or "-"] += 1
+            row = {"id": row_id, "session_id": session_id, **nlu.model_dump()}
+            if baseline:
+                prev = next(old)
+                row["changed"] = (prev.intent, prev.crop) != (nlu.intent, nlu.crop)
+                changed += row["changed"]
+            out.write(json.dumps(row, ensure_ascii=False) + "\n")
+        buffer.clear()
+
+    for row in iter_messages(conn, role, since_id):
+        buffer.append(row)
+        if len(buffer) >= 1000:
+            flush()
+    flush()
+
+    elapsed = max(time.perf_counter() - t0, 1e-9)
+    summary = {
+        "messages": total,
+        "per_sec": round(total / elapsed),
+        "intents": dict(intents.most_common()),
+        "crops": dict(crops.most_common()),
+    }
+    if baseline:
+        summary["changed"] = changed
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", required=True, help="chat history DB (orchestrator ka HISTORY_DB_PATH)")
+    parser.add_argument("--out", help="NDJSON output file (default: stdout)")
+    parser.add_argument("--lexicon", default=str(DEFAULT_LEXICON_PATH))
+    parser.add_argument("--compare", action="store_true", help="default lexicon se diff count karo")
+    parser.add_argument("--role", default="user")
+    parser.add_argument("--since-id", type=int, default=0)
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(f"file:{Path(args.db).resolve()}?mode=ro", uri=True)
+    baseline = Lexicon.load() if args.compare else None
+    out = open(args.out, "w", encoding="utf-8") if args.out else sys.stdout
+    try:
+        summary = relabel(conn, out, Lexicon.load(args.lexicon), baseline, args.role, args.since_id)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        conn.close()
+    print("✅ Relabel done:", json.dumps(summary, ensure_ascii=False), file=sys.stderr)
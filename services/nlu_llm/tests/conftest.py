@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture
+def anyio_backend():
+    # services asyncio par hi chalte hain (uvicorn)
+    return "asyncio"
@@ -0,0 +1,45 @@
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from main import app
+
+
+@pytest.mark.anyio
+async def test_analyze_returns_confidences():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        resp = await ac.post("/analyze", json={"message": "dhaan ke patte par brown spot"})
+
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["intent"] == "disease" and body["crop"] == "dhaan"
+    assert body["intent_confidence"] == 0.9
+    assert body["crops"] == [{"label": "dhaan", "confidence": 1.0}]
+
+
+@pytest.mark.anyio
+async def test_analyze_batch_streams_ndjson_in_order(monkeypatch):
+    import json
+
+    import main
+
+    monkeypatch.setattr(main, "NLU_BATCH_CHUNK", 2)
+    items = [{"id": "a", "message": "gehu me khaad"}, {"message": "mandi bhav"}, {"message": "gehu me khaad"}]
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        resp = await ac.post("/analyze/batch", json={"items": items})
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in resp.text.splitlines()]
+    assert [r["id"] for r in rows] == ["a", 1, 2]
+    assert [r["intent"] for r in rows] == ["fertilizer", "price", "fertilizer"]
+
+
+@pytest.mark.anyio
+async def test_analyze_batch_rejects_oversized(monkeypatch):
+    import main
+
+    monkeypatch.setattr(main, "NLU_BATCH_MAX", 1)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        resp = await ac.post("/analyze/batch", json={"items": [{"message": "a"}, {"message": "b"}]})
+    assert resp.status_code == 413
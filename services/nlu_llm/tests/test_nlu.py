@@ -0,0 +1,35 @@
+from lexicon import Lexicon
+from nlu import detect_intent_and_crop
+
+
+def test_detects_crop_and_intent_with_synonyms():
+    result = detect_intent_and_crop("Gehun ke liye kitna urvarak dena chahiye?")
+    assert result.intent == "fertilizer"
+    assert result.crop == "gehu"
+    assert result.intent_confidence == 1.0
+
+    assert detect_intent_and_crop("धान में रोग").model_dump()["crop"] == "dhaan"
+
+
+def test_matches_whole_words_only():
+    result = detect_intent_and_crop("progress report spotless hai")
+    assert result.intent == "general"
+    assert result.crop is None
+    assert result.intents == []
+
+
+def test_multiword_phrase_and_priority():
+    # "yellow rust" phrase, "rust" alag se double count nahi
+    lex = Lexicon.from_dict({"intent": {"disease": {"rust": 0.5, "yellow rust": 0.9}}})
+    assert lex.analyze("gehu me yellow rust") == {"intent": [("disease", 0.9)]}
+
+    # barabar confidence → lexicon order (fertilizer pehle)
+    result = detect_intent_and_crop("sarson me khaad aur bimari")
+    assert result.intent == "fertilizer"
+    assert [s.label for s in result.intents] == ["fertilizer", "disease"]
+
+
+def test_confidence_combines_weak_evidence():
+    lex = Lexicon.from_dict({"intent": {"price": {"rate": 0.6, "dam": 0.5}}})
+    assert lex.analyze("rate aur dam kya hai") == {"intent": [("price", 0.8)]}
+    assert lex.analyze("rate rate rate") == {"intent": [("price", 0.6)]}
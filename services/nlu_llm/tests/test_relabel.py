@@ -0,0 +1,46 @@
+import io
+import json
+import sqlite3
+
+from lexicon import Lexicon
+from relabel import relabel
+
+
+def _db():
+    conn = sqlite3.connect(":memory:")
+    conn.execute(
+        "CREATE TABLE chat_history (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+        "session_id TEXT, role TEXT, message TEXT, timestamp DATETIME)"
+    )
+    conn.executemany(
+        "INSERT INTO chat_history (session_id, role, message) VALUES (?, ?, ?)",
+        [
+            ("s1", "user", "gehu me khaad kitna"),
+            ("s1", "bot", "120 kg urea"),
+            ("s2", "user", "tamatar ka bhav"),
+            ("s2", "user", "progress kaisa hai"),
+        ],
+    )
+    return conn
+
+
+def test_relabel_writes_ndjson_and_summary():
+    out = io.StringIO()
+    summary = relabel(_db(), out, Lexicon.load())
+
+    rows = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [r["id"] for r in rows] == [1, 3, 4]
+    assert [r["intent"] for r in rows] == ["fertilizer", "price", "general"]
+    assert summary["messages"] == 3
+    assert summary["intents"] == {"fertilizer": 1, "price": 1, "general": 1}
+
+
+def test_relabel_compare_counts_changed_labels():
+    new = Lexicon.from_dict({"crop": {"tamatar": {"tamatar": 1.0}}, "intent": {"price": {"bhav": 1.0}}})
+    out = io.StringIO()
+    summary = relabel(_db(), out, new, baseline=Lexicon.load())
+
+    rows = [json.loads(line) for line in out.getvalue().splitlines()]
+    # msg 1: fertilizer/gehu → general/None; msg 3: crop tamatar naya
+    assert [r["changed"] for r in rows] == [True, True, False]
+    assert summary["changed"] == 2
@@ -0,0 +1,242 @@
+import asyncio
+import contextvars
+import json
+import os
+import re
+import threading
+import time
+
+from prometheus_client import Histogram
+
+# ----------------- Tracing -----------------
+#
+# Ek /chat request gateway → orchestrator → NLU / RAG / LLM tak ek hi trace:
+#   - W3C `traceparent: 00-<trace_id>-<span_id>-01` har hop par aage (httpx_hook)
+#   - `X-Request-ID` = trace_id; gateway response me wapas milta hai, farmer
+#     ki shikayat par usi ID se poora trace mil jaata hai
+#   - span(name): stage ka time → stage_latency_seconds{service, stage}
+#     histogram + (TRACE_EXPORT_PATH set ho to) JSON line file me export.
+#     Kai services ek hi file / volume me likh sakti hain (O_APPEND lines);
+#     benchmarks/trace_report.py us file se per-stage breakdown banata hai.
+#
+# Copy: chat_orchestrator (yahan badlo), api_gateway, nlu_llm, rag_services,
+# llm-services/services; chat_orchestrator/tests/test_vendored_modules.py drift pakadta hai.
+
+TRACEPARENT = "traceparent"
+REQUEST_ID = "X-Request-ID"
+
+STAGE_LATENCY = Histogram(
+    "stage_latency_seconds",
+    "Latency of traced stages (request spans and their children)",
+    ["service", "stage"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30),
+)
+
+# scrape / health checks trace nahi hote
+UNTRACED_PATHS = {"/metrics", "/health"}
+
+_TRACEPARENT_RE = re.compile(r"^[0-9a-f]{2}-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+_HEX32_RE = re.compile(r"^[0-9a-f]{32}$")
+
+_service = "unknown"
+_exporter = None
+_current: contextvars.ContextVar["Span | None"] = contextvars.ContextVar("span", default=None)
+
+
+def _new_id(nbytes: int) -> str:
+    return os.urandom(nbytes).hex()
+
+# ----------------- Export -----------------
+
+class FileExporter:
+    """Spans JSON lines me; buffer `max_buffer` spans ya `interval` sec par flush."""
+
+    def __init__(self, path: str, max_buffer: int = 100, interval: float = 1.0):
+        self.path = path
+        self.max_buffer = max_buffer
+        self.interval = interval
+        self._lines: list[str] = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def export(self, record: dict):
+        with self._lock:
+            self._lines.append(json.dumps(record, ensure_ascii=False, separators=(",", ":")))
+            if len(self._lines) >= self.max_buffer or time.monotonic() - self._last_flush >= self.interval:
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        self._last_flush = time.monotonic()
+        if not self._lines:
+            return
+        data = ("\n".join(self._lines) + "\n").encode("utf-8")
+        self._lines = []
+        # O_APPEND: kai workers / services ki lines aapas me nahi katti
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, data)
+        finally:
+            os.close(fd)
+
+
+def configure(service: str, export_path: str = ""):
+    global _service, _exporter
+    _service = service
+    _exporter = FileExporter(export_path) if export_path else None
+
+
+def shutdown():
+    if _exporter is not None:
+        _exporter.flush()
+
+# ----------------- Spans -----------------
+
+class Span:
+    def __init__(self, name: str, trace_id: str, parent_id: str | None, attrs: dict):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = _new_id(8)
+        self.parent_id = parent_id
+        self.attrs = attrs
+        self.status = "ok"
+        self.start = time.time()
+        self._started = time.perf_counter()
+        self.duration = 0.0
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def end(self):
+        self.duration = time.perf_counter() - self._started
+        STAGE_LATENCY.labels(_service, self.name).observe(self.duration)
+        if _exporter is not None:
+            _exporter.export({
+                "trace_id": self.trace_id,
+                "span_id": self.span_id,
+                "parent_id": self.parent_id,
+                "service": _service,
+                "name": self.name,
+                "start": round(self.start, 6),
+                "duration_ms": round(self.duration * 1000, 3),
+                "status": self.status,
+                "attrs": self.attrs,
+            })
+
+
+def current() -> Span | None:
+    return _current.get()
+
+
+def request_id() -> str | None:
+    span = _current.get()
+    return span.trace_id if span is not None else None
+
+
+class span:
+    """`with span("rag") as s:` ya `async with upstream.call(), span("llm"):` — dono chalte hain."""
+
+    def __init__(self, name: str, **attrs):
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self) -> Span:
+        self._parent = parent = _current.get()
+        self._span = Span(self.name, parent.trace_id if parent else _new_id(16), parent.span_id if parent else None, self.attrs)
+        self._token = _current.set(self._span)
+        return self._span
+
+    def __exit__(self, exc_type, exc, tb):
+        s = self._span
+        if exc_type is GeneratorExit or (exc_type is not None and issubclass(exc_type, asyncio.CancelledError)):
+            s.status = "cancelled"
+        elif exc is not None:
+            s.status = "error"
+            s.attrs["error"] = repr(exc)[:200]
+        try:
+            _current.reset(self._token)
+        except ValueError:
+            # async generator doosre context me band hua
+            _current.set(self._parent)
+        s.end()
+        return False
+
+    async def __aenter__(self) -> Span:
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return self.__exit__(exc_type, exc, tb)
+
+
+def outbound_headers() -> dict[str, str]:
+    span = _current.get()
+    if span is None:
+        return {}
+    return {TRACEPARENT: f"00-{span.trace_id}-{span.span_id}-01", REQUEST_ID: span.trace_id}
+
+
+def httpx_hook():
+    """httpx `event_hooks={"request": [...]}`: traceparent + X-Request-ID aage."""
+
+    async def apply(request):
+        request.headers.update(outbound_headers())
+
+    return apply
+
+# ----------------- Middleware -----------------
+
+class TracingMiddleware:
+    """Har HTTP request ka server span; response me X-Request-ID."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in UNTRACED_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        trace_id = parent_id = None
+        for name, value in scope.get("headers", ()):
+            if name == b"traceparent":
+                match = _TRACEPARENT_RE.match(value.decode("latin-1").strip().lower())
+                if match:
+                    trace_id, parent_id = match.groups()
+            elif name == b"x-request-id" and trace_id is None:
+                candidate = value.decode("latin-1").strip().lower().replace("-", "")
+                if _HEX32_RE.match(candidate):
+                    trace_id = candidate
+
+        s = Span(f"{scope['method']} {scope['path']}", trace_id or _new_id(16), parent_id, {})
+        token = _current.set(s)
+        status = 500
+
+        async def send_with_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"x-request-id", s.trace_id.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        except BaseException:
+            s.status = "error"
+            raise
+        finally:
+            _current.reset(token)
+            # route template (/api/chat/history/{session_id}) — session IDs se
+            # metric labels na phatein
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            s.name = f"{scope['method']} {route}"
+            s.set(status=status)
+            if status >= 500:
+                s.status = "error"
+            s.end()
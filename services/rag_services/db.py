@@ -0,0 +1,134 @@
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from urllib.parse import quote
+
+# ----------------- SQLite Connection Pool -----------------
+#
+# Har query par sqlite3.connect() + close() mehenga hai (file open, schema
+# parse, statement compile). Pool long-lived connections rakhta hai; har
+# connection ka apna statement cache hota hai, isliye same SQL string dobara
+# compile nahi hoti.
+#
+# readonly=True: `?mode=ro` URI — file read-only khulti hai, journal_mode /
+# synchronous pragmas nahi chalte (reader DB ka journal mode nahi badalta).
+# immutable=True: published knowledge snapshot (file kabhi nahi badalti) —
+# `?mode=ro&immutable=1` URI, koi lock / journal / change-check nahi; saath me
+# mmap_size pragma do to pages seedha page cache se padhe jaate hain.
+#
+# Copy: chat_orchestrator (yahan badlo), rag_services;
+# chat_orchestrator/tests/test_vendored_modules.py drift pakadta hai.
+
+DEFAULT_PRAGMAS = {
+    "journal_mode": "WAL",      # readers writers ko block nahi karte
+    "synchronous": "NORMAL",    # WAL me safe, har commit par fsync nahi
+    "temp_store": "MEMORY",
+    "cache_size": -16000,       # ~16 MB page cache per connection
+}
+
+
+class SQLitePool:
+    def __init__(
+        self,
+        db_path: Path | str,
+        size: int = 4,
+        readonly: bool = False,
+        immutable: bool = False,
+        busy_timeout_ms: int = 5000,
+        cached_statements: int = 256,
+        pragmas: dict | None = None,
+    ):
+        self.db_path = str(db_path)
+        self.size = size
+        self.readonly = readonly or immutable
+        self.immutable = immutable
+        self.busy_timeout_ms = busy_timeout_ms
+        self.cached_statements = cached_statements
+        self.pragmas = {**DEFAULT_PRAGMAS, **(pragmas or {})}
+        if self.readonly:
+            # read-only file par journal / sync settings ka matlab nahi (aur likh bhi nahi sakte)
+            self.pragmas.pop("journal_mode", None)
+            self.pragmas.pop("synchronous", None)
+
+        self._idle: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if self.immutable:
+            target, uri = f"file:{quote(self.db_path)}?mode=ro&immutable=1", True
+        elif self.readonly:
+            target, uri = f"file:{quote(self.db_path)}?mode=ro", True
+        else:
+            target, uri = self.db_path, False
+        conn = sqlite3.connect(
+            target,
+            uri=uri,
+            check_same_thread=False,
+            timeout=self.busy_timeout_ms / 1000,
+            cached_statements=self.cached_statements,
+        )
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        if self.readonly:
+            conn.execute("PRAGMA query_only = ON")
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                try:
+                    return self._connect()
+                except Exception:
+                    self._created -= 1
+                    raise
+
+        # pool full → kisi aur thread ke connection lautane ka wait
+        return self._idle.get()
+
+    def _release(self, conn: sqlite3.Connection):
+        if self._closed:
+            conn.close()
+            return
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        """
+        Pool se ek connection do. Block ke andar exception aaye to open
+        transaction rollback hota hai, warna jo caller ne commit nahi kiya
+        wo bhi rollback (connection hamesha clean state me lautta hai).
+        """
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._release(conn)
+
+    @contextmanager
+    def transaction(self):
+        with self.connection() as conn:
+            yield conn
+            conn.commit()
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+        with self._lock:
+            self._created = 0
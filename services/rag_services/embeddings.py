@@ -0,0 +1,46 @@
+import zlib
+
+import numpy as np
+
+from symptom_index import stem, tokenize
+
+# ---------------- Hashed N-gram Embedder ----------------
+#
+# Offline, deterministic, CPU-only embedding: word stems + character n-grams
+# ko signed feature hashing se fixed dim vector me daalo, phir L2 normalize.
+# Koi model download nahi, har process / machine par same vector (crc32,
+# Python ka randomized hash() nahi).
+
+
+class HashingEmbedder:
+    def __init__(self, dim: int = 256, ngram_range: tuple[int, int] = (3, 5), word_weight: float = 2.0):
+        self.dim = dim
+        self.ngram_range = ngram_range
+        self.word_weight = word_weight
+
+    def _features(self, text: str):
+        lo, hi = self.ngram_range
+        for token in tokenize(text):
+            word = stem(token)
+            yield f"w:{word}", self.word_weight
+            padded = f"<{word}>"
+            for n in range(lo, hi + 1):
+                for i in range(len(padded) - n + 1):
+                    yield padded[i:i + n], 1.0
+
+    def embed(self, text: str) -> np.ndarray:
+        vec = np.zeros(self.dim, dtype=np.float32)
+        for feature, weight in self._features(text):
+            h = zlib.crc32(feature.encode("utf-8"))
+            sign = 1.0 if h & 0x80000000 else -1.0
+            vec[h % self.dim] += sign * weight
+        norm = np.linalg.norm(vec)
+        if norm > 0:
+            vec /= norm
+        return vec
+
+    def embed_batch(self, texts: list[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            out[i] = self.embed(text)
+        return out
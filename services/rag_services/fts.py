@@ -0,0 +1,338 @@
+"""
+Full-text search (SQLite FTS5 + BM25) over saara recommendation text.
+
+Jab intent/crop routing se koi row nahi milti, /query yahan se free-text
+search karta hai taaki zyada sawal RAG se hi answer ho jaayein.
+
+Index setup / rebuild (idempotent):
+
+    python fts.py --db /app/data/agri_knowledge.db [--rebuild]
+"""
+import argparse
+import sqlite3
+import time
+
+from symptom_index import stem, tokenize
+
+# ---------------- Schema ----------------
+#
+# knowledge_fts ki rowid = (source row id << 3) | source tag, taaki triggers
+# ek row ko seedha rowid se delete/update kar sakein (full scan nahi).
+
+SOURCE_TAGS = {
+    "fertilizer_table": 1,
+    "disease_table": 2,
+    "crop_calendar": 3,
+    "advisory": 4,
+}
+
+ADVISORY_DDL = """
+CREATE TABLE IF NOT EXISTS advisory_passages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    doc_id TEXT NOT NULL,
+    chunk_no INTEGER NOT NULL,
+    crop_name TEXT,
+    title TEXT NOT NULL DEFAULT '',
+    body TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    UNIQUE (doc_id, chunk_no)
+);
+CREATE INDEX IF NOT EXISTS idx_advisory_hash ON advisory_passages (content_hash);
+"""
+
+FTS_DDL = """
+CREATE VIRTUAL TABLE IF NOT EXISTS knowledge_fts USING fts5(
+    title,
+    body,
+    crop UNINDEXED,
+    source UNINDEXED,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS knowledge_fts_vocab USING fts5vocab(knowledge_fts, row);
+"""
+
+# table → (rowid column, title, body, crop, source) SQL expressions; "{r}" =
+# row alias (new / old / table name). Triggers aur rebuild dono yahi use karte hain.
+FTS_SOURCES = {
+    "fertilizer": (
+        "id",
+        "{r}.crop_name || ' khaad fertilizer'",
+        "{r}.recommendation",
+        "{r}.crop_name",
+        "fertilizer_table",
+    ),
+    "disease": (
+        "id",
+        "{r}.disease_name || ' ' || replace({r}.symptom_keywords, ',', ' ')",
+        "{r}.recommendation",
+        "{r}.crop_name",
+        "disease_table",
+    ),
+    "crop_calendar": (
+        "rowid",
+        "{r}.crop_name || ' buvai katai calendar'",
+        "{r}.crop_name || ' ki buvai ' || {r}.sowing_month || ' me aur katai ' "
+        "|| {r}.harvesting_month || ' me hoti hai.'",
+        "{r}.crop_name",
+        "crop_calendar",
+    ),
+    "advisory_passages": (
+        "id",
+        "{r}.title",
+        "{r}.body",
+        "coalesce({r}.crop_name, '')",
+        "advisory",
+    ),
+}
+
+
+def _fts_select(table: str, r: str) -> str:
+    pk, title, body, crop, source = FTS_SOURCES[table]
+    tag = SOURCE_TAGS[source]
+    return (
+        f"SELECT ({r}.{pk} << 3) | {tag}, {title.format(r=r)}, {body.format(r=r)}, "
+        f"lower({crop.format(r=r)}), '{source}'"
+    )
+
+
+def _trigger_ddl(table: str) -> str:
+    pk, *_, source = FTS_SOURCES[table]
+    insert_new = "INSERT INTO knowledge_fts (rowid, title, body, crop, source) " + _fts_select(table, "new")
+    delete_old = f"DELETE FROM knowledge_fts WHERE rowid = (old.{pk} << 3) | {SOURCE_TAGS[source]}"
+    return f"""
+CREATE TRIGGER IF NOT EXISTS {table}_fts_ai AFTER INSERT ON {table} BEGIN
+    {insert_new};
+END;
+CREATE TRIGGER IF NOT EXISTS {table}_fts_ad AFTER DELETE ON {table} BEGIN
+    {delete_old};
+END;
+CREATE TRIGGER IF NOT EXISTS {table}_fts_au AFTER UPDATE ON {table} BEGIN
+    {delete_old};
+    {insert_new};
+END;
+"""
+
+
+def _table_exists(conn: sqlite3.Connection, name: str) -> bool:
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = ?", (name,)
+    ).fetchone()
+    return row is not None
+
+
+def rebuild_fts(conn: sqlite3.Connection):
+    conn.execute("DELETE FROM knowledge_fts")
+    for table in FTS_SOURCES:
+        if _table_exists(conn, table):
+            conn.execute(
+                "INSERT INTO knowledge_fts (rowid, title, body, crop, source) "
+                + _fts_select(table, table) + f" FROM {table}"
+            )
+    conn.execute("INSERT INTO knowledge_fts (knowledge_fts) VALUES ('optimize')")
+
+
+def ensure_fts(conn: sqlite3.Connection, rebuild: bool = False) -> bool:
+    """
+    FTS table + incremental triggers banao (agar nahi hain). Pehli baar ya
+    rebuild=True par existing rows se index bharo. Returns True agar rebuild hua.
+    """
+    existed = _table_exists(conn, "knowledge_fts")
+
+    conn.executescript(ADVISORY_DDL + FTS_DDL)
+    # triggers sirf un tables par jo maujood hain
+    for table in FTS_SOURCES:
+        if _table_exists(conn, table):
+            conn.executescript(_trigger_ddl(table))
+        else:
+            print(f"⚠️ FTS: table '{table}' missing, triggers skipped")
+
+    if rebuild or not existed:
+        rebuild_fts(conn)
+        conn.commit()
+        return True
+
+    conn.commit()
+    return False
+
+# ---------------- Search ----------------
+
+# Hinglish stopwords: ye har sawal me hote hain, ranking me madad nahi karte
+STOPWORDS = {
+    "ke", "ki", "ka", "ko", "me", "mein", "main", "hai", "hain", "ho", "hota",
+    "hoti", "liye", "kya", "kaise", "kab", "kitna", "kitni", "aur", "ya", "se",
+    "par", "pe", "to", "bhi", "mera", "meri", "mere", "hum", "ham", "humare",
+    "kare", "karein", "karen", "karna", "karu", "karun", "batao", "bataye",
+    "bataiye", "please", "plz", "sir", "ji", "the", "is", "a", "an", "of",
+    "for", "in", "on", "and", "what", "how", "my", "i", "do", "koi", "kuch",
+    "ek", "de", "do", "den", "dena", "chahiye",
+}
+
+
+def query_terms(message: str) -> list[str]:
+    seen = []
+    for token in tokenize(message):
+        if token in STOPWORDS or len(token) < 3:
+            continue
+        term = stem(token)
+        if term not in seen:
+            seen.append(term)
+    return seen
+
+
+# stem ke common Hinglish inflections; prefix query (patt*) se sasta aur
+# "shabd1*" jaisa hazaron terms me expand nahi hota
+INFLECTIONS = ("", "a", "e", "i", "o", "aa", "ee", "on", "en")
+
+
+def variants(term: str) -> list[str]:
+    if not term.isalpha():
+        return [term]
+    return [term + suffix for suffix in INFLECTIONS]
+
+
+def _group(term: str) -> str:
+    return "(" + " OR ".join(f'"{v}"' for v in variants(term)) + ")"
+
+
+SEARCH_SQL = """
+    SELECT source, crop, title, body,
+           snippet(knowledge_fts, 1, '', '', '…', 32) AS snip,
+           bm25(knowledge_fts, 2.0, 1.0) AS score
+    FROM knowledge_fts
+    WHERE knowledge_fts MATCH ?
+      AND (? = '' OR crop = ? OR crop = '')
+    ORDER BY score
+    LIMIT ?
+"""
+
+DOC_COUNT_SQL = "SELECT count(*) FROM knowledge_fts_docsize"
+
+
+class FullTextIndex:
+    """
+    BM25 search with df-aware query planning.
+
+    "fasal", "khet" jaise terms lakhon passages me hote hain; unhe OR query
+    me daalne se har search poore doclist ko score karta hai. Isliye term ka
+    document frequency (fts5vocab, TTL cache) dekh kar sirf selective terms
+    se candidates nikalte hain; common terms sirf "kitne terms mile" wale
+    check me gine jaate hain. Sab terms common hon to AND query.
+
+    search() ka stats_key (knowledge version / snapshot) badle to df cache
+    turant reset — naye snapshot par purane counts se planning nahi.
+    """
+
+    def __init__(
+        self,
+        min_terms: int = 2,
+        candidates: int = 50,
+        common_df_min: int = 500,
+        common_df_ratio: float = 0.01,
+        df_ttl: float = 300.0,
+    ):
+        self.min_terms = min_terms
+        self.candidates = candidates
+        self.common_df_min = common_df_min
+        self.common_df_ratio = common_df_ratio
+        self.df_ttl = df_ttl
+
+        self._df: dict[str, tuple[float, int]] = {}
+        self._docs: tuple[float, int] = (0.0, 0)
+        self._stats_key = None
+
+    def _use_stats(self, key):
+        if key != self._stats_key:
+            self._df = {}
+            self._docs = (0.0, 0)
+            self._stats_key = key
+
+    def _doc_count(self, conn: sqlite3.Connection) -> int:
+        at, n = self._docs
+        if time.monotonic() - at > self.df_ttl:
+            n = conn.execute(DOC_COUNT_SQL).fetchone()[0]
+            self._docs = (time.monotonic(), n)
+        return n
+
+    def _df_of(self, conn: sqlite3.Connection, term: str) -> int:
+        cached = self._df.get(term)
+        if cached and time.monotonic() - cached[0] <= self.df_ttl:
+            return cached[1]
+
+        forms = variants(term)
+        placeholders = ",".join("?" * len(forms))
+        df = conn.execute(
+            f"SELECT coalesce(sum(doc), 0) FROM knowledge_fts_vocab WHERE term IN ({placeholders})",
+            forms,
+        ).fetchone()[0]
+        self._df[term] = (time.monotonic(), df)
+        return df
+
+    def plan(self, conn: sqlite3.Connection, terms: list[str]) -> str:
+        common_df = max(self.common_df_min, self.common_df_ratio * self._doc_count(conn))
+        selective = [t for t in terms if self._df_of(conn, t) <= common_df]
+        if selective:
+            return " OR ".join(_group(t) for t in selective)
+        return " AND ".join(_group(t) for t in terms)
+
+    def search(
+        self,
+        conn: sqlite3.Connection,
+        message: str,
+        crop: str | None = None,
+        k: int = 3,
+        stats_key=None,
+    ) -> list[dict]:
+        """
+        BM25-ranked passages. Hit tab hi maana jata hai jab passage me kam se
+        kam min(min_terms, query terms) alag query terms milein — ek common
+        word se LLM skip nahi hona chahiye.
+        """
+        self._use_stats(stats_key)
+        terms = query_terms(message)
+        crop = (crop or "").strip().lower()
+
+        # sirf crop ka naam match hona koi jawab nahi hai
+        scoring_terms = [t for t in terms if t != stem(crop)]
+        if not scoring_terms:
+            return []
+        needed = min(self.min_terms, len(scoring_terms))
+
+        try:
+            expr = self.plan(conn, scoring_terms)
+            rows = conn.execute(
+                SEARCH_SQL, (expr, crop, crop, max(self.candidates, k))
+            ).fetchall()
+        except sqlite3.OperationalError as e:
+            # FTS table abhi bani nahi
+            print("⚠️ FTS search unavailable:", e)
+            return []
+
+        hits = []
+        for source, row_crop, title, body, snip, score in rows:
+            words = {stem(w) for w in tokenize(f"{title} {body}")}
+            if sum(1 for t in scoring_terms if t in words) < needed:
+                continue
+            hits.append({
+                "source": source,
+                "crop": row_crop or None,
+                "title": title,
+                "snippet": snip,
+                "score": round(-score, 4),
+            })
+            if len(hits) >= k:
+                break
+        return hits
+
+# ---------------- CLI ----------------
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--db", required=True)
+    parser.add_argument("--rebuild", action="store_true")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    rebuilt = ensure_fts(conn, rebuild=args.rebuild)
+    count = conn.execute("SELECT count(*) FROM knowledge_fts").fetchone()[0]
+    conn.close()
+    print(f"✅ FTS ready ({'rebuilt' if rebuilt else 'up to date'}): {count} passages")
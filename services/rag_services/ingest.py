@@ -0,0 +1,433 @@
+"""
+Advisory documents (PDF / text) ko knowledge DB me ingest karo.
+
+Pipeline (har document ek generator chain se guzarta hai):
+
+    extract → normalize Hinglish → chunk → content hash → upsert (FTS triggers index karte hain)
+
+Documents process pool me parallel process hote hain; ek waqt par sirf
+`workers * 2` documents in-flight rehte hain (bounded memory). Re-ingest
+idempotent hai: unchanged file poori skip, changed file me sirf badle chunks
+likhe jaate hain, aur corpus se hati files ke passages bhi hat jaate hain
+(--keep-missing se nahi).
+
+    python ingest.py --db /app/data/agri_knowledge.db /app/data/advisories --workers 4
+    python ingest.py --db ... /app/data/advisories --publish /app/data/knowledge   # phir snapshot bhi
+"""
+import argparse
+import hashlib
+import re
+import sqlite3
+import time
+import unicodedata
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Iterator
+
+import fts
+
+SUPPORTED_SUFFIXES = {".txt", ".md", ".pdf"}
+
+# ---------------- Extract ----------------
+
+
+def extract_pages(path: Path) -> Iterator[str]:
+    if path.suffix.lower() == ".pdf":
+        try:
+            from pypdf import PdfReader
+        except ImportError:
+            raise RuntimeError("PDF ingestion needs 'pypdf' (pip install pypdf)")
+        for page in PdfReader(str(path)).pages:
+            yield page.extract_text() or ""
+        return
+
+    with open(path, encoding="utf-8", errors="replace") as f:
+        # paragraph-wise stream, poori file memory me nahi
+        block: list[str] = []
+        for line in f:
+            if line.strip():
+                block.append(line)
+            elif block:
+                yield "".join(block)
+                block = []
+        if block:
+            yield "".join(block)
+
+# ---------------- Normalize ----------------
+
+# Hinglish spelling variants → ek canonical form (NLU / RAG me yahi naam chalte hain)
+SPELLING_VARIANTS = {
+    "gehun": "gehu", "gehoon": "gehu", "gahu": "gehu", "wheat": "gehu",
+    "dhan": "dhaan", "dhaan": "dhaan", "chawal": "dhaan", "paddy": "dhaan", "rice": "dhaan",
+    "sarso": "sarson", "mustard": "sarson",
+    "khad": "khaad", "khaad": "khaad",
+    "beemari": "bimari", "bimaari": "bimari",
+    "keeda": "keet", "kida": "keet",
+    "sinchaai": "sinchai",
+}
+VARIANT_RE = re.compile(
+    r"\b(" + "|".join(sorted(map(re.escape, SPELLING_VARIANTS), key=len, reverse=True)) + r")\b",
+    re.IGNORECASE,
+)
+CROPS = ("gehu", "dhaan", "sarson")
+WS_RE = re.compile(r"\s+")
+
+
+def normalize(text: str) -> str:
+    text = unicodedata.normalize("NFKC", text)
+    text = VARIANT_RE.sub(lambda m: SPELLING_VARIANTS[m.group(1).lower()], text)
+    return WS_RE.sub(" ", text).strip()
+
+
+def normalized(pages: Iterator[str]) -> Iterator[str]:
+    for page in pages:
+        text = normalize(page)
+        if text:
+            yield text
+
+# ---------------- Chunk ----------------
+
+SENTENCE_RE = re.compile(r"(?<=[.!?।])\s+")
+
+
+def chunks(paragraphs: Iterator[str], max_chars: int = 800, min_chars: int | None = None) -> Iterator[str]:
+    """
+    Sentences ko max_chars tak pack karo; sentence beech se nahi tootta.
+    Paragraph khatam → chunk khatam (min_chars se chhota ho to agle paragraph
+    se judta hai): file me ek jagah badlav baaki chunks ki boundaries shift
+    nahi karta, re-ingest me wo chunks same hash ke saath bache rehte hain.
+    """
+    min_chars = max_chars // 4 if min_chars is None else min_chars
+    buf = ""
+    for para in paragraphs:
+        for sentence in SENTENCE_RE.split(para):
+            if buf and len(buf) + len(sentence) + 1 > max_chars:
+                yield buf
+                buf = ""
+            buf = f"{buf} {sentence}".strip()
+            while len(buf) > max_chars:
+                # bahut lamba sentence → hard split
+                yield buf[:max_chars]
+                buf = buf[max_chars:]
+        if len(buf) >= min_chars:
+            yield buf
+            buf = ""
+    if buf:
+        yield buf
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha1(text.lower().encode("utf-8")).hexdigest()
+
+
+def detect_crop(text: str) -> str | None:
+    counts = {crop: len(re.findall(rf"\b{crop}\b", text, re.IGNORECASE)) for crop in CROPS}
+    crop, best = max(counts.items(), key=lambda kv: kv[1])
+    others = sum(counts.values()) - best
+    # ek hi crop dominate kare tabhi tag karo, warna general advisory
+    return crop if best and best > others else None
+
+# ---------------- Worker ----------------
+
+
+def file_hash(path: Path) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def process_document(path: str, doc_id: str, known_hash: str | None, max_chars: int) -> dict:
+    """Process pool worker: ek document → chunks (ya 'unchanged')."""
+    p = Path(path)
+    digest = file_hash(p)
+    if digest == known_hash:
+        return {"doc_id": doc_id, "hash": digest, "unchanged": True}
+
+    title = doc_title(doc_id)
+    out = []
+    for text in chunks(normalized(extract_pages(p)), max_chars):
+        out.append({"text": text, "hash": content_hash(text), "crop": detect_crop(text)})
+    return {"doc_id": doc_id, "hash": digest, "unchanged": False, "title": title, "chunks": out}
+
+# ---------------- Writer ----------------
+#
+# Document ke andar chunk ki pehchaan = content hash (position nahi): file ke
+# beech me paragraph judne se baaki chunks jaise the waise rehte hain, sirf
+# naya chunk likha jaata hai. chunk_no ab document me stable id hai (naye
+# chunks max + 1 paate hain), exact position nahi.
+#
+# Same text kisi aur document me pehle se indexed ho to dobara nahi likhte,
+# par advisory_chunk_refs me reference rakhte hain. Owner document wo chunk
+# chhode (badle / file hate) to passage reference wale document ko mil jaata
+# hai — text index se gaayab nahi hota.
+
+DOCUMENTS_DDL = """
+CREATE TABLE IF NOT EXISTS advisory_documents (
+    doc_id TEXT PRIMARY KEY,
+    file_hash TEXT NOT NULL,
+    chunk_count INTEGER NOT NULL,
+    ingested_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS advisory_chunk_refs (
+    doc_id TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    PRIMARY KEY (doc_id, content_hash)
+);
+CREATE INDEX IF NOT EXISTS idx_advisory_chunk_refs_hash ON advisory_chunk_refs (content_hash);
+"""
+
+INSERT_CHUNK_SQL = """
+    INSERT INTO advisory_passages (doc_id, chunk_no, crop_name, title, body, content_hash)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+
+class IngestStats:
+    def __init__(self):
+        self.docs = 0
+        self.unchanged_docs = 0
+        self.failed_docs = 0
+        self.removed_docs = 0
+        self.chunks = 0
+        self.written = 0
+        self.duplicates = 0
+        self.deleted = 0
+        self.started = time.perf_counter()
+
+    def report(self) -> str:
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        return (
+            f"docs={self.docs} unchanged={self.unchanged_docs} failed={self.failed_docs} "
+            f"removed={self.removed_docs} chunks={self.chunks} written={self.written} "
+            f"duplicates={self.duplicates} deleted={self.deleted} elapsed={elapsed:.1f}s "
+            f"throughput={self.chunks / elapsed:.0f} chunks/s"
+        )
+
+
+def doc_title(doc_id: str) -> str:
+    return Path(doc_id).stem.replace("_", " ").replace("-", " ")
+
+
+def _next_chunk_no(conn: sqlite3.Connection, doc_id: str) -> int:
+    return conn.execute(
+        "SELECT coalesce(max(chunk_no), -1) + 1 FROM advisory_passages WHERE doc_id = ?", (doc_id,)
+    ).fetchone()[0]
+
+
+def release_chunk(conn: sqlite3.Connection, passage_id: int, digest: str) -> bool:
+    """
+    Owner document ne chunk chhoda. Koi aur document isi text ko refer karta
+    hai to passage usko de do, warna delete. Returns True agar delete hua.
+    """
+    ref = conn.execute(
+        "SELECT doc_id FROM advisory_chunk_refs WHERE content_hash = ? ORDER BY doc_id LIMIT 1", (digest,)
+    ).fetchone()
+    if ref is None:
+        conn.execute("DELETE FROM advisory_passages WHERE id = ?", (passage_id,))
+        return True
+    heir = ref[0]
+    conn.execute("DELETE FROM advisory_chunk_refs WHERE doc_id = ? AND content_hash = ?", (heir, digest))
+    conn.execute(
+        "UPDATE advisory_passages SET doc_id = ?, chunk_no = ?, title = ? WHERE id = ?",
+        (heir, _next_chunk_no(conn, heir), doc_title(heir), passage_id),
+    )
+    return False
+
+
+def write_document(conn: sqlite3.Connection, result: dict, stats: IngestStats):
+    doc_id = result["doc_id"]
+    owned = {digest: pid for pid, digest in conn.execute(
+        "SELECT id, content_hash FROM advisory_passages WHERE doc_id = ?", (doc_id,)
+    )}
+    refs = {digest for (digest,) in conn.execute(
+        "SELECT content_hash FROM advisory_chunk_refs WHERE doc_id = ?", (doc_id,)
+    )}
+    next_no = _next_chunk_no(conn, doc_id)
+
+    seen: set[str] = set()
+    duplicates: set[str] = set()
+    for chunk in result["chunks"]:
+        stats.chunks += 1
+        digest = chunk["hash"]
+        if digest in seen:
+            continue
+        seen.add(digest)
+        if digest in owned:
+            continue
+        # same text kisi aur document me pehle se hai → dobara index nahi, sirf reference
+        dup = conn.execute(
+            "SELECT 1 FROM advisory_passages WHERE content_hash = ? AND doc_id != ? LIMIT 1",
+            (digest, doc_id),
+        ).fetchone()
+        if dup:
+            stats.duplicates += 1
+            duplicates.add(digest)
+            if digest not in refs:
+                conn.execute(
+                    "INSERT INTO advisory_chunk_refs (doc_id, content_hash) VALUES (?, ?)", (doc_id, digest)
+                )
+            continue
+        conn.execute(
+            INSERT_CHUNK_SQL,
+            (doc_id, next_no, chunk["crop"], result["title"], chunk["text"], digest),
+        )
+        next_no += 1
+        stats.written += 1
+
+    for digest, pid in owned.items():
+        if digest not in seen and release_chunk(conn, pid, digest):
+            stats.deleted += 1
+    dropped = refs - duplicates
+    if dropped:
+        conn.executemany(
+            "DELETE FROM advisory_chunk_refs WHERE doc_id = ? AND content_hash = ?",
+            [(doc_id, digest) for digest in dropped],
+        )
+
+    conn.execute(
+        "INSERT INTO advisory_documents (doc_id, file_hash, chunk_count) VALUES (?, ?, ?) "
+        "ON CONFLICT (doc_id) DO UPDATE SET file_hash = excluded.file_hash, "
+        "chunk_count = excluded.chunk_count, ingested_at = CURRENT_TIMESTAMP",
+        (doc_id, result["hash"], len(seen)),
+    )
+
+
+def remove_document(conn: sqlite3.Connection, doc_id: str, stats: IngestStats):
+    """File corpus se hat gayi → uske passages (reference wale doc ko handover) aur record hatao."""
+    conn.execute("DELETE FROM advisory_chunk_refs WHERE doc_id = ?", (doc_id,))
+    for pid, digest in conn.execute(
+        "SELECT id, content_hash FROM advisory_passages WHERE doc_id = ?", (doc_id,)
+    ).fetchall():
+        if release_chunk(conn, pid, digest):
+            stats.deleted += 1
+    conn.execute("DELETE FROM advisory_documents WHERE doc_id = ?", (doc_id,))
+    stats.removed_docs += 1
+
+
+def bump_version(conn: sqlite3.Connection):
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS knowledge_version (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        version INTEGER NOT NULL
+    )
+    """)
+    conn.execute(
+        "INSERT INTO knowledge_version (id, version) VALUES (1, 1) "
+        "ON CONFLICT(id) DO UPDATE SET version = version + 1"
+    )
+
+# ---------------- Pipeline ----------------
+
+
+def iter_documents(paths: list[Path]) -> Iterator[tuple[Path, str]]:
+    for root in paths:
+        if root.is_file():
+            yield root, root.name
+            continue
+        for path in sorted(root.rglob("*")):
+            if path.is_file() and path.suffix.lower() in SUPPORTED_SUFFIXES:
+                yield path, path.relative_to(root).as_posix()
+
+
+def ingest(
+    db_path: Path | str,
+    paths: list[Path],
+    workers: int = 4,
+    max_chars: int = 800,
+    commit_every: int = 50,
+    prune: bool = True,
+) -> IngestStats:
+    """prune=True: jo documents is ingest set me nahi mile unke passages bhi hatao."""
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    fts.ensure_fts(conn)
+    had_refs = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'advisory_chunk_refs'"
+    ).fetchone() is not None
+    conn.executescript(DOCUMENTS_DDL)
+    indexed = [doc_id for (doc_id,) in conn.execute("SELECT doc_id FROM advisory_documents")]
+    # refs table se pehle ki DB: skip hue duplicates ka reference nahi tha →
+    # ek baar sab documents dobara process (unchanged chunks phir bhi nahi likhte)
+    known = dict(conn.execute("SELECT doc_id, file_hash FROM advisory_documents")) if had_refs else {}
+
+    stats = IngestStats()
+    changed = False
+    pending_commit = 0
+    docs = iter_documents(paths)
+    in_flight = set()
+    seen_docs: set[str] = set()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        def submit_next() -> bool:
+            try:
+                path, doc_id = next(docs)
+            except StopIteration:
+                return False
+            seen_docs.add(doc_id)
+            in_flight.add(pool.submit(process_document, str(path), doc_id, known.get(doc_id), max_chars))
+            return True
+
+        # bounded window: itne hi documents ek saath memory me
+        for _ in range(workers * 2):
+            if not submit_next():
+                break
+
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                in_flight.discard(future)
+                submit_next()
+                stats.docs += 1
+                try:
+                    result = future.result()
+                except Exception as e:
+                    stats.failed_docs += 1
+                    print("⚠️ Ingest failed:", e)
+                    continue
+                if result["unchanged"]:
+                    stats.unchanged_docs += 1
+                    continue
+
+                before = conn.total_changes
+                write_document(conn, result, stats)
+                changed |= conn.total_changes > before
+                pending_commit += 1
+                if pending_commit >= commit_every:
+                    conn.commit()
+                    pending_commit = 0
+
+    if prune:
+        for doc_id in indexed:
+            if doc_id not in seen_docs:
+                remove_document(conn, doc_id, stats)
+                changed = True
+
+    if changed:
+        bump_version(conn)
+    conn.commit()
+    conn.close()
+    return stats
+
+# ---------------- CLI ----------------
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+", type=Path)
+    parser.add_argument("--db", required=True)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--max-chars", type=int, default=800)
+    parser.add_argument("--publish", type=Path, default=None, help="ingest ke baad is dir me immutable snapshot")
+    parser.add_argument(
+        "--keep-missing", action="store_true",
+        help="paths me na mile documents ko index me rehne do (sirf kuch files re-ingest karni hon)",
+    )
+    args = parser.parse_args()
+
+    stats = ingest(args.db, args.paths, args.workers, args.max_chars, prune=not args.keep_missing)
+    print("✅ Ingest done:", stats.report())
+    if args.publish:
+        from publish_knowledge import publish
+
+        print("✅ Knowledge snapshot published:", publish(args.db, args.publish))
@@ -0,0 +1,333 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from fastapi.concurrency import run_in_threadpool
+from prometheus_client import Counter, Gauge, Histogram
+
+from db import SQLitePool
+from symptom_index import SymptomIndex
+
+# ---------------- Metrics ----------------
+
+INDEX_ENTRIES = Gauge(
+    "rag_knowledge_index_entries", "Rows held in the in-memory knowledge index", ["table"]
+)
+INDEX_VERSION = Gauge("rag_knowledge_index_version", "Version of the loaded knowledge snapshot")
+RELOAD_LATENCY = Histogram("rag_knowledge_reload_seconds", "Knowledge snapshot reload duration")
+RELOAD_COUNT = Counter("rag_knowledge_reloads_total", "Knowledge snapshot reloads", ["status"])
+
+# ---------------- Snapshot ----------------
+
+
+def _norm(crop: str | None) -> str:
+    return (crop or "").strip().lower()
+
+
+class KnowledgeSnapshot:
+    """
+    Knowledge tables ka immutable in-memory copy. Lookup sirf dict access
+    hai, koi SQL ya thread hop nahi. Naya data aane par naya snapshot banta
+    hai aur reference ek saath swap hota hai.
+    """
+
+    __slots__ = ("version", "loaded_at", "fertilizer", "disease", "crop_calendar", "symptoms", "pool")
+
+    def __init__(self, version=None, fertilizer=None, disease=None, crop_calendar=None, pool=None):
+        self.version = version
+        # FTS jaise SQL lookups isi pool se — dicts aur SQL ek hi file ke
+        self.pool: SQLitePool | None = pool
+        self.loaded_at = time.time()
+        self.fertilizer: dict[str, str] = fertilizer or {}
+        self.disease: dict[str, tuple] = disease or {}
+        self.crop_calendar: dict[str, tuple[str, str]] = crop_calendar or {}
+        # snapshot ke saath ek hi baar banta hai
+        self.symptoms = SymptomIndex(self.disease)
+
+    def sizes(self) -> dict[str, int]:
+        return {
+            "fertilizer": len(self.fertilizer),
+            "disease": sum(len(rows) for rows in self.disease.values()),
+            "crop_calendar": len(self.crop_calendar),
+            "symptom_postings": len(self.symptoms),
+        }
+
+    def fertilizer_for(self, crop: str):
+        return self.fertilizer.get(_norm(crop))
+
+    def diseases_for(self, crop: str) -> tuple:
+        return self.disease.get(_norm(crop), ())
+
+    def match_diseases(self, crop: str, message: str, k: int = 3) -> list[tuple[float, tuple]]:
+        return self.symptoms.search(_norm(crop), message, k)
+
+    def calendar_for(self, crop: str):
+        return self.crop_calendar.get(_norm(crop))
+
+
+EMPTY_SNAPSHOT = KnowledgeSnapshot()
+
+# ---------------- Loader ----------------
+
+VERSION_SQL = "SELECT version FROM knowledge_version WHERE id = 1"
+
+
+def _table_exists(conn: sqlite3.Connection, name: str) -> bool:
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+    ).fetchone()
+    return row is not None
+
+
+def read_version(conn: sqlite3.Connection):
+    if not _table_exists(conn, "knowledge_version"):
+        return None
+    row = conn.execute(VERSION_SQL).fetchone()
+    return row[0] if row else None
+
+
+def load_snapshot(conn: sqlite3.Connection, pool: SQLitePool | None = None) -> KnowledgeSnapshot:
+    # ek hi read transaction → teeno tables ka consistent view
+    conn.execute("BEGIN")
+    try:
+        version = read_version(conn)
+
+        fertilizer = {}
+        if _table_exists(conn, "fertilizer"):
+            for crop, rec in conn.execute(
+                "SELECT crop_name, recommendation FROM fertilizer ORDER BY id"
+            ):
+                # purane LIMIT-less query jaisa: pehli row jeetti hai
+                fertilizer.setdefault(_norm(crop), rec)
+
+        disease: dict[str, list] = {}
+        if _table_exists(conn, "disease"):
+            for crop, keywords, name, rec in conn.execute(
+                "SELECT crop_name, symptom_keywords, disease_name, recommendation "
+                "FROM disease ORDER BY id"
+            ):
+                disease.setdefault(_norm(crop), []).append((name, rec, keywords))
+
+        crop_calendar = {}
+        if _table_exists(conn, "crop_calendar"):
+            for crop, sowing, harvesting in conn.execute(
+                "SELECT crop_name, sowing_month, harvesting_month FROM crop_calendar"
+            ):
+                crop_calendar.setdefault(_norm(crop), (sowing, harvesting))
+    finally:
+        conn.rollback()
+
+    return KnowledgeSnapshot(
+        version=version,
+        fertilizer=fertilizer,
+        disease={crop: tuple(rows) for crop, rows in disease.items()},
+        crop_calendar=crop_calendar,
+        pool=pool,
+    )
+
+# ---------------- Index with Hot Reload ----------------
+
+
+class KnowledgeIndex:
+    def __init__(self, pool: SQLitePool, db_path: Path | str, poll_interval: float = 5.0):
+        self.pool = pool
+        self.db_path = Path(db_path)
+        self.poll_interval = poll_interval
+        self.snapshot: KnowledgeSnapshot = EMPTY_SNAPSHOT
+
+        self._file_sig = None
+        self._task: asyncio.Task | None = None
+
+    def _file_signature(self):
+        # WAL mode me writes pehle -wal file me jaate hain, isliye dono dekho
+        sig = []
+        for path in (self.db_path, Path(f"{self.db_path}-wal")):
+            try:
+                st = os.stat(path)
+                sig.append((st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                sig.append(None)
+        return tuple(sig)
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Sync reload (threadpool me chalao). File signature na badla ho to
+        kuch nahi; badla ho par version row same ho (e.g. sirf chat_history
+        likhi gayi) to bhi skip. Returns True agar naya snapshot swap hua.
+        """
+        file_sig = self._file_signature()
+        if not force and file_sig == self._file_sig:
+            return False
+        if file_sig[0] is None:
+            return False
+
+        start = time.perf_counter()
+        try:
+            with self.pool.connection() as conn:
+                if not force and self.snapshot is not EMPTY_SNAPSHOT:
+                    version = read_version(conn)
+                    if version is not None and version == self.snapshot.version:
+                        self._file_sig = file_sig
+                        return False
+                snapshot = load_snapshot(conn, self.pool)
+        except Exception as e:
+            RELOAD_COUNT.labels(status="error").inc()
+            print("❌ Knowledge snapshot reload failed:", e)
+            return False
+
+        self.snapshot = snapshot
+        self._file_sig = file_sig
+
+        RELOAD_LATENCY.observe(time.perf_counter() - start)
+        RELOAD_COUNT.labels(status="ok").inc()
+        for table, size in snapshot.sizes().items():
+            INDEX_ENTRIES.labels(table=table).set(size)
+        if isinstance(snapshot.version, (int, float)):
+            INDEX_VERSION.set(snapshot.version)
+
+        print("📚 Knowledge snapshot loaded:", snapshot.version, snapshot.sizes())
+        return True
+
+    @contextmanager
+    def use(self):
+        """Ek request = ek snapshot (beech me reload ho to bhi consistent)."""
+        yield self.snapshot
+
+    async def start(self):
+        await run_in_threadpool(self.reload, True)
+        if self.poll_interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._watch())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            await run_in_threadpool(self.reload)
+
+# ---------------- Published Snapshots ----------------
+#
+# publish_knowledge.py working DB se ek immutable file banata hai
+# (knowledge-<seq>.db) aur phir CURRENT pointer file atomically badalta hai.
+# RAG us file ko `immutable=1` + mmap + query_only se kholta hai: chat turns
+# ke writes / WAL / locks se koi lena dena nahi. CURRENT badle to naya pool +
+# snapshot ek hi reference swap me. Purana pool tab tak khula rehta hai jab
+# tak us snapshot ko use() se pakde requests khatam na ho jaayein (refcount);
+# aakhri request lautte hi band.
+
+CURRENT = "CURRENT"
+
+
+def current_snapshot(directory: Path | str) -> Path | None:
+    try:
+        name = (Path(directory) / CURRENT).read_text().strip()
+    except FileNotFoundError:
+        return None
+    return Path(directory) / name if name else None
+
+
+def open_snapshot_pool(path: Path | str, size: int = 4, mmap_size: int = 256 * 1024 * 1024) -> SQLitePool:
+    return SQLitePool(path, size=size, immutable=True, pragmas={"mmap_size": mmap_size})
+
+
+class SnapshotIndex(KnowledgeIndex):
+    """KnowledgeIndex, par live DB ki jagah published snapshots (CURRENT) par."""
+
+    def __init__(
+        self,
+        directory: Path | str,
+        pool_size: int = 4,
+        mmap_size: int = 256 * 1024 * 1024,
+        poll_interval: float = 5.0,
+    ):
+        super().__init__(None, Path(directory) / CURRENT, poll_interval=poll_interval)
+        self.directory = Path(directory)
+        self.pool_size = pool_size
+        self.mmap_size = mmap_size
+        self.path: Path | None = None
+        # snapshot → kitne requests abhi use kar rahe hain
+        self._users: dict[KnowledgeSnapshot, int] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def use(self):
+        """
+        Request ke poore duration ke liye snapshot + uska pool. Beech me swap
+        ho jaaye to bhi ye pool band nahi hota jab tak block khatam na ho.
+        """
+        with self._lock:
+            snapshot = self.snapshot
+            self._users[snapshot] = self._users.get(snapshot, 0) + 1
+        try:
+            yield snapshot
+        finally:
+            with self._lock:
+                left = self._users.pop(snapshot) - 1
+                if left:
+                    self._users[snapshot] = left
+                retired = not left and snapshot is not self.snapshot
+            if retired and snapshot.pool is not None:
+                snapshot.pool.close()
+
+    def prepare(self, force: bool = False) -> tuple[KnowledgeSnapshot, Path] | None:
+        """
+        Sync (threadpool): CURRENT badla ho to naya pool + snapshot kholo, par
+        swap nahi — caller vector index ke saath ek hi jagah swap() karta hai.
+        """
+        path = current_snapshot(self.directory)
+        if path is None or (path == self.path and not force):
+            return None
+
+        start = time.perf_counter()
+        pool = open_snapshot_pool(path, self.pool_size, self.mmap_size)
+        try:
+            with pool.connection() as conn:
+                snapshot = load_snapshot(conn, pool)
+        except Exception as e:
+            pool.close()
+            RELOAD_COUNT.labels(status="error").inc()
+            print("❌ Knowledge snapshot open failed:", path, e)
+            return None
+        RELOAD_LATENCY.observe(time.perf_counter() - start)
+        return snapshot, path
+
+    def swap(self, prepared: tuple[KnowledgeSnapshot, Path]):
+        snapshot, path = prepared
+        with self._lock:
+            old = self.snapshot
+            self.snapshot, self.pool, self.path = snapshot, snapshot.pool, path
+            # koi request purana snapshot nahi pakde → abhi band, warna aakhri use() band karega
+            idle = old not in self._users
+        if idle and old.pool is not None:
+            old.pool.close()
+
+        RELOAD_COUNT.labels(status="ok").inc()
+        for table, size in snapshot.sizes().items():
+            INDEX_ENTRIES.labels(table=table).set(size)
+        if isinstance(snapshot.version, (int, float)):
+            INDEX_VERSION.set(snapshot.version)
+
+        print("📚 Knowledge snapshot published:", path.name, snapshot.sizes())
+
+    def reload(self, force: bool = False) -> bool:
+        prepared = self.prepare(force)
+        if prepared is None:
+            return False
+        self.swap(prepared)
+        return True
+
+    async def stop(self):
+        await super().stop()
+        if self.pool is not None:
+            self.pool.close()
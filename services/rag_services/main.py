@@ -1,15 +1,117 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from pydantic import BaseModel
 from pathlib import Path
 from fastapi.concurrency import run_in_threadpool
-import sqlite3
+import asyncio
+import os
+import time
+
+from prometheus_client import generate_latest, CONTENT_TYPE_LATEST, Histogram
+
+import deadlines
+import tracing
+from db import SQLitePool
+from deadlines import DeadlineExceeded, DeadlineMiddleware, deadline_exceeded_handler
+from knowledge_index import KnowledgeIndex, KnowledgeSnapshot, SnapshotIndex, current_snapshot
+from vector_index import BatchingSearcher, VectorIndex, resolve_index_dir
+import fts
 
 app = FastAPI(title="AI Agri Assistant - RAG / Knowledge Service")
+# orchestrator ka X-Deadline-Ms: budget khatam ho to search shuru hi nahi
+app.add_middleware(DeadlineMiddleware)
+app.add_exception_handler(DeadlineExceeded, deadline_exceeded_handler)
 
 BASE_DIR = Path(__file__).resolve().parent
-DB_PATH = Path("/app/data/agri_knowledge.db")
+DB_PATH = Path(os.getenv("RAG_DB_PATH", "/app/data/agri_knowledge.db"))
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 4))
+KNOWLEDGE_RELOAD_INTERVAL = float(os.getenv("KNOWLEDGE_RELOAD_INTERVAL", 5))
+# publish_knowledge.py ke immutable snapshots (CURRENT pointer) yahan
+KNOWLEDGE_SNAPSHOT_DIR = Path(os.getenv("KNOWLEDGE_SNAPSHOT_DIR", str(DB_PATH.parent / "knowledge")))
+KNOWLEDGE_MMAP_SIZE = int(os.getenv("KNOWLEDGE_MMAP_SIZE", 256 * 1024 * 1024))
+
+# FTS index create_db.py / ingest.py / publish_knowledge.py banate hain;
+# RAG service DB me kabhi nahi likhta
+FTS_ENABLED = os.getenv("FTS_ENABLED", "true").lower() == "true"
+FTS_MIN_TERMS = int(os.getenv("FTS_MIN_TERMS", 2))
+
+# dense retrieval: index `python vector_index.py --db ... --out ...` se banta hai
+VECTOR_INDEX_DIR = Path(os.getenv("VECTOR_INDEX_DIR", str(DB_PATH.parent / "vector_index")))
+VECTOR_MIN_SCORE = float(os.getenv("VECTOR_MIN_SCORE", 0.25))
+VECTOR_NPROBE = int(os.getenv("VECTOR_NPROBE", 8))
+VECTOR_MAX_BATCH = int(os.getenv("VECTOR_MAX_BATCH", 32))
+VECTOR_MAX_WAIT_MS = float(os.getenv("VECTOR_MAX_WAIT_MS", 2))
+
+# set ho to spans JSON lines me (orchestrator ke trace ke child spans)
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH", "")
+tracing.configure("rag_service", TRACE_EXPORT_PATH)
+app.add_middleware(tracing.TracingMiddleware)
+
+# ---------------- Knowledge Sources ----------------
+#
+# Snapshot ya purana live-DB mode, aur vector index — dono har
+# KNOWLEDGE_RELOAD_INTERVAL par dobara dekhe jaate hain: pehla
+# publish_knowledge.py run ya naya vector build restart ke bina uthta hai.
+# Naya pool / snapshot / index threadpool me tayyar, phir event loop par ek
+# saath swap.
+
+
+def _snapshot_index() -> SnapshotIndex:
+    # immutable file: writes / WAL / locks se koi contention nahi
+    return SnapshotIndex(
+        KNOWLEDGE_SNAPSHOT_DIR,
+        pool_size=DB_POOL_SIZE,
+        mmap_size=KNOWLEDGE_MMAP_SIZE,
+        poll_interval=0,
+    )
+
+
+db_pool: SQLitePool | None = None
+if current_snapshot(KNOWLEDGE_SNAPSHOT_DIR) is not None:
+    print("📌 RAG knowledge snapshots:", KNOWLEDGE_SNAPSHOT_DIR)
+    knowledge = _snapshot_index()
+else:
+    # purana tarika: live DB read-only (abhi tak koi snapshot publish nahi hua)
+    print("📌 RAG DB PATH:", DB_PATH)
+    db_pool = SQLitePool(DB_PATH, size=DB_POOL_SIZE, readonly=True)
+    # knowledge tables memory me, file/version badalne par reload
+    knowledge = KnowledgeIndex(db_pool, DB_PATH, poll_interval=0)
+
+
+def _check_fts():
+    with knowledge.use() as snapshot:
+        if snapshot.pool is None:
+            return
+        with snapshot.pool.connection() as conn:
+            found = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'knowledge_fts'").fetchone()
+    if not found:
+        print("⚠️ FTS index missing — `python fts.py --db ...` ya publish_knowledge.py chalayein")
+
+
+@app.on_event("startup")
+async def startup_event():
+    global sources_task
+    await knowledge.start()
+    if FTS_ENABLED:
+        await run_in_threadpool(_check_fts)
+    _load_vector_index()
+    if KNOWLEDGE_RELOAD_INTERVAL > 0:
+        sources_task = asyncio.create_task(_watch_sources())
+
 
-print("📌 RAG DB PATH:", DB_PATH)
+@app.on_event("shutdown")
+async def shutdown_event():
+    if sources_task is not None:
+        sources_task.cancel()
+        try:
+            await sources_task
+        except asyncio.CancelledError:
+            pass
+    await knowledge.stop()
+    if vector_searcher is not None:
+        await vector_searcher.stop()
+    if db_pool is not None:
+        db_pool.close()
+    tracing.shutdown()
 
 # ---------------- Models ----------------
 
@@ -17,10 +119,23 @@ class QueryRequest(BaseModel):
     intent: str
     crop: str | None = None
     message: str
+    top_k: int = 3
+
+class DiseaseMatch(BaseModel):
+    disease_name: str
+    score: float
+
+class Passage(BaseModel):
+    source: str
+    title: str
+    snippet: str
+    score: float
 
 class QueryResponse(BaseModel):
     context: str
     source: str
+    matches: list[DiseaseMatch] = []
+    passages: list[Passage] = []
 
 # ---------------- Health ----------------
 
@@ -28,54 +143,143 @@ class QueryResponse(BaseModel):
 async def health():
     return {"status": "ok", "service": "rag_service"}
 
-# ---------------- DB HELPERS (SYNC) ----------------
+# ---------------- Metrics ----------------
+
+@app.get("/metrics")
+def metrics():
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+# ---------------- Full-Text Fallback ----------------
+
+full_text = fts.FullTextIndex(min_terms=FTS_MIN_TERMS)
+
+
+def _fts_search(snapshot: KnowledgeSnapshot, message: str, crop: str, k: int):
+    # df stats us snapshot ke hisaab se (reload / swap ke baad purane counts nahi)
+    with snapshot.pool.connection() as conn:
+        return full_text.search(
+            conn, message, crop=crop, k=k, stats_key=(snapshot.version, snapshot.loaded_at)
+        )
+
+# ---------------- Dense Retrieval ----------------
+
+vector_searcher: BatchingSearcher | None = None
+
+
+def _load_vector_index():
+    if resolve_index_dir(VECTOR_INDEX_DIR) is None:
+        print("ℹ️ Vector index not found, dense retrieval off:", VECTOR_INDEX_DIR)
+        return
+    _use_vector_index(VectorIndex(VECTOR_INDEX_DIR))
 
-def _get_fertilizer_recommendation(crop: str):
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
-    cur = conn.cursor()
-    cur.execute(
-        "SELECT recommendation FROM fertilizer WHERE LOWER(crop_name) = ?",
-        (crop,),
-    )
-    row = cur.fetchone()
-    conn.close()
-    return row
-
-def _get_disease_info(crop: str):
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
-    cur = conn.cursor()
-    cur.execute(
-        """
-        SELECT disease_name, recommendation
-        FROM disease
-        WHERE LOWER(crop_name) = ?
-        LIMIT 1
-        """,
-        (crop,),
-    )
-    row = cur.fetchone()
-    conn.close()
-    return row
-
-def _get_crop_calendar(crop: str):
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
-    cur = conn.cursor()
-    cur.execute(
-        """
-        SELECT sowing_month, harvesting_month
-        FROM crop_calendar
-        WHERE LOWER(crop_name) = ?
-        """,
-        (crop,),
-    )
-    row = cur.fetchone()
-    conn.close()
-    return row
+
+def _use_vector_index(index: VectorIndex):
+    global vector_searcher
+    if vector_searcher is None:
+        vector_searcher = BatchingSearcher(
+            index,
+            max_batch=VECTOR_MAX_BATCH,
+            max_wait=VECTOR_MAX_WAIT_MS / 1000,
+            nprobe=VECTOR_NPROBE,
+        )
+    else:
+        # queue me pade requests agle batch me naye index par
+        vector_searcher.index = index
+    print(f"🧭 Vector index loaded: {len(index)} passages ({index.manifest['dtype']})")
+
+
+async def _vector_search(message: str, crop: str, k: int) -> list[dict]:
+    # crop filter baad me lagta hai, isliye thoda zyada fetch
+    hits = await vector_searcher.search(message, k * 4)
+    return [
+        h for h in hits
+        if h["score"] >= VECTOR_MIN_SCORE and (not crop or h["crop"] in (None, crop))
+    ][:k]
+
+# ---------------- Source Reload ----------------
+
+sources_task: asyncio.Task | None = None
+
+
+def _prepare_sources():
+    """Threadpool me: jo badla uska naya version tayyar karo, swap nahi."""
+    index, prepared = knowledge, None
+    if isinstance(index, SnapshotIndex):
+        prepared = index.prepare()
+    elif current_snapshot(KNOWLEDGE_SNAPSHOT_DIR) is not None:
+        # pehla publish: live DB mode se snapshot mode
+        index = _snapshot_index()
+        prepared = index.prepare(force=True)
+        if prepared is None:
+            index = knowledge
+    else:
+        # live DB mode: uska apna reload (file signature / version)
+        index.reload()
+
+    vectors = None
+    path = resolve_index_dir(VECTOR_INDEX_DIR)
+    loaded = vector_searcher.index.path if vector_searcher is not None else None
+    if path is not None and path != loaded:
+        try:
+            vectors = VectorIndex(VECTOR_INDEX_DIR)
+        except Exception as e:
+            print("❌ Vector index load failed:", VECTOR_INDEX_DIR, e)
+    return index, prepared, vectors
+
+
+async def refresh_sources():
+    global knowledge, db_pool
+    index, prepared, vectors = await run_in_threadpool(_prepare_sources)
+
+    # beech me koi await nahi: snapshot, pool aur vector index ek saath badalte hain
+    old_knowledge, old_pool = knowledge, db_pool
+    if prepared is not None:
+        index.swap(prepared)
+    if vectors is not None:
+        _use_vector_index(vectors)
+    if index is old_knowledge:
+        return
+
+    knowledge, db_pool = index, None
+    print("📌 RAG knowledge snapshots:", KNOWLEDGE_SNAPSHOT_DIR)
+    # chal rahe requests ke connections release par band ho jaate hain
+    await old_knowledge.stop()
+    if old_pool is not None:
+        old_pool.close()
+
+
+async def _watch_sources():
+    while True:
+        await asyncio.sleep(KNOWLEDGE_RELOAD_INTERVAL)
+        try:
+            await refresh_sources()
+        except Exception as e:
+            print("❌ Knowledge source reload failed:", e)
 
 # ---------------- Query Endpoint ----------------
 
+QUERY_LATENCY = Histogram(
+    "rag_query_latency_seconds",
+    "RAG /query latency by knowledge source that answered",
+    ["source"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2),
+)
+
+
 @app.post("/query", response_model=QueryResponse)
 async def query_knowledge(req: QueryRequest):
+    started = time.perf_counter()
+    # ek request = ek snapshot; swap ho to bhi iska pool request khatam hone tak khula
+    with knowledge.use() as snapshot:
+        res = await _query_knowledge(req, snapshot)
+    QUERY_LATENCY.labels(res.source).observe(time.perf_counter() - started)
+    span = tracing.current()
+    if span is not None:
+        span.set(source=res.source)
+    return res
+
+
+async def _query_knowledge(req: QueryRequest, snapshot: KnowledgeSnapshot) -> QueryResponse:
 
     intent = req.intent.lower()
     crop = (req.crop or "").lower()
@@ -83,18 +287,31 @@ async def query_knowledge(req: QueryRequest):
     try:
         # 🌾 Fertilizer
         if intent == "fertilizer" and crop:
-            row = await run_in_threadpool(_get_fertilizer_recommendation, crop)
-            if row:
+            rec = snapshot.fertilizer_for(crop)
+            if rec:
                 return QueryResponse(
-                    context=row[0],
+                    context=rec,
                     source="fertilizer_table",
                 )
 
         # 🦠 Disease
         if intent == "disease" and crop:
-            row = await run_in_threadpool(_get_disease_info, crop)
-            if row:
-                disease_name, rec = row
+            ranked = snapshot.match_diseases(crop, req.message, max(req.top_k, 1))
+            if ranked:
+                _, (disease_name, rec, _) = ranked[0]
+                return QueryResponse(
+                    context=f"{disease_name}: {rec}",
+                    source="disease_table",
+                    matches=[
+                        DiseaseMatch(disease_name=row[0], score=round(score, 4))
+                        for score, row in ranked
+                    ],
+                )
+
+            # lakshan match nahi hue → crop ki pehli bimari (purana behaviour)
+            rows = snapshot.diseases_for(crop)
+            if rows:
+                disease_name, rec, _ = rows[0]
                 return QueryResponse(
                     context=f"{disease_name}: {rec}",
                     source="disease_table",
@@ -102,7 +319,7 @@ async def query_knowledge(req: QueryRequest):
 
         # 🌱 Crop calendar
         if intent == "general" and crop:
-            row = await run_in_threadpool(_get_crop_calendar, crop)
+            row = snapshot.calendar_for(crop)
             if row:
                 sowing, harvesting = row
                 return QueryResponse(
@@ -114,6 +331,46 @@ async def query_knowledge(req: QueryRequest):
                     source="crop_calendar",
                 )
 
+        # 🔎 Routing miss → BM25 full-text search (caller ka budget bacha ho to)
+        if FTS_ENABLED and snapshot.pool is not None and not deadlines.expired():
+            with tracing.span("fts") as span:
+                hits = await run_in_threadpool(_fts_search, snapshot, req.message, crop, max(req.top_k, 1))
+                span.set(hits=len(hits))
+            if hits:
+                return QueryResponse(
+                    context="\n".join(f"- {h['snippet']}" for h in hits),
+                    source="fts_search",
+                    passages=[
+                        Passage(
+                            source=h["source"],
+                            title=h["title"],
+                            snippet=h["snippet"],
+                            score=h["score"],
+                        )
+                        for h in hits
+                    ],
+                )
+
+        # 🧭 Dense (vector) retrieval
+        if vector_searcher is not None and not deadlines.expired():
+            with tracing.span("vector") as span:
+                hits = await _vector_search(req.message, crop, max(req.top_k, 1))
+                span.set(hits=len(hits))
+            if hits:
+                return QueryResponse(
+                    context="\n".join(f"- {h['text']}" for h in hits),
+                    source="vector_search",
+                    passages=[
+                        Passage(
+                            source=h["source"],
+                            title=h["title"],
+                            snippet=h["text"],
+                            score=h["score"],
+                        )
+                        for h in hits
+                    ],
+                )
+
     except Exception as e:
         print("❌ RAG ERROR:", e)
 
@@ -0,0 +1,116 @@
+"""
+Working knowledge DB (create_db.py / ingest.py wali) se immutable snapshot publish karo.
+
+    working DB ──VACUUM INTO──▶ knowledge-<seq>.db.tmp
+        → chat tables drop, FTS index build, knowledge_version = seq
+        → journal_mode DELETE, fsync, rename
+        → CURRENT pointer (tmp + os.replace, atomic)
+        → purane snapshots (--keep se zyada) delete
+
+RAG service CURRENT dekhta rehta hai aur naya snapshot bina restart ke
+immutable=1 + mmap se khol leta hai. Publish ke beech crash → CURRENT purane
+snapshot par hi rehta hai (adhi file kabhi point nahi hoti).
+
+    python publish_knowledge.py --db /app/data/agri_knowledge.db --out /app/data/knowledge
+"""
+import argparse
+import os
+import re
+import sqlite3
+from pathlib import Path
+
+import fts
+from knowledge_index import CURRENT, current_snapshot
+
+SNAPSHOT_RE = re.compile(r"^knowledge-(\d+)\.db$")
+
+# purani DBs me chat history bhi isi file me thi — snapshot me sirf knowledge
+NON_KNOWLEDGE_TABLES = ("chat_history", "sessions", "archived_sessions", "answer_cache")
+
+
+def _fsync(path: Path):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def snapshots(out: Path) -> list[tuple[int, Path]]:
+    found = []
+    for path in out.iterdir():
+        match = SNAPSHOT_RE.match(path.name)
+        if match:
+            found.append((int(match.group(1)), path))
+    return sorted(found)
+
+
+def publish(db_path: Path | str, out: Path | str, keep: int = 3) -> Path:
+    out = Path(out)
+    out.mkdir(parents=True, exist_ok=True)
+    existing = snapshots(out)
+    seq = existing[-1][0] + 1 if existing else 1
+    final = out / f"knowledge-{seq:06d}.db"
+    tmp = out / f"{final.name}.tmp"
+    if tmp.exists():
+        tmp.unlink()
+
+    src = sqlite3.connect(db_path)
+    try:
+        # consistent copy, writers chalte rahein to bhi (ek read transaction)
+        src.execute("VACUUM INTO ?", (str(tmp),))
+    finally:
+        src.close()
+
+    conn = sqlite3.connect(tmp)
+    try:
+        for table in NON_KNOWLEDGE_TABLES:
+            conn.execute(f"DROP TABLE IF EXISTS {table}")
+        fts.ensure_fts(conn, rebuild=True)
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS knowledge_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
+        )
+        """)
+        # seq hi version: har publish par answer caches invalidate
+        conn.execute(
+            "INSERT INTO knowledge_version (id, version) VALUES (1, ?) "
+            "ON CONFLICT(id) DO UPDATE SET version = excluded.version",
+            (seq,),
+        )
+        conn.commit()
+        conn.execute("VACUUM")
+        # immutable reader ke liye koi -wal / -shm nahi
+        conn.execute("PRAGMA journal_mode = DELETE")
+    finally:
+        conn.close()
+
+    _fsync(tmp)
+    os.replace(tmp, final)
+
+    pointer = out / f"{CURRENT}.tmp"
+    with open(pointer, "w", encoding="utf-8") as f:
+        f.write(final.name + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(pointer, out / CURRENT)
+    _fsync(out)
+
+    # reader abhi purani file par ho to bhi unlink safe (open fd chalta rehta hai)
+    current = current_snapshot(out)
+    for _, path in snapshots(out)[:-keep] if keep > 0 else []:
+        if path != current:
+            path.unlink()
+    return final
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", required=True, help="working knowledge DB")
+    parser.add_argument("--out", required=True, help="snapshot directory (RAG ka KNOWLEDGE_SNAPSHOT_DIR)")
+    parser.add_argument("--keep", type=int, default=3, help="itne purane snapshots rakho")
+    args = parser.parse_args()
+
+    path = publish(args.db, args.out, args.keep)
+    print("✅ Knowledge snapshot published:", path)
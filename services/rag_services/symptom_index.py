@@ -0,0 +1,111 @@
+import heapq
+import math
+import re
+
+# ---------------- Tokenizer ----------------
+
+# Hinglish (roman) + Devanagari words; baaki sab separator
+TOKEN_RE = re.compile(r"[a-z0-9ऀ-ॿ]+")
+
+
+def tokenize(text: str | None) -> list[str]:
+    return TOKEN_RE.findall((text or "").lower())
+
+
+def stem(token: str) -> str:
+    """
+    Roman Hinglish ke common inflections ek karo: peela/peele/peeli → peel,
+    patta/patte/patton → patt. Chhote tokens (daag, rog) waise hi rehte hain.
+    """
+    if len(token) < 4:
+        return token
+    if token.endswith(("on", "en")) and len(token) > 5:
+        token = token[:-2]
+    return token.rstrip("aei") if len(token.rstrip("aei")) >= 3 else token
+
+
+def symptom_terms(text: str | None) -> set[str]:
+    return {stem(t) for t in tokenize(text)}
+
+# ---------------- Inverted Index ----------------
+
+# Bade crops par "daag" jaisa token hazaron rows me hota hai. Aise common
+# tokens candidates generate nahi karte, sirf rare tokens se mile candidates
+# ka score badhate hain (chhote crops par sab exact scoring hi hai).
+COMMON_MIN_DF = 64
+COMMON_DF_RATIO = 0.05
+
+
+class SymptomIndex:
+    """
+    Symptom token → disease rows ka inverted index, crop-wise.
+
+    Score = user message me mile symptom tokens ka IDF sum (crop ke andar),
+    isliye "daag" jaisa har bimari me aane wala token kam weight paata hai
+    aur "peela" / "blast" jaise specific tokens ranking decide karte hain.
+    """
+
+    __slots__ = ("rows", "postings", "posting_sets", "idf", "common")
+
+    def __init__(self, diseases: dict[str, tuple] | None = None):
+        # rows[crop] = tuple of (disease_name, recommendation, symptom_keywords)
+        self.rows: dict[str, tuple] = diseases or {}
+        # postings[(crop, token)] = tuple of row positions in rows[crop]
+        self.postings: dict[tuple[str, str], tuple[int, ...]] = {}
+        self.posting_sets: dict[tuple[str, str], frozenset[int]] = {}
+        self.idf: dict[tuple[str, str], float] = {}
+        self.common: set[tuple[str, str]] = set()
+
+        for crop, rows in self.rows.items():
+            building: dict[str, list[int]] = {}
+            for pos, (_, _, keywords) in enumerate(rows):
+                for token in symptom_terms((keywords or "").replace(",", " ")):
+                    building.setdefault(token, []).append(pos)
+
+            n = len(rows)
+            common_df = max(COMMON_MIN_DF, COMMON_DF_RATIO * n)
+            for token, positions in building.items():
+                key = (crop, token)
+                self.postings[key] = tuple(positions)
+                self.idf[key] = math.log(1 + n / len(positions))
+                if len(positions) > common_df:
+                    self.common.add(key)
+                    self.posting_sets[key] = frozenset(positions)
+
+    def __len__(self) -> int:
+        return len(self.postings)
+
+    def search(self, crop: str, message: str, k: int = 3) -> list[tuple[float, tuple]]:
+        """
+        Top-k (score, row) crop ke liye, score desc. Koi token match na ho
+        to khali list.
+        """
+        scores: dict[int, float] = {}
+        postings = self.postings
+        idf = self.idf
+
+        keys = [(crop, token) for token in symptom_terms(message)]
+        keys = [key for key in keys if key in postings]
+        rare = [key for key in keys if key not in self.common]
+        common = [key for key in keys if key in self.common]
+
+        for key in rare or common:
+            weight = idf[key]
+            for pos in postings[key]:
+                scores[pos] = scores.get(pos, 0.0) + weight
+
+        if rare:
+            for key in common:
+                weight = idf[key]
+                members = self.posting_sets[key]
+                for pos in scores:
+                    if pos in members:
+                        scores[pos] += weight
+
+        if not scores:
+            return []
+
+        rows = self.rows[crop]
+        # tie par pehli (purani) row aage
+        best = heapq.nsmallest(k, scores.items(), key=lambda item: (-item[1], item[0]))
+        return [(score, rows[pos]) for pos, score in best]
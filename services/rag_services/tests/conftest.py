@@ -0,0 +1,72 @@
+import sqlite3
+
+import pytest
+
+SCHEMA = """
+CREATE TABLE fertilizer (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    crop_name TEXT NOT NULL,
+    recommendation TEXT NOT NULL
+);
+CREATE TABLE disease (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    crop_name TEXT NOT NULL,
+    symptom_keywords TEXT NOT NULL,
+    disease_name TEXT NOT NULL,
+    recommendation TEXT NOT NULL
+);
+CREATE TABLE crop_calendar (
+    crop_name TEXT PRIMARY KEY,
+    sowing_month TEXT NOT NULL,
+    harvesting_month TEXT NOT NULL
+);
+CREATE TABLE chat_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT,
+    role TEXT,
+    message TEXT,
+    timestamp TEXT
+);
+CREATE TABLE knowledge_version (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    version INTEGER NOT NULL
+);
+INSERT INTO knowledge_version VALUES (1, 1);
+"""
+
+
+def seed(conn: sqlite3.Connection):
+    conn.executescript(SCHEMA)
+    conn.executemany(
+        "INSERT INTO fertilizer (crop_name, recommendation) VALUES (?, ?)",
+        [("Gehu", "gehu urea dap"), ("dhaan", "dhaan urea")],
+    )
+    conn.executemany(
+        "INSERT INTO disease (crop_name, symptom_keywords, disease_name, recommendation) "
+        "VALUES (?, ?, ?, ?)",
+        [
+            ("gehu", "bhura,daag,patta", "Brown Rust", "propiconazole"),
+            ("gehu", "peela,daag,patta", "Yellow Rust", "tebuconazole"),
+            ("dhaan", "neck,blast,daag,panicle", "Neck Blast", "tricyclazole"),
+        ],
+    )
+    conn.executemany(
+        "INSERT INTO crop_calendar VALUES (?, ?, ?)",
+        [("gehu", "October–November", "March–April")],
+    )
+    conn.commit()
+
+
+@pytest.fixture
+def anyio_backend():
+    # services asyncio par hi chalte hain (uvicorn)
+    return "asyncio"
+
+
+@pytest.fixture
+def knowledge_db(tmp_path):
+    path = tmp_path / "agri_knowledge.db"
+    conn = sqlite3.connect(path)
+    seed(conn)
+    conn.close()
+    return path
@@ -0,0 +1,93 @@
+import sqlite3
+
+import fts
+
+
+def _conn(path):
+    conn = sqlite3.connect(path)
+    fts.ensure_fts(conn)
+    return conn
+
+
+def test_ensure_fts_indexes_existing_rows(knowledge_db):
+    conn = _conn(knowledge_db)
+    count = conn.execute("SELECT count(*) FROM knowledge_fts").fetchone()[0]
+
+    # 2 fertilizer + 3 disease + 1 calendar
+    assert count == 6
+    assert fts.ensure_fts(conn) is False
+
+
+def test_search_ranks_and_filters_by_crop(knowledge_db):
+    conn = _conn(knowledge_db)
+
+    hits = fts.FullTextIndex().search(conn, "patte par peela daag", crop="gehu")
+    assert hits[0]["title"].startswith("Yellow Rust")
+    assert all(h["source"] == "disease_table" for h in hits)
+
+    assert fts.FullTextIndex().search(conn, "panicle blast daag", crop="gehu") == []
+    assert fts.FullTextIndex().search(conn, "panicle blast daag", crop="dhaan")[0]["title"].startswith("Neck Blast")
+
+
+def test_crop_name_or_stopwords_alone_are_not_hits(knowledge_db):
+    conn = _conn(knowledge_db)
+
+    assert fts.FullTextIndex().search(conn, "gehu ke liye kya", crop="gehu") == []
+    assert fts.FullTextIndex().search(conn, "kya hai ji") == []
+
+
+def test_triggers_keep_index_in_sync(knowledge_db):
+    conn = _conn(knowledge_db)
+
+    conn.execute(
+        "INSERT INTO advisory_passages (doc_id, chunk_no, crop_name, title, body, content_hash) "
+        "VALUES ('icar-1', 0, 'sarson', 'Mahu niyantran', 'Sarson me mahu keet dikhe to neem tel spray', 'h1')"
+    )
+    conn.commit()
+    hits = fts.FullTextIndex().search(conn, "mahu keet spray", crop="sarson")
+    assert hits and hits[0]["source"] == "advisory"
+
+    conn.execute("UPDATE advisory_passages SET body = 'imidacloprid spray label dose' WHERE doc_id = 'icar-1'")
+    conn.commit()
+    assert fts.FullTextIndex().search(conn, "neem tel", crop="sarson") == []
+    assert fts.FullTextIndex().search(conn, "imidacloprid spray", crop="sarson")
+
+    conn.execute("DELETE FROM fertilizer WHERE crop_name = 'dhaan'")
+    conn.commit()
+    count = conn.execute("SELECT count(*) FROM knowledge_fts WHERE source = 'fertilizer_table'").fetchone()[0]
+    assert count == 1
+
+
+def test_common_terms_do_not_drive_candidate_generation(knowledge_db):
+    conn = _conn(knowledge_db)
+
+    # har term "common" → AND plan, dono terms wali passage hi milti hai
+    index = fts.FullTextIndex(common_df_min=0, common_df_ratio=0)
+    assert " AND " in index.plan(conn, ["peel", "daag"])
+    hits = index.search(conn, "peela daag", crop="gehu")
+    assert [h["title"].split(" ")[0] for h in hits] == ["Yellow"]
+
+    # "daag" 3 disease rows me hai, "peel" sirf ek me
+    index = fts.FullTextIndex(common_df_min=1, common_df_ratio=0)
+    assert index.plan(conn, ["peel", "daag"]).count('"peel"') == 1
+    assert '"daag"' not in index.plan(conn, ["peel", "daag"])
+
+
+def test_df_cache_resets_when_stats_key_changes(knowledge_db):
+    conn = _conn(knowledge_db)
+    index = fts.FullTextIndex(common_df_min=1, common_df_ratio=0)
+    index.search(conn, "peela daag", stats_key=(1, "a"))
+    assert index._df_of(conn, "peel") == 1
+
+    conn.execute(
+        "INSERT INTO disease (crop_name, symptom_keywords, disease_name, recommendation) "
+        "VALUES ('sarson', 'peela,patta', 'Peela Patta', 'sulphur')"
+    )
+    conn.commit()
+    # same key → TTL tak purana df
+    index.search(conn, "peela daag", stats_key=(1, "a"))
+    assert index._df["peel"][1] == 1
+    # naya snapshot / version → cache reset, naya df
+    index.search(conn, "peela daag", stats_key=(2, "b"))
+    assert index._df["peel"][1] == 2
+    conn.close()
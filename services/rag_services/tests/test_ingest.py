@@ -0,0 +1,159 @@
+import sqlite3
+
+import fts
+import ingest
+
+DOC = """Gehun me peela ratua (yellow rust) thand aur nami me failta hai. Patton par peeli dhariyan dikhein to turant spray karein.
+
+Propiconazole 0.1% ka spray 15 din ke antar par do baar karein. Khet ki nigrani rakhein.
+"""
+
+
+def _passages(db):
+    conn = sqlite3.connect(db)
+    rows = conn.execute(
+        "SELECT doc_id, chunk_no, crop_name, body FROM advisory_passages ORDER BY doc_id, chunk_no"
+    ).fetchall()
+    conn.close()
+    return rows
+
+
+def _version(db):
+    conn = sqlite3.connect(db)
+    version = conn.execute("SELECT version FROM knowledge_version").fetchone()[0]
+    conn.close()
+    return version
+
+
+def test_normalize_and_chunk():
+    text = ingest.normalize("Gehun  ke liye\nKHAD  kab den?")
+    assert text == "gehu ke liye khaad kab den?"
+
+    parts = list(ingest.chunks(iter(["Ek. Do. Teen."]), max_chars=8))
+    assert parts == ["Ek. Do.", "Teen."]
+    assert all(len(p) <= 20 for p in ingest.chunks(iter(["x" * 50]), max_chars=20))
+
+
+def test_ingest_is_idempotent_and_indexes_fts(knowledge_db, tmp_path):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (docs / "gehu_rust.txt").write_text(DOC, encoding="utf-8")
+    # same content doosre naam se → dedupe
+    (docs / "copy.txt").write_text(DOC, encoding="utf-8")
+
+    stats = ingest.ingest(knowledge_db, [docs], workers=2, max_chars=120)
+    rows = _passages(knowledge_db)
+    assert stats.written == len(rows) > 1
+    assert stats.duplicates == len(rows)
+    assert {r[2] for r in rows} <= {"gehu", None}
+    assert _version(knowledge_db) == 2
+
+    conn = sqlite3.connect(knowledge_db)
+    hits = fts.FullTextIndex().search(conn, "propiconazole spray antar", crop="gehu")
+    conn.close()
+    assert hits and hits[0]["source"] == "advisory"
+
+    # dobara chalane par kuch nahi likha jata
+    again = ingest.ingest(knowledge_db, [docs], workers=2, max_chars=120)
+    assert again.unchanged_docs == 2 and again.written == 0
+    assert _passages(knowledge_db) == rows
+    assert _version(knowledge_db) == 2
+
+
+def test_reingest_touches_only_changed_chunks(knowledge_db, tmp_path):
+    doc = tmp_path / "advisory.txt"
+    doc.write_text(DOC, encoding="utf-8")
+    ingest.ingest(knowledge_db, [doc], workers=1, max_chars=120)
+    before = _passages(knowledge_db)
+
+    doc.write_text(DOC.replace("do baar", "teen baar"), encoding="utf-8")
+    stats = ingest.ingest(knowledge_db, [doc], workers=1, max_chars=120)
+    after = _passages(knowledge_db)
+
+    # badla chunk naya row, purana hata; baaki rows jaise the
+    assert stats.written == 1 and stats.deleted == 1
+    assert len(after) == len(before)
+    assert len(set(after) - set(before)) == 1
+
+    # chhota document → purane extra chunks hat jaate hain
+    doc.write_text("Gehu me sinchai 20 din par karein.", encoding="utf-8")
+    stats = ingest.ingest(knowledge_db, [doc], workers=1, max_chars=120)
+    assert stats.deleted == len(before)
+    assert len(_passages(knowledge_db)) == 1
+
+
+PARAS = [
+    "Sarson me mahu keet thand me badhta hai. Neem tel ka spray karein.",
+    "Buvai se pehle beej upchar zaroor karein. Isse ukhtha rog kam hota hai.",
+    "Phool aate samay halki sinchai karein. Paani jama na hone dein.",
+    "Katai tab karein jab phaliyan peeli ho jaayein. Der se katai me daane jhadte hain.",
+]
+
+
+def _bodies(db, doc_id=None):
+    return {body for d, _, _, body in _passages(db) if doc_id is None or d == doc_id}
+
+
+def test_mid_file_insertion_writes_only_the_new_chunk(knowledge_db, tmp_path):
+    doc = tmp_path / "sarson.txt"
+    doc.write_text("\n\n".join(PARAS), encoding="utf-8")
+    ingest.ingest(knowledge_db, [doc], workers=1, max_chars=120)
+    before = _bodies(knowledge_db)
+    assert len(before) == len(PARAS)
+
+    inserted = "Khet me kharpatwar 30 din par nikaalein. Nirai gudai se paudhe majboot hote hain."
+    doc.write_text("\n\n".join(PARAS[:1] + [inserted] + PARAS[1:]), encoding="utf-8")
+    stats = ingest.ingest(knowledge_db, [doc], workers=1, max_chars=120)
+
+    assert stats.written == 1 and stats.deleted == 0
+    assert _bodies(knowledge_db) == before | {inserted}
+
+
+def _shared_corpus(tmp_path):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (docs / "a.txt").write_text(f"{PARAS[0]}\n\n{PARAS[1]}", encoding="utf-8")
+    (docs / "b.txt").write_text(f"{PARAS[1]}\n\n{PARAS[2]}", encoding="utf-8")
+    return docs
+
+
+def _owner(db, body):
+    owner = next(d for d, _, _, b in _passages(db) if b == body)
+    return owner, "b.txt" if owner == "a.txt" else "a.txt"
+
+
+def test_deduped_chunk_survives_when_its_source_changes(knowledge_db, tmp_path):
+    docs = _shared_corpus(tmp_path)
+    stats = ingest.ingest(knowledge_db, [docs], workers=1, max_chars=120)
+    assert stats.duplicates == 1
+    assert _bodies(knowledge_db) == set(PARAS[:3])
+
+    # shared paragraph ka owner use hata de → text reference wale doc ke naam
+    owner, other = _owner(knowledge_db, PARAS[1])
+    (docs / owner).write_text(PARAS[0] if owner == "a.txt" else PARAS[2], encoding="utf-8")
+    stats = ingest.ingest(knowledge_db, [docs], workers=1, max_chars=120)
+
+    assert stats.deleted == 0 and stats.unchanged_docs == 1
+    assert _bodies(knowledge_db) == set(PARAS[:3])
+    assert PARAS[1] in _bodies(knowledge_db, other)
+
+
+def test_deleted_file_is_purged_but_shared_text_stays(knowledge_db, tmp_path):
+    docs = _shared_corpus(tmp_path)
+    ingest.ingest(knowledge_db, [docs], workers=1, max_chars=120)
+    owner, other = _owner(knowledge_db, PARAS[1])
+
+    (docs / owner).unlink()
+    stats = ingest.ingest(knowledge_db, [docs], workers=1, max_chars=120)
+
+    assert stats.removed_docs == 1 and stats.deleted == 1
+    kept = PARAS[2] if other == "b.txt" else PARAS[0]
+    gone = PARAS[0] if other == "b.txt" else PARAS[2]
+    assert _bodies(knowledge_db) == _bodies(knowledge_db, other) == {PARAS[1], kept}
+
+    conn = sqlite3.connect(knowledge_db)
+    documents = conn.execute("SELECT doc_id FROM advisory_documents").fetchall()
+    hits = fts.FullTextIndex().search(conn, gone.split(".")[0])
+    conn.close()
+    assert documents == [(other,)]
+    assert not any(h["source"] == "advisory" and h["title"] == ingest.doc_title(owner) for h in hits)
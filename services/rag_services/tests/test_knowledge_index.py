@@ -0,0 +1,152 @@
+import sqlite3
+
+from db import SQLitePool
+from knowledge_index import KnowledgeIndex
+
+
+def _index(path):
+    index = KnowledgeIndex(SQLitePool(path, readonly=True), path, poll_interval=0)
+    assert index.reload(force=True)
+    return index
+
+
+def test_snapshot_lookups_are_case_insensitive(knowledge_db):
+    snap = _index(knowledge_db).snapshot
+
+    assert snap.fertilizer_for("GEHU") == "gehu urea dap"
+    assert snap.calendar_for("gehu") == ("October–November", "March–April")
+    assert [d[0] for d in snap.diseases_for("gehu")] == ["Brown Rust", "Yellow Rust"]
+    assert snap.fertilizer_for("bajra") is None
+    assert snap.sizes() == {
+        "fertilizer": 2,
+        "disease": 3,
+        "crop_calendar": 1,
+        "symptom_postings": 8,
+    }
+
+
+def test_reload_swaps_snapshot_when_version_changes(knowledge_db):
+    index = _index(knowledge_db)
+    old = index.snapshot
+
+    conn = sqlite3.connect(knowledge_db)
+    conn.execute("INSERT INTO fertilizer (crop_name, recommendation) VALUES ('sarson', 'sarson dap')")
+    conn.execute("UPDATE knowledge_version SET version = version + 1")
+    conn.commit()
+    conn.close()
+
+    assert index.reload()
+    assert index.snapshot is not old
+    assert index.snapshot.version == 2
+    assert index.snapshot.fertilizer_for("sarson") == "sarson dap"
+    # purana snapshot untouched (in-flight requests ke liye)
+    assert old.fertilizer_for("sarson") is None
+
+
+def test_chat_writes_do_not_trigger_reload(knowledge_db):
+    index = _index(knowledge_db)
+    old = index.snapshot
+
+    conn = sqlite3.connect(knowledge_db)
+    conn.execute("INSERT INTO chat_history (session_id, role, message) VALUES ('s', 'user', 'hi')")
+    conn.commit()
+    conn.close()
+
+    assert not index.reload()
+    assert index.snapshot is old
+
+
+def test_missing_db_keeps_empty_snapshot(tmp_path):
+    path = tmp_path / "missing.db"
+    index = KnowledgeIndex(SQLitePool(path, readonly=True), path, poll_interval=0)
+
+    assert not index.reload(force=True)
+    assert index.snapshot.sizes() == {
+        "fertilizer": 0,
+        "disease": 0,
+        "crop_calendar": 0,
+        "symptom_postings": 0,
+    }
+
+
+def test_published_snapshot_is_immutable_and_swaps_atomically(knowledge_db, tmp_path):
+    from knowledge_index import CURRENT, SnapshotIndex
+    from publish_knowledge import publish
+
+    # seed DB me chat_history bhi hai (purana shared layout)
+    out = tmp_path / "knowledge"
+    first = publish(knowledge_db, out, keep=2)
+    index = SnapshotIndex(out, pool_size=1, poll_interval=0)
+    assert index.reload() and not index.reload()
+    old_pool = index.pool
+
+    with index.pool.connection() as conn:
+        assert conn.execute("PRAGMA query_only").fetchone()[0] == 1
+        assert conn.execute("PRAGMA mmap_size").fetchone()[0] > 0
+        tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert "chat_history" not in tables and "knowledge_fts" in tables
+    assert index.snapshot.version == 1 and index.snapshot.fertilizer_for("gehu") == "gehu urea dap"
+
+    conn = sqlite3.connect(knowledge_db)
+    conn.execute("INSERT INTO fertilizer (crop_name, recommendation) VALUES ('sarson', 'sarson dap')")
+    conn.commit()
+    conn.close()
+    # live DB ka write snapshot par asar nahi karta — sirf naya publish
+    assert not index.reload()
+    assert index.snapshot.fertilizer_for("sarson") is None
+
+    publish(knowledge_db, out, keep=2)
+    third = publish(knowledge_db, out, keep=2)
+    assert (out / CURRENT).read_text().strip() == third.name
+    assert not first.exists() and sorted(p.name for p in out.glob("knowledge-*.db")) == [
+        "knowledge-000002.db",
+        "knowledge-000003.db",
+    ]
+
+    assert index.reload()
+    assert index.snapshot.version == 3 and index.snapshot.fertilizer_for("sarson") == "sarson dap"
+    assert index.snapshot.pool is index.pool and old_pool._closed
+
+
+def test_snapshot_swap_waits_for_in_flight_searches(knowledge_db, tmp_path):
+    import threading
+
+    import fts
+    from knowledge_index import SnapshotIndex
+    from publish_knowledge import publish
+
+    out = tmp_path / "knowledge"
+    publish(knowledge_db, out)
+    index = SnapshotIndex(out, pool_size=2, poll_interval=0)
+    assert index.reload()
+
+    holding, swapped = threading.Event(), threading.Event()
+    seen = {}
+
+    def search():
+        with index.use() as snapshot:
+            with snapshot.pool.connection() as conn:
+                seen["before"] = fts.FullTextIndex().search(conn, "patte par peela daag", crop="gehu")
+                holding.set()
+                swapped.wait(5)
+                # swap ke baad bhi: pakda hua connection + pool ka doosra (naya) connection
+                with snapshot.pool.connection() as second:
+                    seen["after"] = fts.FullTextIndex().search(second, "patte par peela daag", crop="gehu")
+            seen["version"] = snapshot.version
+            seen["closed_inside"] = snapshot.pool._closed
+
+    worker = threading.Thread(target=search)
+    worker.start()
+    assert holding.wait(5)
+    old_pool = index.pool
+    publish(knowledge_db, out)
+    assert index.reload()
+    swapped.set()
+    worker.join(5)
+
+    assert seen["before"] and seen["after"] == seen["before"]
+    assert seen["version"] == 1 and not seen["closed_inside"]
+    # aakhri user lautte hi purana pool band, naya chalu
+    assert old_pool._closed and index.snapshot.version == 2 and not index.pool._closed
+    with index.use() as snapshot:
+        assert snapshot.pool is index.pool
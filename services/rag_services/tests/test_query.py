@@ -0,0 +1,122 @@
+import sqlite3
+
+import pytest
+from fastapi.testclient import TestClient
+
+import fts
+import main
+from db import SQLitePool
+from knowledge_index import KnowledgeIndex
+
+
+def _client(monkeypatch, path):
+    index = KnowledgeIndex(SQLitePool(path, readonly=True), path, poll_interval=0)
+    index.reload(force=True)
+    monkeypatch.setattr(main, "knowledge", index)
+    return TestClient(main.app)
+
+
+def test_fertilizer_hit(monkeypatch, knowledge_db):
+    client = _client(monkeypatch, knowledge_db)
+    res = client.post("/query", json={"intent": "fertilizer", "crop": "gehu", "message": "khaad"})
+
+    assert res.json()["context"] == "gehu urea dap"
+    assert res.json()["source"] == "fertilizer_table"
+
+
+def test_crop_calendar_hit(monkeypatch, knowledge_db):
+    client = _client(monkeypatch, knowledge_db)
+    res = client.post("/query", json={"intent": "general", "crop": "gehu", "message": "kab boye"})
+
+    assert res.json()["source"] == "crop_calendar"
+    assert "October–November" in res.json()["context"]
+
+
+def test_disease_ranked_by_symptoms(monkeypatch, knowledge_db):
+    client = _client(monkeypatch, knowledge_db)
+    res = client.post(
+        "/query",
+        json={"intent": "disease", "crop": "gehu", "message": "gehu ke patte peele daag, peela pad gaya"},
+    )
+
+    body = res.json()
+    assert body["context"].startswith("Yellow Rust")
+    assert [m["disease_name"] for m in body["matches"]] == ["Yellow Rust", "Brown Rust"]
+
+
+def test_disease_without_symptom_match_falls_back(monkeypatch, knowledge_db):
+    client = _client(monkeypatch, knowledge_db)
+    res = client.post("/query", json={"intent": "disease", "crop": "gehu", "message": "gehu me rog"})
+
+    assert res.json()["context"].startswith("Brown Rust")
+    assert res.json()["matches"] == []
+
+
+def test_routing_miss_uses_full_text_search(monkeypatch, knowledge_db):
+    conn = sqlite3.connect(knowledge_db)
+    fts.ensure_fts(conn)
+    conn.close()
+
+    client = _client(monkeypatch, knowledge_db)
+    monkeypatch.setattr(main, "db_pool", main.knowledge.pool)
+    res = client.post("/query", json={"intent": "general", "crop": None, "message": "panicle par blast"})
+
+    body = res.json()
+    assert body["source"] == "fts_search"
+    assert body["passages"][0]["title"].startswith("Neck Blast")
+
+
+def test_unknown_crop_is_generic(monkeypatch, knowledge_db):
+    client = _client(monkeypatch, knowledge_db)
+    res = client.post("/query", json={"intent": "fertilizer", "crop": "bajra", "message": "khaad"})
+
+    assert res.json()["source"] == "generic"
+
+
+def test_metrics_endpoint_is_prometheus_text(monkeypatch, knowledge_db):
+    client = _client(monkeypatch, knowledge_db)
+    res = client.get("/metrics")
+
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/plain")
+    assert "rag_knowledge_index_entries" in res.text
+
+
+@pytest.mark.anyio
+async def test_first_publish_and_vector_build_are_picked_up_without_restart(monkeypatch, knowledge_db, tmp_path):
+    from knowledge_index import SnapshotIndex
+    from publish_knowledge import publish
+    from vector_index import build_index, passages_from_db
+
+    legacy_pool = SQLitePool(knowledge_db, readonly=True)
+    legacy = KnowledgeIndex(legacy_pool, knowledge_db, poll_interval=0)
+    legacy.reload(force=True)
+    monkeypatch.setattr(main, "knowledge", legacy)
+    monkeypatch.setattr(main, "db_pool", legacy_pool)
+    monkeypatch.setattr(main, "vector_searcher", None)
+    monkeypatch.setattr(main, "KNOWLEDGE_SNAPSHOT_DIR", tmp_path / "knowledge")
+    monkeypatch.setattr(main, "VECTOR_INDEX_DIR", tmp_path / "vi")
+
+    # kuch badla nahi → live DB mode hi
+    await main.refresh_sources()
+    assert main.knowledge is legacy and main.vector_searcher is None
+
+    snapshot = publish(knowledge_db, tmp_path / "knowledge")
+    conn = sqlite3.connect(snapshot)
+    texts, meta = passages_from_db(conn)
+    conn.close()
+    build_index(tmp_path / "vi", texts, meta)
+
+    await main.refresh_sources()
+    assert isinstance(main.knowledge, SnapshotIndex) and main.db_pool is None
+    assert main.knowledge.path == snapshot and legacy_pool._closed
+    first_build = main.vector_searcher.index.path
+
+    # naya vector build → usi searcher me naya index
+    build_index(tmp_path / "vi", texts[:2], meta[:2])
+    await main.refresh_sources()
+    assert main.vector_searcher.index.path != first_build and len(main.vector_searcher.index) == 2
+
+    res = TestClient(main.app).post("/query", json={"intent": "fertilizer", "crop": "gehu", "message": "khaad"})
+    assert res.json()["context"] == "gehu urea dap"
+    await main.knowledge.stop()
@@ -0,0 +1,62 @@
+from symptom_index import SymptomIndex, stem, tokenize
+
+ROWS = {
+    "gehu": (
+        ("Brown Rust", "r1", "bhura,daag,patta"),
+        ("Yellow Rust", "r2", "peela,daag,patta"),
+        ("Loose Smut", "r3", "kaala,bali,powder"),
+    )
+}
+
+
+def test_tokenize_handles_punctuation_and_case():
+    assert tokenize("Patte PEELE, daag!") == ["patte", "peele", "daag"]
+    assert tokenize(None) == []
+
+
+def test_stem_merges_hinglish_inflections():
+    assert stem("peela") == stem("peele") == stem("peeli")
+    assert stem("patta") == stem("patte") == stem("patton")
+    assert stem("daag") == "daag"
+
+
+def test_inflected_message_still_matches():
+    index = SymptomIndex(ROWS)
+    ranked = index.search("gehu", "patte peele pad gaye", k=1)
+
+    assert ranked[0][1][0] == "Yellow Rust"
+
+
+def test_specific_symptom_outranks_common_one():
+    index = SymptomIndex(ROWS)
+    ranked = index.search("gehu", "patta peela daag", k=3)
+
+    assert ranked[0][1][0] == "Yellow Rust"
+    assert ranked[0][0] > ranked[1][0]
+    assert len(ranked) == 2
+
+
+def test_top_k_and_unknown_crop():
+    index = SymptomIndex(ROWS)
+
+    assert len(index.search("gehu", "daag", k=1)) == 1
+    assert index.search("dhaan", "daag") == []
+    assert index.search("gehu", "kuch nahi") == []
+
+
+def test_ties_keep_table_order():
+    index = SymptomIndex(ROWS)
+    ranked = index.search("gehu", "daag patta", k=2)
+
+    assert [row[0] for _, row in ranked] == ["Brown Rust", "Yellow Rust"]
+
+
+def test_common_tokens_only_boost_selective_candidates():
+    rows = {"gehu": tuple((f"d{i}", "r", "daag,patta") for i in range(200)) + (("Blast", "r", "daag,blast"),)}
+    index = SymptomIndex(rows)
+
+    ranked = index.search("gehu", "daag blast", k=3)
+    assert [row[0] for _, row in ranked] == ["Blast"]
+
+    # sirf common token ho to bhi jawab milta hai
+    assert [row[0] for _, row in index.search("gehu", "daag", k=2)] == ["d0", "d1"]
@@ -0,0 +1,109 @@
+import asyncio
+import sqlite3
+
+import numpy as np
+import pytest
+
+import fts
+from embeddings import HashingEmbedder
+from vector_index import BatchingSearcher, VectorIndex, build_index, passages_from_db, quantize
+
+
+@pytest.fixture
+def passages(knowledge_db):
+    conn = sqlite3.connect(knowledge_db)
+    fts.ensure_fts(conn)
+    texts, meta = passages_from_db(conn)
+    conn.close()
+    return texts, meta
+
+
+def test_embedder_is_deterministic_and_normalized():
+    a = HashingEmbedder().embed("gehu ke patte peele")
+    b = HashingEmbedder().embed("gehu ke patte peele")
+
+    assert np.array_equal(a, b)
+    assert np.isclose(np.linalg.norm(a), 1.0)
+    assert not HashingEmbedder().embed("").any()
+
+
+def test_int8_quantization_keeps_dot_products_close():
+    vecs = HashingEmbedder().embed_batch(["gehu khaad", "dhaan blast", "sarson mahu"])
+    q, scales = quantize(vecs, "int8")
+
+    restored = q.astype(np.float32) * scales[:, None]
+    assert q.dtype == np.int8
+    assert np.allclose(restored @ vecs[0], vecs @ vecs[0], atol=0.02)
+
+
+@pytest.mark.parametrize("dtype,nlist", [("float16", 0), ("int8", 0), ("int8", 2)])
+def test_search_finds_relevant_passage(tmp_path, passages, dtype, nlist):
+    texts, meta = passages
+    build_index(tmp_path / "vi", texts, meta, dtype=dtype, nlist=nlist)
+    index = VectorIndex(tmp_path / "vi")
+
+    hits = index.search("gehu ke patte peele ho gaye", k=2, nprobe=nlist or 8)
+    assert isinstance(index.vectors, np.memmap)
+    assert hits[0]["title"].startswith("Yellow Rust")
+    assert hits[0]["score"] >= hits[1]["score"]
+
+
+def test_rebuild_swaps_current_pointer(tmp_path, passages):
+    texts, meta = passages
+    build_index(tmp_path / "vi", texts, meta)
+    loaded = VectorIndex(tmp_path / "vi")
+    build_index(tmp_path / "vi", texts[:2], meta[:2])
+    build_index(tmp_path / "vi", texts[:3], meta[:3])
+
+    assert len(VectorIndex(tmp_path / "vi")) == 3
+    # pehle se khula index (mmap) purana build hatne ke baad bhi chalta hai
+    assert loaded.search("gehu ke patte peele ho gaye", k=1)
+    assert sorted(p.name.split("-")[0] for p in (tmp_path / "vi").iterdir()) == ["CURRENT", "build", "build"]
+
+
+@pytest.mark.anyio
+async def test_concurrent_requests_are_batched(tmp_path, passages):
+    texts, meta = passages
+    build_index(tmp_path / "vi", texts, meta)
+    index = VectorIndex(tmp_path / "vi")
+
+    calls = []
+    original = index.search_batch
+
+    def counting(queries, k, nprobe):
+        calls.append(len(queries))
+        return original(queries, k, nprobe)
+
+    index.search_batch = counting
+    searcher = BatchingSearcher(index, max_wait=0.02)
+
+    results = await asyncio.gather(
+        searcher.search("gehu urea", 1),
+        searcher.search("dhaan blast", 2),
+        searcher.search("peela daag", 1),
+    )
+    await searcher.stop()
+
+    assert calls == [3]
+    assert [len(r) for r in results] == [1, 2, 1]
+
+
+@pytest.mark.anyio
+async def test_batch_failure_fails_waiters_and_keeps_loop_alive(tmp_path, passages):
+    texts, meta = passages
+    build_index(tmp_path / "vi", texts, meta)
+    index = VectorIndex(tmp_path / "vi")
+    searcher = BatchingSearcher(index, max_wait=0.01)
+
+    await searcher.search("gehu urea", 1)
+    # galat dim ka vector: np.stack hi fail hota hai (search_batch se pehle)
+    future = asyncio.get_running_loop().create_future()
+    await searcher._queue.put((index.embedder.embed("gehu urea")[:5], 1, future))
+    first = asyncio.ensure_future(searcher.search("dhaan blast", 1))
+
+    with pytest.raises(ValueError):
+        await asyncio.wait_for(future, 1)
+    with pytest.raises(ValueError):
+        await asyncio.wait_for(first, 1)
+    assert len(await asyncio.wait_for(searcher.search("peela daag", 1), 1)) == 1
+    await searcher.stop()
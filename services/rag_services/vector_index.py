@@ -0,0 +1,375 @@
+"""
+Local dense retrieval: memory-mapped float16 / int8 passage matrix par NumPy
+dot-product top-k, optional IVF (coarse k-means lists) ke saath.
+
+Knowledge DB ke saare passages (knowledge_fts) se index banao:
+
+    python vector_index.py --db /app/data/agri_knowledge.db \\
+        --out /app/data/vector_index --dtype int8 --nlist 64
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sqlite3
+import time
+from pathlib import Path
+from urllib.parse import quote
+
+import numpy as np
+from fastapi.concurrency import run_in_threadpool
+
+from embeddings import HashingEmbedder
+
+MANIFEST = "manifest.json"
+CURRENT = "CURRENT"
+INDEX_FILES = (MANIFEST, "vectors.npy", "scales.npy", "centroids.npy", "offsets.npy", "meta.json")
+SCORE_CHUNK = 4096    # itni rows ek baar me float32 me (cache-friendly block)
+
+# ---------------- Quantization ----------------
+
+
+def quantize(vecs: np.ndarray, dtype: str) -> tuple[np.ndarray, np.ndarray | None]:
+    if dtype == "float16":
+        return vecs.astype(np.float16), None
+    if dtype == "int8":
+        # per-row symmetric scale: row ≈ q * scale
+        scales = np.abs(vecs).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        q = np.round(vecs / scales[:, None]).astype(np.int8)
+        return q, scales.astype(np.float32)
+    raise ValueError(f"Unsupported vector dtype: {dtype}")
+
+# ---------------- IVF (spherical k-means) ----------------
+
+
+def kmeans(vecs: np.ndarray, k: int, iters: int = 10, seed: int = 0, sample_per_list: int = 256) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    # centroids ke liye poora corpus zaroori nahi, sample kaafi hai
+    if len(vecs) > k * sample_per_list:
+        vecs = vecs[rng.choice(len(vecs), size=k * sample_per_list, replace=False)]
+
+    centroids = vecs[rng.choice(len(vecs), size=k, replace=False)].copy()
+    for _ in range(iters):
+        assign = np.argmax(vecs @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, vecs)
+        empty = np.bincount(assign, minlength=k) == 0
+        # khali list → random point se dobara shuru
+        sums[empty] = vecs[rng.integers(len(vecs), size=int(empty.sum()))]
+        centroids = sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+    return centroids.astype(np.float32)
+
+# ---------------- Build ----------------
+
+
+def build_index(
+    out_dir: Path | str,
+    texts: list[str],
+    meta: list[dict],
+    embedder: HashingEmbedder | None = None,
+    dtype: str = "int8",
+    nlist: int = 0,
+    seed: int = 0,
+) -> dict:
+    embedder = embedder or HashingEmbedder()
+    return write_index(out_dir, embedder.embed_batch(texts), meta, embedder, dtype, nlist, seed)
+
+
+def write_index(
+    out_dir: Path | str,
+    vecs: np.ndarray,
+    meta: list[dict],
+    embedder: HashingEmbedder,
+    dtype: str = "int8",
+    nlist: int = 0,
+    seed: int = 0,
+) -> dict:
+    """
+    Har build out_dir ke andar apni dir (build-<ns>) me likha jaata hai, phir
+    CURRENT pointer ek os.replace me badalta hai — reader ko kabhi khaali /
+    aadha-likha index nahi dikhta. Pichhla build rakhte hain (jisne abhi
+    CURRENT padha ho wo use khol sake), usse purane hata dete hain.
+    """
+    out_dir = Path(out_dir)
+
+    offsets = None
+    centroids = None
+    if nlist and len(vecs) >= nlist:
+        centroids = kmeans(vecs, nlist, seed=seed)
+        assign = np.argmax(vecs @ centroids.T, axis=1)
+        # har list ki rows contiguous → probe = ek slice
+        order = np.argsort(assign, kind="stable")
+        vecs = vecs[order]
+        meta = [meta[i] for i in order]
+        offsets = np.searchsorted(assign[order], np.arange(nlist + 1)).astype(np.int64)
+
+    matrix, scales = quantize(vecs, dtype)
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    tmp = out_dir / f"build-{time.time_ns():020d}"
+    tmp.mkdir()
+
+    np.save(tmp / "vectors.npy", matrix)
+    if scales is not None:
+        np.save(tmp / "scales.npy", scales)
+    if centroids is not None:
+        np.save(tmp / "centroids.npy", centroids)
+        np.save(tmp / "offsets.npy", offsets)
+    with open(tmp / "meta.json", "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+
+    manifest = {
+        "count": len(meta),
+        "dim": embedder.dim,
+        "ngram_range": list(embedder.ngram_range),
+        "word_weight": embedder.word_weight,
+        "dtype": dtype,
+        "nlist": 0 if centroids is None else nlist,
+        "built_at": time.time(),
+    }
+    with open(tmp / MANIFEST, "w") as f:
+        json.dump(manifest, f)
+
+    pointer = out_dir / f"{CURRENT}.tmp-{os.getpid()}"
+    with open(pointer, "w") as f:
+        f.write(tmp.name + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(pointer, out_dir / CURRENT)
+
+    # purana layout (files seedha out_dir me) + pichhle se purane builds
+    for name in INDEX_FILES:
+        (out_dir / name).unlink(missing_ok=True)
+    for old in sorted(out_dir.glob("build-*"))[:-2]:
+        shutil.rmtree(old, ignore_errors=True)
+    return manifest
+
+
+def resolve_index_dir(path: Path | str) -> Path | None:
+    """out_dir ka CURRENT build; purana layout (manifest seedha out_dir me) bhi chalta hai."""
+    path = Path(path)
+    try:
+        name = (path / CURRENT).read_text().strip()
+    except FileNotFoundError:
+        return path if (path / MANIFEST).exists() else None
+    return path / name
+
+# ---------------- Search ----------------
+
+
+class VectorIndex:
+    def __init__(self, path: Path | str):
+        # CURRENT ek hi baar padho: saari files usi build se
+        self.root = Path(path)
+        self.path = resolve_index_dir(path)
+        if self.path is None:
+            raise FileNotFoundError(f"No vector index in {path}")
+        with open(self.path / MANIFEST) as f:
+            self.manifest = json.load(f)
+
+        # mmap: OS page cache share hota hai, process RSS me poora matrix nahi
+        self.vectors = np.load(self.path / "vectors.npy", mmap_mode="r")
+        scales = self.path / "scales.npy"
+        self.scales = np.load(scales, mmap_mode="r") if scales.exists() else None
+
+        self.centroids = None
+        self.offsets = None
+        if self.manifest["nlist"]:
+            self.centroids = np.load(self.path / "centroids.npy")
+            self.offsets = np.load(self.path / "offsets.npy")
+
+        with open(self.path / "meta.json", encoding="utf-8") as f:
+            self.meta: list[dict] = json.load(f)
+
+        self.embedder = HashingEmbedder(
+            dim=self.manifest["dim"],
+            ngram_range=tuple(self.manifest["ngram_range"]),
+            word_weight=self.manifest["word_weight"],
+        )
+
+    def __len__(self) -> int:
+        return self.manifest["count"]
+
+    def _scores(self, start: int, stop: int, queries: np.ndarray) -> np.ndarray:
+        block = np.asarray(self.vectors[start:stop], dtype=np.float32)
+        scores = block @ queries.T
+        if self.scales is not None:
+            scores *= np.asarray(self.scales[start:stop])[:, None]
+        return scores
+
+    @staticmethod
+    def _top(scores: np.ndarray, ids: np.ndarray, k: int) -> list[tuple[float, int]]:
+        if len(scores) > k:
+            part = np.argpartition(-scores, k)[:k]
+        else:
+            part = np.arange(len(scores))
+        part = part[np.argsort(-scores[part], kind="stable")]
+        return [(float(scores[i]), int(ids[i])) for i in part]
+
+    def _brute(self, queries: np.ndarray, k: int) -> list[list[tuple[float, int]]]:
+        best_scores = [np.empty(0, dtype=np.float32) for _ in queries]
+        best_ids = [np.empty(0, dtype=np.int64) for _ in queries]
+
+        for start in range(0, len(self), SCORE_CHUNK):
+            stop = min(start + SCORE_CHUNK, len(self))
+            block = self._scores(start, stop, queries)     # (rows, batch)
+            for q in range(len(queries)):
+                col = block[:, q]
+                kk = min(k, len(col))
+                part = np.argpartition(-col, kk - 1)[:kk]
+                best_scores[q] = np.concatenate([best_scores[q], col[part]])
+                best_ids[q] = np.concatenate([best_ids[q], part + start])
+
+        return [self._top(s, i, k) for s, i in zip(best_scores, best_ids)]
+
+    def _ivf(self, queries: np.ndarray, k: int, nprobe: int) -> list[list[tuple[float, int]]]:
+        probes = np.argsort(-(queries @ self.centroids.T), axis=1)[:, :nprobe]
+        results = []
+        for q, lists in enumerate(probes):
+            ids = np.concatenate([
+                np.arange(self.offsets[c], self.offsets[c + 1]) for c in lists
+            ])
+            if not len(ids):
+                results.append([])
+                continue
+            block = np.asarray(self.vectors[ids], dtype=np.float32)
+            scores = block @ queries[q]
+            if self.scales is not None:
+                scores *= np.asarray(self.scales[ids])
+            results.append(self._top(scores, ids, k))
+        return results
+
+    def search_batch(self, queries: np.ndarray, k: int = 5, nprobe: int = 8) -> list[list[dict]]:
+        """queries: (batch, dim) float32, L2-normalized. Har query ke top-k hits."""
+        if len(self) == 0:
+            return [[] for _ in queries]
+        queries = np.ascontiguousarray(queries, dtype=np.float32)
+
+        if self.centroids is not None and nprobe < len(self.centroids):
+            ranked = self._ivf(queries, k, nprobe)
+        else:
+            ranked = self._brute(queries, k)
+
+        return [
+            [{**self.meta[i], "score": round(score, 4)} for score, i in hits]
+            for hits in ranked
+        ]
+
+    def search(self, text: str, k: int = 5, nprobe: int = 8) -> list[dict]:
+        return self.search_batch(self.embedder.embed(text)[None, :], k, nprobe)[0]
+
+# ---------------- Request Batching ----------------
+
+
+class BatchingSearcher:
+    """
+    Concurrent /query requests ke vectors ek matrix me jod kar ek hi
+    search_batch call (ek matmul) me score karo. Pehli request ke baad
+    max_wait tak ya max_batch hone tak aur requests ka wait hota hai.
+    """
+
+    def __init__(self, index: VectorIndex, max_batch: int = 32, max_wait: float = 0.002, nprobe: int = 8):
+        self.index = index
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.nprobe = nprobe
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+
+    async def search(self, text: str, k: int = 5) -> list[dict]:
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((self.index.embedder.embed(text), k, future))
+        return await future
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _next(self, timeout: float):
+        # wait_for(queue.get()) timeout ke waqt mila hua item gira sakta hai
+        # (Python 3.10); alag task + cancel ke baad bhi result check
+        getter = asyncio.ensure_future(self._queue.get())
+        await asyncio.wait({getter}, timeout=timeout)
+        if not getter.done():
+            getter.cancel()
+            await asyncio.wait({getter})
+        return None if getter.cancelled() else getter.result()
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            try:
+                deadline = time.monotonic() + self.max_wait
+                while len(batch) < self.max_batch:
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    item = await self._next(timeout)
+                    if item is None:
+                        break
+                    batch.append(item)
+
+                queries = np.stack([vec for vec, _, _ in batch])
+                k = max(k for _, k, _ in batch)
+                results = await run_in_threadpool(self.index.search_batch, queries, k, self.nprobe)
+                for (_, k_req, future), hits in zip(batch, results):
+                    if not future.done():
+                        future.set_result(hits[:k_req])
+            except Exception as e:
+                # batch ka koi bhi error: har waiting request ko wahi error, loop chalta rahe
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+# ---------------- CLI ----------------
+
+
+def passages_from_db(conn: sqlite3.Connection) -> tuple[list[str], list[dict]]:
+    texts, meta = [], []
+    for rowid, source, crop, title, body in conn.execute(
+        "SELECT rowid, source, crop, title, body FROM knowledge_fts"
+    ):
+        texts.append(f"{title}. {body}")
+        meta.append({
+            "id": rowid,
+            "source": source,
+            "crop": crop or None,
+            "title": title,
+            "text": body[:600],
+        })
+    return texts, meta
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--db", required=True)
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--dtype", choices=["float16", "int8"], default="int8")
+    parser.add_argument("--nlist", type=int, default=0)
+    parser.add_argument("--dim", type=int, default=256)
+    args = parser.parse_args()
+
+    # knowledge DB / snapshot sirf padhte hain; FTS create_db / ingest / publish banate hain
+    conn = sqlite3.connect(f"file:{quote(str(Path(args.db).resolve()))}?mode=ro", uri=True)
+    try:
+        texts, meta = passages_from_db(conn)
+    except sqlite3.OperationalError as e:
+        raise SystemExit(f"❌ {e} — pehle `python fts.py --db {args.db}` ya publish_knowledge.py chalayein")
+    finally:
+        conn.close()
+
+    t0 = time.perf_counter()
+    manifest = build_index(args.out, texts, meta, HashingEmbedder(dim=args.dim), args.dtype, args.nlist)
+    print(f"✅ Vector index: {manifest['count']} passages, {args.dtype}, nlist={manifest['nlist']} "
+          f"in {time.perf_counter() - t0:.1f}s → {args.out}")